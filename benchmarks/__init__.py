@@ -0,0 +1,4 @@
+"""Микробенчмарки сервиса поликлиники.
+
+Запуск из корня проекта: ``python -m benchmarks.<имя_модуля>``.
+"""
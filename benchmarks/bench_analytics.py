@@ -0,0 +1,36 @@
+"""Отчеты по выручке и загрузке на большом числе записей."""
+
+import sys
+import time
+
+from benchmarks.datasets import build_service
+from services.analytics import GROUP_COLUMNS, aggregate, summarize
+
+APPOINTMENTS = 1_000_000
+
+
+def main() -> None:
+    total = int(sys.argv[1]) if len(sys.argv) > 1 else APPOINTMENTS
+    service = build_service(total)
+    for appointment_id in range(1, total + 1, 7):
+        service.cancel_appointment(appointment_id)
+
+    started = time.perf_counter()
+    service.appointment_columns()
+    print(f"{total} записей на прием, построение столбцов: "
+          f"{time.perf_counter() - started:.2f} с")
+
+    for group_by in GROUP_COLUMNS:
+        started = time.perf_counter()
+        groups = aggregate(service, group_by)
+        elapsed = time.perf_counter() - started
+        print(f"{group_by:>10}: {len(groups):>5} групп, {elapsed * 1000:.0f} мс")
+
+    started = time.perf_counter()
+    totals = summarize(service)
+    print(f"{'итого':>10}: {totals.count} записей, {totals.revenue:.0f} руб., "
+          f"{(time.perf_counter() - started) * 1000:.0f} мс")
+
+
+if __name__ == "__main__":
+    main()
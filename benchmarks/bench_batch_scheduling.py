@@ -0,0 +1,80 @@
+"""Пропускная способность пакетной записи на прием.
+
+Пакет заявок на неделю: пациенты просятся к врачам пяти специализаций,
+часть заявок - к конкретному врачу. Заявок больше, чем свободного
+времени, поэтому часть остается неразмещенной.
+"""
+
+import random
+import sys
+import time
+from datetime import timedelta
+
+from benchmarks.datasets import FIRST_DAY
+from services.batch_scheduling import BookingRequest, schedule_batch
+from services.polyclinic_service import PolyclinicService
+
+REQUESTS = 40_000
+DOCTORS = 200
+PATIENTS = 5_000
+SPECIALIZATIONS = ("Терапевт", "Хирург", "Кардиолог", "Невролог", "Офтальмолог")
+
+
+def build(requests: int):
+    service = PolyclinicService("Городская поликлиника №1", "ул. Ленина, 10")
+    for i in range(PATIENTS):
+        service.create_patient(
+            "Иван", f"Иванов{i}", "1990-01-01", f"+7999{i:07d}", f"{i:016d}"
+        )
+    for i in range(DOCTORS):
+        service.create_doctor(
+            "Петр",
+            f"Петров{i}",
+            "1980-01-01",
+            f"+7998{i:07d}",
+            SPECIALIZATIONS[i % len(SPECIALIZATIONS)],
+            f"LIC{i}",
+        )
+    department = service.create_department("Терапевтическое", 1, 1)
+    for i in range(DOCTORS):
+        service.create_room(str(100 + i), 1, "Кабинет", department.department_id)
+    for duration in (15, 30, 45):
+        service.create_service("Консультация", "Прием", 1000.0, duration)
+
+    rng = random.Random(17)
+    batch = []
+    for _ in range(requests):
+        first = FIRST_DAY + timedelta(days=rng.randrange(7))
+        last = first + timedelta(days=rng.randrange(3))
+        doctor_id = rng.randrange(1, DOCTORS + 1) if rng.random() < 0.2 else None
+        batch.append(
+            BookingRequest(
+                rng.randrange(1, PATIENTS + 1),
+                rng.randrange(1, 4),
+                first.isoformat(),
+                last.isoformat(),
+                doctor_id=doctor_id,
+                specialization=(
+                    None if doctor_id else rng.choice(SPECIALIZATIONS)
+                ),
+                reason="Плановый осмотр",
+            )
+        )
+    return service, batch
+
+
+def main() -> None:
+    total = int(sys.argv[1]) if len(sys.argv) > 1 else REQUESTS
+    service, batch = build(total)
+
+    started = time.perf_counter()
+    result = schedule_batch(service, batch)
+    elapsed = time.perf_counter() - started
+
+    print(f"{total} заявок, {DOCTORS} врачей и кабинетов")
+    print(f"размещено: {len(result.placed)}, не размещено: {len(result.unplaced)}")
+    print(f"время: {elapsed:.2f} с, {total / elapsed:.0f} заявок/с")
+
+
+if __name__ == "__main__":
+    main()
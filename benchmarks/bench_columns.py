@@ -0,0 +1,64 @@
+"""Агрегатная выборка: обход объектов Appointment против столбцовой копии.
+
+Считается число неотмененных записей по врачам и суммарные минуты
+приемов по услугам.
+"""
+
+import sys
+import time
+from collections import Counter
+
+from benchmarks.datasets import build_service
+from models import STATUS_CANCELLED, STATUS_COMPLETED, STATUS_SCHEDULED
+
+APPOINTMENTS = 1_000_000
+
+
+def scan_objects(service):
+    per_doctor = Counter()
+    minutes = Counter()
+    for appointment in service.iter_entities("appointments"):
+        if appointment.status != STATUS_CANCELLED:
+            per_doctor[appointment.doctor.doctor_id] += 1
+            minutes[appointment.service.service_id] += appointment.service.duration
+    return per_doctor, minutes
+
+
+def scan_columns(service):
+    columns = service.appointment_columns()
+    mask = columns.status_mask(STATUS_SCHEDULED, STATUS_COMPLETED)
+    per_doctor = columns.count_by("doctor_id", mask)
+    minutes = Counter(
+        {
+            service_id: count * service.get_service(service_id).duration
+            for service_id, count in columns.count_by("service_id", mask).items()
+        }
+    )
+    return per_doctor, minutes
+
+
+def main() -> None:
+    total = int(sys.argv[1]) if len(sys.argv) > 1 else APPOINTMENTS
+    service = build_service(total)
+    for appointment_id in range(1, total + 1, 7):
+        service.cancel_appointment(appointment_id)
+
+    started = time.perf_counter()
+    service.appointment_columns()
+    built = time.perf_counter() - started
+
+    timings = {}
+    results = {}
+    for title, scan in (("объекты", scan_objects), ("столбцы", scan_columns)):
+        started = time.perf_counter()
+        results[title] = scan(service)
+        timings[title] = time.perf_counter() - started
+    assert results["объекты"] == results["столбцы"]
+
+    print(f"{total} записей на прием, построение столбцов: {built:.2f} с")
+    for title, elapsed in timings.items():
+        print(f"{title:>10}: {elapsed * 1000:.0f} мс")
+
+
+if __name__ == "__main__":
+    main()
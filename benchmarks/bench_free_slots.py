@@ -0,0 +1,39 @@
+"""Поиск ближайших свободных окон у врачей одной специализации.
+
+Записи врачей в наборе build_service идут подряд по получасовым окнам, а
+каждая седьмая запись отменена, поэтому свободные окна разбросаны по
+всему забронированному периоду.
+"""
+
+import sys
+import time
+from datetime import timedelta
+
+from benchmarks.datasets import FIRST_DAY, build_service
+
+APPOINTMENTS = 1_000_000
+DOCTORS = 2_000
+
+
+def main() -> None:
+    total = int(sys.argv[1]) if len(sys.argv) > 1 else APPOINTMENTS
+    service = build_service(total, doctors=DOCTORS)
+    for appointment_id in range(1, total + 1, 7):
+        service.cancel_appointment(appointment_id)
+    booked_days = total // DOCTORS // 24 + 1
+    print(f"{total} записей на прием, {DOCTORS} врачей, {booked_days} дней занято")
+
+    first = FIRST_DAY.isoformat()
+    last = (FIRST_DAY + timedelta(days=90)).isoformat()
+    for duration, limit in ((30, 10), (30, 100), (60, 10)):
+        started = time.perf_counter()
+        slots = service.find_free_slots("Терапевт", (first, last), duration, limit)
+        elapsed = time.perf_counter() - started
+        print(
+            f"{duration} мин, {limit} окон: {elapsed * 1000:.1f} мс, "
+            f"первое {slots[0][0]} {slots[0][1]}, последнее {slots[-1][0]} {slots[-1][1]}"
+        )
+
+
+if __name__ == "__main__":
+    main()
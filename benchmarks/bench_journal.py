@@ -0,0 +1,37 @@
+"""Сохранение после небольшой правки: полный снимок против журнала."""
+
+import os
+import sys
+import tempfile
+import time
+
+from benchmarks.datasets import build_service
+from services.file_manager import PolyclinicFileManager
+
+APPOINTMENTS = 500_000
+EDITS = 10
+
+
+def main() -> None:
+    total = int(sys.argv[1]) if len(sys.argv) > 1 else APPOINTMENTS
+    service = build_service(total)
+    with tempfile.TemporaryDirectory() as tmp:
+        filename = os.path.join(tmp, "polyclinic.snap")
+
+        started = time.perf_counter()
+        PolyclinicFileManager.save_to_snapshot(service, filename)
+        full = time.perf_counter() - started
+
+        for appointment_id in range(1, EDITS + 1):
+            service.cancel_appointment(appointment_id)
+        started = time.perf_counter()
+        PolyclinicFileManager.save_to_snapshot(service, filename)
+        incremental = time.perf_counter() - started
+
+    print(f"{total} записей на прием, изменено {EDITS}:")
+    print(f"  полный снимок: {full * 1000:.1f} мс")
+    print(f"         журнал: {incremental * 1000:.1f} мс")
+
+
+if __name__ == "__main__":
+    main()
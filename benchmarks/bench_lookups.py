@@ -0,0 +1,46 @@
+"""Задержка get_* в зависимости от размера реестра (1k .. 1M сущностей)."""
+
+import random
+import sys
+import timeit
+
+from services.polyclinic_service import PolyclinicService
+
+SIZES = [1_000, 10_000, 100_000, 1_000_000]
+LOOKUPS = 100_000
+
+
+def build_service(size: int) -> PolyclinicService:
+    """Создает сервис с заданным числом пациентов и врачей."""
+    service = PolyclinicService("Бенчмарк", "ул. Тестовая, 1")
+    for i in range(size):
+        service.create_patient(
+            "Иван", "Иванов", "1990-01-01", f"+7999{i:07d}", str(i)
+        )
+        service.create_doctor(
+            "Петр", "Петров", "1980-01-01", f"+7998{i:07d}", "Терапевт", f"LIC{i}"
+        )
+    return service
+
+
+def main() -> None:
+    sizes = [int(arg) for arg in sys.argv[1:]] or SIZES
+    print(f"{'размер':>10} {'get_patient, нс':>16} {'get_doctor, нс':>16}")
+    for size in sizes:
+        service = build_service(size)
+        ids = [random.randint(1, size) for _ in range(LOOKUPS)]
+
+        patient_time = timeit.timeit(
+            lambda: [service.get_patient(i) for i in ids], number=1
+        )
+        doctor_time = timeit.timeit(
+            lambda: [service.get_doctor(i) for i in ids], number=1
+        )
+        print(
+            f"{size:>10} {patient_time / LOOKUPS * 1e9:>16.1f} "
+            f"{doctor_time / LOOKUPS * 1e9:>16.1f}"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,94 @@
+"""Память на объект модели (tracemalloc) на наборе из 1M записей на прием.
+
+Строки полей создаются заново для каждой строки, как при разборе файла,
+поэтому замер учитывает и повторяющиеся статусы, специализации и типы
+кабинетов.
+"""
+
+import sys
+import tracemalloc
+from typing import Callable, List
+
+from models import Appointment, Department, Doctor, MedicalService, Patient, Room
+
+APPOINTMENTS = 1_000_000
+PATIENTS = 100_000
+DOCTORS = 10_000
+ROOMS = 5_000
+
+SPECIALIZATIONS = ["Терапевт", "Хирург", "Кардиолог", "Невролог", "Офтальмолог"]
+ROOM_TYPES = ["Процедурный", "Диагностический", "Смотровой"]
+STATUSES = ["запланирован", "завершен", "отменен"]
+
+
+def fresh(text: str) -> str:
+    """Возвращает новую копию строки, как после разбора файла."""
+    return (text + " ")[:-1]
+
+
+def measure(title: str, count: int, build: Callable[[int], object]) -> List[object]:
+    """Создает count объектов и печатает, сколько байт приходится на каждый."""
+    tracemalloc.start()
+    before = tracemalloc.get_traced_memory()[0]
+    entities = [build(i) for i in range(count)]
+    after = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    # Сам список ссылок (8 байт на элемент) к объектам не относится
+    per_entity = (after - before - sys.getsizeof(entities)) / count
+    print(f"{title:>16}: {per_entity:7.1f} байт на объект ({count} шт.)")
+    return entities
+
+
+def main() -> None:
+    total = int(sys.argv[1]) if len(sys.argv) > 1 else APPOINTMENTS
+    head = Doctor(0, "Иван", "Иванов", "1970-01-01", "+7900", "Терапевт", "LIC0")
+    department = Department(1, "Терапевтическое", 1, head)
+    service = MedicalService(1, "Консультация", "Первичный осмотр", 1500.0, 30)
+
+    patients = measure(
+        "Patient",
+        PATIENTS,
+        lambda i: Patient(
+            i, f"Имя{i}", f"Фамилия{i}", "1990-01-01", f"+7{i:010d}", f"INS{i:08d}"
+        ),
+    )
+    doctors = measure(
+        "Doctor",
+        DOCTORS,
+        lambda i: Doctor(
+            i,
+            f"Имя{i}",
+            f"Фамилия{i}",
+            "1975-01-01",
+            f"+7{i:010d}",
+            fresh(SPECIALIZATIONS[i % len(SPECIALIZATIONS)]),
+            f"LIC{i:06d}",
+        ),
+    )
+    rooms = measure(
+        "Room",
+        ROOMS,
+        lambda i: Room(
+            i, str(100 + i), 1, fresh(ROOM_TYPES[i % len(ROOM_TYPES)]), department
+        ),
+    )
+
+    def build_appointment(i: int) -> Appointment:
+        appointment = Appointment(
+            i,
+            patients[i % PATIENTS],
+            doctors[i % DOCTORS],
+            rooms[i % ROOMS],
+            fresh("2026-01-01"),
+            fresh("10:00"),
+            service,
+            fresh(""),
+        )
+        appointment.status = fresh(STATUSES[i % len(STATUSES)])
+        return appointment
+
+    measure("Appointment", total, build_appointment)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,129 @@
+"""Подсказки по началу имени и поиск с опечатками среди пациентов.
+
+Фамилии составляются из корней и суффиксов (около десяти тысяч различных
+фамилий на любое число пациентов), имена берутся из списка. Подсказка -
+autocomplete по первым буквам фамилии или имени, поиск с опечатками -
+search_similar по фамилии с одной заменой или пропуском буквы.
+
+Запуск: python -m benchmarks.bench_name_search [пациентов]
+"""
+
+import random
+import sys
+import time
+
+from benchmarks.bench_record_store import timed
+from services.polyclinic_service import PolyclinicService
+
+ROOTS = (
+    "Иван Петр Сидор Смирн Кузнец Попов Васил Соколов Михайл Новик Федор Мороз "
+    "Волк Алексе Лебед Семен Егор Павл Козл Степан Никола Орл Андре Макар Никит "
+    "Захар Зайц Солов Борис Яковл Григор Роман Воробь Сергее Кузьмин Фрол "
+    "Александр Дмитри Королев Гусев Киселев Ильин Максим Поляков Сорокин "
+    "Виноград Ковал Белов Медвед Антон Тарас Жуков Баран Филипп Комар Давыд "
+    "Беляк Гераси Богдан Осип Сидорен Матве Тит Марк Кудряв Бар Куликов Карп "
+    "Афанас Власов Маслов Исак Тихон Аксен Гаврил Родион Котов Горбун Кудрин "
+    "Бык Зуев Третьяк Савел Панов Рыбак Суворов Абрам Воронин Мухин Архип "
+    "Трофим Мартын Емельян Горшков Чернов Овчин Селезн Панфил Копыл Михеев"
+).split()
+SUFFIXES = (
+    "ов ова ев ева ин ина ский ская енко ук юк ич ович цев цева ников никова "
+    "ченко инский овский ёв ёва ко ян ец ак ачев анов енков ушкин ишин ыгин "
+    "ейкин ахов убов урин илов енов ыкин унов ашов ихин ецкий ецкая овцев ашкин "
+    "анский оров ищев олин орин ушев ятин еров абов ульев офеев ыров емов ялов "
+    "ихов устов ащук ецов уров якин итов уков ылин омов яшов агин евич евская "
+    "инов удов ыпин ебов ачук ешин акин евцов онов овин ашин енцов ыков отин "
+    "урцев юшин ыгов евин ачёв ешков ошин ивцев ячин онин"
+).split()
+FIRST_NAMES = (
+    "Александр Алексей Анна Андрей Дмитрий Екатерина Елена Иван Ирина Мария "
+    "Михаил Наталья Николай Ольга Павел Пётр Сергей Светлана Татьяна Юлия"
+).split()
+QUERIES = 1_000
+
+
+def build_service(patients: int) -> PolyclinicService:
+    """Создает сервис с пациентами с повторяющимися фамилиями."""
+    rng = random.Random(1)
+    service = PolyclinicService("Бенчмарк", "ул. Тестовая, 1")
+    for i in range(patients):
+        service.create_patient(
+            rng.choice(FIRST_NAMES),
+            rng.choice(ROOTS) + rng.choice(SUFFIXES),
+            "1990-01-01",
+            f"+7916{i:07d}",
+            f"{i:016d}",
+        )
+    return service
+
+
+def misspell(word: str, rng: random.Random) -> str:
+    """Заменяет или пропускает одну букву слова (не первую)."""
+    position = rng.randrange(1, len(word))
+    if rng.random() < 0.5:
+        return word[:position] + word[position + 1 :]
+    return word[:position] + rng.choice("аеиоуя") + word[position + 1 :]
+
+
+def measure(label: str, action, queries) -> None:
+    start = time.perf_counter()
+    found = 0
+    for query in queries:
+        found += len(action(query))
+    elapsed = (time.perf_counter() - start) / len(queries)
+    print(f"{label}: {elapsed * 1000:.3f} мс (в среднем {found / len(queries):.1f})")
+
+
+def main() -> None:
+    patients = int(sys.argv[1]) if len(sys.argv) > 1 else 1_000_000
+    service = timed("Создание пациентов", lambda: build_service(patients))
+    timed("Построение индексов имен", lambda: service.autocomplete("patients", "А"))
+
+    rng = random.Random(2)
+    people = rng.sample(service.patients, QUERIES)
+    print(f"Пациентов: {patients}")
+    measure(
+        "Подсказка по 3 буквам фамилии",
+        lambda query: service.autocomplete("patients", query),
+        [person.last_name[:3] for person in people],
+    )
+    measure(
+        "Подсказка по фамилии и началу имени",
+        lambda query: service.autocomplete("patients", query),
+        [f"{person.last_name} {person.first_name[:2]}" for person in people],
+    )
+    measure(
+        "Подсказка по началу имени",
+        lambda query: service.autocomplete("patients", query),
+        [person.first_name[:4] for person in people],
+    )
+    measure(
+        "Фамилия с опечаткой, первая страница",
+        lambda query: service.search_similar("patients", query)[1],
+        [misspell(person.last_name, rng) for person in people[:100]],
+    )
+    measure(
+        "Фамилия и имя с опечатками, первая страница",
+        lambda query: service.search_similar("patients", query)[1],
+        [
+            f"{misspell(person.last_name, rng)} {misspell(person.first_name, rng)}"
+            for person in people[:100]
+        ],
+    )
+
+    # Обновление индексов при изменениях
+    start = time.perf_counter()
+    created = [
+        service.create_patient(
+            "Иван", f"Новиков{i}", "1990-01-01", f"+7917{i:07d}", ""
+        )
+        for i in range(1_000)
+    ]
+    for patient in created:
+        service.delete_patient(patient.patient_id)
+    elapsed = (time.perf_counter() - start) / len(created) / 2
+    print(f"Создание или удаление пациента с индексами: {elapsed * 1000:.3f} мс")
+
+
+if __name__ == "__main__":
+    main()
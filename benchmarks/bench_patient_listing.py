@@ -0,0 +1,61 @@
+"""Строки списка пациентов со сведениями о медицинской карте.
+
+Раньше карта пациента искалась перебором service.medical_records для
+каждой строки, и список из n пациентов строился за O(n^2). Теперь
+строка берет карту из Patient.medical_record и число записей из
+count_record_entries, и время растет линейно. Старый способ меряется
+только на размерах до OLD_LIMIT.
+
+Запуск: python -m benchmarks.bench_patient_listing [размеры...]
+"""
+
+import sys
+import time
+
+from benchmarks.datasets import build_service
+from main import PolyclinicApp
+
+SIZES = [1_000, 5_000, 20_000, 100_000]
+OLD_LIMIT = 5_000
+
+
+def old_record_info(service, patient) -> str:
+    """Сведения о карте, как их искал прежний view_patients."""
+    medical_record = next(
+        (
+            record
+            for record in service.medical_records
+            if record.patient.patient_id == patient.patient_id
+        ),
+        None,
+    )
+    if medical_record and medical_record.entries:
+        return " (есть мед. карта)"
+    return " (нет записей)"
+
+
+def main() -> None:
+    sizes = [int(arg) for arg in sys.argv[1:]] or SIZES
+    print(f"{'пациентов':>10} {'прежде, мс':>12} {'теперь, мс':>12}")
+    for size in sizes:
+        service = build_service(0, patients=size, doctors=1)
+        app = PolyclinicApp()
+        app.service = service
+        patients = service.patients
+
+        old = "-"
+        if size <= OLD_LIMIT:
+            start = time.perf_counter()
+            for patient in patients:
+                old_record_info(service, patient)
+            old = f"{(time.perf_counter() - start) * 1000:.1f}"
+
+        start = time.perf_counter()
+        for patient in patients:
+            app.describe_patient(patient)
+        new = (time.perf_counter() - start) * 1000
+        print(f"{size:>10} {old:>12} {new:>12.1f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,150 @@
+"""Записи медицинских карт: память и выборки по коду диагноза и датам.
+
+Память: записи-словари, какими они были раньше, против RecordEntry.
+Выборки: перебор всех карт против индекса записей сервиса
+(find_record_entries и patients_with_code).
+
+Запуск: python -m benchmarks.bench_record_entries [пациентов] [записей на карту]
+"""
+
+import random
+import sys
+import tracemalloc
+
+from benchmarks.bench_record_store import timed
+from benchmarks.datasets import build_service
+from models import RecordEntry, format_date, parse_date
+
+CODES = 200
+CODE = "J06"
+DATE_RANGE = ("2026-03-01", "2026-03-07")
+
+
+def fill_records(service, entries: int) -> None:
+    """Добавляет каждому пациенту entries записей за 2026 год.
+
+    Диагнозы выбираются из CODES кодов, даты приема - случайные дни года.
+    """
+    rng = random.Random(1)
+    diagnoses = [
+        service.create_diagnosis(f"{chr(65 + i // 10)}{i % 10:02d}", f"Диагноз {i}", "")
+        for i in range(CODES)
+    ]
+    doctors = list(service.iter_entities("doctors"))
+    first_day = parse_date("2026-01-01")
+    for patient in service.iter_entities("patients"):
+        record = patient.medical_record
+        for day in sorted(rng.randrange(365) for _ in range(entries)):
+            record.add_entry(
+                format_date(first_day + day),
+                rng.choice(doctors),
+                rng.choice(diagnoses),
+                "Кашель, температура 37.5, слабость",
+                "Обильное питье, постельный режим",
+                (),
+            )
+
+
+def entry_dict(entry: RecordEntry) -> dict:
+    """Запись карты в прежнем виде словаря."""
+    return {
+        "entry_id": entry.entry_id,
+        "entry_day": entry.entry_day,
+        "doctor": entry.doctor,
+        "diagnosis": entry.diagnosis,
+        "symptoms": entry.symptoms,
+        "treatment": entry.treatment,
+        "prescriptions": list(entry.prescriptions),
+    }
+
+
+def measure(label: str, build) -> None:
+    tracemalloc.start()
+    result = build()
+    size = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    print(f"{label}: {size / len(result):.0f} байт на запись")
+
+
+def scan_entries(service, code, date_range):
+    """Выборка записей перебором всех карт; code=None - любой диагноз."""
+    first_day, last_day = parse_date(date_range[0]), parse_date(date_range[1])
+    return [
+        (patient, entry)
+        for patient in service.iter_entities("patients")
+        for entry in patient.medical_record.entries
+        if (code is None or entry.diagnosis.code == code)
+        and first_day <= entry.entry_day <= last_day
+    ]
+
+
+def scan_patients(service, code):
+    """Пациенты с кодом диагноза перебором всех карт."""
+    return [
+        patient
+        for patient in service.iter_entities("patients")
+        if any(entry.diagnosis.code == code for entry in patient.medical_record.entries)
+    ]
+
+
+def main() -> None:
+    patients = int(sys.argv[1]) if len(sys.argv) > 1 else 20_000
+    entries = int(sys.argv[2]) if len(sys.argv) > 2 else 20
+    service = build_service(0, patients=patients, doctors=100)
+    fill_records(service, entries)
+    print(f"Пациентов: {patients}, записей в карте: {entries}")
+
+    sample = [
+        entry
+        for patient in service.iter_entities("patients")
+        for entry in patient.medical_record.entries
+    ][:100_000]
+    measure("Словари", lambda: [entry_dict(entry) for entry in sample])
+    measure(
+        "RecordEntry",
+        lambda: [
+            RecordEntry(
+                entry.entry_id,
+                entry.entry_day,
+                entry.doctor,
+                entry.diagnosis,
+                entry.symptoms,
+                entry.treatment,
+                entry.prescriptions,
+            )
+            for entry in sample
+        ],
+    )
+
+    found = timed(
+        f"Перебор карт: {CODE} за {DATE_RANGE[0]}..{DATE_RANGE[1]}",
+        lambda: scan_entries(service, CODE, DATE_RANGE),
+    )
+    timed("Построение индекса записей", service.record_index)
+    indexed = timed(
+        f"Индекс: {CODE} за {DATE_RANGE[0]}..{DATE_RANGE[1]}",
+        lambda: service.find_record_entries(CODE, DATE_RANGE),
+    )
+    print(f"Найдено записей: {len(indexed)} (перебором {len(found)})")
+
+    found = timed(
+        f"Перебор карт: все приемы за {DATE_RANGE[0]}..{DATE_RANGE[1]}",
+        lambda: scan_entries(service, None, DATE_RANGE),
+    )
+    indexed = timed(
+        f"Индекс: все приемы за {DATE_RANGE[0]}..{DATE_RANGE[1]}",
+        lambda: service.find_record_entries(None, DATE_RANGE),
+    )
+    print(f"Найдено записей: {len(indexed)} (перебором {len(found)})")
+
+    found = timed(
+        f"Перебор карт: пациенты с {CODE}", lambda: scan_patients(service, CODE)
+    )
+    indexed = timed(
+        f"Индекс: пациенты с {CODE}", lambda: service.patients_with_code(CODE)
+    )
+    print(f"Найдено пациентов: {len(indexed)} (перебором {len(found)})")
+
+
+if __name__ == "__main__":
+    main()
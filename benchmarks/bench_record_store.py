@@ -0,0 +1,86 @@
+"""Хранилище медицинских карт: сохранение, открытие и чтение одной карты.
+
+Запуск: python -m benchmarks.bench_record_store [пациентов] [записей на карту]
+"""
+
+import os
+import sys
+import tempfile
+import time
+
+from benchmarks.datasets import build_service
+from services.file_manager import PolyclinicFileManager
+from services.record_store import records_path
+
+
+def fill_records(service, entries: int) -> None:
+    """Добавляет каждому пациенту entries записей с одним назначением."""
+    diagnoses = [
+        service.create_diagnosis(f"J0{i}", f"Диагноз {i}", "Описание")
+        for i in range(10)
+    ]
+    doctors = list(service.iter_entities("doctors"))
+    for patient in service.iter_entities("patients"):
+        record = patient.medical_record
+        for i in range(entries):
+            prescription = service.create_prescription(
+                "Парацетамол", "500 мг", "3 раза в день", "5 дней"
+            )
+            record.add_entry(
+                f"2026-01-{i % 28 + 1:02d}",
+                doctors[(patient.patient_id + i) % len(doctors)],
+                diagnoses[i % len(diagnoses)],
+                "Кашель, температура 37.5, слабость",
+                "Обильное питье, постельный режим",
+                [prescription],
+            )
+
+
+def timed(label: str, action):
+    start = time.perf_counter()
+    result = action()
+    print(f"{label}: {(time.perf_counter() - start) * 1000:.1f} мс")
+    return result
+
+
+def main() -> None:
+    patients = int(sys.argv[1]) if len(sys.argv) > 1 else 20_000
+    entries = int(sys.argv[2]) if len(sys.argv) > 2 else 20
+    service = build_service(0, patients=patients, doctors=100)
+    fill_records(service, entries)
+    print(f"Пациентов: {patients}, записей в карте: {entries}")
+
+    with tempfile.TemporaryDirectory() as directory:
+        filename = os.path.join(directory, "polyclinic.snapshot")
+        timed(
+            "Сохранение снимка с картами",
+            lambda: PolyclinicFileManager.save_to_snapshot(service, filename),
+        )
+        size = os.path.getsize(records_path(filename)) / 1024 / 1024
+        print(f"Размер хранилища карт: {size:.1f} МБ")
+
+        loaded = timed(
+            "Открытие снимка",
+            lambda: PolyclinicFileManager.load_from_snapshot(filename),
+        )
+        patient_id = patients // 2
+        timed(
+            "Первое открытие одной карты",
+            lambda: loaded.get_medical_record(patient_id).entries,
+        )
+        copy = os.path.join(directory, "copy.snapshot")
+        timed(
+            "Повторное сохранение без чтения карт",
+            lambda: PolyclinicFileManager.save_to_snapshot(loaded, copy),
+        )
+        timed(
+            "Чтение всех карт",
+            lambda: [
+                patient.medical_record.entries
+                for patient in loaded.iter_entities("patients")
+            ],
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,87 @@
+"""Стоимость проверки пересечений при заполнении календарей до 1M записей."""
+
+import random
+import sys
+import time
+from datetime import date, timedelta
+
+from models import ValidationError
+from services.polyclinic_service import PolyclinicService
+from services.scheduling import to_interval
+
+APPOINTMENTS = 1_000_000
+DOCTORS = 1_000
+ROOMS = 500
+DAYS = 365
+PROBES = 100_000
+
+
+def build_service() -> PolyclinicService:
+    """Создает сервис с врачами, кабинетами и услугами разной длительности."""
+    service = PolyclinicService("Бенчмарк", "ул. Тестовая, 1")
+    service.create_patient("Иван", "Иванов", "1990-01-01", "+79990000000", "1")
+    for i in range(DOCTORS):
+        service.create_doctor(
+            "Петр", "Петров", "1980-01-01", f"+7998{i:07d}", "Терапевт", f"LIC{i}"
+        )
+    department = service.create_department("Терапевтическое", 1, 1)
+    for i in range(ROOMS):
+        service.create_room(str(i), 1, "Кабинет", department.department_id)
+    for duration in (15, 30, 45, 60):
+        service.create_service(f"Услуга {duration}", "", 1000.0, duration)
+    return service
+
+
+def main() -> None:
+    total = int(sys.argv[1]) if len(sys.argv) > 1 else APPOINTMENTS
+    service = build_service()
+    first_day = date(2026, 1, 1)
+    days = [(first_day + timedelta(days=i)).isoformat() for i in range(DAYS)]
+    times = [f"{h:02d}:{m:02d}" for h in range(8, 20) for m in (0, 15, 30, 45)]
+
+    rng = random.Random(42)
+    booked = rejected = 0
+    started = time.perf_counter()
+    while booked < total:
+        try:
+            service.create_appointment(
+                1,
+                rng.randint(1, DOCTORS),
+                rng.randint(1, ROOMS),
+                rng.choice(days),
+                rng.choice(times),
+                rng.randint(1, 4),
+            )
+            booked += 1
+        except ValidationError:
+            rejected += 1
+    elapsed = time.perf_counter() - started
+    print(
+        f"Создано {booked} записей за {elapsed:.1f} с "
+        f"({elapsed / (booked + rejected) * 1e6:.1f} мкс на попытку, "
+        f"отклонено пересечений: {rejected})"
+    )
+
+    doctor = service.get_doctor(1)
+    room = service.get_room(1)
+    probes = [
+        (rng.choice(days), rng.choice(times), rng.choice([15, 30, 45, 60]))
+        for _ in range(PROBES)
+    ]
+    started = time.perf_counter()
+    conflicts = 0
+    for day, slot, duration in probes:
+        start, end = to_interval(day, slot, duration)
+        try:
+            service._check_availability(doctor, room, start, end)
+        except ValidationError:
+            conflicts += 1
+    elapsed = time.perf_counter() - started
+    print(
+        f"Проверка пересечений: {elapsed / PROBES * 1e6:.2f} мкс на запрос "
+        f"({conflicts} конфликтов из {PROBES})"
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,70 @@
+"""Поиск пациентов для выбора в меню: страница поиска против полного списка.
+
+Полный список - то, что делали экраны выбора раньше: строка на каждого
+пациента. Страница поиска - search_patients по началу фамилии, номеру
+страховки и телефону, на странице PAGE_SIZE строк.
+
+Запуск: python -m benchmarks.bench_search [пациентов]
+"""
+
+import random
+import sys
+import time
+
+from main import PAGE_SIZE
+from services.polyclinic_service import PolyclinicService
+
+SURNAMES = ["Иванов", "Петров", "Сидоров", "Смирнов", "Кузнецов", "Попов", "Соколов"]
+QUERIES = 1_000
+
+
+def build_service(patients: int) -> PolyclinicService:
+    """Создает сервис с пациентами с разными фамилиями и телефонами."""
+    service = PolyclinicService("Бенчмарк", "ул. Тестовая, 1")
+    for i in range(patients):
+        service.create_patient(
+            "Иван",
+            f"{SURNAMES[i % len(SURNAMES)]}{i}",
+            "1990-01-01",
+            f"+7916{i:07d}",
+            f"{i:016d}",
+        )
+    return service
+
+
+def main() -> None:
+    patients = int(sys.argv[1]) if len(sys.argv) > 1 else 100_000
+    service = build_service(patients)
+
+    start = time.perf_counter()
+    lines = [f"{i}. {patient}" for i, patient in enumerate(service.patients, 1)]
+    listing = time.perf_counter() - start
+    print(f"Пациентов: {patients}")
+    print(f"Полный список ({len(lines)} строк): {listing * 1000:.1f} мс")
+
+    start = time.perf_counter()
+    service.search_patients("Иванов")
+    print(f"Построение индекса поиска: {(time.perf_counter() - start) * 1000:.1f} мс")
+
+    numbers = [random.randrange(patients) for _ in range(QUERIES)]
+    queries = {
+        "фамилия": [f"{SURNAMES[i % len(SURNAMES)]}{str(i)[:3]}" for i in numbers],
+        "страховка": [f"{i:016d}"[:14] for i in numbers],
+        "телефон": [f"8916{i:07d}"[:9] for i in numbers],
+    }
+    for label, texts in queries.items():
+        start = time.perf_counter()
+        found = 0
+        for text in texts:
+            total, page = service.search_patients(text, 0, PAGE_SIZE)
+            lines = [f"{i}. {patient}" for i, patient in enumerate(page, 1)]
+            found += total
+        elapsed = (time.perf_counter() - start) / len(texts)
+        print(
+            f"Страница поиска, {label}: {elapsed * 1e6:.1f} мкс "
+            f"(в среднем {found / len(texts):.0f} совпадений)"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,75 @@
+"""Время запуска и пиковая память: загрузка JSON против бинарного снимка.
+
+Каждый загрузчик запускается в отдельном процессе. Отдельно замеряется
+первая операция, которой нужны индексы записей на прием: у снимка они
+строятся лениво.
+"""
+
+import os
+import resource
+import subprocess
+import sys
+import tempfile
+import time
+
+from benchmarks.datasets import build_service
+from services.file_manager import PolyclinicFileManager
+
+APPOINTMENTS = 200_000
+LOADERS = {
+    "json": PolyclinicFileManager.load_from_json,
+    "snapshot": PolyclinicFileManager.load_from_snapshot,
+}
+
+
+def run_loader(mode: str, filename: str) -> None:
+    """Загружает файл, отменяет одну запись и печатает замеры."""
+    started = time.perf_counter()
+    service = LOADERS[mode](filename)
+    loaded = time.perf_counter() - started
+
+    started = time.perf_counter()
+    service.cancel_appointment(1)
+    first_change = time.perf_counter() - started
+
+    peak_kb = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    print(f"RESULT {loaded:.3f} {first_change:.3f} {peak_kb / 1024:.0f}")
+
+
+def main() -> None:
+    total = int(sys.argv[1]) if len(sys.argv) > 1 else APPOINTMENTS
+    service = build_service(total)
+    with tempfile.TemporaryDirectory() as tmp:
+        files = {
+            "json": os.path.join(tmp, "polyclinic.json"),
+            "snapshot": os.path.join(tmp, "polyclinic.snap"),
+        }
+        PolyclinicFileManager.save_to_json(service, files["json"])
+        PolyclinicFileManager.save_to_snapshot(service, files["snapshot"])
+        for mode, filename in files.items():
+            size_mb = os.path.getsize(filename) / 2**20
+            print(f"{mode:>10}: {size_mb:.0f} МБ")
+
+        print(f"Загрузка {total} записей на прием:")
+        for mode, filename in files.items():
+            output = subprocess.run(
+                [sys.executable, "-m", "benchmarks.bench_snapshot", mode, filename],
+                capture_output=True,
+                text=True,
+                check=True,
+            ).stdout
+            result = next(
+                line for line in output.splitlines() if line.startswith("RESULT")
+            )
+            _, loaded, first_change, peak = result.split()
+            print(
+                f"{mode:>10}: запуск {loaded} с, первая отмена {first_change} с, "
+                f"пиковый RSS {peak} МБ"
+            )
+
+
+if __name__ == "__main__":
+    if len(sys.argv) == 3 and sys.argv[1] in LOADERS:
+        run_loader(sys.argv[1], sys.argv[2])
+    else:
+        main()
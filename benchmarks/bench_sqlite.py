@@ -0,0 +1,51 @@
+"""Хранилище в памяти против SQLite: массовая запись и проверка занятости."""
+
+import os
+import random
+import sys
+import tempfile
+import time
+
+from benchmarks.datasets import FIRST_DAY, build_service
+from services.file_manager import PolyclinicFileManager
+from services.scheduling import MINUTES_PER_DAY
+
+APPOINTMENTS = 200_000
+PROBES = 20_000
+
+
+def probe(service, probes: int) -> float:
+    """Возвращает среднее время проверки занятости врача в микросекундах."""
+    rng = random.Random(1)
+    doctors = service.count("doctors")
+    repository = service.repository
+    started = time.perf_counter()
+    for _ in range(probes):
+        day = FIRST_DAY.toordinal() + rng.randrange(30)
+        start = day * MINUTES_PER_DAY + rng.randrange(8 * 60, 20 * 60)
+        doctor_id = rng.randrange(1, doctors + 1)
+        repository.find_overlap("doctor_id", doctor_id, start, start + 30)
+    return (time.perf_counter() - started) / probes * 1e6
+
+
+def main() -> None:
+    total = int(sys.argv[1]) if len(sys.argv) > 1 else APPOINTMENTS
+    memory = build_service(total)
+    with tempfile.TemporaryDirectory() as tmp:
+        filename = os.path.join(tmp, "polyclinic.db")
+        started = time.perf_counter()
+        PolyclinicFileManager.save_to_sqlite(memory, filename)
+        elapsed = time.perf_counter() - started
+        print(
+            f"Запись {total} записей в SQLite: {elapsed:.1f} с "
+            f"({total / elapsed:.0f} строк/с)"
+        )
+
+        stored = PolyclinicFileManager.load_from_sqlite(filename)
+        print(f"Проверка занятости, в памяти: {probe(memory, PROBES):.1f} мкс")
+        print(f"Проверка занятости, SQLite:   {probe(stored, PROBES):.1f} мкс")
+        stored.repository.close()
+
+
+if __name__ == "__main__":
+    main()
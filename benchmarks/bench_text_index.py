@@ -0,0 +1,166 @@
+"""Полнотекстовый поиск по записям карт: индекс против перебора текстов.
+
+Документы - синтетические записи: жалобы, лечение, диагноз и лекарства.
+Лекарства и диагнозы выбираются с убывающими весами, поэтому в запросах
+есть и редкие, и частые слова. Перебор (то, что пришлось бы делать без
+индекса) меряется только на первых SCAN_LIMIT документах.
+
+Запуск: python -m benchmarks.bench_text_index [документов]
+"""
+
+import os
+import random
+import sys
+import tempfile
+import time
+
+from benchmarks.bench_record_store import timed
+from services.text_index import TextIndex, tokenize
+
+SCAN_LIMIT = 100_000
+QUERIES = 100
+
+SYMPTOMS = [
+    "кашель",
+    "сухой кашель",
+    "температура 37.5",
+    "температура 39",
+    "слабость",
+    "головная боль",
+    "боль в горле",
+    "насморк",
+    "тошнота",
+    "боль в животе",
+    "изжога",
+    "одышка",
+    "боль в спине",
+    "головокружение",
+    "сыпь",
+    "зуд",
+    "боль в суставах",
+    "отеки ног",
+    "бессонница",
+    "повышенное давление",
+]
+TREATMENTS = [
+    "постельный режим",
+    "обильное питье",
+    "диета",
+    "физиотерапия",
+    "ЛФК",
+    "ингаляции",
+    "полоскание горла",
+    "контроль давления",
+    "повторный прием через неделю",
+]
+MEDICATIONS = [
+    "Парацетамол",
+    "Ибупрофен",
+    "Амоксициллин",
+    "Азитромицин",
+    "Омепразол",
+    "Лоратадин",
+    "Эналаприл",
+    "Амлодипин",
+    "Метформин",
+    "Аторвастатин",
+    "Диклофенак",
+    "Цетиризин",
+    "Флуконазол",
+    "Мелоксикам",
+    "Бисопролол",
+    "Варфарин",
+    "Кларитромицин",
+    "Преднизолон",
+    "Левотироксин",
+    "Габапентин",
+]
+DIAGNOSES = [
+    "J06 ОРВИ",
+    "J02 Острый фарингит",
+    "J20 Острый бронхит",
+    "I10 Гипертензия",
+    "K29 Гастрит",
+    "M54 Дорсалгия",
+    "E11 Сахарный диабет",
+    "L20 Атопический дерматит",
+    "G43 Мигрень",
+    "J45 Астма",
+]
+
+
+def weights(count: int):
+    """Убывающие веса: первый элемент встречается чаще всего."""
+    return [1 / (rank + 1) ** 1.5 for rank in range(count)]
+
+
+def documents(count: int, seed: int = 1):
+    """Тексты синтетических записей карт."""
+    rng = random.Random(seed)
+    medication_weights = weights(len(MEDICATIONS))
+    diagnosis_weights = weights(len(DIAGNOSES))
+    for _ in range(count):
+        parts = rng.sample(SYMPTOMS, 3) + rng.sample(TREATMENTS, 2)
+        parts += rng.choices(DIAGNOSES, diagnosis_weights)
+        parts += rng.choices(MEDICATIONS, medication_weights, k=2)
+        yield ", ".join(parts)
+
+
+def main() -> None:
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 1_000_000
+    print(f"Документов: {count}")
+
+    index = TextIndex()
+    timed(
+        "Построение индекса",
+        lambda: index.build(enumerate(documents(count))),
+    )
+    texts = list(documents(min(count, SCAN_LIMIT)))
+
+    rng = random.Random(2)
+    queries = {
+        "редкое лекарство": [rng.choice(MEDICATIONS[-5:]) for _ in range(QUERIES)],
+        "лекарство и жалоба": [
+            f"{rng.choice(MEDICATIONS[5:])} {rng.choice(SYMPTOMS)}"
+            for _ in range(QUERIES)
+        ],
+        "диагноз и жалоба": [
+            f"{rng.choice(DIAGNOSES).split()[0]} {rng.choice(SYMPTOMS)}"
+            for _ in range(QUERIES)
+        ],
+    }
+
+    with tempfile.TemporaryDirectory() as directory:
+        filename = os.path.join(directory, "records.text")
+        timed("Сохранение индекса", lambda: index.save(filename))
+        size = os.path.getsize(filename) / 1024 / 1024
+        print(f"Размер файла индекса: {size:.1f} МБ")
+        opened = timed("Открытие индекса", lambda: TextIndex.open(filename))
+
+        for label, texts_of_queries in queries.items():
+            for name, target in (("в памяти", index), ("из файла", opened)):
+                start = time.perf_counter()
+                found = 0
+                for query in texts_of_queries:
+                    found += target.search(query, 0, 20)[0]
+                elapsed = (time.perf_counter() - start) / len(texts_of_queries)
+                print(
+                    f"Поиск ({label}, {name}): {elapsed * 1000:.2f} мс, "
+                    f"в среднем {found / len(texts_of_queries):.0f} совпадений"
+                )
+
+            # Перебор: текст каждой записи разбирается так же, как при
+            # индексации, и проверяется на все слова запроса
+            query = texts_of_queries[0]
+            terms = set(tokenize(query))
+            start = time.perf_counter()
+            scanned = sum(1 for text in texts if terms <= set(tokenize(text)))
+            elapsed = time.perf_counter() - start
+            print(
+                f"Перебор {len(texts)} текстов ({query!r}): "
+                f"{elapsed * 1000:.0f} мс, {scanned} совпадений"
+            )
+
+
+if __name__ == "__main__":
+    main()
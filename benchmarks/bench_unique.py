@@ -0,0 +1,66 @@
+"""Уникальные номера пациентов: индекс против перебора коллекции.
+
+Поиск по номеру страховки и телефону - get_patient_by_* против перебора
+всех пациентов (так пришлось бы проверять повтор номера без индекса).
+Отдельно меряется создание пациента, которое занимает номера в индексе.
+
+Запуск: python -m benchmarks.bench_unique [пациентов]
+"""
+
+import random
+import sys
+import time
+
+from benchmarks.bench_record_store import timed
+from benchmarks.datasets import build_service
+from services.search import normalize_number, normalize_phone
+
+QUERIES = 10_000
+SCANS = 5
+
+
+def main() -> None:
+    patients = int(sys.argv[1]) if len(sys.argv) > 1 else 1_000_000
+    service = timed("Создание пациентов", lambda: build_service(0, patients, 10))
+    print(f"Пациентов: {patients}")
+
+    rng = random.Random(1)
+    people = rng.sample(service.patients, QUERIES)
+    for label, lookup, value in (
+        ("страховки", service.get_patient_by_insurance, "insurance_number"),
+        ("телефона", service.get_patient_by_phone, "phone"),
+    ):
+        start = time.perf_counter()
+        found = sum(lookup(getattr(person, value)) is person for person in people)
+        elapsed = (time.perf_counter() - start) / QUERIES
+        print(
+            f"Поиск по номеру {label} в индексе: {elapsed * 1e6:.2f} мкс "
+            f"(найдено {found} из {QUERIES})"
+        )
+
+    normalize = {"insurance_number": normalize_number, "phone": normalize_phone}
+    for value in normalize:
+        start = time.perf_counter()
+        for person in people[:SCANS]:
+            key = normalize[value](getattr(person, value))
+            next(
+                other
+                for other in service.iter_entities("patients")
+                if normalize[value](getattr(other, value)) == key
+            )
+        elapsed = (time.perf_counter() - start) / SCANS
+        print(f"Перебор пациентов по полю {value}: {elapsed * 1000:.1f} мс")
+
+    start = time.perf_counter()
+    created = [
+        service.create_patient(
+            "Иван", f"Новиков{i}", "1990-01-01", f"+7917{i:07d}", f"9{i:015d}"
+        )
+        for i in range(QUERIES)
+    ]
+    elapsed = (time.perf_counter() - start) / len(created)
+    print(f"Создание пациента с проверкой номеров: {elapsed * 1e6:.1f} мкс")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,74 @@
+"""Пропускная способность пакетной проверки строк (строк в секунду).
+
+Проверяются строки пациентов и записей на прием, каждая десятая строка
+содержит ошибку. Пачка проверяется построчно и по столбцам.
+"""
+
+import sys
+import time
+
+from services.validation import validator_for
+
+ROWS = 100_000
+
+
+def patient_rows(total: int):
+    rows = []
+    for i in range(total):
+        rows.append(
+            {
+                "patient_id": i + 1,
+                "first_name": "Иван",
+                "last_name": "Иванов" if i % 10 else "Иванов1",
+                "birth_date": f"19{50 + i % 50}-0{1 + i % 9}-1{i % 10}",
+                "phone": "+7 (999) 000-00-00" if i % 10 else "123",
+                "insurance_number": f"{i:016d}",
+            }
+        )
+    return rows
+
+
+def appointment_rows(total: int):
+    rows = []
+    for i in range(total):
+        rows.append(
+            {
+                "appointment_id": i + 1,
+                "patient_id": i % 1000 + 1,
+                "doctor_id": i % 100 + 1,
+                "room_id": i % 100 + 1,
+                "service_id": 1,
+                "appointment_date": f"2026-0{1 + i % 9}-{1 + i % 28:02d}",
+                "appointment_time": f"{8 + i % 12:02d}:{i % 4 * 15:02d}",
+                "reason": "Плановый осмотр",
+                "status": "запланирован" if i % 10 else "неизвестно",
+            }
+        )
+    return rows
+
+
+def measure(title: str, total: int, run) -> None:
+    started = time.perf_counter()
+    errors = run()
+    elapsed = time.perf_counter() - started
+    print(
+        f"{title:>24}: {total / elapsed:>10.0f} строк/с, ошибок {len(errors)}"
+    )
+
+
+def main() -> None:
+    total = int(sys.argv[1]) if len(sys.argv) > 1 else ROWS
+    for section, build in (
+        ("patients", patient_rows),
+        ("appointments", appointment_rows),
+    ):
+        rows = build(total)
+        columns = {field: [row[field] for row in rows] for field in rows[0]}
+        validator = validator_for(section)
+        print(f"{section}: {total} строк")
+        measure("построчно", total, lambda: validator.validate(rows))
+        measure("по столбцам", total, lambda: validator.validate_columns(columns))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,55 @@
+"""Пиковая память и время загрузки XML: ET.parse против iterparse.
+
+Каждый загрузчик запускается в отдельном процессе, чтобы пиковый RSS
+не смешивался между замерами.
+"""
+
+import os
+import resource
+import subprocess
+import sys
+import tempfile
+import time
+
+from benchmarks.datasets import build_service
+from services.file_manager import PolyclinicFileManager
+
+APPOINTMENTS = 200_000
+
+
+def run_loader(filename: str, streaming: bool) -> None:
+    """Загружает файл и печатает время и пиковый RSS текущего процесса."""
+    started = time.perf_counter()
+    PolyclinicFileManager.load_from_xml(filename, streaming=streaming)
+    elapsed = time.perf_counter() - started
+    peak_kb = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    print(f"RESULT {elapsed:.2f} {peak_kb / 1024:.0f}")
+
+
+def main() -> None:
+    total = int(sys.argv[1]) if len(sys.argv) > 1 else APPOINTMENTS
+    with tempfile.TemporaryDirectory() as tmp:
+        filename = os.path.join(tmp, "polyclinic.xml")
+        PolyclinicFileManager.save_to_xml(build_service(total), filename)
+        size_mb = os.path.getsize(filename) / 2**20
+        print(f"Файл: {total} записей на прием, {size_mb:.0f} МБ")
+
+        for mode, title in (("tree", "ET.parse"), ("stream", "iterparse")):
+            output = subprocess.run(
+                [sys.executable, "-m", "benchmarks.bench_xml_load", mode, filename],
+                capture_output=True,
+                text=True,
+                check=True,
+            ).stdout
+            result = next(
+                line for line in output.splitlines() if line.startswith("RESULT")
+            )
+            _, elapsed, peak = result.split()
+            print(f"{title:>10}: {elapsed} с, пиковый RSS {peak} МБ")
+
+
+if __name__ == "__main__":
+    if len(sys.argv) == 3 and sys.argv[1] in ("tree", "stream"):
+        run_loader(sys.argv[2], streaming=sys.argv[1] == "stream")
+    else:
+        main()
@@ -0,0 +1,50 @@
+"""Генерация синтетических данных поликлиники для бенчмарков."""
+
+from datetime import date, timedelta
+
+from services.polyclinic_service import PolyclinicService
+
+SLOTS_PER_DAY = 24  # получасовые окна с 8:00 до 20:00
+FIRST_DAY = date(2026, 1, 1)
+
+
+def build_service(
+    appointments: int, patients: int = 10_000, doctors: int = 1_000
+) -> PolyclinicService:
+    """Создает сервис с заданным числом записей на прием без пересечений.
+
+    У каждого врача свой кабинет, а записи врача идут подряд по получасовым
+    окнам, поэтому проверки занятости никогда не отклоняют запись.
+    """
+    service = PolyclinicService("Городская поликлиника №1", "ул. Ленина, 10")
+    for i in range(patients):
+        service.create_patient(
+            "Иван", f"Иванов{i}", "1990-01-01", f"+7999{i:07d}", f"{i:016d}"
+        )
+    for i in range(doctors):
+        service.create_doctor(
+            "Петр", f"Петров{i}", "1980-01-01", f"+7998{i:07d}", "Терапевт", f"LIC{i}"
+        )
+    department = service.create_department("Терапевтическое", 1, 1)
+    for i in range(doctors):
+        service.create_room(str(100 + i), 1, "Кабинет", department.department_id)
+    service.create_service("Консультация", "Прием терапевта", 1500.0, 30)
+
+    days = {}
+    for i in range(appointments):
+        doctor_id = i % doctors + 1
+        slot = i // doctors
+        day = slot // SLOTS_PER_DAY
+        if day not in days:
+            days[day] = (FIRST_DAY + timedelta(days=day)).isoformat()
+        minutes = 8 * 60 + (slot % SLOTS_PER_DAY) * 30
+        service.create_appointment(
+            i % patients + 1,
+            doctor_id,
+            doctor_id,
+            days[day],
+            f"{minutes // 60:02d}:{minutes % 60:02d}",
+            1,
+            "Плановый осмотр",
+        )
+    return service
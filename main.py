@@ -1,159 +1,116 @@
-import re
-from datetime import datetime
+from datetime import date
+from typing import Optional
+from models import ValidationError, parse_date, parse_time
 from services.polyclinic_service import PolyclinicService
 from services.file_manager import PolyclinicFileManager
+from services.analytics import aggregate, summarize
+from services.validation import (
+    check_cost,
+    check_diagnosis_code,
+    check_duration,
+    check_floor,
+    check_insurance_number,
+    check_license_number,
+    check_name,
+    check_phone,
+    check_room_number,
+    check_specialization,
+)
 
 
 class Validator:
-    """Класс для валидации вводимых данных."""
+    """Класс для валидации вводимых данных.
+
+    Правила общие с пакетной проверкой services.validation; здесь текст
+    ошибки выводится пользователю.
+    """
 
     @staticmethod
-    def validate_name(name: str, field_name: str) -> bool:
-        """Проверяет имя/фамилию/название."""
-        if not name or len(name.strip()) < 2:
-            print(f"{field_name} должно содержать минимум 2 символа")
-            return False
-        if not re.match(r"^[a-zA-Zа-яА-ЯёЁ\s\-]+$", name):
-            print(f"{field_name} может содержать только буквы, пробелы и дефисы")
+    def _report(message: Optional[str]) -> bool:
+        """Выводит текст ошибки, если он есть, и возвращает успех проверки."""
+        if message is not None:
+            print(message)
             return False
         return True
 
+    @staticmethod
+    def validate_name(name: str, field_name: str) -> bool:
+        """Проверяет имя/фамилию/название."""
+        return Validator._report(check_name(name, field_name))
+
     @staticmethod
     def validate_phone(phone: str) -> bool:
         """Проверяет номер телефона."""
-        cleaned_phone = re.sub(r"[^\d+]", "", phone)
-
-        if (
-            (cleaned_phone.startswith("+7") and len(cleaned_phone) == 12)
-            or (cleaned_phone.startswith("8") and len(cleaned_phone) == 11)
-            or (cleaned_phone.startswith("7") and len(cleaned_phone) == 11)
-        ):
-            return True
-
-        print(
-            "Неверный формат телефона. Используйте: +7XXX..., 8XXX... или 7XXX... (10 цифр после кода)"
-        )
-        return False
+        return Validator._report(check_phone(phone))
 
     @staticmethod
     def validate_date(date_str: str) -> bool:
         """Проверяет дату в формате ГГГГ-ММ-ДД."""
         try:
-            date = datetime.strptime(date_str, "%Y-%m-%d")
-            if date > datetime.now():
+            if parse_date(date_str) > date.today().toordinal():
                 print("Дата не может быть в будущем")
                 return False
             return True
-        except ValueError:
+        except ValidationError:
             print("Неверный формат даты. Используйте: ГГГГ-ММ-ДД")
             return False
 
     @staticmethod
-    def validate_insurance_number(number: str) -> bool:
-        """Проверяет номер страховки - только 16 цифр."""
-        cleaned_number = re.sub(r"[\s\-]", "", number)
-
-        if not cleaned_number:
-            print("Номер страховки не может быть пустым")
-            return False
-
-        if len(cleaned_number) != 16:
-            print("Номер страховки должен содержать ровно 16 цифр")
-            return False
-
-        if not cleaned_number.isdigit():
-            print("Номер страховки должен содержать только цифры")
+    def validate_report_date(date_str: str) -> bool:
+        """Проверяет границу периода отчета: пустая строка или ГГГГ-ММ-ДД."""
+        if not date_str:
+            return True
+        try:
+            parse_date(date_str)
+            return True
+        except ValidationError:
+            print("Неверный формат даты. Используйте: ГГГГ-ММ-ДД")
             return False
 
-        return True
+    @staticmethod
+    def validate_insurance_number(number: str) -> bool:
+        """Проверяет номер страховки - только 16 цифр."""
+        return Validator._report(check_insurance_number(number))
 
     @staticmethod
     def validate_license_number(number: str) -> bool:
         """Проверяет номер лицензии врача."""
-        if not number or len(number.strip()) < 5:
-            print("Номер лицензии должен содержать минимум 5 символов")
-            return False
-        if not re.match(r"^[a-zA-Zа-яА-ЯёЁ0-9\-]+$", number):
-            print("Номер лицензии может содержать только буквы, цифры и дефисы")
-            return False
-        return True
+        return Validator._report(check_license_number(number))
 
     @staticmethod
     def validate_specialization(spec: str) -> bool:
         """Проверяет специализацию врача."""
-        if not spec or len(spec.strip()) < 3:
-            print("Специализация должна содержать минимум 3 символа")
-            return False
-        if not re.match(r"^[a-zA-Zа-яА-ЯёЁ\s\-]+$", spec):
-            print("Специализация может содержать только буквы, пробелы и дефисы")
-            return False
-        return True
+        return Validator._report(check_specialization(spec))
 
     @staticmethod
     def validate_floor(floor: str) -> bool:
         """Проверяет номер этажа."""
-        try:
-            floor_num = int(floor)
-            if 1 <= floor_num <= 50:
-                return True
-            else:
-                print("Этаж должен быть от 1 до 50")
-                return False
-        except ValueError:
-            print("Этаж должен быть числом")
-            return False
+        return Validator._report(check_floor(floor))
 
     @staticmethod
     def validate_room_number(number: str) -> bool:
         """Проверяет номер кабинета."""
-        if not number or len(number.strip()) < 1:
-            print("Номер кабинета не может быть пустым")
-            return False
-        if not re.match(r"^[a-zA-Zа-яА-ЯёЁ0-9\-\s]+$", number):
-            print(
-                "Номер кабинета может содержать только буквы, цифры, пробелы и дефисы"
-            )
-            return False
-        return True
+        return Validator._report(check_room_number(number))
 
     @staticmethod
     def validate_cost(cost: str) -> bool:
         """Проверяет стоимость."""
-        try:
-            cost_num = float(cost)
-            if cost_num >= 0:
-                return True
-            else:
-                print("Стоимость не может быть отрицательной")
-                return False
-        except ValueError:
-            print("Стоимость должна быть числом")
-            return False
+        return Validator._report(check_cost(cost))
 
     @staticmethod
     def validate_duration(duration: str) -> bool:
         """Проверяет длительность в минутах."""
-        try:
-            duration_num = int(duration)
-            if 1 <= duration_num <= 480:
-                return True
-            else:
-                print("Длительность должна быть от 1 до 480 минут")
-                return False
-        except ValueError:
-            print("Длительность должна быть целым числом")
-            return False
+        return Validator._report(check_duration(duration))
 
     @staticmethod
     def validate_appointment_date(date_str: str) -> bool:
         """Проверяет дату приема."""
         try:
-            date = datetime.strptime(date_str, "%Y-%m-%d")
-            if date < datetime.now().replace(hour=0, minute=0, second=0, microsecond=0):
+            if parse_date(date_str) < date.today().toordinal():
                 print("Дата приема не может быть в прошлом")
                 return False
             return True
-        except ValueError:
+        except ValidationError:
             print("Неверный формат даты. Используйте: ГГГГ-ММ-ДД")
             return False
 
@@ -161,14 +118,13 @@ class Validator:
     def validate_appointment_time(time_str: str) -> bool:
         """Проверяет время приема."""
         try:
-            time = datetime.strptime(time_str, "%H:%M")
-            hour = time.hour
+            hour = parse_time(time_str) // 60
             if 8 <= hour <= 20:
                 return True
             else:
                 print("Время приема должно быть с 8:00 до 20:00")
                 return False
-        except ValueError:
+        except ValidationError:
             print("Неверный формат времени. Используйте: ЧЧ:ММ")
             return False
 
@@ -183,10 +139,7 @@ class Validator:
     @staticmethod
     def validate_diagnosis_code(code: str) -> bool:
         """Проверяет код диагноза."""
-        if not code or len(code.strip()) < 2:
-            print("Код диагноза должен содержать минимум 2 символа")
-            return False
-        return True
+        return Validator._report(check_diagnosis_code(code))
 
     @staticmethod
     def validate_medication(medication: str) -> bool:
@@ -221,6 +174,15 @@ class Validator:
         return True
 
 
+# Число строк на странице списков
+PAGE_SIZE = 20
+
+# Подсказки поиска для выбора пациентов и врачей
+PATIENT_SEARCH = "фамилия и имя или их начало, номер страховки или телефон"
+DOCTOR_SEARCH = "фамилия и имя или их начало, номер лицензии или телефон"
+RECORD_SEARCH = "слова из жалоб, лечения, диагноза или лекарства"
+
+
 class PolyclinicApp:
     """Класс приложения поликлиники с меню."""
 
@@ -248,6 +210,99 @@ class PolyclinicApp:
         print("Превышено максимальное количество попыток. Возврат в меню.")
         return None
 
+    def browse(
+        self,
+        title: str,
+        fetch,
+        describe=str,
+        empty: str = "Список пуст",
+        search: Optional[str] = None,
+        select: bool = False,
+    ):
+        """Показывает список постранично и, если select, возвращает выбранный объект.
+
+        fetch(query, offset, limit) возвращает число найденных объектов и
+        страницу; выводится только текущая страница. search - подсказка
+        поиска (None - поиск недоступен): в режиме выбора запрос спрашивается
+        сразу, а команда "/запрос" ищет заново на любой странице.
+        """
+        query = ""
+        if search and select:
+            query = input(f"Поиск ({search}; Enter - все): ").strip()
+        offset = 0
+        while True:
+            total, items = fetch(query, offset, PAGE_SIZE)
+            if not total:
+                if not query:
+                    print(empty)
+                    return None
+                query = input("Ничего не найдено. Новый поиск (Enter - отмена): ")
+                query = query.strip()
+                if not query:
+                    return None
+                continue
+
+            print(f"\n--- {title}: {offset + 1}-{offset + len(items)} из {total} ---")
+            for number, item in enumerate(items, offset + 1):
+                print(f"{number}. {describe(item)}")
+
+            has_next = offset + PAGE_SIZE < total
+            hints = []
+            if select:
+                hints.append("номер - выбор")
+            if has_next:
+                hints.append("Enter - далее")
+            if offset:
+                hints.append("'-' - назад")
+            if search:
+                hints.append("/запрос - поиск")
+            hints.append("0 - выход")
+            command = input(f"{', '.join(hints)}: ").strip()
+
+            if command == "0" or (not command and not has_next):
+                return None
+            if not command:
+                offset += PAGE_SIZE
+            elif command == "-":
+                offset = max(offset - PAGE_SIZE, 0)
+            elif search and command.startswith("/"):
+                query = command[1:].strip()
+                offset = 0
+            elif select and command.isdigit():
+                number = int(command)
+                if offset < number <= offset + len(items):
+                    return items[number - offset - 1]
+                print("Неверный номер!")
+            else:
+                print("Неверный выбор!")
+
+    def _page_of(self, collection: str):
+        """Возвращает функцию выборки страниц коллекции без поиска для browse."""
+        return lambda query, offset, limit: (
+            self.service.count(collection),
+            self.service.page(collection, offset, limit),
+        )
+
+    def choose_patient(self, title: str = "ПАЦИЕНТЫ"):
+        """Выбирает пациента поиском по фамилии, страховке или телефону."""
+        return self.browse(
+            title,
+            self.service.search_patients,
+            empty="Нет доступных пациентов!",
+            search=PATIENT_SEARCH,
+            select=True,
+        )
+
+    def choose_doctor(self, title: str = "ВРАЧИ"):
+        """Выбирает врача поиском по фамилии, лицензии или телефону."""
+        return self.browse(
+            title,
+            self.service.search_doctors,
+            empty="Нет доступных врачей!",
+            search=DOCTOR_SEARCH,
+            select=True,
+        )
+
     def display_main_menu(self):
         """Отображает главное меню."""
         print("\n" + "=" * 50)
@@ -263,6 +318,7 @@ class PolyclinicApp:
         print("8. Записи на прием")
         print("9. Медицинские карты и диагнозы")
         print("10. Просмотр всех данных")
+        print("11. Отчеты по выручке и загрузке")
         print("0. Выход")
         print("=" * 50)
 
@@ -287,6 +343,8 @@ class PolyclinicApp:
         print("\n--- ЗАГРУЗКА ДАННЫХ ---")
         print("1. Загрузить из JSON")
         print("2. Загрузить из XML")
+        print("3. Загрузить из бинарного снимка")
+        print("4. Открыть базу SQLite")
         choice = input("Выберите формат: ").strip()
 
         filename = input("Введите имя файла: ").strip()
@@ -299,6 +357,10 @@ class PolyclinicApp:
                 self.service = self.file_manager.load_from_json(filename)
             elif choice == "2":
                 self.service = self.file_manager.load_from_xml(filename)
+            elif choice == "3":
+                self.service = self.file_manager.load_from_snapshot(filename)
+            elif choice == "4":
+                self.service = self.file_manager.load_from_sqlite(filename)
             else:
                 print("Неверный выбор!")
         except Exception as e:
@@ -313,6 +375,8 @@ class PolyclinicApp:
         print("\n--- СОХРАНЕНИЕ ДАННЫХ ---")
         print("1. Сохранить в JSON")
         print("2. Сохранить в XML")
+        print("3. Сохранить в бинарный снимок")
+        print("4. Сохранить в базу SQLite")
         choice = input("Выберите формат: ").strip()
 
         filename = input("Введите имя файла: ").strip()
@@ -325,6 +389,10 @@ class PolyclinicApp:
                 self.file_manager.save_to_json(self.service, filename)
             elif choice == "2":
                 self.file_manager.save_to_xml(self.service, filename)
+            elif choice == "3":
+                self.file_manager.save_to_snapshot(self.service, filename)
+            elif choice == "4":
+                self.file_manager.save_to_sqlite(self.service, filename)
             else:
                 print("Неверный выбор!")
         except Exception as e:
@@ -394,65 +462,50 @@ class PolyclinicApp:
             print(f"Ошибка при добавлении пациента: {e}")
 
     def view_patients(self):
-        """Просматривает всех пациентов."""
-        patients = self.service.get_all_patients()
-        if not patients:
-            print("Пациенты не найдены")
-            return
-
-        print("\n--- СПИСОК ПАЦИЕНТОВ ---")
-        for i, patient in enumerate(patients, 1):
-            medical_record = next(
-                (
-                    record
-                    for record in self.service.medical_records
-                    if record.patient.patient_id == patient.patient_id
-                ),
-                None,
-            )
-            record_info = (
-                " (есть мед. карта)"
-                if medical_record and medical_record.entries
-                else " (нет записей)"
-            )
-            print(
-                f"{i}. {patient} (Тел: {patient.phone}, Страховка: {patient.insurance_number}){record_info}"
-            )
+        """Просматривает пациентов постранично с поиском."""
+        self.browse(
+            "СПИСОК ПАЦИЕНТОВ",
+            self.service.search_patients,
+            self.describe_patient,
+            empty="Пациенты не найдены",
+            search=PATIENT_SEARCH,
+        )
+
+    def describe_patient(self, patient) -> str:
+        """Строка пациента для списка."""
+        record_info = (
+            " (есть мед. карта)"
+            if self.service.count_record_entries(patient.patient_id)
+            else " (нет записей)"
+        )
+        return (
+            f"{patient} (Тел: {patient.phone}, "
+            f"Страховка: {patient.insurance_number}){record_info}"
+        )
 
     def delete_patient(self):
         """Удаляет пациента."""
-        patients = self.service.get_all_patients()
-        if not patients:
+        if not self.service.count("patients"):
             print("Нет пациентов для удаления")
             return
 
         print("\n--- УДАЛЕНИЕ ПАЦИЕНТА ---")
-        self.view_patients()
+        patient = self.choose_patient()
+        if not patient:
+            return
 
-        try:
-            patient_choice = (
-                int(input("Выберите номер пациента для удаления: ").strip()) - 1
-            )
-            if 0 <= patient_choice < len(patients):
-                patient = patients[patient_choice]
-                confirm = (
-                    input(
-                        f"Вы уверены, что хотите удалить пациента {patient}? (да/нет): "
-                    )
-                    .strip()
-                    .lower()
-                )
-                if confirm == "да":
-                    if self.service.delete_patient(patient.patient_id):
-                        print(f"Пациент {patient} удален")
-                    else:
-                        print("Не удалось удалить пациента")
-                else:
-                    print("Удаление отменено")
+        confirm = (
+            input(f"Вы уверены, что хотите удалить пациента {patient}? (да/нет): ")
+            .strip()
+            .lower()
+        )
+        if confirm == "да":
+            if self.service.delete_patient(patient.patient_id):
+                print(f"Пациент {patient} удален")
             else:
-                print("Неверный выбор пациента!")
-        except ValueError:
-            print("Введите корректный номер!")
+                print("Не удалось удалить пациента")
+        else:
+            print("Удаление отменено")
 
     def doctors_menu(self):
         """Меню управления врачами."""
@@ -524,52 +577,40 @@ class PolyclinicApp:
             print(f"Ошибка при добавлении врача: {e}")
 
     def view_doctors(self):
-        """Просматривает всех врачей."""
-        doctors = self.service.get_all_doctors()
-        if not doctors:
-            print("Врачи не найдены")
-            return
-
-        print("\n--- СПИСОК ВРАЧЕЙ ---")
-        for i, doctor in enumerate(doctors, 1):
-            print(
-                f"{i}. {doctor} (Тел: {doctor.phone}, Лицензия: {doctor.license_number})"
-            )
+        """Просматривает врачей постранично с поиском."""
+        self.browse(
+            "СПИСОК ВРАЧЕЙ",
+            self.service.search_doctors,
+            lambda doctor: (
+                f"{doctor} (Тел: {doctor.phone}, Лицензия: {doctor.license_number})"
+            ),
+            empty="Врачи не найдены",
+            search=DOCTOR_SEARCH,
+        )
 
     def delete_doctor(self):
         """Удаляет врача."""
-        doctors = self.service.get_all_doctors()
-        if not doctors:
+        if not self.service.count("doctors"):
             print("Нет врачей для удаления")
             return
 
         print("\n--- УДАЛЕНИЕ ВРАЧА ---")
-        self.view_doctors()
+        doctor = self.choose_doctor()
+        if not doctor:
+            return
 
-        try:
-            doctor_choice = (
-                int(input("Выберите номер врача для удаления: ").strip()) - 1
-            )
-            if 0 <= doctor_choice < len(doctors):
-                doctor = doctors[doctor_choice]
-                confirm = (
-                    input(f"Вы уверены, что хотите удалить врача {doctor}? (да/нет): ")
-                    .strip()
-                    .lower()
-                )
-                if confirm == "да":
-                    if self.service.delete_doctor(doctor.doctor_id):
-                        print(f"Врач {doctor} удален")
-                    else:
-                        print(
-                            "Не удалось удалить врача (возможно, он заведует отделением)"
-                        )
-                else:
-                    print("Удаление отменено")
+        confirm = (
+            input(f"Вы уверены, что хотите удалить врача {doctor}? (да/нет): ")
+            .strip()
+            .lower()
+        )
+        if confirm == "да":
+            if self.service.delete_doctor(doctor.doctor_id):
+                print(f"Врач {doctor} удален")
             else:
-                print("Неверный выбор врача!")
-        except ValueError:
-            print("Введите корректный номер!")
+                print("Не удалось удалить врача (возможно, он заведует отделением)")
+        else:
+            print("Удаление отменено")
 
     def departments_menu(self):
         """Меню управления отделениями и кабинетами."""
@@ -909,7 +950,8 @@ class PolyclinicApp:
             print("1. Создать запись")
             print("2. Просмотреть все записи")
             print("3. Удалить запись")
-            print("4. Назад")
+            print("4. Найти свободное время")
+            print("5. Назад")
             choice = input("Выберите действие: ").strip()
 
             if choice == "1":
@@ -919,6 +961,8 @@ class PolyclinicApp:
             elif choice == "3":
                 self.delete_appointment()
             elif choice == "4":
+                self.find_free_time()
+            elif choice == "5":
                 break
             else:
                 print("Неверный выбор!")
@@ -927,30 +971,12 @@ class PolyclinicApp:
         """Создает новую запись на прием."""
         print("\n--- СОЗДАНИЕ ЗАПИСИ НА ПРИЕМ ---")
 
-        patients = self.service.get_all_patients()
-        if not patients:
-            print("Нет доступных пациентов!")
+        patient = self.choose_patient("ДОСТУПНЫЕ ПАЦИЕНТЫ")
+        if not patient:
             return
-        print("\nДоступные пациенты:")
-        for i, patient in enumerate(patients, 1):
-            print(f"{i}. {patient}")
 
-        patient_choice = input("Выберите номер пациента: ").strip()
-        if not patient_choice.isdigit():
-            print("Введите номер!")
-            return
-
-        doctors = self.service.get_all_doctors()
-        if not doctors:
-            print("Нет доступных врачей!")
-            return
-        print("\nДоступные врачи:")
-        for i, doctor in enumerate(doctors, 1):
-            print(f"{i}. {doctor}")
-
-        doctor_choice = input("Выберите номер врача: ").strip()
-        if not doctor_choice.isdigit():
-            print("Введите номер!")
+        doctor = self.choose_doctor("ДОСТУПНЫЕ ВРАЧИ")
+        if not doctor:
             return
 
         rooms = self.service.rooms
@@ -998,21 +1024,14 @@ class PolyclinicApp:
             return
 
         try:
-            patient_choice = int(patient_choice) - 1
-            doctor_choice = int(doctor_choice) - 1
             room_choice = int(room_choice) - 1
             service_choice = int(service_choice) - 1
 
-            if (
-                0 <= patient_choice < len(patients)
-                and 0 <= doctor_choice < len(doctors)
-                and 0 <= room_choice < len(rooms)
-                and 0 <= service_choice < len(services)
-            ):
+            if 0 <= room_choice < len(rooms) and 0 <= service_choice < len(services):
 
                 appointment = self.service.create_appointment(
-                    patients[patient_choice].patient_id,
-                    doctors[doctor_choice].doctor_id,
+                    patient.patient_id,
+                    doctor.doctor_id,
                     rooms[room_choice].room_id,
                     date,
                     time,
@@ -1025,51 +1044,121 @@ class PolyclinicApp:
         except Exception as e:
             print(f"Ошибка при создании записи: {e}")
 
-    def view_appointments(self):
-        """Просматривает все записи на прием."""
-        appointments = self.service.get_all_appointments()
-        if not appointments:
-            print("Записи не найдены")
+    def find_free_time(self):
+        """Подбирает ближайшие свободные окна и записывает в выбранное."""
+        print("\n--- ПОИСК СВОБОДНОГО ВРЕМЕНИ ---")
+
+        specialization = self.get_valid_input(
+            "Специализация врача: ", self.validator.validate_specialization
+        )
+        if not specialization:
             return
 
-        print("\n--- СПИСОК ЗАПИСЕЙ ---")
-        for i, appointment in enumerate(appointments, 1):
-            print(f"{i}. {appointment}")
+        services = self.service.services
+        if not services:
+            print("Нет доступных услуг!")
+            return
+        print("\nДоступные услуги:")
+        for i, service in enumerate(services, 1):
+            print(f"{i}. {service} - {service.duration} мин.")
 
-    def delete_appointment(self):
-        """Удаляет запись на прием."""
-        appointments = self.service.get_all_appointments()
-        if not appointments:
-            print("Нет записей для удаления")
+        service_choice = input("Выберите номер услуги: ").strip()
+        if not service_choice.isdigit() or not (
+            1 <= int(service_choice) <= len(services)
+        ):
+            print("Неверный выбор услуги!")
             return
+        service = services[int(service_choice) - 1]
 
-        print("\n--- УДАЛЕНИЕ ЗАПИСИ ---")
-        self.view_appointments()
+        first_date = self.get_valid_input(
+            "Искать с даты (ГГГГ-ММ-ДД): ", self.validator.validate_appointment_date
+        )
+        if not first_date:
+            return
+        last_date = self.get_valid_input(
+            "Искать по дату (ГГГГ-ММ-ДД): ", self.validator.validate_appointment_date
+        )
+        if not last_date:
+            return
 
         try:
-            appointment_choice = (
-                int(input("Выберите номер записи для удаления: ").strip()) - 1
+            slots = self.service.find_free_slots(
+                specialization, (first_date, last_date), service.duration
             )
-            if 0 <= appointment_choice < len(appointments):
-                appointment = appointments[appointment_choice]
-                confirm = (
-                    input(
-                        f"Вы уверены, что хотите удалить запись {appointment}? (да/нет): "
-                    )
-                    .strip()
-                    .lower()
-                )
-                if confirm == "да":
-                    if self.service.delete_appointment(appointment.appointment_id):
-                        print(f"Запись {appointment} удалена")
-                    else:
-                        print("Не удалось удалить запись")
-                else:
-                    print("Удаление отменено")
+        except ValidationError as e:
+            print(f"Ошибка поиска: {e}")
+            return
+        if not slots:
+            print("Свободное время не найдено")
+            return
+
+        print("\nСвободное время:")
+        for i, (slot_date, slot_time, doctor, room) in enumerate(slots, 1):
+            print(f"{i}. {slot_date} {slot_time} - {doctor}, {room}")
+
+        slot_choice = input("Выберите номер времени для записи (Enter - назад): ")
+        slot_choice = slot_choice.strip()
+        if not slot_choice:
+            return
+        if not slot_choice.isdigit() or not (1 <= int(slot_choice) <= len(slots)):
+            print("Неверный выбор времени!")
+            return
+        slot_date, slot_time, doctor, room = slots[int(slot_choice) - 1]
+
+        patient = self.choose_patient("ДОСТУПНЫЕ ПАЦИЕНТЫ")
+        if not patient:
+            return
+
+        reason = self.get_valid_input(
+            "Причина визита: ", self.validator.validate_reason
+        )
+        if not reason:
+            return
+
+        try:
+            appointment = self.service.create_appointment(
+                patient.patient_id,
+                doctor.doctor_id,
+                room.room_id,
+                slot_date,
+                slot_time,
+                service.service_id,
+                reason,
+            )
+            print(f"Запись создана: {appointment}")
+        except Exception as e:
+            print(f"Ошибка при создании записи: {e}")
+
+    def view_appointments(self):
+        """Просматривает записи на прием постранично."""
+        self.browse(
+            "СПИСОК ЗАПИСЕЙ", self._page_of("appointments"), empty="Записи не найдены"
+        )
+
+    def delete_appointment(self):
+        """Удаляет запись на прием."""
+        print("\n--- УДАЛЕНИЕ ЗАПИСИ ---")
+        appointment = self.browse(
+            "ЗАПИСИ",
+            self._page_of("appointments"),
+            empty="Нет записей для удаления",
+            select=True,
+        )
+        if not appointment:
+            return
+
+        confirm = (
+            input(f"Вы уверены, что хотите удалить запись {appointment}? (да/нет): ")
+            .strip()
+            .lower()
+        )
+        if confirm == "да":
+            if self.service.delete_appointment(appointment.appointment_id):
+                print(f"Запись {appointment} удалена")
             else:
-                print("Неверный выбор записи!")
-        except ValueError:
-            print("Введите корректный номер!")
+                print("Не удалось удалить запись")
+        else:
+            print("Удаление отменено")
 
     def medical_records_menu(self):
         """Меню управления медицинскими картами и диагнозами."""
@@ -1084,7 +1173,8 @@ class PolyclinicApp:
             print("3. Просмотреть все диагнозы")
             print("4. Добавить запись в медицинскую карту")
             print("5. Просмотреть медицинскую карту пациента")
-            print("6. Назад")
+            print("6. Поиск по медицинским картам")
+            print("7. Назад")
             choice = input("Выберите действие: ").strip()
 
             if choice == "1":
@@ -1098,20 +1188,42 @@ class PolyclinicApp:
             elif choice == "5":
                 self.view_patient_medical_record()
             elif choice == "6":
+                self.search_medical_records()
+            elif choice == "7":
                 break
             else:
                 print("Неверный выбор!")
 
     def view_all_medical_records(self):
         """Просматривает все медицинские карты."""
-        if not self.service.medical_records:
+        medical_records = self.service.medical_records
+        if not medical_records:
             print("Медицинские карты не найдены")
             return
 
         print("\n--- ВСЕ МЕДИЦИНСКИЕ КАРТЫ ---")
-        for i, record in enumerate(self.service.medical_records, 1):
-            entries_count = len(record.entries)
-            print(f"{i}. {record} - {entries_count} записей")
+        for i, record in enumerate(medical_records, 1):
+            print(f"{i}. {record} - {record.entry_count} записей")
+
+    def search_medical_records(self):
+        """Ищет записи во всех медицинских картах по словам."""
+        query = input(f"Поиск ({RECORD_SEARCH}): ").strip()
+        if not query:
+            return
+
+        def describe(found):
+            patient, entry = found
+            return f"{entry.entry_date} {patient}: {entry.diagnosis}; {entry.symptoms}"
+
+        self.browse(
+            "НАЙДЕННЫЕ ЗАПИСИ",
+            lambda text, offset, limit: self.service.search_records(
+                text or query, offset, limit
+            ),
+            describe,
+            empty="Записи не найдены",
+            search=RECORD_SEARCH,
+        )
 
     def add_diagnosis(self):
         """Добавляет новый диагноз."""
@@ -1154,30 +1266,12 @@ class PolyclinicApp:
         """Добавляет запись в медицинскую карту."""
         print("\n--- ДОБАВЛЕНИЕ ЗАПИСИ В МЕДИЦИНСКУЮ КАРТУ ---")
 
-        patients = self.service.get_all_patients()
-        if not patients:
-            print("Нет доступных пациентов!")
-            return
-        print("\nДоступные пациенты:")
-        for i, patient in enumerate(patients, 1):
-            print(f"{i}. {patient}")
-
-        patient_choice = input("Выберите номер пациента: ").strip()
-        if not patient_choice.isdigit():
-            print("Введите номер!")
+        patient = self.choose_patient("ДОСТУПНЫЕ ПАЦИЕНТЫ")
+        if not patient:
             return
 
-        doctors = self.service.get_all_doctors()
-        if not doctors:
-            print("Нет доступных врачей!")
-            return
-        print("\nДоступные врачи:")
-        for i, doctor in enumerate(doctors, 1):
-            print(f"{i}. {doctor}")
-
-        doctor_choice = input("Выберите номер врача: ").strip()
-        if not doctor_choice.isdigit():
-            print("Введите номер!")
+        doctor = self.choose_doctor("ДОСТУПНЫЕ ВРАЧИ")
+        if not doctor:
             return
 
         diagnoses = self.service.diagnoses
@@ -1253,41 +1347,22 @@ class PolyclinicApp:
                 print("Неверный выбор!")
 
         try:
-            patient_choice = int(patient_choice) - 1
-            doctor_choice = int(doctor_choice) - 1
             diagnosis_choice = int(diagnosis_choice) - 1
 
-            if (
-                0 <= patient_choice < len(patients)
-                and 0 <= doctor_choice < len(doctors)
-                and 0 <= diagnosis_choice < len(diagnoses)
-            ):
+            if 0 <= diagnosis_choice < len(diagnoses):
 
-                patient = patients[patient_choice]
-                doctor = doctors[doctor_choice]
                 diagnosis = diagnoses[diagnosis_choice]
 
-                medical_record = next(
-                    (
-                        record
-                        for record in self.service.medical_records
-                        if record.patient.patient_id == patient.patient_id
-                    ),
-                    None,
+                self.service.add_record_entry(
+                    patient.patient_id,
+                    entry_date,
+                    doctor,
+                    diagnosis,
+                    symptoms,
+                    treatment,
+                    prescriptions,
                 )
-
-                if medical_record:
-                    medical_record.add_entry(
-                        entry_date,
-                        doctor,
-                        diagnosis,
-                        symptoms,
-                        treatment,
-                        prescriptions,
-                    )
-                    print(f"Запись добавлена в медицинскую карту пациента {patient}")
-                else:
-                    print("Медицинская карта для пациента не найдена")
+                print(f"Запись добавлена в медицинскую карту пациента {patient}")
             else:
                 print("Неверный выбор!")
         except Exception as e:
@@ -1295,46 +1370,28 @@ class PolyclinicApp:
 
     def view_patient_medical_record(self):
         """Просматривает медицинскую карту пациента."""
-        patients = self.service.get_all_patients()
-        if not patients:
-            print("Нет доступных пациентов!")
-            return
-
         print("\n--- ПРОСМОТР МЕДИЦИНСКОЙ КАРТЫ ---")
-        self.view_patients()
-
-        try:
-            patient_choice = int(input("Выберите номер пациента: ").strip()) - 1
-            if 0 <= patient_choice < len(patients):
-                patient = patients[patient_choice]
-                medical_record = next(
-                    (
-                        record
-                        for record in self.service.medical_records
-                        if record.patient.patient_id == patient.patient_id
-                    ),
-                    None,
-                )
-
-                if medical_record and medical_record.entries:
-                    print(f"\n--- МЕДИЦИНСКАЯ КАРТА: {patient} ---")
-                    for i, entry in enumerate(medical_record.entries, 1):
-                        print(f"\nЗапись #{i}:")
-                        print(f"  Дата: {entry['entry_date']}")
-                        print(f"  Врач: {entry['doctor'].get_full_name()}")
-                        print(f"  Диагноз: {entry['diagnosis']}")
-                        print(f"  Симптомы: {entry['symptoms']}")
-                        print(f"  Лечение: {entry['treatment']}")
-                        if entry["prescriptions"]:
-                            print("  Назначения:")
-                            for j, prescription in enumerate(entry["prescriptions"], 1):
-                                print(f"    {j}. {prescription}")
-                else:
-                    print(f"Медицинская карта пациента {patient} пуста или не найдена")
-            else:
-                print("Неверный выбор пациента!")
-        except ValueError:
-            print("Введите корректный номер!")
+        patient = self.choose_patient()
+        if not patient:
+            return
+
+        medical_record = self.service.get_medical_record(patient.patient_id)
+        if medical_record and medical_record.entry_count:
+            print(f"\n--- МЕДИЦИНСКАЯ КАРТА: {patient} ---")
+            for i, entry in enumerate(medical_record.entries, 1):
+                print(f"\nЗапись #{i}:")
+                print(f"  Дата: {entry.entry_date}")
+                doctor = entry.doctor
+                print(f"  Врач: {doctor.get_full_name() if doctor else 'удален'}")
+                print(f"  Диагноз: {entry.diagnosis}")
+                print(f"  Симптомы: {entry.symptoms}")
+                print(f"  Лечение: {entry.treatment}")
+                if entry.prescriptions:
+                    print("  Назначения:")
+                    for j, prescription in enumerate(entry.prescriptions, 1):
+                        print(f"    {j}. {prescription}")
+        else:
+            print(f"Медицинская карта пациента {patient} пуста или не найдена")
 
     def view_all_data(self):
         """Просматривает все данные поликлиники."""
@@ -1358,6 +1415,69 @@ class PolyclinicApp:
         self.view_diagnoses()
         self.view_all_medical_records()
 
+    def reports_menu(self):
+        """Меню отчетов по выручке и загрузке."""
+        if not self.service:
+            print("Сначала создайте поликлинику!")
+            return
+
+        groupings = {
+            "1": ("doctor", "Врач"),
+            "2": ("department", "Отделение"),
+            "3": ("service", "Услуга"),
+            "4": ("day", "День"),
+            "5": ("week", "Неделя"),
+            "6": ("month", "Месяц"),
+        }
+        while True:
+            print("\n--- ОТЧЕТЫ ПО ВЫРУЧКЕ И ЗАГРУЗКЕ ---")
+            print("1. По врачам")
+            print("2. По отделениям")
+            print("3. По услугам")
+            print("4. По дням")
+            print("5. По неделям")
+            print("6. По месяцам")
+            print("7. Назад")
+            choice = input("Выберите действие: ").strip()
+
+            if choice in groupings:
+                self.show_report(*groupings[choice])
+            elif choice == "7":
+                break
+            else:
+                print("Неверный выбор!")
+
+    def show_report(self, group_by: str, title: str):
+        """Выводит отчет по выбранной группировке за указанный период."""
+        start = self.get_valid_input(
+            "Начало периода (ГГГГ-ММ-ДД, Enter - без ограничения): ",
+            self.validator.validate_report_date,
+        )
+        if start is None:
+            return
+        end = self.get_valid_input(
+            "Конец периода (ГГГГ-ММ-ДД, Enter - без ограничения): ",
+            self.validator.validate_report_date,
+        )
+        if end is None:
+            return
+
+        start_day = parse_date(start) if start else None
+        end_day = parse_date(end) if end else None
+        groups = aggregate(self.service, group_by, start_day=start_day, end_day=end_day)
+        if not groups:
+            print("Записи за период не найдены")
+            return
+
+        print(f"\n{title:<30} {'Записей':>10} {'Минут':>10} {'Выручка, руб.':>15}")
+        for totals in groups + [
+            summarize(self.service, start_day=start_day, end_day=end_day)
+        ]:
+            print(
+                f"{totals.label[:30]:<30} {totals.count:>10} "
+                f"{totals.minutes:>10} {totals.revenue:>15.2f}"
+            )
+
     def run(self):
         """Запускает главный цикл приложения."""
         print("Запуск системы управления поликлиникой")
@@ -1386,6 +1506,8 @@ class PolyclinicApp:
                 self.medical_records_menu()
             elif choice == "10":
                 self.view_all_data()
+            elif choice == "11":
+                self.reports_menu()
             elif choice == "0":
                 print("До свидания!")
                 break
@@ -1,13 +1,30 @@
 from .base import MedicalError, NotFoundError, ValidationError
+from .dates import MINUTES_PER_DAY, parse_date, parse_time, format_date, format_time
 from .person import Person, Patient, Doctor
 from .structure import Department, Room
-from .medical import MedicalService, Diagnosis, Prescription, MedicalRecord
-from .appointment import Appointment
+from .medical import (
+    MedicalService,
+    Diagnosis,
+    Prescription,
+    RecordEntry,
+    MedicalRecord,
+)
+from .appointment import (
+    Appointment,
+    STATUS_SCHEDULED,
+    STATUS_COMPLETED,
+    STATUS_CANCELLED,
+)
 
 __all__ = [
     "MedicalError",
     "NotFoundError",
     "ValidationError",
+    "MINUTES_PER_DAY",
+    "parse_date",
+    "parse_time",
+    "format_date",
+    "format_time",
     "Person",
     "Patient",
     "Doctor",
@@ -16,6 +33,10 @@ __all__ = [
     "MedicalService",
     "Diagnosis",
     "Prescription",
+    "RecordEntry",
     "MedicalRecord",
     "Appointment",
+    "STATUS_SCHEDULED",
+    "STATUS_COMPLETED",
+    "STATUS_CANCELLED",
 ]
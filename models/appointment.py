@@ -1,11 +1,35 @@
+from .base import intern_text
+from .dates import MINUTES_PER_DAY, format_date, format_time, parse_date, parse_time
 from .person import Patient, Doctor
 from .structure import Room
 from .medical import MedicalService
 
+STATUS_SCHEDULED = "запланирован"
+STATUS_COMPLETED = "завершен"
+STATUS_CANCELLED = "отменен"
+
+status_text = {
+    STATUS_SCHEDULED: "Запланирован",
+    STATUS_COMPLETED: "Завершен",
+    STATUS_CANCELLED: "Отменен",
+}
+
 
 class Appointment:
     """Класс записи на прием."""
 
+    __slots__ = (
+        "appointment_id",
+        "patient",
+        "doctor",
+        "room",
+        "day",
+        "minute",
+        "service",
+        "reason",
+        "_status",
+    )
+
     def __init__(
         self,
         appointment_id: int,
@@ -25,19 +49,51 @@ class Appointment:
         self.appointment_time = appointment_time
         self.service = service
         self.reason = reason
-        self.status: str = "запланирован"
+        self.status: str = STATUS_SCHEDULED
+
+    @property
+    def appointment_date(self) -> str:
+        """Дата приема в формате ГГГГ-ММ-ДД."""
+        return format_date(self.day)
+
+    @appointment_date.setter
+    def appointment_date(self, value: str) -> None:
+        self.day = parse_date(value)
+
+    @property
+    def appointment_time(self) -> str:
+        """Время приема в формате ЧЧ:ММ."""
+        return format_time(self.minute)
+
+    @appointment_time.setter
+    def appointment_time(self, value: str) -> None:
+        self.minute = parse_time(value)
+
+    @property
+    def start(self) -> int:
+        """Начало приема в минутах от начала эпохи."""
+        return self.day * MINUTES_PER_DAY + self.minute
+
+    @property
+    def status(self) -> str:
+        return self._status
+
+    @status.setter
+    def status(self, value: str) -> None:
+        # Статусов всего три: загруженные строки сводятся к общим экземплярам
+        self._status = intern_text(value)
 
     def complete(self) -> None:
         """Отмечает прием как завершенный."""
-        self.status = "завершен"
+        self.status = STATUS_COMPLETED
 
     def cancel(self) -> None:
         """Отменяет прием."""
-        self.status = "отмене"
+        self.status = STATUS_CANCELLED
 
     def __str__(self) -> str:
         return (
             f"Прием #{self.appointment_id}: {self.patient.get_full_name()} "
             f"-> {self.doctor.get_full_name()} ({self.appointment_date} "
-            f"{self.appointment_time}) - {status_text[self.status]}"
+            f"{self.appointment_time}) - {status_text.get(self.status, self.status)}"
         )
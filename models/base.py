@@ -1,3 +1,12 @@
+import sys
+from typing import Optional
+
+
+def intern_text(value: Optional[str]) -> Optional[str]:
+    """Возвращает общий экземпляр строки для повторяющихся значений."""
+    return sys.intern(value) if type(value) is str else value
+
+
 class MedicalError(Exception):
     """Базовое исключение для медицинской системы."""
 
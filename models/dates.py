@@ -0,0 +1,52 @@
+"""Компактное представление дат и времени.
+
+Даты хранятся как порядковый номер дня (date.toordinal), время - как
+минута от начала суток. Строки разбираются и форматируются только на
+границах: при вводе, загрузке, сохранении и выводе. Значений немного,
+поэтому результаты кэшируются.
+"""
+
+import re
+from datetime import date
+from functools import lru_cache
+from .base import ValidationError
+
+MINUTES_PER_DAY = 24 * 60
+
+_DATE_FORMAT = re.compile(r"\d{4}-\d{2}-\d{2}")
+
+
+@lru_cache(maxsize=65536)
+def parse_date(text: str) -> int:
+    """Переводит дату ГГГГ-ММ-ДД в порядковый номер дня."""
+    try:
+        if _DATE_FORMAT.fullmatch(text):
+            return date.fromisoformat(text).toordinal()
+    except (TypeError, ValueError):
+        pass
+    raise ValidationError(f"Неверный формат даты: {text}")
+
+
+@lru_cache(maxsize=4096)
+def parse_time(text: str) -> int:
+    """Переводит время ЧЧ:ММ в минуты от начала суток."""
+    try:
+        hours, minutes = text.split(":")
+        hours, minutes = int(hours), int(minutes)
+    except (AttributeError, ValueError):
+        raise ValidationError(f"Неверный формат времени: {text}")
+    if not (0 <= hours < 24 and 0 <= minutes < 60):
+        raise ValidationError(f"Неверный формат времени: {text}")
+    return hours * 60 + minutes
+
+
+@lru_cache(maxsize=65536)
+def format_date(day: int) -> str:
+    """Переводит порядковый номер дня в строку ГГГГ-ММ-ДД."""
+    return date.fromordinal(day).isoformat()
+
+
+@lru_cache(maxsize=MINUTES_PER_DAY)
+def format_time(minute: int) -> str:
+    """Переводит минуты от начала суток в строку ЧЧ:ММ."""
+    return f"{minute // 60:02d}:{minute % 60:02d}"
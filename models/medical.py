@@ -1,10 +1,14 @@
-from typing import List, Dict, Any
+from bisect import bisect_left, insort
+from typing import Callable, Iterable, List, Optional, Tuple
+from .dates import format_date, parse_date
 from .person import Patient, Doctor
 
 
 class MedicalService:
     """Класс медицинской услуги."""
 
+    __slots__ = ("service_id", "name", "description", "cost", "duration")
+
     def __init__(
         self, service_id: int, name: str, description: str, cost: float, duration: int
     ) -> None:
@@ -21,6 +25,8 @@ class MedicalService:
 class Diagnosis:
     """Класс медицинского диагноза."""
 
+    __slots__ = ("diagnosis_id", "code", "name", "description")
+
     def __init__(
         self, diagnosis_id: int, code: str, name: str, description: str
     ) -> None:
@@ -36,6 +42,8 @@ class Diagnosis:
 class Prescription:
     """Класс медицинского назначения."""
 
+    __slots__ = ("prescription_id", "medication", "dosage", "frequency", "duration")
+
     def __init__(
         self,
         prescription_id: int,
@@ -54,15 +62,108 @@ class Prescription:
         return f"{self.medication} - {self.dosage}"
 
 
+class RecordEntry:
+    """Запись медицинской карты: один прием у врача."""
+
+    __slots__ = (
+        "entry_id",
+        "entry_day",
+        "doctor",
+        "diagnosis",
+        "symptoms",
+        "treatment",
+        "prescriptions",
+    )
+
+    def __init__(
+        self,
+        entry_id: int,
+        entry_day: int,
+        doctor: Optional[Doctor],
+        diagnosis: Optional[Diagnosis],
+        symptoms: str,
+        treatment: str,
+        prescriptions: Iterable[Prescription] = (),
+    ) -> None:
+        self.entry_id = entry_id
+        self.entry_day = entry_day
+        self.doctor = doctor
+        self.diagnosis = diagnosis
+        self.symptoms = symptoms
+        self.treatment = treatment
+        self.prescriptions: Tuple[Prescription, ...] = tuple(prescriptions)
+
+    @property
+    def entry_date(self) -> str:
+        """Дата приема в формате ГГГГ-ММ-ДД."""
+        return format_date(self.entry_day)
+
+    def __repr__(self) -> str:
+        code = self.diagnosis.code if self.diagnosis else None
+        return f"RecordEntry({self.entry_id}, {self.entry_date}, {code!r})"
+
+
 class MedicalRecord:
-    """Класс медицинской карты пациента."""
+    """Класс медицинской карты пациента.
+
+    Записи карты, сохраненные в хранилище карт, можно не читать при
+    загрузке: defer_entries откладывает их до первого обращения к entries.
+    Записи хранятся в порядке добавления, entry_id - номер записи в карте
+    начиная с 1. Выборки по датам идут через индекс (день, entry_id),
+    который строится при первой выборке.
+
+    on_entry(карта, запись) вызывается после каждого add_entry: так
+    владелец карты (сервис поликлиники) поддерживает свои индексы и
+    отмечает карту измененной.
+    """
+
+    __slots__ = (
+        "record_id",
+        "patient",
+        "on_entry",
+        "_entries",
+        "_loader",
+        "_entry_count",
+        "_by_day",
+    )
 
-    def __init__(self, record_id: int, patient: Patient) -> None:
+    def __init__(
+        self,
+        record_id: int,
+        patient: Patient,
+        on_entry: Optional[Callable[["MedicalRecord", "RecordEntry"], None]] = None,
+    ) -> None:
         self.record_id = record_id
         self.patient = patient
-        self.entries: List[Dict[str, Any]] = []
+        self.on_entry = on_entry
+        self._entries: Optional[List[RecordEntry]] = []
+        self._loader: Optional[Callable[[], List[RecordEntry]]] = None
+        self._entry_count = 0
+        self._by_day: Optional[List[Tuple[int, int]]] = None
         patient.medical_record = self
 
+    def defer_entries(
+        self, loader: Callable[[], List[RecordEntry]], count: int
+    ) -> None:
+        """Заменяет записи карты отложенными: loader прочитает count записей."""
+        self._entries = None
+        self._loader = loader
+        self._entry_count = count
+        self._by_day = None
+
+    @property
+    def deferred_entries(self) -> Optional[Callable[[], List[RecordEntry]]]:
+        """Загрузчик еще не прочитанных записей или None, если они в памяти."""
+        return self._loader
+
+    @property
+    def entries(self) -> List[RecordEntry]:
+        """Записи карты; отложенные записи читаются при первом обращении."""
+        if self._entries is None:
+            self._entries = self._loader()
+            self._loader = None
+        return self._entries
+
     def add_entry(
         self,
         entry_date: str,
@@ -70,19 +171,50 @@ class MedicalRecord:
         diagnosis: Diagnosis,
         symptoms: str,
         treatment: str,
-        prescriptions: List[Prescription],
-    ) -> None:
+        prescriptions: Iterable[Prescription],
+    ) -> RecordEntry:
         """Добавляет запись в медицинскую карту."""
-        entry = {
-            "entry_id": len(self.entries) + 1,
-            "entry_date": entry_date,
-            "doctor": doctor,
-            "diagnosis": diagnosis,
-            "symptoms": symptoms,
-            "treatment": treatment,
-            "prescriptions": prescriptions,
-        }
-        self.entries.append(entry)
+        entries = self.entries
+        entry = RecordEntry(
+            len(entries) + 1,
+            parse_date(entry_date),
+            doctor,
+            diagnosis,
+            symptoms,
+            treatment,
+            prescriptions,
+        )
+        entries.append(entry)
+        if self._by_day is not None:
+            insort(self._by_day, (entry.entry_day, entry.entry_id))
+        if self.on_entry is not None:
+            self.on_entry(self, entry)
+        return entry
+
+    def get_entry(self, entry_id: int) -> Optional[RecordEntry]:
+        """Возвращает запись карты по номеру."""
+        entries = self.entries
+        if 1 <= entry_id <= len(entries):
+            return entries[entry_id - 1]
+        return None
+
+    def entries_between(self, first_day: int, last_day: int) -> List[RecordEntry]:
+        """Возвращает записи с днем приема в [first_day, last_day] по датам."""
+        entries = self.entries
+        if self._by_day is None:
+            self._by_day = sorted(
+                (entry.entry_day, entry.entry_id) for entry in entries
+            )
+        low = bisect_left(self._by_day, (first_day,))
+        high = bisect_left(self._by_day, (last_day + 1,))
+        return [entries[entry_id - 1] for _, entry_id in self._by_day[low:high]]
+
+    @property
+    def entry_count(self) -> int:
+        """Число записей в карте, не читая отложенные записи."""
+        if self._entries is None:
+            return self._entry_count
+        return len(self._entries)
 
     def __str__(self) -> str:
         return f"Мед. карта #{self.record_id}"
@@ -1,13 +1,26 @@
 from typing import Optional
+from .base import intern_text
+from .dates import format_date, parse_date
 
 
 class Person:
     """Базовый класс для всех персон в системе."""
 
+    __slots__ = ("person_id", "first_name", "last_name", "birth_day", "phone")
+
     @property
     def patient_id(self):
         return self.person_id
 
+    @property
+    def birth_date(self) -> str:
+        """Дата рождения в формате ГГГГ-ММ-ДД."""
+        return format_date(self.birth_day)
+
+    @birth_date.setter
+    def birth_date(self, value: str) -> None:
+        self.birth_day = parse_date(value)
+
     def __init__(
         self,
         person_id: int,
@@ -33,6 +46,8 @@ class Person:
 class Patient(Person):
     """Класс пациента поликлиники."""
 
+    __slots__ = ("insurance_number", "medical_record")
+
     def __init__(
         self,
         patient_id: int,
@@ -53,10 +68,21 @@ class Patient(Person):
 class Doctor(Person):
     """Класс врача поликлиники."""
 
+    __slots__ = ("_specialization", "license_number")
+
     @property
     def doctor_id(self):
         return self.person_id
 
+    @property
+    def specialization(self) -> str:
+        return self._specialization
+
+    @specialization.setter
+    def specialization(self, value: str) -> None:
+        # Специализаций немного: одинаковые строки хранятся в одном экземпляре
+        self._specialization = intern_text(value)
+
     def __init__(
         self,
         doctor_id: int,
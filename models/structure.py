@@ -1,10 +1,13 @@
 from typing import List
+from .base import intern_text
 from .person import Doctor
 
 
 class Department:
     """Класс отделения поликлиники."""
 
+    __slots__ = ("department_id", "name", "floor", "head_doctor", "doctors")
+
     def __init__(
         self, department_id: int, name: str, floor: int, head_doctor: Doctor
     ) -> None:
@@ -25,6 +28,8 @@ class Department:
 class Room:
     """Класс кабинета поликлиника."""
 
+    __slots__ = ("room_id", "room_number", "floor", "_room_type", "department")
+
     def __init__(
         self,
         room_id: int,
@@ -39,5 +44,14 @@ class Room:
         self.room_type = room_type
         self.department = department
 
+    @property
+    def room_type(self) -> str:
+        return self._room_type
+
+    @room_type.setter
+    def room_type(self, value: str) -> None:
+        # Типов кабинетов немного: одинаковые строки хранятся в одном экземпляре
+        self._room_type = intern_text(value)
+
     def __str__(self) -> str:
         return f"Кабинет {self.room_number} ({self.room_type})"
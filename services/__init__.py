@@ -1,4 +1,12 @@
 from .polyclinic_service import PolyclinicService
 from .file_manager import PolyclinicFileManager
+from .repository import Repository, InMemoryRepository
+from .sqlite_repository import SqliteRepository
 
-__all__ = ["PolyclinicService", "PolyclinicFileManager"]
+__all__ = [
+    "PolyclinicService",
+    "PolyclinicFileManager",
+    "Repository",
+    "InMemoryRepository",
+    "SqliteRepository",
+]
@@ -0,0 +1,162 @@
+"""Отчеты по выручке и загрузке поликлиники.
+
+Агрегаты считаются по столбцовой копии записей (AppointmentColumns):
+строки сначала подсчитываются по парам (ключ группы, ID услуги) одним
+проходом по массивам, затем пары умножаются на стоимость и длительность
+услуги. Число различных пар невелико, поэтому объекты Appointment не
+создаются и не обходятся.
+"""
+
+from collections import Counter
+from datetime import date
+from itertools import compress
+from typing import Callable, Dict, Hashable, Iterable, List, Optional, Tuple
+from models import ValidationError, STATUS_SCHEDULED, STATUS_COMPLETED, format_date
+from .polyclinic_service import PolyclinicService
+
+# Группировки отчета: имя -> столбец записей, по которому строится ключ
+GROUP_COLUMNS: Dict[str, str] = {
+    "doctor": "doctor_id",
+    "department": "room_id",
+    "service": "service_id",
+    "day": "day",
+    "week": "day",
+    "month": "day",
+}
+
+# Статусы записей, которые приносят выручку и занимают время
+BILLABLE_STATUSES = (STATUS_SCHEDULED, STATUS_COMPLETED)
+
+
+class GroupTotals:
+    """Итоги одной группы отчета."""
+
+    __slots__ = ("key", "label", "count", "minutes", "revenue")
+
+    def __init__(self, key: Hashable, label: str) -> None:
+        self.key = key
+        self.label = label
+        self.count = 0
+        self.minutes = 0
+        self.revenue = 0.0
+
+    def add(self, count: int, duration: int, cost: float) -> None:
+        """Добавляет count записей услуги с заданными длительностью и ценой."""
+        self.count += count
+        self.minutes += count * duration
+        self.revenue += count * cost
+
+    def __repr__(self) -> str:
+        return (
+            f"GroupTotals({self.label!r}, count={self.count}, "
+            f"minutes={self.minutes}, revenue={self.revenue})"
+        )
+
+
+def _week_start(day: int) -> int:
+    # Порядковый день 1 (0001-01-01) - понедельник
+    return day - (day - 1) % 7
+
+
+def _week_label(day: int) -> str:
+    year, week, _ = date.fromordinal(day).isocalendar()
+    return f"{year}-W{week:02d}"
+
+
+def _month_key(day: int) -> Tuple[int, int]:
+    value = date.fromordinal(day)
+    return value.year, value.month
+
+
+def _grouping(
+    service: PolyclinicService, group_by: str
+) -> Tuple[Callable[[int], Hashable], Callable[[Hashable], str]]:
+    """Возвращает функции: значение столбца -> ключ группы, ключ -> подпись."""
+    if group_by == "doctor":
+        return int, lambda doctor_id: service.get_doctor(doctor_id).get_full_name()
+    if group_by == "department":
+        return (
+            lambda room_id: service.get_room(room_id).department.department_id,
+            lambda department_id: service.get_department(department_id).name,
+        )
+    if group_by == "service":
+        return int, lambda service_id: service.get_service(service_id).name
+    if group_by == "day":
+        return int, format_date
+    if group_by == "week":
+        return _week_start, _week_label
+    if group_by == "month":
+        return _month_key, lambda key: f"{key[0]:04d}-{key[1]:02d}"
+    raise ValidationError(f"Неизвестная группировка отчета: {group_by}")
+
+
+def _row_mask(
+    service: PolyclinicService,
+    statuses: Iterable[str],
+    start_day: Optional[int],
+    end_day: Optional[int],
+) -> bytes:
+    """Маска строк с нужными статусами и днем в [start_day, end_day]."""
+    columns = service.appointment_columns()
+    mask = columns.status_mask(*statuses)
+    if start_day is None and end_day is None:
+        return mask
+    low = start_day if start_day is not None else 0
+    high = end_day if end_day is not None else 2**31
+    return bytes(
+        selected and low <= day <= high for selected, day in zip(mask, columns.day)
+    )
+
+
+def aggregate(
+    service: PolyclinicService,
+    group_by: str,
+    statuses: Iterable[str] = BILLABLE_STATUSES,
+    start_day: Optional[int] = None,
+    end_day: Optional[int] = None,
+) -> List[GroupTotals]:
+    """Считает число записей, минуты приемов и выручку по группам.
+
+    group_by - одно из GROUP_COLUMNS. Учитываются записи со статусами
+    statuses, а при заданных start_day/end_day (порядковые номера дней,
+    включительно) - только записи за этот период. Группы упорядочены по
+    ключу.
+    """
+    if group_by not in GROUP_COLUMNS:
+        raise ValidationError(f"Неизвестная группировка отчета: {group_by}")
+    key_of, label_of = _grouping(service, group_by)
+    columns = service.appointment_columns()
+    mask = _row_mask(service, statuses, start_day, end_day)
+
+    pairs = Counter(
+        compress(zip(columns.column(GROUP_COLUMNS[group_by]), columns.service_id), mask)
+    )
+
+    groups: Dict[Hashable, GroupTotals] = {}
+    keys: Dict[int, Hashable] = {}
+    for (value, service_id), count in pairs.items():
+        key = keys.get(value)
+        if key is None:
+            key = keys[value] = key_of(value)
+        totals = groups.get(key)
+        if totals is None:
+            totals = groups[key] = GroupTotals(key, label_of(key))
+        medical_service = service.get_service(service_id)
+        totals.add(count, medical_service.duration, medical_service.cost)
+    return [groups[key] for key in sorted(groups)]
+
+
+def summarize(
+    service: PolyclinicService,
+    statuses: Iterable[str] = BILLABLE_STATUSES,
+    start_day: Optional[int] = None,
+    end_day: Optional[int] = None,
+) -> GroupTotals:
+    """Считает общие итоги по всем записям с отбором как в aggregate."""
+    columns = service.appointment_columns()
+    mask = _row_mask(service, statuses, start_day, end_day)
+    totals = GroupTotals(None, "Итого")
+    for service_id, count in Counter(compress(columns.service_id, mask)).items():
+        medical_service = service.get_service(service_id)
+        totals.add(count, medical_service.duration, medical_service.cost)
+    return totals
@@ -0,0 +1,150 @@
+"""Пакетная запись пациентов на прием.
+
+Заявки расставляются жадно: сначала самые ограниченные (конкретный врач,
+узкое окно дат, долгая услуга), каждая получает самое раннее свободное
+окно, найденное через PolyclinicService.find_free_slots, и сразу
+занимает его, так что следующие заявки видят уже обновленные календари.
+"""
+
+from typing import Iterable, List, Optional, Tuple
+from models import Appointment, NotFoundError, ValidationError, parse_date
+from .polyclinic_service import PolyclinicService
+from .scheduling import SLOT_STEP
+
+
+class BookingRequest:
+    """Заявка на запись: пациент, услуга, врач или специализация, окно дат."""
+
+    __slots__ = (
+        "patient_id",
+        "service_id",
+        "first_date",
+        "last_date",
+        "doctor_id",
+        "specialization",
+        "reason",
+    )
+
+    def __init__(
+        self,
+        patient_id: int,
+        service_id: int,
+        first_date: str,
+        last_date: str,
+        doctor_id: Optional[int] = None,
+        specialization: Optional[str] = None,
+        reason: str = "",
+    ) -> None:
+        if (doctor_id is None) == (specialization is None):
+            raise ValidationError(
+                "В заявке нужно указать либо врача, либо специализацию"
+            )
+        self.patient_id = patient_id
+        self.service_id = service_id
+        self.first_date = first_date
+        self.last_date = last_date
+        self.doctor_id = doctor_id
+        self.specialization = specialization
+        self.reason = reason
+
+    def __repr__(self) -> str:
+        target = (
+            f"doctor_id={self.doctor_id}"
+            if self.doctor_id is not None
+            else f"specialization={self.specialization!r}"
+        )
+        return (
+            f"BookingRequest(patient_id={self.patient_id}, "
+            f"service_id={self.service_id}, {target}, "
+            f"{self.first_date}..{self.last_date})"
+        )
+
+
+class BatchResult:
+    """Итог пакетной записи: размещенные заявки и заявки с причиной отказа."""
+
+    __slots__ = ("placed", "unplaced")
+
+    def __init__(self) -> None:
+        self.placed: List[Tuple[BookingRequest, Appointment]] = []
+        self.unplaced: List[Tuple[BookingRequest, str]] = []
+
+    def __repr__(self) -> str:
+        return f"BatchResult(placed={len(self.placed)}, unplaced={len(self.unplaced)})"
+
+
+def _priority(service: PolyclinicService, request: BookingRequest) -> Tuple:
+    """Ключ порядка заявок: сначала наиболее ограниченные."""
+    try:
+        window = parse_date(request.last_date) - parse_date(request.first_date)
+    except ValidationError:
+        window = 0
+    medical_service = service.get_service(request.service_id)
+    duration = medical_service.duration if medical_service else 0
+    return request.doctor_id is None, window, -duration
+
+
+def _place(
+    service: PolyclinicService, request: BookingRequest, step: int
+) -> Appointment:
+    """Записывает заявку в самое раннее свободное окно."""
+    if not service.get_patient(request.patient_id):
+        raise NotFoundError(f"Пациент с ID {request.patient_id} не найден")
+    medical_service = service.get_service(request.service_id)
+    if not medical_service:
+        raise NotFoundError(f"Услуга с ID {request.service_id} не найдена")
+
+    date_range = (request.first_date, request.last_date)
+    if request.doctor_id is not None:
+        slots = service.find_doctor_free_slots(
+            request.doctor_id, date_range, medical_service.duration, 1, step
+        )
+    else:
+        slots = service.find_free_slots(
+            request.specialization, date_range, medical_service.duration, 1, step
+        )
+    if not slots:
+        raise ValidationError("Нет свободного времени в заданном окне")
+
+    slot_date, slot_time, doctor, room = slots[0]
+    return service.create_appointment(
+        request.patient_id,
+        doctor.doctor_id,
+        room.room_id,
+        slot_date,
+        slot_time,
+        request.service_id,
+        request.reason,
+    )
+
+
+def schedule_batch(
+    service: PolyclinicService,
+    requests: Iterable[BookingRequest],
+    step: int = SLOT_STEP,
+) -> BatchResult:
+    """Записывает пакет заявок и сообщает, какие из них разместить не удалось.
+
+    Заявки, для которых в окне не нашлось врача и кабинета, а также заявки
+    с несуществующими пациентом, врачом или услугой попадают в unplaced с
+    текстом причины; остальные уже записаны в сервис. Все изменения идут
+    одной транзакцией хранилища.
+    """
+    requests = list(requests)
+    order = sorted(range(len(requests)), key=lambda i: _priority(service, requests[i]))
+    placed = {}
+    unplaced = {}
+    with service.transaction():
+        for i in order:
+            try:
+                placed[i] = _place(service, requests[i], step)
+            except (NotFoundError, ValidationError) as e:
+                unplaced[i] = str(e)
+
+    result = BatchResult()
+    for i, request in enumerate(requests):
+        if i in placed:
+            result.placed.append((request, placed[i]))
+        else:
+            result.unplaced.append((request, unplaced[i]))
+    return result
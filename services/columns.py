@@ -0,0 +1,118 @@
+from array import array
+from collections import Counter
+from itertools import compress
+from typing import Dict, Iterable, List, Optional
+from models import Appointment, STATUS_SCHEDULED, STATUS_COMPLETED, STATUS_CANCELLED
+
+# Коды статусов в столбце status; прочие статусы получают коды по мере
+# появления
+STATUS_CODES: Dict[str, int] = {
+    STATUS_SCHEDULED: 0,
+    STATUS_COMPLETED: 1,
+    STATUS_CANCELLED: 2,
+}
+
+
+class AppointmentColumns:
+    """Столбцовая копия записей на прием (структура массивов).
+
+    Каждое поле хранится в отдельном массиве array, строка i всех массивов
+    описывает одну запись. Порядок строк не определен: при удалении на
+    место строки переносится последняя. Агрегаты считаются встроенными
+    функциями по массивам, без обхода объектов Appointment.
+    """
+
+    # Имя столбца -> код типа array
+    COLUMNS: Dict[str, str] = {
+        "appointment_id": "i",
+        "patient_id": "i",
+        "doctor_id": "i",
+        "room_id": "i",
+        "service_id": "i",
+        "day": "i",
+        "minute": "H",
+        "status": "B",
+    }
+
+    def __init__(self, appointments: Iterable[Appointment] = ()) -> None:
+        self.appointment_id = array("i")
+        self.patient_id = array("i")
+        self.doctor_id = array("i")
+        self.room_id = array("i")
+        self.service_id = array("i")
+        self.day = array("i")
+        self.minute = array("H")
+        self.status = array("B")
+
+        self._rows: Dict[int, int] = {}
+        self._codes: Dict[str, int] = dict(STATUS_CODES)
+        self._statuses: List[str] = list(STATUS_CODES)
+
+        for appointment in appointments:
+            self.append(appointment)
+
+    def __len__(self) -> int:
+        return len(self.appointment_id)
+
+    def __contains__(self, appointment_id: object) -> bool:
+        return appointment_id in self._rows
+
+    def column(self, name: str) -> array:
+        """Возвращает столбец по имени."""
+        if name not in self.COLUMNS:
+            raise KeyError(name)
+        return getattr(self, name)
+
+    def status_code(self, status: str) -> int:
+        """Возвращает код статуса, регистрируя новый статус при необходимости."""
+        code = self._codes.get(status)
+        if code is None:
+            code = self._codes[status] = len(self._statuses)
+            self._statuses.append(status)
+        return code
+
+    def status_name(self, code: int) -> str:
+        """Возвращает статус по коду."""
+        return self._statuses[code]
+
+    def append(self, appointment: Appointment) -> None:
+        """Добавляет строку записи."""
+        self._rows[appointment.appointment_id] = len(self.appointment_id)
+        self.appointment_id.append(appointment.appointment_id)
+        self.patient_id.append(appointment.patient.patient_id)
+        self.doctor_id.append(appointment.doctor.doctor_id)
+        self.room_id.append(appointment.room.room_id)
+        self.service_id.append(appointment.service.service_id)
+        self.day.append(appointment.day)
+        self.minute.append(appointment.minute)
+        self.status.append(self.status_code(appointment.status))
+
+    def remove(self, appointment_id: int) -> None:
+        """Удаляет строку записи, перенося на ее место последнюю строку."""
+        row = self._rows.pop(appointment_id)
+        last = len(self.appointment_id) - 1
+        for name in self.COLUMNS:
+            column = getattr(self, name)
+            if row != last:
+                column[row] = column[last]
+            column.pop()
+        if row != last:
+            self._rows[self.appointment_id[row]] = row
+
+    def set_status(self, appointment_id: int, status: str) -> None:
+        """Обновляет статус записи."""
+        self.status[self._rows[appointment_id]] = self.status_code(status)
+
+    def status_mask(self, *statuses: str) -> bytes:
+        """Возвращает маску строк (байт 1 или 0) с одним из статусов."""
+        table = bytearray(256)
+        for status in statuses:
+            code = self._codes.get(status)
+            if code is not None:
+                table[code] = 1
+        return self.status.tobytes().translate(table)
+
+    def count_by(self, name: str, mask: Optional[bytes] = None) -> Counter:
+        """Считает строки по значениям столбца, при необходимости по маске."""
+        column = self.column(name)
+        return Counter(column if mask is None else compress(column, mask))
@@ -1,6 +1,35 @@
 import json
+import os
+from functools import partial
 import xml.etree.ElementTree as ET
+from xml.sax.saxutils import escape
+from typing import Any, Dict, Iterator, List, Optional, TextIO
 from .polyclinic_service import PolyclinicService
+from .json_stream import iter_json_object
+from .repository import ID_ATTRIBUTES
+from .rows import SECTIONS, Row, hydrate_row, iter_rows
+from .journal import (
+    append_changes,
+    discard_journal,
+    journal_path,
+    needs_compaction,
+    replay_journal,
+)
+from .record_store import (
+    RecordStore,
+    drop_charts,
+    open_records,
+    open_text_index,
+    save_records,
+    save_text_index,
+    text_index_unsaved,
+)
+from .snapshot import load_snapshot, save_snapshot
+from .sqlite_repository import SqliteRepository
+from .validation import validator_for
+
+WRITE_BUFFER = 1024 * 1024
+WRITE_CHUNK_ROWS = 1000
 
 
 class PolyclinicFileManager:
@@ -8,505 +37,276 @@ class PolyclinicFileManager:
 
     @staticmethod
     def save_to_json(service: PolyclinicService, filename: str) -> None:
-        """Сохраняет данные поликлиники в JSON файл."""
+        """Сохраняет данные поликлиники в JSON файл.
+
+        Объекты сериализуются по одному прямо из коллекций сервиса и
+        записываются в файл блоками, без построения общего документа.
+        Медицинские карты сохраняются рядом, в хранилище карт
+        (services.record_store).
+        """
         try:
-            data = {
-                "name": service.name,
-                "address": service.address,
-                "patients": [
-                    {
-                        "patient_id": p.patient_id,
-                        "first_name": p.first_name,
-                        "last_name": p.last_name,
-                        "birth_date": p.birth_date,
-                        "phone": p.phone,
-                        "insurance_number": p.insurance_number,
-                    }
-                    for p in service.patients
-                ],
-                "doctors": [
-                    {
-                        "doctor_id": d.doctor_id,
-                        "first_name": d.first_name,
-                        "last_name": d.last_name,
-                        "birth_date": d.birth_date,
-                        "phone": d.phone,
-                        "specialization": d.specialization,
-                        "license_number": d.license_number,
-                    }
-                    for d in service.doctors
-                ],
-                "departments": [
-                    {
-                        "department_id": d.department_id,
-                        "name": d.name,
-                        "floor": d.floor,
-                        "head_doctor_id": d.head_doctor.doctor_id,
-                    }
-                    for d in service.departments
-                ],
-                "rooms": [
-                    {
-                        "room_id": r.room_id,
-                        "room_number": r.room_number,
-                        "floor": r.floor,
-                        "room_type": r.room_type,
-                        "department_id": r.department.department_id,
-                    }
-                    for r in service.rooms
-                ],
-                "services": [
-                    {
-                        "service_id": s.service_id,
-                        "name": s.name,
-                        "description": s.description,
-                        "cost": s.cost,
-                        "duration": s.duration,
-                    }
-                    for s in service.services
-                ],
-                "appointments": [
-                    {
-                        "appointment_id": a.appointment_id,
-                        "patient_id": a.patient.patient_id,
-                        "doctor_id": a.doctor.doctor_id,
-                        "room_id": a.room.room_id,
-                        "appointment_date": a.appointment_date,
-                        "appointment_time": a.appointment_time,
-                        "service_id": a.service.service_id,
-                        "reason": a.reason,
-                        "status": a.status,
-                    }
-                    for a in service.appointments
-                ],
-            }
-
-            with open(filename, "w", encoding="utf-8") as f:
-                json.dump(data, f, ensure_ascii=False, indent=2)
+            with open(filename, "w", encoding="utf-8", buffering=WRITE_BUFFER) as f:
+                f.write("{\n")
+                f.write(f'  "name": {json.dumps(service.name, ensure_ascii=False)},\n')
+                f.write(
+                    f'  "address": {json.dumps(service.address, ensure_ascii=False)}'
+                )
+                for section, _, _ in SECTIONS:
+                    f.write(f',\n  "{section}": ')
+                    PolyclinicFileManager._write_json_array(
+                        f, iter_rows(service, section)
+                    )
+                f.write("\n}")
+            PolyclinicFileManager._save_records(service, filename)
             print(f"Данные успешно сохранены в {filename}")
 
         except Exception as e:
             print(f"Ошибка при сохранении в JSON: {e}")
 
     @staticmethod
-    def load_from_json(filename: str) -> PolyclinicService:
-        """Загружает данные поликлиники из JSON файла."""
+    def _write_json_array(f: TextIO, rows: Iterator[Row]) -> None:
+        """Пишет массив плоских строк в формате json.dump(indent=2) блоками."""
+        # Разделитель с отступом дает тот же текст, что indent=2, но позволяет
+        # использовать быстрый C-кодировщик вместо Python-реализации с indent.
+        encoder = json.JSONEncoder(ensure_ascii=False, separators=(",\n      ", ": "))
+        chunk: List[str] = []
+        opened = False
+        for row in rows:
+            chunk.append(",\n    {\n      " if opened else "[\n    {\n      ")
+            chunk.append(encoder.encode(row)[1:-1])
+            chunk.append("\n    }")
+            opened = True
+            if len(chunk) >= WRITE_CHUNK_ROWS * 3:
+                f.write("".join(chunk))
+                chunk.clear()
+        chunk.append("\n  ]" if opened else "[]")
+        f.write("".join(chunk))
+
+    @staticmethod
+    def load_from_json(
+        filename: str, streaming: bool = True, validate: bool = False
+    ) -> PolyclinicService:
+        """Загружает данные поликлиники из JSON файла.
+
+        В потоковом режиме файл разбирается по одной записи, и объекты
+        восстанавливаются по мере чтения, не дожидаясь разбора всего документа.
+        С validate=True строки сначала проверяются правилами
+        services.validation, а строки с ошибками пропускаются.
+        """
         try:
-            with open(filename, "r", encoding="utf-8") as f:
-                data = json.load(f)
-
-            service = PolyclinicService(data["name"], data["address"])
-
-            # Загрузка пациентов
-            for patient_data in data["patients"]:
-                service.create_patient(
-                    patient_data["first_name"],
-                    patient_data["last_name"],
-                    patient_data["birth_date"],
-                    patient_data["phone"],
-                    patient_data["insurance_number"],
-                )
+            if streaming:
+                service = PolyclinicFileManager._stream_json(filename, validate)
+            else:
+                with open(filename, "r", encoding="utf-8") as f:
+                    data = json.load(f)
+
+                service = PolyclinicService(data["name"], data["address"])
+                for section, _, label in SECTIONS:
+                    for row in data.get(section, []):
+                        PolyclinicFileManager._load_row(
+                            service, section, label, row, validate
+                        )
 
-            # Загрузка врачей
-            for doctor_data in data["doctors"]:
-                service.create_doctor(
-                    doctor_data["first_name"],
-                    doctor_data["last_name"],
-                    doctor_data["birth_date"],
-                    doctor_data["phone"],
-                    doctor_data["specialization"],
-                    doctor_data["license_number"],
-                )
+            PolyclinicFileManager._attach_records(service, filename)
+            PolyclinicFileManager._print_load_summary(service, filename)
+            return service
 
-            # Загрузка отделений
-            if "departments" in data:
-                for department_data in data["departments"]:
-                    service.create_department(
-                        department_data["name"],
-                        department_data["floor"],
-                        department_data["head_doctor_id"],
-                    )
+        except Exception as e:
+            print(f"Ошибка при загрузке из JSON: {e}")
+            return PolyclinicService("Восстановленная поликлиника", "Неизвестный адрес")
 
-            # Загрузка кабинетов
-            if "rooms" in data:
-                for room_data in data["rooms"]:
-                    service.create_room(
-                        room_data["room_number"],
-                        room_data["floor"],
-                        room_data["room_type"],
-                        room_data["department_id"],
+    @staticmethod
+    def _stream_json(filename: str, validate: bool = False) -> PolyclinicService:
+        """Восстанавливает сервис, читая JSON файл потоково."""
+        labels = {section: label for section, _, label in SECTIONS}
+        service = PolyclinicService("", "")
+        with open(filename, "r", encoding="utf-8") as f:
+            for key, value in iter_json_object(f):
+                if key in labels:
+                    PolyclinicFileManager._load_row(
+                        service, key, labels[key], value, validate
                     )
+                elif key == "name":
+                    service.name = value
+                elif key == "address":
+                    service.address = value
+        return service
 
-            # Загрузка услуг
-            if "services" in data:
-                for service_data in data["services"]:
-                    service.create_service(
-                        service_data["name"],
-                        service_data["description"],
-                        service_data["cost"],
-                        service_data["duration"],
+    @staticmethod
+    def _load_row(
+        service: PolyclinicService,
+        section: str,
+        label: str,
+        row: Row,
+        validate: bool = False,
+    ) -> None:
+        """Восстанавливает объект раздела с исходным ID, минуя create_*.
+
+        С validate=True строка с ошибками полей не загружается.
+        """
+        if validate:
+            errors = validator_for(section).check(row)
+            if errors:
+                row_id = row.get(ID_ATTRIBUTES[section])
+                for error in errors:
+                    print(
+                        f"Ошибка при загрузке {label} (ID {row_id}): "
+                        f"поле {error.field} - {error.message}"
                     )
+                return
+        try:
+            hydrate_row(service, section, row)
+        except Exception as e:
+            print(f"Ошибка при загрузке {label}: {e}")
 
-            # Загрузка записей на прием
-            if "appointments" in data:
-                for appointment_data in data["appointments"]:
-                    try:
-                        # Получаем объекты по ID
-                        patient = service.get_patient(appointment_data["patient_id"])
-                        doctor = service.get_doctor(appointment_data["doctor_id"])
-                        room = service.get_room(appointment_data["room_id"])
-                        medical_service = service.get_service(
-                            appointment_data["service_id"]
-                        )
+    @staticmethod
+    def _open_records(filename: str) -> Optional[RecordStore]:
+        """Открывает хранилище медицинских карт файла данных, если оно есть.
 
-                        if all([patient, doctor, room, medical_service]):
-                            # Создаем запись на прием
-                            appointment = service.create_appointment(
-                                patient.patient_id,
-                                doctor.doctor_id,
-                                room.room_id,
-                                appointment_data["appointment_date"],
-                                appointment_data["appointment_time"],
-                                medical_service.service_id,
-                                appointment_data.get("reason", ""),
-                            )
+        Поврежденное хранилище не мешает загрузке остальных данных: карты
+        тогда остаются пустыми.
+        """
+        try:
+            return open_records(filename)
+        except (OSError, ValueError) as e:
+            print(f"Ошибка при загрузке медицинских карт: {e}")
+            return None
 
-                            # Устанавливаем статус записи
-                            if appointment and "status" in appointment_data:
-                                appointment.status = appointment_data["status"]
-                    except Exception as e:
-                        print(f"Ошибка при загрузке записи на прием: {e}")
-                        continue
-
-            print(f"Данные успешно загружены из {filename}")
-            print(
-                f"Загружено: {len(service.patients)} пациентов, "
-                f"{len(service.doctors)} врачей, "
-                f"{len(service.departments)} отделений, "
-                f"{len(service.rooms)} кабинетов, "
-                f"{len(service.services)} услуг, "
-                f"{len(service.appointments)} записей на прием"
-            )
-            return service
+    @staticmethod
+    def _attach_records(service: PolyclinicService, filename: str) -> None:
+        """Подключает карты пациентов, уже восстановленных в памяти."""
+        store = PolyclinicFileManager._open_records(filename)
+        if store is not None:
+            store.attach(service)
+            store.bind_all()
+        PolyclinicFileManager._attach_text_index(service, filename)
 
-        except Exception as e:
-            print(f"Ошибка при загрузке из JSON: {e}")
-            return PolyclinicService("Восстановленная поликлиника", "Неизвестный адрес")
+    @staticmethod
+    def _save_records(service: PolyclinicService, filename: str) -> None:
+        """Сохраняет медицинские карты и их полнотекстовый индекс."""
+        save_records(service, filename)
+        save_text_index(service, filename)
 
     @staticmethod
-    def save_to_xml(service: PolyclinicService, filename: str) -> None:
-        """Сохраняет данные поликлиники в XML файл."""
+    def _attach_text_index(service: PolyclinicService, filename: str) -> None:
+        """Подключает сохраненный полнотекстовый индекс карт, если он есть.
+
+        Без индекса (или с поврежденным) поиск по картам построит его
+        заново при первом запросе.
+        """
         try:
-            root = ET.Element("polyclinic")
-
-            ET.SubElement(root, "name").text = service.name
-            ET.SubElement(root, "address").text = service.address
-
-            patients_elem = ET.SubElement(root, "patients")
-            for patient in service.patients:
-                patient_elem = ET.SubElement(patients_elem, "patient")
-                ET.SubElement(patient_elem, "id").text = str(patient.patient_id)
-                ET.SubElement(patient_elem, "first_name").text = patient.first_name
-                ET.SubElement(patient_elem, "last_name").text = patient.last_name
-                ET.SubElement(patient_elem, "birth_date").text = patient.birth_date
-                ET.SubElement(patient_elem, "phone").text = patient.phone
-                ET.SubElement(
-                    patient_elem, "insurance_number"
-                ).text = patient.insurance_number
-
-            doctors_elem = ET.SubElement(root, "doctors")
-            for doctor in service.doctors:
-                doctor_elem = ET.SubElement(doctors_elem, "doctor")
-                ET.SubElement(doctor_elem, "id").text = str(doctor.doctor_id)
-                ET.SubElement(doctor_elem, "first_name").text = doctor.first_name
-                ET.SubElement(doctor_elem, "last_name").text = doctor.last_name
-                ET.SubElement(doctor_elem, "birth_date").text = doctor.birth_date
-                ET.SubElement(doctor_elem, "phone").text = doctor.phone
-                ET.SubElement(
-                    doctor_elem, "specialization"
-                ).text = doctor.specialization
-                ET.SubElement(
-                    doctor_elem, "license_number"
-                ).text = doctor.license_number
-
-            # Сохранение отделений
-            departments_elem = ET.SubElement(root, "departments")
-            for department in service.departments:
-                department_elem = ET.SubElement(departments_elem, "department")
-                ET.SubElement(department_elem, "id").text = str(
-                    department.department_id
-                )
-                ET.SubElement(department_elem, "name").text = department.name
-                ET.SubElement(department_elem, "floor").text = str(department.floor)
-                ET.SubElement(department_elem, "head_doctor_id").text = str(
-                    department.head_doctor.doctor_id
-                )
+            index = open_text_index(filename)
+        except (OSError, ValueError) as e:
+            print(f"Ошибка при загрузке индекса медицинских карт: {e}")
+            return
+        if index is not None:
+            service.attach_text_index(index)
 
-            # Сохранение кабинетов
-            rooms_elem = ET.SubElement(root, "rooms")
-            for room in service.rooms:
-                room_elem = ET.SubElement(rooms_elem, "room")
-                ET.SubElement(room_elem, "id").text = str(room.room_id)
-                ET.SubElement(room_elem, "room_number").text = room.room_number
-                ET.SubElement(room_elem, "floor").text = str(room.floor)
-                ET.SubElement(room_elem, "room_type").text = room.room_type
-                ET.SubElement(room_elem, "department_id").text = str(
-                    room.department.department_id
-                )
+    @staticmethod
+    def _print_load_summary(service: PolyclinicService, filename: str) -> None:
+        """Выводит сводку о загруженных данных."""
+        print(f"Данные успешно загружены из {filename}")
+        print(
+            f"Загружено: {service.count('patients')} пациентов, "
+            f"{service.count('doctors')} врачей, "
+            f"{service.count('departments')} отделений, "
+            f"{service.count('rooms')} кабинетов, "
+            f"{service.count('services')} услуг, "
+            f"{service.count('diagnoses')} диагнозов, "
+            f"{service.count('appointments')} записей на прием"
+        )
 
-            # Сохранение услуг
-            services_elem = ET.SubElement(root, "services")
-            for service_obj in service.services:
-                service_elem = ET.SubElement(services_elem, "service")
-                ET.SubElement(service_elem, "id").text = str(service_obj.service_id)
-                ET.SubElement(service_elem, "name").text = service_obj.name
-                ET.SubElement(
-                    service_elem, "description"
-                ).text = service_obj.description
-                ET.SubElement(service_elem, "cost").text = str(service_obj.cost)
-                ET.SubElement(service_elem, "duration").text = str(service_obj.duration)
-
-            # Сохранение записей на прием
-            appointments_elem = ET.SubElement(root, "appointments")
-            for appointment in service.appointments:
-                appointment_elem = ET.SubElement(appointments_elem, "appointment")
-                ET.SubElement(appointment_elem, "id").text = str(
-                    appointment.appointment_id
-                )
-                ET.SubElement(appointment_elem, "patient_id").text = str(
-                    appointment.patient.patient_id
-                )
-                ET.SubElement(appointment_elem, "doctor_id").text = str(
-                    appointment.doctor.doctor_id
-                )
-                ET.SubElement(appointment_elem, "room_id").text = str(
-                    appointment.room.room_id
-                )
-                ET.SubElement(
-                    appointment_elem, "appointment_date"
-                ).text = appointment.appointment_date
-                ET.SubElement(
-                    appointment_elem, "appointment_time"
-                ).text = appointment.appointment_time
-                ET.SubElement(appointment_elem, "service_id").text = str(
-                    appointment.service.service_id
-                )
-                ET.SubElement(appointment_elem, "reason").text = appointment.reason
-                ET.SubElement(appointment_elem, "status").text = appointment.status
+    @staticmethod
+    def save_to_xml(service: PolyclinicService, filename: str) -> None:
+        """Сохраняет данные поликлиники в XML файл.
 
-            tree = ET.ElementTree(root)
-            tree.write(filename, encoding="utf-8", xml_declaration=True)
+        Каждый объект сериализуется в отдельный элемент и сразу записывается
+        в файл, полное дерево документа не строится.
+        """
+        try:
+            with open(filename, "w", encoding="utf-8", buffering=WRITE_BUFFER) as f:
+                f.write("<?xml version='1.0' encoding='utf-8'?>\n<polyclinic>")
+                f.write(PolyclinicFileManager._xml_field("name", service.name))
+                f.write(PolyclinicFileManager._xml_field("address", service.address))
+
+                for section, tag, _ in SECTIONS:
+                    PolyclinicFileManager._write_xml_section(
+                        f, section, tag, iter_rows(service, section)
+                    )
+                f.write("</polyclinic>")
+            PolyclinicFileManager._save_records(service, filename)
             print(f"Данные успешно сохранены в {filename}")
 
         except Exception as e:
             print(f"Ошибка при сохранении в XML: {e}")
 
     @staticmethod
-    def load_from_xml(filename: str) -> PolyclinicService:
-        """Загружает данные поликлиники из XML файла."""
-        try:
-            tree = ET.parse(filename)
-            root = tree.getroot()
-
-            # Основная информация
-            name = root.find("name").text
-            address = root.find("address").text
-            service = PolyclinicService(name, address)
-
-            # Загрузка пациентов
-            patients_elem = root.find("patients")
-            if patients_elem is not None:
-                for patient_elem in patients_elem.findall("patient"):
-                    try:
-                        first_name = patient_elem.find("first_name").text
-                        last_name = patient_elem.find("last_name").text
-                        birth_date = patient_elem.find("birth_date").text
-                        phone = patient_elem.find("phone").text
-                        insurance_number = patient_elem.find("insurance_number").text
-
-                        # Создаем пациента через сервис для валидации
-                        patient = service.create_patient(
-                            first_name, last_name, birth_date, phone, insurance_number
-                        )
-                    except Exception as e:
-                        print(f"Ошибка при загрузке пациента: {e}")
-                        continue
-
-            # Загрузка врачей
-            doctors_elem = root.find("doctors")
-            if doctors_elem is not None:
-                for doctor_elem in doctors_elem.findall("doctor"):
-                    try:
-                        first_name_elem = doctor_elem.find("first_name")
-                        last_name_elem = doctor_elem.find("last_name")
-                        birth_date_elem = doctor_elem.find("birth_date")
-                        phone_elem = doctor_elem.find("phone")
-                        specialization_elem = doctor_elem.find("specialization")
-                        license_number_elem = doctor_elem.find("license_number")
-
-                        # Проверяем, что все необходимые поля существуют и не None
-                        if (
-                            first_name_elem is not None
-                            and last_name_elem is not None
-                            and birth_date_elem is not None
-                            and phone_elem is not None
-                            and specialization_elem is not None
-                            and license_number_elem is not None
-                        ):
-
-                            first_name = first_name_elem.text
-                            last_name = last_name_elem.text
-                            birth_date = birth_date_elem.text
-                            phone = phone_elem.text
-                            specialization = specialization_elem.text
-                            license_number = license_number_elem.text
-
-                            # Проверяем, что текстовые значения не None
-                            if all(
-                                [
-                                    first_name,
-                                    last_name,
-                                    birth_date,
-                                    phone,
-                                    specialization,
-                                    license_number,
-                                ]
-                            ):
-                                # Создаем врача через сервис для валидации
-                                doctor = service.create_doctor(
-                                    first_name,
-                                    last_name,
-                                    birth_date,
-                                    phone,
-                                    specialization,
-                                    license_number,
-                                )
-                            else:
-                                print("Не все поля врача содержат текст")
-                                continue
-                        else:
-                            print("Не все поля врача найдены в XML")
-                            continue
-                    except Exception as e:
-                        print(f"Ошибка при загрузке врача: {e}")
-                        continue
-
-            # Загрузка отделений
-            departments_elem = root.find("departments")
-            if departments_elem is not None:
-                for department_elem in departments_elem.findall("department"):
-                    try:
-                        name = department_elem.find("name").text
-                        floor = int(department_elem.find("floor").text)
-                        head_doctor_id = int(
-                            department_elem.find("head_doctor_id").text
-                        )
+    def _write_xml_section(
+        f: TextIO, section: str, tag: str, rows: Iterator[Row]
+    ) -> None:
+        """Пишет раздел XML поэлементно, сбрасывая текст в файл блоками."""
+        # Текст экранируется так же, как в ElementTree: &, < и >
+        id_key = f"{tag}_id"
+        chunk: List[str] = []
+        opened = False
+        for row in rows:
+            if not opened:
+                chunk.append(f"<{section}>")
+                opened = True
+            chunk.append(f"<{tag}><id>{row[id_key]}</id>")
+            for key, value in row.items():
+                if key != id_key:
+                    chunk.append(PolyclinicFileManager._xml_field(key, value))
+            chunk.append(f"</{tag}>")
+            if len(chunk) >= WRITE_CHUNK_ROWS * 10:
+                f.write("".join(chunk))
+                chunk.clear()
+        chunk.append(f"</{section}>" if opened else f"<{section} />")
+        f.write("".join(chunk))
 
-                        # Создаем отделение
-                        department = service.create_department(
-                            name, floor, head_doctor_id
-                        )
-                        if not department:
-                            print(f"Не удалось создать отделение {name}")
-                    except Exception as e:
-                        print(f"Ошибка при загрузке отделения: {e}")
-                        continue
-
-            # Загрузка кабинетов
-            rooms_elem = root.find("rooms")
-            if rooms_elem is not None:
-                for room_elem in rooms_elem.findall("room"):
-                    try:
-                        room_number = room_elem.find("room_number").text
-                        floor = int(room_elem.find("floor").text)
-                        room_type = room_elem.find("room_type").text
-                        department_id = int(room_elem.find("department_id").text)
-
-                        # Создаем кабинет
-                        room = service.create_room(
-                            room_number, floor, room_type, department_id
-                        )
-                        if not room:
-                            print(f"Не удалось создать кабинет {room_number}")
-                    except Exception as e:
-                        print(f"Ошибка при загрузке кабинета: {e}")
-                        continue
-
-            # Загрузка услуг
-            services_elem = root.find("services")
-            if services_elem is not None:
-                for service_elem in services_elem.findall("service"):
-                    try:
-                        name = service_elem.find("name").text
-                        description = service_elem.find("description").text
-                        cost = float(service_elem.find("cost").text)
-                        duration = int(service_elem.find("duration").text)
-
-                        # Создаем услугу
-                        medical_service = service.create_service(
-                            name, description, cost, duration
-                        )
-                    except Exception as e:
-                        print(f"Ошибка при загрузке услуги: {e}")
-                        continue
-
-            # Загрузка записей на прием
-            appointments_elem = root.find("appointments")
-            if appointments_elem is not None:
-                for appointment_elem in appointments_elem.findall("appointment"):
-                    try:
-                        patient_id = int(appointment_elem.find("patient_id").text)
-                        doctor_id = int(appointment_elem.find("doctor_id").text)
-                        room_id = int(appointment_elem.find("room_id").text)
-                        appointment_date = appointment_elem.find(
-                            "appointment_date"
-                        ).text
-                        appointment_time = appointment_elem.find(
-                            "appointment_time"
-                        ).text
-                        service_id = int(appointment_elem.find("service_id").text)
-                        reason = appointment_elem.find("reason").text
-                        status = appointment_elem.find("status").text
-
-                        # Получаем объекты по ID
-                        patient = service.get_patient(patient_id)
-                        doctor = service.get_doctor(doctor_id)
-                        room = service.get_room(room_id)
-                        medical_service = service.get_service(service_id)
-
-                        if all([patient, doctor, room, medical_service]):
-                            # Создаем запись на прием
-                            appointment = service.create_appointment(
-                                patient_id,
-                                doctor_id,
-                                room_id,
-                                appointment_date,
-                                appointment_time,
-                                service_id,
-                                reason,
-                            )
+    @staticmethod
+    def _xml_field(tag: str, value: Any) -> str:
+        """Сериализует поле в XML так же, как ElementTree."""
+        text = "" if value is None else escape(str(value))
+        return f"<{tag}>{text}</{tag}>" if text else f"<{tag} />"
 
-                            # Устанавливаем статус записи
-                            if appointment and status:
-                                appointment.status = status
-                        else:
-                            print(
-                                f"Не удалось создать запись на прием: не найдены связанные объекты"
+    @staticmethod
+    def load_from_xml(
+        filename: str, streaming: bool = True, validate: bool = False
+    ) -> PolyclinicService:
+        """Загружает данные поликлиники из XML файла.
+
+        В потоковом режиме документ разбирается через iterparse: каждый
+        объект восстанавливается по событию закрытия тега и сразу удаляется
+        из дерева, поэтому память не растет с размером файла. Параметр
+        validate - как в load_from_json.
+        """
+        try:
+            if streaming:
+                service = PolyclinicFileManager._stream_xml(filename, validate)
+            else:
+                tree = ET.parse(filename)
+                root = tree.getroot()
+
+                # Основная информация
+                name = root.find("name").text
+                address = root.find("address").text
+                service = PolyclinicService(name, address)
+
+                for section, tag, label in SECTIONS:
+                    section_elem = root.find(section)
+                    if section_elem is not None:
+                        for elem in section_elem.findall(tag):
+                            PolyclinicFileManager._load_row(
+                                service,
+                                section,
+                                label,
+                                PolyclinicFileManager._xml_row(elem, f"{tag}_id"),
+                                validate,
                             )
-                    except Exception as e:
-                        print(f"Ошибка при загрузке записи на прием: {e}")
-                        continue
-
-            print(f"Данные успешно загружены из {filename}")
-            print(
-                f"Загружено: {len(service.patients)} пациентов, "
-                f"{len(service.doctors)} врачей, "
-                f"{len(service.departments)} отделений, "
-                f"{len(service.rooms)} кабинетов, "
-                f"{len(service.services)} услуг, "
-                f"{len(service.appointments)} записей на прием"
-            )
 
+            PolyclinicFileManager._attach_records(service, filename)
+            PolyclinicFileManager._print_load_summary(service, filename)
             return service
 
         except ET.ParseError as e:
@@ -515,3 +315,184 @@ class PolyclinicFileManager:
         except Exception as e:
             print(f"Ошибка при загрузке из XML: {e}")
             return PolyclinicService("Восстановленная поликлиника", "Неизвестный адрес")
+
+    @staticmethod
+    def _stream_xml(filename: str, validate: bool = False) -> PolyclinicService:
+        """Восстанавливает сервис, разбирая XML файл через iterparse."""
+        sections = {section: (tag, label) for section, tag, label in SECTIONS}
+        service = PolyclinicService("", "")
+        root = section_elem = None
+        tag = label = section = None
+        depth = 0
+
+        for event, elem in ET.iterparse(filename, events=("start", "end")):
+            if event == "start":
+                depth += 1
+                if depth == 1:
+                    root = elem
+                elif depth == 2 and elem.tag in sections:
+                    section_elem, section = elem, elem.tag
+                    tag, label = sections[section]
+                continue
+
+            depth -= 1
+            if depth == 2 and section_elem is not None and elem.tag == tag:
+                PolyclinicFileManager._load_row(
+                    service,
+                    section,
+                    label,
+                    PolyclinicFileManager._xml_row(elem, f"{tag}_id"),
+                    validate,
+                )
+                # Обработанный объект больше не нужен - убираем его из дерева
+                section_elem.remove(elem)
+            elif depth == 1:
+                if elem.tag == "name":
+                    service.name = elem.text or ""
+                elif elem.tag == "address":
+                    service.address = elem.text or ""
+                elif elem is section_elem:
+                    section_elem = None
+                root.remove(elem)
+
+        return service
+
+    @staticmethod
+    def _xml_row(elem: ET.Element, id_key: str) -> Dict[str, Optional[str]]:
+        """Преобразует XML-элемент объекта в строку вида поле -> значение."""
+        row = {child.tag: child.text for child in elem}
+        row[id_key] = row.pop("id", None)
+        return row
+
+    @staticmethod
+    def save_to_snapshot(service: PolyclinicService, filename: str) -> None:
+        """Сохраняет данные поликлиники в бинарный снимок.
+
+        Если сервис загружен из этого снимка или уже сохранялся в него,
+        в журнал рядом со снимком дописываются только изменения с прошлого
+        сохранения, а файл медицинских карт и его индекс переписываются,
+        только если карты менялись (индекс, построенный после загрузки,
+        дописывается рядом). Разросшийся журнал сворачивается в новый
+        снимок.
+        """
+        try:
+            path = os.path.abspath(filename)
+            journaled = service.last_checkpoint == path and os.path.exists(filename)
+            if journaled:
+                changes = append_changes(service, filename)
+                if needs_compaction(filename):
+                    save_snapshot(service, filename)
+                    discard_journal(filename)
+                    print(f"Журнал свернут, данные сохранены в {filename}")
+                else:
+                    print(
+                        f"Изменения ({changes}) дописаны в журнал "
+                        f"{journal_path(filename)}"
+                    )
+            else:
+                save_snapshot(service, filename)
+                discard_journal(filename)
+                print(f"Данные успешно сохранены в {filename}")
+            if not journaled or service.charts_changed:
+                PolyclinicFileManager._save_records(service, filename)
+            elif text_index_unsaved(service, filename):
+                save_text_index(service, filename)
+            service.checkpoint(path)
+
+        except Exception as e:
+            print(f"Ошибка при сохранении снимка: {e}")
+
+    @staticmethod
+    def load_from_snapshot(filename: str) -> PolyclinicService:
+        """Открывает бинарный снимок и применяет его журнал изменений.
+
+        Файл отображается в память, пациенты, записи на прием и записи
+        медицинских карт декодируются только при обращении, поэтому время
+        запуска почти не зависит от объема данных.
+        """
+        try:
+            store = PolyclinicFileManager._open_records(filename)
+            bind_record = store.bind if store else None
+            service = load_snapshot(filename, bind_record)
+            if store is not None:
+                store.attach(service)
+            PolyclinicFileManager._attach_text_index(service, filename)
+            replay_journal(service, filename, bind_record)
+            service.checkpoint(os.path.abspath(filename))
+            PolyclinicFileManager._print_load_summary(service, filename)
+            return service
+
+        except Exception as e:
+            print(f"Ошибка при загрузке снимка: {e}")
+            return PolyclinicService("Восстановленная поликлиника", "Неизвестный адрес")
+
+    @staticmethod
+    def save_to_sqlite(service: PolyclinicService, filename: str) -> None:
+        """Сохраняет данные поликлиники в базу SQLite.
+
+        Для сервиса, работающего поверх этой же базы, достаточно
+        зафиксировать изменения. Иначе объекты записываются в новую базу
+        напрямую через хранилище, без повторных проверок сервиса, одной
+        транзакцией, которая затем атомарно подменяет старый файл.
+        """
+        try:
+            repository = service.repository
+            if (
+                isinstance(repository, SqliteRepository)
+                and repository.path == os.path.abspath(filename)
+            ):
+                repository.save_meta(service.name, service.address)
+                repository.save_id_counters(service.get_id_counters())
+                repository.commit()
+            else:
+                temp_name = f"{filename}.tmp"
+                if os.path.exists(temp_name):
+                    os.remove(temp_name)
+                target = SqliteRepository(temp_name)
+                try:
+                    with target.transaction():
+                        target.save_meta(service.name, service.address)
+                        target.save_id_counters(service.get_id_counters())
+                        for section, _, _ in SECTIONS:
+                            for entity in service.iter_entities(section):
+                                target.add(section, entity)
+                finally:
+                    target.close()
+                os.replace(temp_name, filename)
+            PolyclinicFileManager._save_records(service, filename)
+            print(f"Данные успешно сохранены в {filename}")
+
+        except Exception as e:
+            print(f"Ошибка при сохранении в SQLite: {e}")
+
+    @staticmethod
+    def load_from_sqlite(filename: str) -> PolyclinicService:
+        """Открывает сервис, работающий поверх базы SQLite.
+
+        Объекты читаются из базы по мере обращения, а изменения сразу
+        записываются в нее; карты удаленных пациентов сразу стираются и из
+        файла карт.
+        """
+        try:
+            if not os.path.exists(filename):
+                raise FileNotFoundError(f"Файл {filename} не найден")
+            repository = SqliteRepository(filename)
+            meta = repository.load_meta()
+            if meta is None:
+                repository.close()
+                raise ValueError("База не содержит данных поликлиники")
+            store = PolyclinicFileManager._open_records(filename)
+            if store is not None:
+                repository.bind_record = store.bind
+            # Карты удаленных пациентов стираются при фиксации удаления
+            repository.drop_records = partial(drop_charts, filename)
+            service = PolyclinicService(*meta, repository=repository)
+            if store is not None:
+                store.attach(service)
+            PolyclinicFileManager._attach_text_index(service, filename)
+            PolyclinicFileManager._print_load_summary(service, filename)
+            return service
+
+        except Exception as e:
+            print(f"Ошибка при загрузке из SQLite: {e}")
+            return PolyclinicService("Восстановленная поликлиника", "Неизвестный адрес")
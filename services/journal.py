@@ -0,0 +1,159 @@
+"""Журнал изменений бинарного снимка.
+
+Сохранение после правки дописывает в файл ``<снимок>.journal`` одну
+строку JSON с изменившимися объектами, поэтому его стоимость зависит от
+числа изменений, а не от объема данных. Первая строка журнала хранит
+отпечаток снимка, к которому он относится: журнал от другого снимка
+(например, оставшийся после сбоя при свертке) не применяется.
+"""
+
+import json
+import os
+from typing import Any, Callable, Dict, List, Optional, Tuple
+from models import MedicalRecord
+from .polyclinic_service import CHANGE_CREATED, PolyclinicService
+from .rows import SECTIONS, delete_row, entity_to_row, hydrate_row
+
+JOURNAL_SUFFIX = ".journal"
+# Журнал сворачивается в снимок, когда превышает эту долю его размера...
+COMPACT_RATIO = 0.5
+# ...но не раньше, чем дорастет до этого размера
+COMPACT_MIN_BYTES = 1024 * 1024
+
+_SECTION_ORDER = {section: i for i, (section, _, _) in enumerate(SECTIONS)}
+
+
+def journal_path(snapshot_filename: str) -> str:
+    """Возвращает путь к журналу снимка."""
+    return snapshot_filename + JOURNAL_SUFFIX
+
+
+def _snapshot_stamp(snapshot_filename: str) -> List[int]:
+    """Отпечаток файла снимка: размер и время изменения."""
+    stat = os.stat(snapshot_filename)
+    return [stat.st_size, stat.st_mtime_ns]
+
+
+def _read_stamp(path: str) -> Optional[List[int]]:
+    """Читает отпечаток снимка из первой строки журнала."""
+    try:
+        with open(path, "rb") as f:
+            return json.loads(f.readline()).get("snapshot")
+    except (OSError, ValueError, AttributeError):
+        return None
+
+
+def _batch(service: PolyclinicService) -> Dict[str, Any]:
+    """Собирает изменения сервиса в одну запись журнала.
+
+    Удаления идут от зависимых разделов к владельцам, сохранения - в
+    порядке зависимостей. Измененная запись на прием удаляется и
+    сохраняется заново, чтобы при применении не конфликтовать по времени
+    с записями, освобожденными в той же порции.
+    """
+    changes = service.get_changes()
+    removed: List[Tuple[str, int]] = sorted(
+        (key for key, change in changes.items() if change != CHANGE_CREATED),
+        key=lambda key: (-_SECTION_ORDER[key[0]], key[1]),
+    )
+    saved = []
+    for section, entity_id in sorted(
+        changes, key=lambda key: (_SECTION_ORDER[key[0]], key[1])
+    ):
+        entity = service.get_entity(section, entity_id)
+        if entity is not None:
+            saved.append([section, entity_to_row(section, entity)])
+    return {
+        "removed": [list(key) for key in removed],
+        "saved": saved,
+        "counters": service.get_id_counters(),
+    }
+
+
+def append_changes(service: PolyclinicService, snapshot_filename: str) -> int:
+    """Дописывает изменения с последней контрольной точки в журнал.
+
+    Возвращает число измененных объектов. Порция пишется одной строкой и
+    сбрасывается на диск, поэтому оборванная при сбое порция не
+    применяется частично.
+    """
+    changes = len(service.get_changes())
+    if not changes:
+        return 0
+
+    path = journal_path(snapshot_filename)
+    stamp = _snapshot_stamp(snapshot_filename)
+    mode = "a" if _read_stamp(path) == stamp else "w"
+    with open(path, mode, encoding="utf-8") as f:
+        if mode == "w":
+            f.write(json.dumps({"snapshot": stamp}) + "\n")
+        f.write(json.dumps(_batch(service), ensure_ascii=False) + "\n")
+        f.flush()
+        os.fsync(f.fileno())
+    return changes
+
+
+def replay_journal(
+    service: PolyclinicService,
+    snapshot_filename: str,
+    bind_record: Optional[Callable[[MedicalRecord], None]] = None,
+) -> int:
+    """Применяет журнал к загруженному снимку; возвращает число порций.
+
+    Оборванная последняя строка отрезается, чтобы следующие порции
+    дописывались после последней целой. bind_record, как и при загрузке
+    снимка, вызывается для медицинской карты каждого пациента из журнала.
+    """
+    path = journal_path(snapshot_filename)
+    if _read_stamp(path) != _snapshot_stamp(snapshot_filename):
+        return 0
+
+    applied = 0
+    with open(path, "r+b") as f:
+        f.readline()
+        offset = f.tell()
+        for line in iter(f.readline, b""):
+            try:
+                if not line.endswith(b"\n"):
+                    raise ValueError("оборванная строка")
+                batch = json.loads(line)
+            except ValueError:
+                f.truncate(offset)
+                break
+            _apply_batch(service, batch, bind_record)
+            offset += len(line)
+            applied += 1
+    return applied
+
+
+def _apply_batch(
+    service: PolyclinicService,
+    batch: Dict[str, Any],
+    bind_record: Optional[Callable[[MedicalRecord], None]],
+) -> None:
+    """Применяет одну порцию изменений."""
+    for section, entity_id in batch["removed"]:
+        delete_row(service, section, entity_id)
+    for section, row in batch["saved"]:
+        entity = hydrate_row(service, section, row)
+        if section == "patients" and bind_record is not None:
+            bind_record(entity.medical_record)
+    service.restore_id_counters(batch["counters"])
+
+
+def needs_compaction(snapshot_filename: str) -> bool:
+    """Проверяет, пора ли свернуть журнал в новый снимок."""
+    try:
+        size = os.path.getsize(journal_path(snapshot_filename))
+    except OSError:
+        return False
+    limit = os.path.getsize(snapshot_filename) * COMPACT_RATIO
+    return size > max(limit, COMPACT_MIN_BYTES)
+
+
+def discard_journal(snapshot_filename: str) -> None:
+    """Удаляет журнал снимка, если он есть."""
+    try:
+        os.remove(journal_path(snapshot_filename))
+    except FileNotFoundError:
+        pass
@@ -0,0 +1,105 @@
+import json
+from typing import Any, Iterator, TextIO, Tuple
+
+_WHITESPACE = " \t\n\r"
+
+
+class _StreamReader:
+    """Буферизованный читатель JSON-текста с декодированием значений по одному."""
+
+    def __init__(self, fp: TextIO, chunk_size: int) -> None:
+        self._fp = fp
+        self._chunk_size = chunk_size
+        self._decoder = json.JSONDecoder()
+        self._buf = ""
+        self._pos = 0
+        self._eof = False
+
+    def _fill(self, size: int) -> bool:
+        """Дочитывает из файла до size символов, отбрасывая обработанную часть."""
+        if self._eof:
+            return False
+        chunk = self._fp.read(size)
+        if not chunk:
+            self._eof = True
+            return False
+        self._buf = self._buf[self._pos :] + chunk
+        self._pos = 0
+        return True
+
+    def _error(self, message: str) -> json.JSONDecodeError:
+        return json.JSONDecodeError(message, self._buf, self._pos)
+
+    def peek(self) -> str:
+        """Возвращает следующий значимый символ, пропуская пробелы."""
+        while True:
+            while self._pos < len(self._buf) and self._buf[self._pos] in _WHITESPACE:
+                self._pos += 1
+            if self._pos < len(self._buf):
+                return self._buf[self._pos]
+            if not self._fill(self._chunk_size):
+                raise self._error("Неожиданный конец JSON")
+
+    def take(self, expected: str) -> str:
+        """Считывает следующий значимый символ из допустимых expected."""
+        char = self.peek()
+        if char not in expected:
+            raise self._error(f"Ожидался один из символов {expected!r}")
+        self._pos += 1
+        return char
+
+    def value(self) -> Any:
+        """Декодирует следующее JSON-значение целиком."""
+        self.peek()
+        size = self._chunk_size
+        while True:
+            try:
+                value, end = self._decoder.raw_decode(self._buf, self._pos)
+            except json.JSONDecodeError:
+                # Значение обрезано границей буфера - дочитываем
+                if not self._fill(size):
+                    raise
+                size *= 2
+                continue
+            # Число на границе буфера могло быть прочитано не полностью
+            if end == len(self._buf) and self._fill(size):
+                size *= 2
+                continue
+            self._pos = end
+            return value
+
+
+def iter_json_object(
+    fp: TextIO, chunk_size: int = 64 * 1024
+) -> Iterator[Tuple[str, Any]]:
+    """Потоково перебирает пары (ключ, значение) JSON-объекта верхнего уровня.
+
+    Значения-массивы не собираются целиком: каждый их элемент выдается
+    отдельной парой (ключ, элемент), поэтому в памяти одновременно
+    находится только одна запись.
+    """
+    reader = _StreamReader(fp, chunk_size)
+    reader.take("{")
+    if reader.peek() == "}":
+        return
+
+    while True:
+        key = reader.value()
+        if not isinstance(key, str):
+            raise reader._error("Ключ объекта должен быть строкой")
+        reader.take(":")
+
+        if reader.peek() == "[":
+            reader.take("[")
+            if reader.peek() == "]":
+                reader.take("]")
+            else:
+                while True:
+                    yield key, reader.value()
+                    if reader.take(",]") == "]":
+                        break
+        else:
+            yield key, reader.value()
+
+        if reader.take(",}") == "}":
+            return
@@ -0,0 +1,127 @@
+import struct
+from typing import Any, Callable, Dict, Iterator, MutableMapping, Optional, Set, Tuple
+
+
+class RecordTable:
+    """Таблица записей фиксированной длины, упорядоченных по ID (первое поле)."""
+
+    def __init__(self, buffer, offset: int, count: int, record_format: str) -> None:
+        self._buffer = buffer
+        self._offset = offset
+        self._struct = struct.Struct(record_format)
+        self.count = count
+
+    def id_at(self, row: int) -> int:
+        """Возвращает ID записи в строке row."""
+        return struct.unpack_from(
+            "<I", self._buffer, self._offset + row * self._struct.size
+        )[0]
+
+    def unpack(self, row: int) -> Tuple:
+        """Декодирует поля записи в строке row."""
+        return self._struct.unpack_from(
+            self._buffer, self._offset + row * self._struct.size
+        )
+
+    def find(self, entity_id: int) -> Optional[int]:
+        """Ищет строку с заданным ID двоичным поиском."""
+        low, high = 0, self.count
+        while low < high:
+            middle = (low + high) // 2
+            if self.id_at(middle) < entity_id:
+                low = middle + 1
+            else:
+                high = middle
+        if low < self.count and self.id_at(low) == entity_id:
+            return low
+        return None
+
+    def max_id(self) -> int:
+        """Возвращает наибольший ID таблицы (0 для пустой таблицы)."""
+        return self.id_at(self.count - 1) if self.count else 0
+
+    def __iter__(self) -> Iterator[Tuple]:
+        size = self._struct.size
+        view = memoryview(self._buffer)[self._offset : self._offset + self.count * size]
+        return self._struct.iter_unpack(view)
+
+
+class LazyEntityMap(MutableMapping):
+    """Карта ID -> объект, декодирующая записи таблицы только при обращении.
+
+    Объекты, добавленные после загрузки, и удаленные ID хранятся поверх
+    неизменяемой таблицы; замененная запись таблицы считается удаленной, а
+    новый объект - добавленным.
+    """
+
+    def __init__(self, table: RecordTable, decode: Callable[[Tuple], Any]) -> None:
+        self._table = table
+        self._decode = decode
+        self._cache: Dict[int, Any] = {}
+        self._extra: Dict[int, Any] = {}
+        self._deleted: Set[int] = set()
+
+    def _row(self, entity_id: int) -> Optional[int]:
+        if entity_id in self._deleted:
+            return None
+        return self._table.find(entity_id)
+
+    def __getitem__(self, entity_id: int) -> Any:
+        entity = self._cache.get(entity_id)
+        if entity is not None:
+            return entity
+        if entity_id in self._extra:
+            return self._extra[entity_id]
+        row = self._row(entity_id)
+        if row is None:
+            raise KeyError(entity_id)
+        entity = self._decode(self._table.unpack(row))
+        self._cache[entity_id] = entity
+        return entity
+
+    def __contains__(self, entity_id: object) -> bool:
+        return (
+            entity_id in self._cache
+            or entity_id in self._extra
+            or (isinstance(entity_id, int) and self._row(entity_id) is not None)
+        )
+
+    def __setitem__(self, entity_id: int, entity: Any) -> None:
+        if entity_id not in self._extra and self._table.find(entity_id) is not None:
+            self._deleted.add(entity_id)
+            self._cache.pop(entity_id, None)
+        self._extra[entity_id] = entity
+
+    def __delitem__(self, entity_id: int) -> None:
+        if entity_id in self._extra:
+            del self._extra[entity_id]
+        elif self._row(entity_id) is not None:
+            self._deleted.add(entity_id)
+            self._cache.pop(entity_id, None)
+        else:
+            raise KeyError(entity_id)
+
+    def __len__(self) -> int:
+        return self._table.count - len(self._deleted) + len(self._extra)
+
+    def __iter__(self) -> Iterator[int]:
+        for row in range(self._table.count):
+            entity_id = self._table.id_at(row)
+            if entity_id not in self._deleted:
+                yield entity_id
+        yield from list(self._extra)
+
+    def stored_rows(self) -> Iterator[Tuple]:
+        """Перебирает поля записей таблицы, оставшихся в карте, не декодируя их."""
+        deleted = self._deleted
+        for fields in self._table:
+            if fields[0] not in deleted:
+                yield fields
+
+    def added(self) -> Iterator[Any]:
+        """Перебирает объекты, добавленные после загрузки."""
+        return iter(list(self._extra.values()))
+
+    def max_id(self) -> int:
+        """Возвращает наибольший ID среди таблицы и добавленных объектов."""
+        return max([self._table.max_id(), *self._extra])
@@ -1,4 +1,17 @@
-from typing import List, Optional
+import warnings
+from functools import partial
+from heapq import heapify, heappop, heappush, heapreplace
+from typing import (
+    Callable,
+    Dict,
+    Iterable,
+    Iterator,
+    List,
+    Mapping,
+    MutableMapping,
+    Optional,
+    Tuple,
+)
 from models import (
     Patient,
     Doctor,
@@ -11,24 +24,119 @@ from models import (
     NotFoundError,
     ValidationError,
     Prescription,
+    RecordEntry,
+    STATUS_CANCELLED,
+    STATUS_COMPLETED,
+    format_date,
+    format_time,
+    parse_date,
+)
+
+from .columns import AppointmentColumns
+from .record_index import RecordEntryIndex
+from .repository import AppointmentIndexRow, InMemoryRepository, Repository
+from .search import SEARCH_FIELDS, PersonIndex
+from .text_index import (
+    TextIndex,
+    diagnosis_text,
+    entry_key,
+    entry_text,
+    split_entry_key,
 )
+from .unique_index import NumberRow, UniqueIndex
+from .scheduling import (
+    MINUTES_PER_DAY,
+    SLOT_STEP,
+    WORKDAY_START,
+    appointment_interval,
+    free_starts,
+    to_interval,
+)
+
+# Типы объектов, для которых сервис ведет счетчики следующих ID
+ID_COUNTERS = (
+    "patient",
+    "doctor",
+    "department",
+    "room",
+    "service",
+    "diagnosis",
+    "appointment",
+    "record",
+    "prescription",
+)
+
+# Свободное окно для записи: дата, время начала, врач и кабинет
+FreeSlot = Tuple[str, str, Doctor, Room]
+
+# Виды изменений объекта с последней контрольной точки
+CHANGE_CREATED = "created"
+CHANGE_MODIFIED = "modified"
+CHANGE_DELETED = "deleted"
+
+
+def _day_range(
+    date_range: Optional[Tuple[str, str]]
+) -> Tuple[Optional[int], Optional[int]]:
+    """Первый и последний день диапазона дат (ГГГГ-ММ-ДД) или (None, None)."""
+    if date_range is None:
+        return None, None
+    return parse_date(date_range[0]), parse_date(date_range[1])
 
 
 class PolyclinicService:
     """Сервис для управления данными поликлиники."""
 
-    def __init__(self, name: str, address: str) -> None:
+    def __init__(
+        self, name: str, address: str, repository: Optional[Repository] = None
+    ) -> None:
         self.name = name
         self.address = address
 
-        self.patients: List[Patient] = []
-        self.doctors: List[Doctor] = []
-        self.departments: List[Department] = []
-        self.rooms: List[Room] = []
-        self.services: List[MedicalService] = []
-        self.diagnoses: List[Diagnosis] = []
-        self.appointments: List[Appointment] = []
-        self.medical_records: List[MedicalRecord] = []
+        # Объекты и индексы для выборок хранит подключаемое хранилище.
+        # Медицинские карты доступны через Patient.medical_record.
+        self._repository = repository if repository is not None else InMemoryRepository()
+        self._repository.record_listener = self._entry_added
+
+        # Столбцовая копия записей на прием для агрегатных выборок; строится
+        # при первом обращении и затем поддерживается при каждом изменении
+        self._appointment_columns: Optional[AppointmentColumns] = None
+
+        # Индексы поиска пациентов и врачей (коллекция -> PersonIndex);
+        # строятся при первом поиске и затем поддерживаются
+        self._search_indexes: Dict[str, PersonIndex] = {}
+
+        # Уникальные номера пациентов и врачей (коллекция -> UniqueIndex):
+        # страховки, лицензии и телефоны; строятся при первом добавлении
+        # или поиске по номеру и затем поддерживаются
+        self._unique_indexes: Dict[str, UniqueIndex] = {}
+
+        # Индекс записей медицинских карт по дням приема и кодам диагнозов;
+        # строится при первой выборке и затем поддерживается
+        self._record_index: Optional[RecordEntryIndex] = None
+
+        # Полнотекстовые индексы записей карт и диагнозов; строятся при
+        # первом поиске (индекс записей можно подключить из файла) и затем
+        # поддерживаются
+        self._text_index: Optional[TextIndex] = None
+        self._diagnosis_text_index: Optional[TextIndex] = None
+
+        # Границы поиска свободных окон: (владелец, ID) -> (длительность,
+        # шаг) -> день -> минута, раньше которой окон у врача ("doctor_id")
+        # или кабинета ("room_id") нет. Занятие времени их не нарушает; при
+        # освобождении времени границы врача и кабинета сбрасываются.
+        self._slot_hints: Dict[
+            Tuple[str, int], Dict[Tuple[int, int], Dict[int, int]]
+        ] = {}
+
+        # Изменения сохраняемых объектов с последней контрольной точки:
+        # (коллекция, ID) -> вид изменения. Восстановление при загрузке
+        # изменением не считается.
+        self._changes: Dict[Tuple[str, int], str] = {}
+        self._checkpoint: Optional[str] = None
+        # Менялись ли медицинские карты с последней контрольной точки
+        # (в карту добавлена запись или удален пациент с непустой картой)
+        self._charts_changed = False
 
         self._next_patient_id = 1
         self._next_doctor_id = 1
@@ -39,6 +147,403 @@ class PolyclinicService:
         self._next_appointment_id = 1
         self._next_record_id = 1
         self._next_prescription_id = 1
+        self.restore_id_counters(self._repository.id_counters())
+
+    @property
+    def repository(self) -> Repository:
+        """Хранилище объектов сервиса."""
+        return self._repository
+
+    def transaction(self):
+        """Группирует изменения в одну транзакцию хранилища."""
+        return self._repository.transaction()
+
+    @property
+    def patients(self) -> List[Patient]:
+        """Список пациентов."""
+        return list(self._repository.patients.values())
+
+    @property
+    def doctors(self) -> List[Doctor]:
+        """Список врачей."""
+        return list(self._repository.doctors.values())
+
+    @property
+    def departments(self) -> List[Department]:
+        """Список отделений."""
+        return list(self._repository.departments.values())
+
+    @property
+    def rooms(self) -> List[Room]:
+        """Список кабинетов."""
+        return list(self._repository.rooms.values())
+
+    @property
+    def services(self) -> List[MedicalService]:
+        """Список услуг."""
+        return list(self._repository.services.values())
+
+    @property
+    def diagnoses(self) -> List[Diagnosis]:
+        """Список диагнозов."""
+        return list(self._repository.diagnoses.values())
+
+    @property
+    def appointments(self) -> List[Appointment]:
+        """Список записей на прием."""
+        return list(self._repository.appointments.values())
+
+    @property
+    def medical_records(self) -> List[MedicalRecord]:
+        """Список медицинских карт."""
+        return [
+            patient.medical_record
+            for patient in self._repository.patients.values()
+            if patient.medical_record
+        ]
+
+    def get_medical_record(self, patient_id: int) -> Optional[MedicalRecord]:
+        """Возвращает медицинскую карту пациента по ID пациента."""
+        patient = self._repository.patients.get(patient_id)
+        return patient.medical_record if patient else None
+
+    def count_record_entries(self, patient_id: int) -> int:
+        """Возвращает число записей в медицинской карте пациента."""
+        medical_record = self.get_medical_record(patient_id)
+        return medical_record.entry_count if medical_record else 0
+
+    def record_index(self) -> RecordEntryIndex:
+        """Возвращает индекс записей медицинских карт."""
+        if self._record_index is None:
+            self._record_index = RecordEntryIndex()
+            self._record_index.build(self.medical_records)
+        return self._record_index
+
+    def add_record_entry(
+        self,
+        patient_id: int,
+        entry_date: str,
+        doctor: Doctor,
+        diagnosis: Diagnosis,
+        symptoms: str,
+        treatment: str,
+        prescriptions: Iterable[Prescription] = (),
+    ) -> RecordEntry:
+        """Добавляет запись в медицинскую карту пациента."""
+        medical_record = self.get_medical_record(patient_id)
+        if medical_record is None:
+            raise NotFoundError(f"Медицинская карта пациента {patient_id} не найдена")
+        return medical_record.add_entry(
+            entry_date, doctor, diagnosis, symptoms, treatment, prescriptions
+        )
+
+    def _entry_added(self, medical_record: MedicalRecord, entry: RecordEntry) -> None:
+        """Поддерживает индексы карт после добавления записи в карту."""
+        patient_id = medical_record.patient.patient_id
+        if self._record_index is not None:
+            self._record_index.add(patient_id, entry)
+        if self._text_index is not None:
+            key = entry_key(patient_id, entry.entry_id)
+            self._text_index.add(key, entry_text(entry))
+        self._charts_changed = True
+
+    def find_record_entries(
+        self,
+        code: Optional[str] = None,
+        date_range: Optional[Tuple[str, str]] = None,
+    ) -> List[Tuple[Patient, RecordEntry]]:
+        """Находит записи медицинских карт по коду диагноза и датам приема.
+
+        code - код диагноза (None - любой), date_range - первый и последний
+        день приема (ГГГГ-ММ-ДД, включительно; None - все дни). Записи
+        упорядочены по дню приема.
+        """
+        first_day, last_day = _day_range(date_range)
+        refs = self.record_index().postings(code).refs(first_day, last_day)
+        patients = self._repository.patients
+        found = []
+        for _, patient_id, entry_id in refs:
+            patient = patients[patient_id]
+            found.append((patient, patient.medical_record.get_entry(entry_id)))
+        return found
+
+    def patients_with_code(
+        self, code: str, date_range: Optional[Tuple[str, str]] = None
+    ) -> List[Patient]:
+        """Возвращает пациентов с записями с кодом диагноза, по возрастанию ID."""
+        postings = self.record_index().postings(code)
+        first_day, last_day = _day_range(date_range)
+        patient_ids = {
+            postings.patient_id[row] for row in postings.rows(first_day, last_day)
+        }
+        patients = self._repository.patients
+        return [patients[patient_id] for patient_id in sorted(patient_ids)]
+
+    def patient_entries_between(
+        self, patient_id: int, date_range: Tuple[str, str]
+    ) -> List[RecordEntry]:
+        """Возвращает записи карты пациента за даты приема date_range."""
+        medical_record = self.get_medical_record(patient_id)
+        if medical_record is None:
+            return []
+        return medical_record.entries_between(*_day_range(date_range))
+
+    def text_index(self, build: bool = True) -> Optional[TextIndex]:
+        """Возвращает полнотекстовый индекс записей медицинских карт.
+
+        Если индекс еще не построен и не подключен, при build=False
+        возвращается None.
+        """
+        if self._text_index is None and build:
+            index = TextIndex()
+            index.build(
+                (
+                    entry_key(record.patient.patient_id, entry.entry_id),
+                    entry_text(entry),
+                )
+                for record in self.medical_records
+                for entry in record.entries
+            )
+            self._text_index = index
+        return self._text_index
+
+    def attach_text_index(self, index: TextIndex) -> None:
+        """Подключает полнотекстовый индекс записей, прочитанный из файла."""
+        self._text_index = index
+
+    def search_records(
+        self, query: str, offset: int = 0, limit: int = 20
+    ) -> Tuple[int, List[Tuple[Patient, RecordEntry]]]:
+        """Ищет записи медицинских карт по тексту.
+
+        Запрос сравнивается с жалобами, лечением, диагнозом и лекарствами
+        записи; в записи должны быть все слова запроса. Возвращает число
+        найденных записей и страницу [offset, offset + limit) по убыванию
+        релевантности. Ссылки индекса на пациентов или записи, которых нет
+        (индекс из файла разошелся с данными), удаляются из индекса, и
+        поиск повторяется, чтобы число найденных записей совпадало со
+        страницами.
+        """
+        text_index = self.text_index()
+        patients = self._repository.patients
+        while True:
+            total, keys = text_index.search(query, offset, limit)
+            found = []
+            missing = []
+            for key in keys:
+                patient_id, entry_id = split_entry_key(key)
+                patient = patients.get(patient_id)
+                entry = None
+                if patient is not None and patient.medical_record is not None:
+                    entry = patient.medical_record.get_entry(entry_id)
+                if entry is None:
+                    missing.append(key)
+                else:
+                    found.append((patient, entry))
+            if not missing:
+                return total, found
+            text_index.discard(missing)
+
+    def search_diagnoses(
+        self, query: str, offset: int = 0, limit: int = 20
+    ) -> Tuple[int, List[Diagnosis]]:
+        """Ищет диагнозы по коду, названию и описанию; см. search_records."""
+        if self._diagnosis_text_index is None:
+            self._diagnosis_text_index = TextIndex()
+            self._diagnosis_text_index.build(
+                (diagnosis.diagnosis_id, diagnosis_text(diagnosis))
+                for diagnosis in self._repository.diagnoses.values()
+            )
+        total, ids = self._diagnosis_text_index.search(query, offset, limit)
+        diagnoses = self._repository.diagnoses
+        return total, [diagnoses[diagnosis_id] for diagnosis_id in ids]
+
+    def iter_entities(self, collection: str) -> Iterator:
+        """Перебирает объекты коллекции (patients, doctors, ...) без копирования."""
+        return iter(getattr(self._repository, collection).values())
+
+    def get_entity(self, collection: str, entity_id: int):
+        """Возвращает объект коллекции (patients, doctors, ...) по ID."""
+        return getattr(self._repository, collection).get(entity_id)
+
+    def appointment_columns(self) -> AppointmentColumns:
+        """Возвращает столбцовую копию записей на прием."""
+        if self._appointment_columns is None:
+            self._appointment_columns = AppointmentColumns(
+                self._repository.appointments.values()
+            )
+        return self._appointment_columns
+
+    def page(self, collection: str, offset: int, limit: int) -> List:
+        """Возвращает объекты коллекции с номерами [offset, offset + limit)."""
+        return self._repository.page(collection, offset, limit)
+
+    def _search_index(self, collection: str) -> PersonIndex:
+        """Возвращает индекс поиска коллекции patients или doctors."""
+        index = self._search_indexes.get(collection)
+        if index is None:
+            index = PersonIndex(*SEARCH_FIELDS[collection])
+            index.build(getattr(self._repository, collection).values())
+            self._search_indexes[collection] = index
+        return index
+
+    def _index_person(self, collection: str, person, added: bool) -> None:
+        """Обновляет индекс поиска, если он уже построен."""
+        index = self._search_indexes.get(collection)
+        if index is not None:
+            if added:
+                index.add(person)
+            else:
+                index.remove(person)
+
+    def _unique_index(self, collection: str) -> UniqueIndex:
+        """Возвращает индекс уникальных номеров коллекции patients или doctors."""
+        index = self._unique_indexes.get(collection)
+        if index is None:
+            index = self._repository.unique_index(collection)
+            self._unique_indexes[collection] = index
+        return index
+
+    def _find_unique(self, collection: str, field: str, value: str):
+        """Возвращает человека с номером value в поле field или None."""
+        person_id = self._unique_index(collection).get(field, value)
+        if person_id is None:
+            return None
+        return getattr(self._repository, collection)[person_id]
+
+    def get_patient_by_insurance(self, insurance_number: str) -> Optional[Patient]:
+        """Возвращает пациента по номеру страховки."""
+        return self._find_unique("patients", "insurance_number", insurance_number)
+
+    def get_patient_by_phone(self, phone: str) -> Optional[Patient]:
+        """Возвращает пациента по телефону (+7..., 8... или 10 цифр)."""
+        return self._find_unique("patients", "phone", phone)
+
+    def get_doctor_by_license(self, license_number: str) -> Optional[Doctor]:
+        """Возвращает врача по номеру лицензии."""
+        return self._find_unique("doctors", "license_number", license_number)
+
+    def get_doctor_by_phone(self, phone: str) -> Optional[Doctor]:
+        """Возвращает врача по телефону (+7..., 8... или 10 цифр)."""
+        return self._find_unique("doctors", "phone", phone)
+
+    def search(
+        self, collection: str, query: str, offset: int = 0, limit: int = 20
+    ) -> Tuple[int, List]:
+        """Ищет пациентов или врачей и возвращает число совпадений и страницу.
+
+        Запрос - начало фамилии (и имени), номера страховки (лицензии) или
+        телефона; если совпадений нет, фамилия ищется с опечатками (см.
+        search_similar). Пустой запрос выбирает всех по возрастанию ID. На
+        страницу попадают совпадения с номерами [offset, offset + limit).
+        """
+        query = query.strip()
+        if not query:
+            return self.count(collection), self.page(collection, offset, limit)
+        total, ids = self._search_index(collection).search(query, offset, limit)
+        entities = getattr(self._repository, collection)
+        return total, [entities[entity_id] for entity_id in ids]
+
+    def autocomplete(self, collection: str, prefix: str, limit: int = 10) -> List:
+        """Подсказывает пациентов или врачей по началу фамилии или имени.
+
+        prefix - начало "фамилии имени" или "имени фамилии"; возвращается
+        не больше limit человек.
+        """
+        ids = self._search_index(collection).complete(prefix, limit)
+        entities = getattr(self._repository, collection)
+        return [entities[entity_id] for entity_id in ids]
+
+    def search_similar(
+        self, collection: str, query: str, offset: int = 0, limit: int = 20
+    ) -> Tuple[int, List]:
+        """Ищет пациентов или врачей по фамилии и имени с опечатками.
+
+        Запрос - фамилия и, через пробел, имя. Возвращает число найденных
+        и страницу [offset, offset + limit) по убыванию сходства.
+        """
+        total, ids = self._search_index(collection).similar(query, offset, limit)
+        entities = getattr(self._repository, collection)
+        return total, [entities[entity_id] for entity_id in ids]
+
+    def search_patients(
+        self, query: str, offset: int = 0, limit: int = 20
+    ) -> Tuple[int, List[Patient]]:
+        """Ищет пациентов по началу фамилии, номера страховки или телефона."""
+        return self.search("patients", query, offset, limit)
+
+    def search_doctors(
+        self, query: str, offset: int = 0, limit: int = 20
+    ) -> Tuple[int, List[Doctor]]:
+        """Ищет врачей по началу фамилии, номера лицензии или телефона."""
+        return self.search("doctors", query, offset, limit)
+
+    def count(self, collection: str) -> int:
+        """Возвращает число объектов коллекции (patients, doctors, ...)."""
+        return len(getattr(self._repository, collection))
+
+    def get_id_counters(self) -> Dict[str, int]:
+        """Возвращает счетчики следующих ID по типам объектов."""
+        return {kind: getattr(self, f"_next_{kind}_id") for kind in ID_COUNTERS}
+
+    def restore_id_counters(self, counters: Mapping[str, int]) -> None:
+        """Восстанавливает счетчики ID, не уменьшая текущие значения."""
+        for kind in ID_COUNTERS:
+            if kind in counters:
+                name = f"_next_{kind}_id"
+                setattr(self, name, max(getattr(self, name), counters[kind]))
+
+    @property
+    def last_checkpoint(self) -> Optional[str]:
+        """Метка последней контрольной точки (например, путь к снимку)."""
+        return self._checkpoint
+
+    def get_changes(self) -> Dict[Tuple[str, int], str]:
+        """Возвращает изменения с последней контрольной точки."""
+        return dict(self._changes)
+
+    @property
+    def charts_changed(self) -> bool:
+        """Менялись ли медицинские карты с последней контрольной точки."""
+        return self._charts_changed
+
+    def checkpoint(self, label: Optional[str] = None) -> None:
+        """Отмечает текущее состояние как сохраненное."""
+        self._changes.clear()
+        self._charts_changed = False
+        self._checkpoint = label
+
+    def _track(self, collection: str, entity_id: int, change: str) -> None:
+        """Запоминает изменение объекта коллекции."""
+        key = (collection, entity_id)
+        previous = self._changes.get(key)
+        if previous == CHANGE_CREATED:
+            # Объект еще не сохранен: изменение не меняет вида, а удаление
+            # означает, что сохранять нечего
+            if change == CHANGE_DELETED:
+                del self._changes[key]
+        else:
+            self._changes[key] = change
+
+    def attach_lazy_collections(
+        self,
+        patients: MutableMapping[int, Patient],
+        appointments: MutableMapping[int, Appointment],
+        appointment_rows: Callable[[], Iterable[AppointmentIndexRow]],
+        patient_numbers: Callable[[], Iterable[NumberRow]],
+    ) -> None:
+        """Подключает лениво декодируемых пациентов и записи на прием.
+
+        Поддерживается только хранилищем в памяти; см.
+        InMemoryRepository.attach_lazy_collections.
+        """
+        if not isinstance(self._repository, InMemoryRepository):
+            raise ValidationError("Ленивая загрузка требует хранилища в памяти")
+        self._repository.attach_lazy_collections(
+            patients, appointments, appointment_rows, patient_numbers
+        )
+        # Номера подключенных пациентов попадут в индекс при его построении
+        self._unique_indexes.pop("patients", None)
 
     def create_patient(
         self,
@@ -57,21 +562,57 @@ class PolyclinicService:
             phone,
             insurance_number,
         )
-        self.patients.append(patient)
-        self._next_patient_id += 1
+        self._add_patient(patient)
+        self._track("patients", patient.patient_id, CHANGE_CREATED)
+        return patient
 
-        record = MedicalRecord(self._next_record_id, patient)
-        self.medical_records.append(record)
+    def restore_patient(self, patient: Patient) -> None:
+        """Добавляет загруженного пациента, сохраняя его ID.
+
+        Повтор номера страховки или телефона в сохраненных данных не мешает
+        загрузке: выдается предупреждение, номер остается за первым
+        пациентом.
+        """
+        self._ensure_new_id(self._repository.patients, patient.patient_id)
+        self._add_patient(patient, strict=False)
+
+    def _add_patient(self, patient: Patient, strict: bool = True) -> None:
+        """Заводит пациенту медицинскую карту и сохраняет его.
+
+        С strict=True номер страховки и телефон не должны быть заняты
+        другим пациентом.
+        """
+        unique_index = self._unique_index("patients")
+        self._claim_numbers(unique_index, patient, strict)
+        MedicalRecord(self._next_record_id, patient, self._entry_added)
         self._next_record_id += 1
 
-        return patient
+        try:
+            self._repository.add("patients", patient)
+        except Exception:
+            unique_index.remove(patient)
+            raise
+        self._index_person("patients", patient, True)
+        self._next_patient_id = max(self._next_patient_id, patient.patient_id + 1)
 
     def get_patient(self, patient_id: int) -> Optional[Patient]:
         """Возвращает пациента по ID."""
-        for patient in self.patients:
-            if patient.patient_id == patient_id:
-                return patient
-        return None
+        return self._repository.patients.get(patient_id)
+
+    @staticmethod
+    def _claim_numbers(unique_index: UniqueIndex, person, strict: bool) -> None:
+        """Занимает номера человека; без strict повторы только предупреждают."""
+        if strict:
+            unique_index.claim(person)
+            return
+        for message in unique_index.register(person):
+            warnings.warn(f"Повтор номера при загрузке: {message}", stacklevel=4)
+
+    @staticmethod
+    def _ensure_new_id(index: Mapping[int, object], entity_id: int) -> None:
+        """Проверяет, что ID восстанавливаемого объекта еще не занят."""
+        if entity_id in index:
+            raise ValidationError(f"Объект с ID {entity_id} уже существует")
 
     def create_doctor(
         self,
@@ -92,16 +633,38 @@ class PolyclinicService:
             specialization,
             license_number,
         )
-        self.doctors.append(doctor)
-        self._next_doctor_id += 1
+        self._add_doctor(doctor)
+        self._track("doctors", doctor.doctor_id, CHANGE_CREATED)
         return doctor
 
+    def restore_doctor(self, doctor: Doctor) -> None:
+        """Добавляет загруженного врача, сохраняя его ID.
+
+        Повтор номера лицензии или телефона в сохраненных данных не мешает
+        загрузке: выдается предупреждение, номер остается за первым врачом.
+        """
+        self._ensure_new_id(self._repository.doctors, doctor.doctor_id)
+        self._add_doctor(doctor, strict=False)
+
+    def _add_doctor(self, doctor: Doctor, strict: bool = True) -> None:
+        """Регистрирует врача.
+
+        С strict=True номер лицензии и телефон не должны быть заняты
+        другим врачом.
+        """
+        unique_index = self._unique_index("doctors")
+        self._claim_numbers(unique_index, doctor, strict)
+        try:
+            self._repository.add("doctors", doctor)
+        except Exception:
+            unique_index.remove(doctor)
+            raise
+        self._index_person("doctors", doctor, True)
+        self._next_doctor_id = max(self._next_doctor_id, doctor.doctor_id + 1)
+
     def get_doctor(self, doctor_id: int) -> Optional[Doctor]:
         """Возвращает врача по ID."""
-        for doctor in self.doctors:
-            if doctor.doctor_id == doctor_id:
-                return doctor
-        return None
+        return self._repository.doctors.get(doctor_id)
 
     def create_department(
         self, name: str, floor: int, head_doctor_id: int
@@ -112,16 +675,24 @@ class PolyclinicService:
             return None
 
         department = Department(self._next_department_id, name, floor, head_doctor)
-        self.departments.append(department)
-        self._next_department_id += 1
+        self._add_department(department)
+        self._track("departments", department.department_id, CHANGE_CREATED)
         return department
 
+    def restore_department(self, department: Department) -> None:
+        """Добавляет загруженное отделение, сохраняя его ID."""
+        self._ensure_new_id(self._repository.departments, department.department_id)
+        self._add_department(department)
+
+    def _add_department(self, department: Department) -> None:
+        """Регистрирует отделение."""
+        department_id = department.department_id
+        self._repository.add("departments", department)
+        self._next_department_id = max(self._next_department_id, department_id + 1)
+
     def get_department(self, department_id: int) -> Optional[Department]:
         """Возвращает отделение по ID."""
-        for department in self.departments:
-            if department.department_id == department_id:
-                return department
-        return None
+        return self._repository.departments.get(department_id)
 
     def create_room(
         self, room_number: str, floor: int, room_type: str, department_id: int
@@ -132,16 +703,23 @@ class PolyclinicService:
             return None
 
         room = Room(self._next_room_id, room_number, floor, room_type, department)
-        self.rooms.append(room)
-        self._next_room_id += 1
+        self._add_room(room)
+        self._track("rooms", room.room_id, CHANGE_CREATED)
         return room
 
+    def restore_room(self, room: Room) -> None:
+        """Добавляет загруженный кабинет, сохраняя его ID."""
+        self._ensure_new_id(self._repository.rooms, room.room_id)
+        self._add_room(room)
+
+    def _add_room(self, room: Room) -> None:
+        """Регистрирует кабинет."""
+        self._repository.add("rooms", room)
+        self._next_room_id = max(self._next_room_id, room.room_id + 1)
+
     def get_room(self, room_id: int) -> Optional[Room]:
         """Возвращает кабинет по ID."""
-        for room in self.rooms:
-            if room.room_id == room_id:
-                return room
-        return None
+        return self._repository.rooms.get(room_id)
 
     def create_service(
         self, name: str, description: str, cost: float, duration: int
@@ -150,16 +728,23 @@ class PolyclinicService:
         service = MedicalService(
             self._next_service_id, name, description, cost, duration
         )
-        self.services.append(service)
-        self._next_service_id += 1
+        self._add_service(service)
+        self._track("services", service.service_id, CHANGE_CREATED)
         return service
 
+    def restore_service(self, service: MedicalService) -> None:
+        """Добавляет загруженную услугу, сохраняя ее ID."""
+        self._ensure_new_id(self._repository.services, service.service_id)
+        self._add_service(service)
+
+    def _add_service(self, service: MedicalService) -> None:
+        """Регистрирует услугу."""
+        self._repository.add("services", service)
+        self._next_service_id = max(self._next_service_id, service.service_id + 1)
+
     def get_service(self, service_id: int) -> Optional[MedicalService]:
         """Возвращает услугу по ID."""
-        for service in self.services:
-            if service.service_id == service_id:
-                return service
-        return None
+        return self._repository.services.get(service_id)
 
     def create_appointment(
         self,
@@ -180,8 +765,8 @@ class PolyclinicService:
         if not all([patient, doctor, room, service]):
             raise NotFoundError("Не найдены пациент, врач, кабинет или услуга")
 
-        if self._is_time_slot_taken(doctor, date, time):
-            raise ValidationError("Время уже занято")
+        start, end = to_interval(date, time, service.duration)
+        self._check_availability(doctor, room, start, end)
 
         appointment = Appointment(
             self._next_appointment_id,
@@ -193,136 +778,393 @@ class PolyclinicService:
             service,
             reason,
         )
-        self.appointments.append(appointment)
-        self._next_appointment_id += 1
+        self._add_appointment(appointment)
+        self._track("appointments", appointment.appointment_id, CHANGE_CREATED)
         return appointment
 
-    def _is_time_slot_taken(self, doctor: Doctor, date: str, time: str) -> bool:
-        """Проверяет, занято ли время у врача."""
-        for appointment in self.appointments:
-            if (
-                appointment.doctor == doctor
-                and appointment.appointment_date == date
-                and appointment.appointment_time == time
-                and appointment.status != "отменен"
-            ):
-                return True
-        return False
+    def restore_appointment(self, appointment: Appointment) -> None:
+        """Добавляет загруженную запись на прием, сохраняя ее ID и статус.
+
+        Сохраненная запись загружается, даже если пересекается по времени с
+        другими записями врача или кабинета: о пересечении выдается
+        предупреждение.
+        """
+        self._ensure_new_id(self._repository.appointments, appointment.appointment_id)
+        if appointment.status != STATUS_CANCELLED:
+            start, end = appointment_interval(appointment)
+            try:
+                self._check_availability(
+                    appointment.doctor, appointment.room, start, end
+                )
+            except ValidationError as error:
+                warnings.warn(
+                    f"Запись на прием {appointment.appointment_id} загружена "
+                    f"с пересечением: {error}",
+                    stacklevel=2,
+                )
+        self._add_appointment(appointment, restored=True)
+
+    def _add_appointment(
+        self, appointment: Appointment, restored: bool = False
+    ) -> None:
+        """Сохраняет запись; неотмененная запись занимает время врача и кабинета.
+
+        restored=True - запись из сохраненных данных (см. restore_appointment).
+        """
+        if restored:
+            self._repository.restore("appointments", appointment)
+        else:
+            self._repository.add("appointments", appointment)
+        if self._appointment_columns is not None:
+            self._appointment_columns.append(appointment)
+        self._next_appointment_id = max(
+            self._next_appointment_id, appointment.appointment_id + 1
+        )
+
+    def _remove_appointment(self, appointment: Appointment) -> None:
+        """Удаляет запись и освобождает ее время."""
+        self._repository.remove("appointments", appointment)
+        self._release_slot_hints(appointment)
+        if self._appointment_columns is not None:
+            self._appointment_columns.remove(appointment.appointment_id)
+        self._track("appointments", appointment.appointment_id, CHANGE_DELETED)
+
+    def _check_availability(
+        self, doctor: Doctor, room: Room, start: int, end: int
+    ) -> None:
+        """Проверяет, свободны ли врач и кабинет в интервале [start, end)."""
+        find_overlap = self._repository.find_overlap
+        if find_overlap("doctor_id", doctor.doctor_id, start, end) is not None:
+            raise ValidationError("Время уже занято")
+        if find_overlap("room_id", room.room_id, start, end) is not None:
+            raise ValidationError("Кабинет уже занят в это время")
+
+    def set_appointment_status(self, appointment_id: int, status: str) -> bool:
+        """Меняет статус записи, поддерживая календари занятости."""
+        appointment = self._repository.appointments.get(appointment_id)
+        if not appointment:
+            return False
+
+        if status == appointment.status:
+            return True
+        if appointment.status == STATUS_CANCELLED:
+            # Возобновляемая запись снова занимает время врача и кабинет
+            start, end = appointment_interval(appointment)
+            self._check_availability(appointment.doctor, appointment.room, start, end)
+        self._repository.update_appointment_status(appointment, status)
+        if status == STATUS_CANCELLED:
+            self._release_slot_hints(appointment)
+        if self._appointment_columns is not None:
+            self._appointment_columns.set_status(appointment_id, status)
+        self._track("appointments", appointment_id, CHANGE_MODIFIED)
+        return True
+
+    def cancel_appointment(self, appointment_id: int) -> bool:
+        """Отменяет запись на прием и освобождает время врача и кабинета."""
+        return self.set_appointment_status(appointment_id, STATUS_CANCELLED)
+
+    def complete_appointment(self, appointment_id: int) -> bool:
+        """Отмечает запись на прием как завершенную."""
+        return self.set_appointment_status(appointment_id, STATUS_COMPLETED)
+
+    def find_free_slots(
+        self,
+        specialization: str,
+        date_range: Tuple[str, str],
+        duration: int,
+        limit: int = 10,
+        step: int = SLOT_STEP,
+    ) -> List[FreeSlot]:
+        """Находит самые ранние свободные окна у врачей специализации.
+
+        date_range - первый и последний день поиска (ГГГГ-ММ-ДД,
+        включительно). Окна длины duration минут лежат в рабочем времени и
+        идут по сетке step минут. Каждое окно выполнимо само по себе: врач и
+        предложенный кабинет в нем свободны. Окна упорядочены по времени,
+        затем по ID врача.
+        """
+        doctors = [
+            doctor
+            for doctor in self._repository.doctors.values()
+            if doctor.specialization == specialization
+        ]
+        return self._find_slots(doctors, date_range, duration, limit, step)
+
+    def find_doctor_free_slots(
+        self,
+        doctor_id: int,
+        date_range: Tuple[str, str],
+        duration: int,
+        limit: int = 10,
+        step: int = SLOT_STEP,
+    ) -> List[FreeSlot]:
+        """Находит самые ранние свободные окна врача; см. find_free_slots."""
+        doctor = self.get_doctor(doctor_id)
+        if not doctor:
+            raise NotFoundError(f"Врач с ID {doctor_id} не найден")
+        return self._find_slots([doctor], date_range, duration, limit, step)
+
+    def _find_slots(
+        self,
+        doctors: List[Doctor],
+        date_range: Tuple[str, str],
+        duration: int,
+        limit: int,
+        step: int,
+    ) -> List[FreeSlot]:
+        """Подбирает ранние окна среди врачей doctors и свободных кабинетов."""
+        if duration <= 0 or limit <= 0:
+            raise ValidationError(
+                "Длительность и число окон должны быть положительными"
+            )
+        first_day, last_day = parse_date(date_range[0]), parse_date(date_range[1])
+        if first_day > last_day:
+            raise ValidationError("Начало периода позже его конца")
+
+        candidates = self._merge_free_starts(
+            doctors, first_day, last_day, duration, step
+        )
+
+        # Кандидаты приходят по неубыванию начала, поэтому кабинет, занятый
+        # записью до момента t, не подходит ни одному кандидату раньше t:
+        # такие кабинеты ждут в куче по моменту освобождения
+        unchecked = list(self._repository.rooms.values())[::-1]
+        blocked: List[Tuple[int, int, Room]] = []
+        find_overlap = self._repository.find_overlap
+        slots: List[FreeSlot] = []
+        for start, doctor in candidates:
+            while blocked and blocked[0][0] <= start:
+                unchecked.append(heappop(blocked)[2])
+            end = start + duration
+            day = start // MINUTES_PER_DAY
+            opening = day * MINUTES_PER_DAY + WORKDAY_START
+            while unchecked:
+                room = unchecked[-1]
+                hints = self._hints("room_id", room.room_id, duration, step)
+                bound = hints.get(day, opening)
+                if start < bound:
+                    busy_until = bound
+                else:
+                    overlap = find_overlap("room_id", room.room_id, start, end)
+                    if overlap is None:
+                        break
+                    _, busy_until = appointment_interval(
+                        self._repository.appointments[overlap]
+                    )
+                    if start == bound:
+                        # Все окна от границы до конца записи заняты
+                        hints[day] = opening + -(-(busy_until - opening) // step) * step
+                unchecked.pop()
+                heappush(blocked, (busy_until, room.room_id, room))
+            else:
+                continue
+
+            day, minute = divmod(start, MINUTES_PER_DAY)
+            slots.append((format_date(day), format_time(minute), doctor, unchecked[-1]))
+            if len(slots) >= limit:
+                break
+        return slots
+
+    def _merge_free_starts(
+        self,
+        doctors: List[Doctor],
+        first_day: int,
+        last_day: int,
+        duration: int,
+        step: int,
+    ) -> Iterator[Tuple[int, Doctor]]:
+        """Сливает свободные начала окон врачей в один поток по возрастанию.
+
+        Куча хранит (начало, ID врача, поток окон врача, врач). Поток врача
+        открывается, только когда его запись поднимается на вершину кучи, а
+        до того начало - лишь нижняя граница. Поэтому календари врачей,
+        у которых нет окон раньше уже найденных, не просматриваются.
+        Границы, найденные поиском, запоминаются в _slot_hints.
+        """
+        range_start = first_day * MINUTES_PER_DAY + WORKDAY_START
+        heap: List[Tuple[int, int, Optional[Iterator[int]], Doctor]] = []
+        for doctor in doctors:
+            hints = self._hints("doctor_id", doctor.doctor_id, duration, step)
+            lower_bound = hints.get(first_day, range_start)
+            heap.append((lower_bound, doctor.doctor_id, None, doctor))
+        heapify(heap)
+        while heap:
+            start, doctor_id, starts, doctor = heap[0]
+            if starts is None:
+                starts = free_starts(
+                    partial(self._repository.busy_intervals, "doctor_id", doctor_id),
+                    first_day,
+                    last_day,
+                    duration,
+                    step,
+                    self._hints("doctor_id", doctor_id, duration, step),
+                )
+            else:
+                yield start, doctor
+            following = next(starts, None)
+            if following is None:
+                heappop(heap)
+            else:
+                heapreplace(heap, (following, doctor_id, starts, doctor))
+
+    def _hints(
+        self, owner: str, owner_id: int, duration: int, step: int
+    ) -> Dict[int, int]:
+        """Возвращает границы поиска окон врача или кабинета: день -> минута."""
+        return self._slot_hints.setdefault((owner, owner_id), {}).setdefault(
+            (duration, step), {}
+        )
+
+    def _release_slot_hints(self, appointment: Appointment) -> None:
+        """Сбрасывает границы поиска окон врача и кабинета, освободивших время."""
+        self._slot_hints.pop(("doctor_id", appointment.doctor.doctor_id), None)
+        self._slot_hints.pop(("room_id", appointment.room.room_id), None)
 
     def get_all_patients(self) -> List[Patient]:
         """Возвращает всех пациентов."""
-        return self.patients.copy()
+        return self.patients
 
     def get_all_doctors(self) -> List[Doctor]:
         """Возвращает всех врачей."""
-        return self.doctors.copy()
+        return self.doctors
 
     def get_all_appointments(self) -> List[Appointment]:
         """Возвращает все записи."""
-        return self.appointments.copy()
+        return self.appointments
 
     def delete_patient(self, patient_id: int) -> bool:
         """Удаляет пациента по ID."""
-        for i, patient in enumerate(self.patients):
-            if patient.patient_id == patient_id:
-                # Удаляем связанную медицинскую карту
-                self.medical_records = [
-                    record
-                    for record in self.medical_records
-                    if record.patient.patient_id != patient_id
-                ]
-                # Удаляем связанные записи на прием
-                self.appointments = [
-                    app
-                    for app in self.appointments
-                    if app.patient.patient_id != patient_id
-                ]
-                # Удаляем пациента
-                self.patients.pop(i)
-                return True
-        return False
+        patient = self._repository.patients.get(patient_id)
+        if not patient:
+            return False
+
+        with self._repository.transaction():
+            # Удаляем связанные записи на прием (медицинская карта хранится
+            # в самом пациенте и удаляется вместе с ним)
+            self._remove_appointments("patient_id", patient_id)
+            # Удаляем пациента
+            self._repository.remove("patients", patient)
+        if "patients" in self._unique_indexes:
+            self._unique_indexes["patients"].remove(patient)
+        self._index_person("patients", patient, False)
+        if self._record_index is not None:
+            self._record_index.remove_patient(patient_id)
+        if patient.medical_record is not None and patient.medical_record.entry_count:
+            self._charts_changed = True
+            if self._text_index is not None:
+                self._text_index.discard(
+                    entry_key(patient_id, entry_id)
+                    for entry_id in range(1, patient.medical_record.entry_count + 1)
+                )
+        self._track("patients", patient_id, CHANGE_DELETED)
+        return True
 
     def delete_doctor(self, doctor_id: int) -> bool:
         """Удаляет врача по ID."""
-        for i, doctor in enumerate(self.doctors):
-            if doctor.doctor_id == doctor_id:
-                # Проверяем, используется ли врач как заведующий отделением
-                for department in self.departments:
-                    if department.head_doctor.doctor_id == doctor_id:
-                        return (
-                            False  # Нельзя удалить врача, который заведует отделением
-                        )
-
-                # Удаляем связанные записи на прием
-                self.appointments = [
-                    app
-                    for app in self.appointments
-                    if app.doctor.doctor_id != doctor_id
-                ]
-                # Удаляем врача
-                self.doctors.pop(i)
-                return True
-        return False
+        doctor = self._repository.doctors.get(doctor_id)
+        if not doctor:
+            return False
+
+        # Проверяем, используется ли врач как заведующий отделением
+        if self._repository.heads_department(doctor_id):
+            return False  # Нельзя удалить врача, который заведует отделением
+
+        with self._repository.transaction():
+            # Удаляем связанные записи на прием
+            self._remove_appointments("doctor_id", doctor_id)
+            # Удаляем врача
+            self._repository.remove("doctors", doctor)
+        if "doctors" in self._unique_indexes:
+            self._unique_indexes["doctors"].remove(doctor)
+        self._index_person("doctors", doctor, False)
+        self._track("doctors", doctor_id, CHANGE_DELETED)
+        return True
+
+    def _remove_appointments(self, owner: str, owner_id: int) -> None:
+        """Удаляет записи на прием, у которых поле owner равно owner_id."""
+        for appointment_id in self._repository.appointment_ids(owner, owner_id):
+            self._remove_appointment(self._repository.appointments[appointment_id])
 
     def delete_department(self, department_id: int) -> bool:
         """Удаляет отделение по ID."""
-        for i, department in enumerate(self.departments):
-            if department.department_id == department_id:
-                # Проверяем, есть ли связанные кабинеты
-                if any(
-                    room.department.department_id == department_id
-                    for room in self.rooms
-                ):
-                    return False  # Нельзя удалить отделение с кабинетами
-
-                # Удаляем отделение
-                self.departments.pop(i)
-                return True
-        return False
+        department = self._repository.departments.get(department_id)
+        if not department:
+            return False
+
+        # Проверяем, есть ли связанные кабинеты
+        if self._repository.has_rooms(department_id):
+            return False  # Нельзя удалить отделение с кабинетами
+
+        # Удаляем отделение
+        self._repository.remove("departments", department)
+        self._track("departments", department_id, CHANGE_DELETED)
+        return True
 
     def delete_room(self, room_id: int) -> bool:
         """Удаляет кабинет по ID."""
-        for i, room in enumerate(self.rooms):
-            if room.room_id == room_id:
-                # Проверяем, есть ли связанные записи на прием
-                if any(app.room.room_id == room_id for app in self.appointments):
-                    return False  # Нельзя удалить кабинет с записями
+        room = self._repository.rooms.get(room_id)
+        if not room:
+            return False
+
+        # Проверяем, есть ли связанные записи на прием
+        if self._repository.has_appointments("room_id", room_id):
+            return False  # Нельзя удалить кабинет с записями
 
-                # Удаляем кабинет
-                self.rooms.pop(i)
-                return True
-        return False
+        # Удаляем кабинет
+        self._repository.remove("rooms", room)
+        self._track("rooms", room_id, CHANGE_DELETED)
+        return True
 
     def delete_service(self, service_id: int) -> bool:
         """Удаляет услугу по ID."""
-        for i, service in enumerate(self.services):
-            if service.service_id == service_id:
-                # Проверяем, используется ли услуга в записях на прием
-                if any(
-                    app.service.service_id == service_id for app in self.appointments
-                ):
-                    return False  # Нельзя удалить услугу, используемую в записях
-
-                # Удаляем услугу
-                self.services.pop(i)
-                return True
-        return False
+        service = self._repository.services.get(service_id)
+        if not service:
+            return False
+
+        # Проверяем, используется ли услуга в записях на прием
+        if self._repository.has_appointments("service_id", service_id):
+            return False  # Нельзя удалить услугу, используемую в записях
+
+        # Удаляем услугу
+        self._repository.remove("services", service)
+        self._track("services", service_id, CHANGE_DELETED)
+        return True
 
     def delete_appointment(self, appointment_id: int) -> bool:
         """Удаляет запись на прием по ID."""
-        for i, appointment in enumerate(self.appointments):
-            if appointment.appointment_id == appointment_id:
-                self.appointments.pop(i)
-                return True
-        return False
+        appointment = self._repository.appointments.get(appointment_id)
+        if not appointment:
+            return False
+        self._remove_appointment(appointment)
+        return True
 
     def create_diagnosis(self, code: str, name: str, description: str) -> Diagnosis:
         """Создает новый диагноз."""
         diagnosis = Diagnosis(self._next_diagnosis_id, code, name, description)
-        self.diagnoses.append(diagnosis)
-        self._next_diagnosis_id += 1
+        self._add_diagnosis(diagnosis)
+        self._track("diagnoses", diagnosis.diagnosis_id, CHANGE_CREATED)
         return diagnosis
 
+    def restore_diagnosis(self, diagnosis: Diagnosis) -> None:
+        """Добавляет загруженный диагноз, сохраняя его ID."""
+        self._ensure_new_id(self._repository.diagnoses, diagnosis.diagnosis_id)
+        self._add_diagnosis(diagnosis)
+
+    def _add_diagnosis(self, diagnosis: Diagnosis) -> None:
+        """Регистрирует диагноз."""
+        self._repository.add("diagnoses", diagnosis)
+        if self._diagnosis_text_index is not None:
+            self._diagnosis_text_index.add(
+                diagnosis.diagnosis_id, diagnosis_text(diagnosis)
+            )
+        self._next_diagnosis_id = max(
+            self._next_diagnosis_id, diagnosis.diagnosis_id + 1
+        )
+
+    def get_diagnosis(self, diagnosis_id: int) -> Optional[Diagnosis]:
+        """Возвращает диагноз по ID."""
+        return self._repository.diagnoses.get(diagnosis_id)
+
     def create_prescription(
         self, medication: str, dosage: str, frequency: str, duration: str
     ) -> Prescription:
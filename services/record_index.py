@@ -0,0 +1,148 @@
+from array import array
+from bisect import bisect_left, bisect_right
+from itertools import compress
+from operator import itemgetter
+from typing import Dict, Iterable, Iterator, List, Optional, Tuple
+from models import Diagnosis, MedicalRecord, RecordEntry
+
+# Ссылка на запись карты: (день приема, ID пациента, номер записи в карте)
+EntryRef = Tuple[int, int, int]
+
+
+def normalize_code(code: str) -> str:
+    """Ключ кода диагноза: без пробелов по краям, в верхнем регистре."""
+    return code.strip().upper()
+
+
+class EntryPostings:
+    """Ссылки на записи карт, упорядоченные по дню приема.
+
+    Ссылки хранятся тремя столбцами array (день, ID пациента, номер
+    записи); строки с одним днем идут в порядке добавления. Выборка
+    диапазона дат - два двоичных поиска по столбцу дней.
+    """
+
+    __slots__ = ("day", "patient_id", "entry_id")
+
+    def __init__(self) -> None:
+        self.day = array("i")
+        self.patient_id = array("i")
+        self.entry_id = array("i")
+
+    def __len__(self) -> int:
+        return len(self.day)
+
+    def add(self, day: int, patient_id: int, entry_id: int) -> None:
+        """Добавляет ссылку, сохраняя порядок по дням."""
+        if not self.day or self.day[-1] <= day:
+            # Записи обычно добавляются в порядке дат: вставка в конец
+            self.day.append(day)
+            self.patient_id.append(patient_id)
+            self.entry_id.append(entry_id)
+            return
+        row = bisect_right(self.day, day)
+        self.day.insert(row, day)
+        self.patient_id.insert(row, patient_id)
+        self.entry_id.insert(row, entry_id)
+
+    @classmethod
+    def from_refs(cls, refs: List[EntryRef]) -> "EntryPostings":
+        """Создает столбцы из ссылок в любом порядке."""
+        postings = cls()
+        refs.sort(key=itemgetter(0))
+        for column, name in enumerate(cls.__slots__):
+            setattr(postings, name, array("i", map(itemgetter(column), refs)))
+        return postings
+
+    def remove_patient(self, patient_id: int) -> None:
+        """Удаляет ссылки на записи пациента."""
+        keep = [value != patient_id for value in self.patient_id]
+        for name in self.__slots__:
+            setattr(self, name, array("i", compress(getattr(self, name), keep)))
+
+    def rows(self, first_day: Optional[int], last_day: Optional[int]) -> range:
+        """Номера строк с днем приема в [first_day, last_day]."""
+        low = 0 if first_day is None else bisect_left(self.day, first_day)
+        high = len(self.day) if last_day is None else bisect_right(self.day, last_day)
+        return range(low, high)
+
+    def refs(
+        self, first_day: Optional[int] = None, last_day: Optional[int] = None
+    ) -> Iterator[EntryRef]:
+        """Перебирает ссылки с днем приема в [first_day, last_day]."""
+        rows = self.rows(first_day, last_day)
+        return zip(
+            self.day[rows.start : rows.stop],
+            self.patient_id[rows.start : rows.stop],
+            self.entry_id[rows.start : rows.stop],
+        )
+
+
+class RecordEntryIndex:
+    """Индекс записей медицинских карт всех пациентов.
+
+    Хранит ссылки на все записи по дням приема и отдельно ссылки на записи
+    каждого кода диагноза. Сами записи индекс не хранит: по ссылке запись
+    берется из карты пациента через MedicalRecord.get_entry.
+    """
+
+    def __init__(self) -> None:
+        self._all = EntryPostings()
+        self._by_code: Dict[str, EntryPostings] = {}
+
+    def __len__(self) -> int:
+        return len(self._all)
+
+    def build(self, records: Iterable[MedicalRecord]) -> None:
+        """Заполняет индекс записями карт, упорядочивая ссылки один раз."""
+        everything: List[EntryRef] = []
+        # Ссылки собираются по объектам диагнозов, чтобы код каждого
+        # диагноза нормализовать один раз
+        by_diagnosis: Dict[Diagnosis, List[EntryRef]] = {}
+        for record in records:
+            patient_id = record.patient.patient_id
+            for entry in record.entries:
+                ref = (entry.entry_day, patient_id, entry.entry_id)
+                everything.append(ref)
+                if entry.diagnosis is not None:
+                    refs = by_diagnosis.get(entry.diagnosis)
+                    if refs is None:
+                        refs = by_diagnosis[entry.diagnosis] = []
+                    refs.append(ref)
+
+        by_code: Dict[str, List[EntryRef]] = {}
+        for diagnosis, refs in by_diagnosis.items():
+            by_code.setdefault(normalize_code(diagnosis.code), []).extend(refs)
+        self._all = EntryPostings.from_refs(everything)
+        self._by_code = {
+            code: EntryPostings.from_refs(refs) for code, refs in by_code.items()
+        }
+
+    def add(self, patient_id: int, entry: RecordEntry) -> None:
+        """Добавляет новую запись карты пациента."""
+        self._all.add(entry.entry_day, patient_id, entry.entry_id)
+        if entry.diagnosis is not None:
+            code = normalize_code(entry.diagnosis.code)
+            postings = self._by_code.get(code)
+            if postings is None:
+                postings = self._by_code[code] = EntryPostings()
+            postings.add(entry.entry_day, patient_id, entry.entry_id)
+
+    def remove_patient(self, patient_id: int) -> None:
+        """Удаляет ссылки на записи карты удаленного пациента."""
+        self._all.remove_patient(patient_id)
+        for code in list(self._by_code):
+            postings = self._by_code[code]
+            postings.remove_patient(patient_id)
+            if not postings:
+                del self._by_code[code]
+
+    def postings(self, code: Optional[str] = None) -> EntryPostings:
+        """Ссылки на записи с кодом диагноза code или на все записи."""
+        if code is None:
+            return self._all
+        return self._by_code.get(normalize_code(code)) or EntryPostings()
+
+    def codes(self) -> Dict[str, int]:
+        """Возвращает число записей по кодам диагнозов."""
+        return {code: len(postings) for code, postings in self._by_code.items()}
@@ -0,0 +1,321 @@
+"""Хранилище медицинских карт рядом с файлом данных поликлиники.
+
+Формат файла ``<данные>.records`` (little-endian, версия 1):
+
+* заголовок: сигнатура, версия, число карт, смещение индекса и счетчик
+  следующего ID назначения;
+* блоки карт: записи одной карты - массив JSON в UTF-8, каждая запись и
+  каждое назначение - массив значений в порядке ENTRY_FIELDS и
+  PRESCRIPTION_FIELDS, без имен полей;
+* индекс: (ID пациента, число записей, смещение блока, длина блока) для
+  каждой непустой карты по возрастанию ID пациента.
+
+При открытии читается только заголовок. Карта пациента получает
+отложенные записи (MedicalRecord.defer_entries), и блок декодируется при
+первом обращении к entries. Карты, которые так и не открывались, при
+следующем сохранении копируются в новый файл байтами, без декодирования.
+"""
+
+import json
+import mmap
+import os
+import struct
+from operator import attrgetter
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+from models import MedicalRecord, RecordEntry
+from .lazy import RecordTable
+from .polyclinic_service import PolyclinicService
+from .rows import entry_from_row, entry_to_row
+from .text_index import TextIndex
+
+RECORDS_SUFFIX = ".records"
+TEXT_INDEX_SUFFIX = ".text"
+MAGIC = b"PCLRECS\0"
+VERSION = 1
+
+_HEADER = struct.Struct("<8sHIQI")
+# ID пациента, число записей, смещение блока, длина блока
+_INDEX_FORMAT = "<IIQI"
+_INDEX_ENTRY = struct.Struct(_INDEX_FORMAT)
+_WRITE_BUFFER = 1024 * 1024
+
+# Порядок значений записи и назначения в блоке карты
+ENTRY_FIELDS = (
+    "entry_id",
+    "entry_day",
+    "doctor_id",
+    "diagnosis_id",
+    "symptoms",
+    "treatment",
+    "prescriptions",
+)
+PRESCRIPTION_FIELDS = (
+    "prescription_id",
+    "medication",
+    "dosage",
+    "frequency",
+    "duration",
+)
+
+
+def _pack_entry(entry: RecordEntry) -> List[Any]:
+    """Строка записи карты -> массив значений блока."""
+    row = entry_to_row(entry)
+    row["prescriptions"] = [
+        [prescription[field] for field in PRESCRIPTION_FIELDS]
+        for prescription in row["prescriptions"]
+    ]
+    return [row[field] for field in ENTRY_FIELDS]
+
+
+def _unpack_entry(values: List[Any]) -> Dict[str, Any]:
+    """Массив значений блока -> строка записи карты."""
+    row = dict(zip(ENTRY_FIELDS, values))
+    row["prescriptions"] = [
+        dict(zip(PRESCRIPTION_FIELDS, prescription))
+        for prescription in row["prescriptions"]
+    ]
+    return row
+
+
+def records_path(filename: str) -> str:
+    """Возвращает путь к хранилищу карт для файла данных."""
+    return filename + RECORDS_SUFFIX
+
+
+class _StoredChart:
+    """Отложенные записи карты: загрузчик для MedicalRecord.defer_entries."""
+
+    __slots__ = ("store", "row")
+
+    def __init__(self, store: "RecordStore", row: int) -> None:
+        self.store = store
+        self.row = row
+
+    def __call__(self) -> List[RecordEntry]:
+        return self.store.read_entries(self.row)
+
+    def raw(self) -> bytes:
+        """Возвращает блок карты в том виде, в каком он лежит в файле."""
+        return self.store.raw(self.row)
+
+
+class RecordStore:
+    """Открытое через mmap хранилище медицинских карт.
+
+    Записи декодируются через сервис, подключенный методом attach: врачи
+    и диагнозы записей берутся из него.
+    """
+
+    def __init__(self, filename: str) -> None:
+        self._filename = filename
+        with open(filename, "rb") as f:
+            self._mm = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+
+        magic, version, count, index_offset, next_prescription = _HEADER.unpack_from(
+            self._mm, 0
+        )
+        if magic != MAGIC:
+            raise ValueError("Файл не является хранилищем медицинских карт")
+        if version != VERSION:
+            raise ValueError(f"Неподдерживаемая версия хранилища карт: {version}")
+
+        self._index_offset = index_offset
+        self._index = RecordTable(self._mm, index_offset, count, _INDEX_FORMAT)
+        self._next_prescription = next_prescription
+        self._service: Optional[PolyclinicService] = None
+
+    def __len__(self) -> int:
+        return self._index.count
+
+    def attach(self, service: PolyclinicService) -> None:
+        """Подключает сервис, в котором будут декодироваться записи."""
+        self._service = service
+        service.restore_id_counters({"prescription": self._next_prescription})
+
+    def bind(self, record: MedicalRecord) -> None:
+        """Откладывает записи карты пациента, если карта есть в хранилище."""
+        row = self._index.find(record.patient.patient_id)
+        if row is not None:
+            count = self._index.unpack(row)[1]
+            if count:
+                record.defer_entries(_StoredChart(self, row), count)
+
+    def bind_all(self) -> int:
+        """Откладывает записи карт всех пациентов подключенного сервиса.
+
+        Для сервисов, где пациенты уже восстановлены в памяти; возвращает
+        число подключенных карт.
+        """
+        bound = 0
+        for row, (patient_id, count, _, _) in enumerate(self._index):
+            if not count:
+                continue
+            patient = self._service.get_patient(patient_id)
+            if patient is not None and patient.medical_record is not None:
+                patient.medical_record.defer_entries(_StoredChart(self, row), count)
+                bound += 1
+        return bound
+
+    def raw(self, row: int) -> bytes:
+        """Возвращает блок карты в строке индекса row."""
+        _, _, offset, length = self._index.unpack(row)
+        return self._mm[offset : offset + length]
+
+    def erase(self, patient_ids: Iterable[int]) -> int:
+        """Стирает из файла карты пациентов patient_ids; возвращает их число.
+
+        Блок карты заполняется нулями, а в индексе у карты остается ноль
+        записей, поэтому bind ее больше не подключает.
+        """
+        erased = []
+        for patient_id in patient_ids:
+            row = self._index.find(patient_id)
+            if row is not None and self._index.unpack(row)[1]:
+                erased.append((row, self._index.unpack(row)))
+        if not erased:
+            return 0
+        with open(self._filename, "r+b") as f:
+            for row, (patient_id, _, offset, length) in erased:
+                f.seek(offset)
+                f.write(b"\0" * length)
+                f.seek(self._index_offset + row * _INDEX_ENTRY.size)
+                f.write(_INDEX_ENTRY.pack(patient_id, 0, offset, length))
+            f.flush()
+            os.fsync(f.fileno())
+        return len(erased)
+
+    def close(self) -> None:
+        """Закрывает отображение файла."""
+        self._mm.close()
+
+    def read_entries(self, row: int) -> List[RecordEntry]:
+        """Декодирует записи карты в строке индекса row."""
+        service = self._service
+        return [
+            entry_from_row(_unpack_entry(values), service)
+            for values in json.loads(self.raw(row))
+        ]
+
+
+def save_records(service: PolyclinicService, filename: str) -> int:
+    """Сохраняет непустые медицинские карты сервиса рядом с файлом данных.
+
+    Файл пишется во временный и атомарно подменяет старый, поэтому
+    открытое хранилище, из которого еще читаются карты, остается целым.
+    Возвращает число сохраненных карт.
+    """
+    path = records_path(filename)
+    temp_name = f"{path}.tmp"
+    encoder = json.JSONEncoder(ensure_ascii=False, separators=(",", ":"))
+    index: List[bytes] = []
+
+    with open(temp_name, "wb", buffering=_WRITE_BUFFER) as f:
+        f.write(b"\0" * _HEADER.size)
+        offset = _HEADER.size
+        patients = service.iter_entities("patients")
+        for patient in sorted(patients, key=attrgetter("patient_id")):
+            record = patient.medical_record
+            if record is None or not record.entry_count:
+                continue
+            source = record.deferred_entries
+            if isinstance(source, _StoredChart):
+                block = source.raw()
+            else:
+                rows = [_pack_entry(entry) for entry in record.entries]
+                block = encoder.encode(rows).encode("utf-8")
+            f.write(block)
+            index.append(
+                _INDEX_ENTRY.pack(
+                    patient.patient_id, record.entry_count, offset, len(block)
+                )
+            )
+            offset += len(block)
+        f.write(b"".join(index))
+
+        next_prescription = service.get_id_counters()["prescription"]
+        f.seek(0)
+        f.write(_HEADER.pack(MAGIC, VERSION, len(index), offset, next_prescription))
+
+    os.replace(temp_name, path)
+    return len(index)
+
+
+def text_index_path(filename: str) -> str:
+    """Возвращает путь к полнотекстовому индексу карт для файла данных."""
+    return filename + TEXT_INDEX_SUFFIX
+
+
+def _records_stamp(filename: str) -> Tuple[int, int]:
+    """Отпечаток файла карт: (размер, время изменения в нс) или (0, 0)."""
+    try:
+        stat = os.stat(records_path(filename))
+    except FileNotFoundError:
+        return 0, 0
+    return stat.st_size, stat.st_mtime_ns
+
+
+def save_text_index(service: PolyclinicService, filename: str) -> bool:
+    """Сохраняет полнотекстовый индекс карт рядом с файлом данных.
+
+    Вызывается после save_records. Индекс, который сервис так и не
+    построил, не сохраняется, а старый файл индекса удаляется: он
+    описывает прежние карты. Возвращает True, если индекс сохранен.
+    """
+    path = text_index_path(filename)
+    index = service.text_index(build=False)
+    if index is None:
+        if os.path.exists(path):
+            os.remove(path)
+        return False
+    index.save(path, _records_stamp(filename))
+    return True
+
+
+def text_index_unsaved(service: PolyclinicService, filename: str) -> bool:
+    """Проверяет, построил ли сервис индекс карт, которого нет в файле.
+
+    Индекс, открытый из файла рядом с текущим файлом карт, помнит его
+    отпечаток; построенный заново или от других карт - нет.
+    """
+    index = service.text_index(build=False)
+    return index is not None and index.records_stamp != _records_stamp(filename)
+
+
+def open_text_index(filename: str) -> Optional[TextIndex]:
+    """Открывает полнотекстовый индекс карт файла данных.
+
+    Возвращает None, если индекса нет или он сохранен не с текущим файлом
+    карт (не совпадает размер или время изменения файла карт).
+    """
+    path = text_index_path(filename)
+    if not os.path.exists(path):
+        return None
+    index = TextIndex.open(path)
+    return index if index.records_stamp == _records_stamp(filename) else None
+
+
+def drop_charts(filename: str, patient_ids: Iterable[int]) -> int:
+    """Стирает карты удаленных пациентов рядом с файлом данных.
+
+    Полнотекстовый индекс карт удаляется вместе с ними: в нем остаются
+    слова стертых записей, а при первом поиске он построится заново.
+    Возвращает число стертых карт.
+    """
+    path = records_path(filename)
+    if not os.path.exists(path):
+        return 0
+    store = RecordStore(path)
+    try:
+        erased = store.erase(patient_ids)
+    finally:
+        store.close()
+    if erased and os.path.exists(text_index_path(filename)):
+        os.remove(text_index_path(filename))
+    return erased
+
+
+def open_records(filename: str) -> Optional[RecordStore]:
+    """Открывает хранилище карт файла данных или возвращает None, если его нет."""
+    path = records_path(filename)
+    return RecordStore(path) if os.path.exists(path) else None
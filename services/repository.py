@@ -0,0 +1,408 @@
+from contextlib import contextmanager
+from itertools import islice
+from typing import (
+    Any,
+    Callable,
+    Dict,
+    Iterable,
+    Iterator,
+    List,
+    Mapping,
+    MutableMapping,
+    Optional,
+    Set,
+    Tuple,
+)
+from models import (
+    Patient,
+    Doctor,
+    Department,
+    Room,
+    MedicalService,
+    Diagnosis,
+    Appointment,
+    MedicalRecord,
+    RecordEntry,
+    STATUS_CANCELLED,
+    ValidationError,
+)
+from .scheduling import IntervalCalendar, appointment_interval
+from .unique_index import NumberRow, UniqueIndex
+
+# (ID записи, ID пациента, ID врача, ID кабинета, ID услуги, начало, конец,
+#  занимает ли запись время)
+AppointmentIndexRow = Tuple[int, int, int, int, int, int, int, bool]
+
+# Коллекции хранилища и атрибуты ID их объектов
+ID_ATTRIBUTES: Dict[str, str] = {
+    "patients": "patient_id",
+    "doctors": "doctor_id",
+    "departments": "department_id",
+    "rooms": "room_id",
+    "services": "service_id",
+    "diagnoses": "diagnosis_id",
+    "appointments": "appointment_id",
+}
+
+# Поля записи на прием, по которым хранилище выбирает записи владельца
+APPOINTMENT_OWNERS = ("patient_id", "doctor_id", "room_id", "service_id")
+
+
+def entity_id(collection: str, entity: Any) -> int:
+    """Возвращает ID объекта коллекции."""
+    return getattr(entity, ID_ATTRIBUTES[collection])
+
+
+class Repository:
+    """Хранилище объектов поликлиники.
+
+    Карты ID -> объект (patients, doctors, ...) служат для чтения; изменения
+    проходят через add/remove, чтобы хранилище поддерживало свои индексы.
+    Правила предметной области (проверки занятости, каскадные удаления)
+    остаются в PolyclinicService.
+    """
+
+    patients: Mapping[int, Patient]
+    doctors: Mapping[int, Doctor]
+    departments: Mapping[int, Department]
+    rooms: Mapping[int, Room]
+    services: Mapping[int, MedicalService]
+    diagnoses: Mapping[int, Diagnosis]
+    appointments: Mapping[int, Appointment]
+
+    # Вызывается для записей, добавленных в карты пациентов, которых
+    # хранилище декодирует само (MedicalRecord.on_entry); задает сервис
+    record_listener: Optional[Callable[[MedicalRecord, RecordEntry], None]] = None
+
+    def add(self, collection: str, entity: Any) -> None:
+        """Сохраняет новый объект коллекции."""
+        raise NotImplementedError
+
+    def restore(self, collection: str, entity: Any) -> None:
+        """Сохраняет загруженный объект.
+
+        В отличие от add, записи на прием из сохраненных данных могут
+        пересекаться по времени с уже загруженными.
+        """
+        self.add(collection, entity)
+
+    def remove(self, collection: str, entity: Any) -> None:
+        """Удаляет объект коллекции."""
+        raise NotImplementedError
+
+    def update_appointment_status(self, appointment: Appointment, status: str) -> None:
+        """Меняет статус записи; отмененная запись не занимает время."""
+        raise NotImplementedError
+
+    def appointment_ids(self, owner: str, owner_id: int) -> List[int]:
+        """Возвращает ID записей, у которых поле owner равно owner_id."""
+        raise NotImplementedError
+
+    def has_appointments(self, owner: str, owner_id: int) -> bool:
+        """Проверяет, есть ли записи, у которых поле owner равно owner_id."""
+        return bool(self.appointment_ids(owner, owner_id))
+
+    def has_rooms(self, department_id: int) -> bool:
+        """Проверяет, есть ли у отделения кабинеты."""
+        raise NotImplementedError
+
+    def heads_department(self, doctor_id: int) -> bool:
+        """Проверяет, заведует ли врач каким-либо отделением."""
+        raise NotImplementedError
+
+    def find_overlap(
+        self, owner: str, owner_id: int, start: int, end: int
+    ) -> Optional[int]:
+        """Возвращает ID неотмененной записи врача (owner="doctor_id") или
+        кабинета (owner="room_id"), пересекающейся с [start, end), или None."""
+        raise NotImplementedError
+
+    def busy_intervals(
+        self, owner: str, owner_id: int, start: int, end: int
+    ) -> Iterator[Tuple[int, int]]:
+        """Перебирает по возрастанию интервалы неотмененных записей врача или
+        кабинета, пересекающиеся с [start, end)."""
+        raise NotImplementedError
+
+    def page(self, collection: str, offset: int, limit: int) -> List[Any]:
+        """Возвращает объекты коллекции с номерами [offset, offset + limit)."""
+        values = getattr(self, collection).values()
+        return list(islice(values, offset, offset + limit))
+
+    def id_counters(self) -> Dict[str, int]:
+        """Возвращает счетчики следующих ID для уже сохраненных объектов."""
+        return {}
+
+    def unique_index(self, collection: str) -> UniqueIndex:
+        """Возвращает индекс уникальных номеров коллекции patients или doctors.
+
+        По умолчанию индекс строится по всем объектам коллекции; дальше его
+        поддерживает сервис.
+        """
+        index = UniqueIndex(collection)
+        index.build(getattr(self, collection).values())
+        return index
+
+    @contextmanager
+    def transaction(self) -> Iterator[None]:
+        """Группирует изменения; хранилища на диске фиксируют их разом."""
+        yield
+
+    def close(self) -> None:
+        """Освобождает ресурсы хранилища."""
+
+
+class InMemoryRepository(Repository):
+    """Хранилище в памяти процесса: словари, обратные ссылки и календари."""
+
+    def __init__(self) -> None:
+        # Карты идентичности: ID -> объект (порядок вставки сохраняется)
+        self.patients: MutableMapping[int, Patient] = {}
+        self.doctors: Dict[int, Doctor] = {}
+        self.departments: Dict[int, Department] = {}
+        self.rooms: Dict[int, Room] = {}
+        self.services: Dict[int, MedicalService] = {}
+        self.diagnoses: Dict[int, Diagnosis] = {}
+        self.appointments: MutableMapping[int, Appointment] = {}
+
+        # Календари занятости врачей и кабинетов: ID -> интервалы записей.
+        # Хранят только неотмененные записи.
+        self._calendars: Dict[str, Dict[int, IntervalCalendar]] = {
+            "doctor_id": {},
+            "room_id": {},
+        }
+
+        # Обратные ссылки: поле -> ID владельца -> ID зависимых объектов
+        self._appointments_by: Dict[str, Dict[int, Set[int]]] = {
+            owner: {} for owner in APPOINTMENT_OWNERS
+        }
+        self._rooms_by_department: Dict[int, Set[int]] = {}
+        self._departments_by_head: Dict[int, Set[int]] = {}
+
+        # Источник строк для отложенного построения календарей и обратных
+        # ссылок записей (заполняется при ленивой загрузке снимка)
+        self._pending_appointment_rows: Optional[
+            Callable[[], Iterable[AppointmentIndexRow]]
+        ] = None
+        # Источник номеров лениво загруженных пациентов для индекса
+        # уникальных номеров
+        self._patient_numbers: Optional[Callable[[], Iterable[NumberRow]]] = None
+
+    def attach_lazy_collections(
+        self,
+        patients: MutableMapping[int, Patient],
+        appointments: MutableMapping[int, Appointment],
+        appointment_rows: Callable[[], Iterable[AppointmentIndexRow]],
+        patient_numbers: Callable[[], Iterable[NumberRow]],
+    ) -> None:
+        """Подключает лениво декодируемых пациентов и записи на прием.
+
+        Календари и обратные ссылки записей строятся из appointment_rows
+        при первой операции, которой они нужны. patient_numbers перебирает
+        номера всех пациентов карты patients на момент вызова.
+        """
+        self.patients = patients
+        self.appointments = appointments
+        self._pending_appointment_rows = appointment_rows
+        self._patient_numbers = patient_numbers
+
+    def unique_index(self, collection: str) -> UniqueIndex:
+        if collection == "patients" and self._patient_numbers is not None:
+            # Номера читаются при первой проверке, а не при загрузке
+            return UniqueIndex(collection, self._patient_numbers)
+        return super().unique_index(collection)
+
+    def _ensure_appointment_indexes(self) -> None:
+        """Достраивает отложенные календари и обратные ссылки записей."""
+        if self._pending_appointment_rows is None:
+            return
+        rows, self._pending_appointment_rows = self._pending_appointment_rows, None
+
+        for (
+            appointment_id,
+            patient_id,
+            doctor_id,
+            room_id,
+            service_id,
+            start,
+            end,
+            active,
+        ) in rows():
+            for owner, owner_id in zip(
+                APPOINTMENT_OWNERS, (patient_id, doctor_id, room_id, service_id)
+            ):
+                self._appointments_by[owner].setdefault(owner_id, set()).add(
+                    appointment_id
+                )
+            if active:
+                # Строки - сохраненные данные: пересечения не отклоняются
+                self._calendar("doctor_id", doctor_id).add(
+                    start, end, appointment_id, overlap=True
+                )
+                self._calendar("room_id", room_id).add(
+                    start, end, appointment_id, overlap=True
+                )
+
+    def _calendar(self, owner: str, owner_id: int) -> IntervalCalendar:
+        return self._calendars[owner].setdefault(owner_id, IntervalCalendar())
+
+    @staticmethod
+    def _link(index: Dict[int, Set[int]], owner_id: int, item_id: int) -> None:
+        index.setdefault(owner_id, set()).add(item_id)
+
+    @staticmethod
+    def _unlink(index: Dict[int, Set[int]], owner_id: int, item_id: int) -> None:
+        owned = index.get(owner_id)
+        if owned is not None:
+            owned.discard(item_id)
+            if not owned:
+                del index[owner_id]
+
+    def add(self, collection: str, entity: Any) -> None:
+        if collection == "appointments":
+            self._add_appointment(entity)
+            return
+        getattr(self, collection)[entity_id(collection, entity)] = entity
+        if collection == "departments":
+            self._link(
+                self._departments_by_head,
+                entity.head_doctor.doctor_id,
+                entity.department_id,
+            )
+        elif collection == "rooms":
+            self._link(
+                self._rooms_by_department, entity.department.department_id, entity.room_id
+            )
+
+    def restore(self, collection: str, entity: Any) -> None:
+        if collection == "appointments":
+            self._add_appointment(entity, overlap=True)
+            return
+        self.add(collection, entity)
+
+    def remove(self, collection: str, entity: Any) -> None:
+        if collection == "appointments":
+            self._remove_appointment(entity)
+            return
+        del getattr(self, collection)[entity_id(collection, entity)]
+        if collection == "departments":
+            self._unlink(
+                self._departments_by_head,
+                entity.head_doctor.doctor_id,
+                entity.department_id,
+            )
+        elif collection == "rooms":
+            self._unlink(
+                self._rooms_by_department, entity.department.department_id, entity.room_id
+            )
+            self._calendars["room_id"].pop(entity.room_id, None)
+        elif collection == "doctors":
+            self._calendars["doctor_id"].pop(entity.doctor_id, None)
+
+    def _appointment_owners(self, appointment: Appointment) -> Iterator[Tuple[str, int]]:
+        return zip(
+            APPOINTMENT_OWNERS,
+            (
+                appointment.patient.patient_id,
+                appointment.doctor.doctor_id,
+                appointment.room.room_id,
+                appointment.service.service_id,
+            ),
+        )
+
+    def _add_appointment(self, appointment: Appointment, overlap: bool = False) -> None:
+        """Регистрирует запись во всех индексах.
+
+        Время занимается первым: если календарь отклонит запись, остальные
+        индексы остаются нетронутыми. overlap=True допускает пересечения.
+        """
+        self._ensure_appointment_indexes()
+        self._book_slot(appointment, overlap)
+        appointment_id = appointment.appointment_id
+        self.appointments[appointment_id] = appointment
+        for owner, owner_id in self._appointment_owners(appointment):
+            self._link(self._appointments_by[owner], owner_id, appointment_id)
+
+    def _remove_appointment(self, appointment: Appointment) -> None:
+        """Удаляет запись из всех индексов."""
+        self._ensure_appointment_indexes()
+        appointment_id = appointment.appointment_id
+        self._release_slot(appointment)
+        del self.appointments[appointment_id]
+        for owner, owner_id in self._appointment_owners(appointment):
+            self._unlink(self._appointments_by[owner], owner_id, appointment_id)
+
+    def _book_slot(self, appointment: Appointment, overlap: bool = False) -> None:
+        """Заносит запись в календари врача и кабинета."""
+        if appointment.status == STATUS_CANCELLED:
+            return
+        start, end = appointment_interval(appointment)
+        appointment_id = appointment.appointment_id
+        self._calendar("doctor_id", appointment.doctor.doctor_id).add(
+            start, end, appointment_id, overlap
+        )
+        room_calendar = self._calendar("room_id", appointment.room.room_id)
+        try:
+            room_calendar.add(start, end, appointment_id, overlap)
+        except ValidationError:
+            # Кабинет занят: время врача освобождается обратно
+            self._calendars["doctor_id"][appointment.doctor.doctor_id].remove(
+                start, appointment_id
+            )
+            raise
+
+    def _release_slot(self, appointment: Appointment) -> None:
+        """Освобождает интервал записи в календарях врача и кабинета."""
+        if appointment.status == STATUS_CANCELLED:
+            return
+        start, _ = appointment_interval(appointment)
+        appointment_id = appointment.appointment_id
+        for owner, owner_id in (
+            ("doctor_id", appointment.doctor.doctor_id),
+            ("room_id", appointment.room.room_id),
+        ):
+            calendar = self._calendars[owner].get(owner_id)
+            if calendar:
+                calendar.remove(start, appointment_id)
+
+    def update_appointment_status(self, appointment: Appointment, status: str) -> None:
+        self._ensure_appointment_indexes()
+        if appointment.status == STATUS_CANCELLED:
+            appointment.status = status
+            try:
+                self._book_slot(appointment)
+            except ValidationError:
+                appointment.status = STATUS_CANCELLED
+                raise
+        else:
+            if status == STATUS_CANCELLED:
+                self._release_slot(appointment)
+            appointment.status = status
+
+    def appointment_ids(self, owner: str, owner_id: int) -> List[int]:
+        self._ensure_appointment_indexes()
+        return list(self._appointments_by[owner].get(owner_id, ()))
+
+    def has_appointments(self, owner: str, owner_id: int) -> bool:
+        self._ensure_appointment_indexes()
+        return bool(self._appointments_by[owner].get(owner_id))
+
+    def has_rooms(self, department_id: int) -> bool:
+        return bool(self._rooms_by_department.get(department_id))
+
+    def heads_department(self, doctor_id: int) -> bool:
+        return bool(self._departments_by_head.get(doctor_id))
+
+    def find_overlap(
+        self, owner: str, owner_id: int, start: int, end: int
+    ) -> Optional[int]:
+        self._ensure_appointment_indexes()
+        calendar = self._calendars[owner].get(owner_id)
+        return calendar.find_overlap(start, end) if calendar else None
+
+    def busy_intervals(
+        self, owner: str, owner_id: int, start: int, end: int
+    ) -> Iterator[Tuple[int, int]]:
+        self._ensure_appointment_indexes()
+        calendar = self._calendars[owner].get(owner_id)
+        return calendar.spans(start, end) if calendar else iter(())
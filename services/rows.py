@@ -0,0 +1,320 @@
+from typing import Any, Callable, Dict, Iterator, List, Mapping, Tuple
+from models import (
+    Patient,
+    Doctor,
+    Department,
+    Room,
+    MedicalService,
+    Diagnosis,
+    Prescription,
+    RecordEntry,
+    Appointment,
+    NotFoundError,
+)
+from .polyclinic_service import PolyclinicService
+
+Row = Mapping[str, Any]
+
+
+def patient_from_row(row: Row, service: PolyclinicService) -> Patient:
+    """Создает пациента из сохраненной строки."""
+    return Patient(
+        int(row["patient_id"]),
+        row["first_name"],
+        row["last_name"],
+        row["birth_date"],
+        row["phone"],
+        row["insurance_number"],
+    )
+
+
+def doctor_from_row(row: Row, service: PolyclinicService) -> Doctor:
+    """Создает врача из сохраненной строки."""
+    return Doctor(
+        int(row["doctor_id"]),
+        row["first_name"],
+        row["last_name"],
+        row["birth_date"],
+        row["phone"],
+        row["specialization"],
+        row["license_number"],
+    )
+
+
+def department_from_row(row: Row, service: PolyclinicService) -> Department:
+    """Создает отделение из сохраненной строки."""
+    head_doctor = service.get_doctor(int(row["head_doctor_id"]))
+    if not head_doctor:
+        raise NotFoundError(f"Не найден заведующий с ID {row['head_doctor_id']}")
+    return Department(
+        int(row["department_id"]), row["name"], int(row["floor"]), head_doctor
+    )
+
+
+def room_from_row(row: Row, service: PolyclinicService) -> Room:
+    """Создает кабинет из сохраненной строки."""
+    department = service.get_department(int(row["department_id"]))
+    if not department:
+        raise NotFoundError(f"Не найдено отделение с ID {row['department_id']}")
+    return Room(
+        int(row["room_id"]),
+        row["room_number"],
+        int(row["floor"]),
+        row["room_type"],
+        department,
+    )
+
+
+def service_from_row(row: Row, service: PolyclinicService) -> MedicalService:
+    """Создает медицинскую услугу из сохраненной строки."""
+    return MedicalService(
+        int(row["service_id"]),
+        row["name"],
+        row.get("description") or "",
+        float(row["cost"]),
+        int(row["duration"]),
+    )
+
+
+def diagnosis_from_row(row: Row, service: PolyclinicService) -> Diagnosis:
+    """Создает диагноз из сохраненной строки."""
+    return Diagnosis(
+        int(row["diagnosis_id"]),
+        row["code"],
+        row["name"],
+        row.get("description") or "",
+    )
+
+
+def appointment_from_row(row: Row, service: PolyclinicService) -> Appointment:
+    """Создает запись на прием из сохраненной строки."""
+    patient = service.get_patient(int(row["patient_id"]))
+    doctor = service.get_doctor(int(row["doctor_id"]))
+    room = service.get_room(int(row["room_id"]))
+    medical_service = service.get_service(int(row["service_id"]))
+    if not all([patient, doctor, room, medical_service]):
+        raise NotFoundError("Не найдены пациент, врач, кабинет или услуга")
+
+    appointment = Appointment(
+        int(row["appointment_id"]),
+        patient,
+        doctor,
+        room,
+        row["appointment_date"],
+        row["appointment_time"],
+        medical_service,
+        row.get("reason") or "",
+    )
+    if row.get("status"):
+        appointment.status = row["status"]
+    return appointment
+
+
+def patient_to_row(patient: Patient) -> Dict[str, Any]:
+    """Преобразует пациента в строку для сохранения."""
+    return {
+        "patient_id": patient.patient_id,
+        "first_name": patient.first_name,
+        "last_name": patient.last_name,
+        "birth_date": patient.birth_date,
+        "phone": patient.phone,
+        "insurance_number": patient.insurance_number,
+    }
+
+
+def doctor_to_row(doctor: Doctor) -> Dict[str, Any]:
+    """Преобразует врача в строку для сохранения."""
+    return {
+        "doctor_id": doctor.doctor_id,
+        "first_name": doctor.first_name,
+        "last_name": doctor.last_name,
+        "birth_date": doctor.birth_date,
+        "phone": doctor.phone,
+        "specialization": doctor.specialization,
+        "license_number": doctor.license_number,
+    }
+
+
+def department_to_row(department: Department) -> Dict[str, Any]:
+    """Преобразует отделение в строку для сохранения."""
+    return {
+        "department_id": department.department_id,
+        "name": department.name,
+        "floor": department.floor,
+        "head_doctor_id": department.head_doctor.doctor_id,
+    }
+
+
+def room_to_row(room: Room) -> Dict[str, Any]:
+    """Преобразует кабинет в строку для сохранения."""
+    return {
+        "room_id": room.room_id,
+        "room_number": room.room_number,
+        "floor": room.floor,
+        "room_type": room.room_type,
+        "department_id": room.department.department_id,
+    }
+
+
+def service_to_row(service: MedicalService) -> Dict[str, Any]:
+    """Преобразует медицинскую услугу в строку для сохранения."""
+    return {
+        "service_id": service.service_id,
+        "name": service.name,
+        "description": service.description,
+        "cost": service.cost,
+        "duration": service.duration,
+    }
+
+
+def diagnosis_to_row(diagnosis: Diagnosis) -> Dict[str, Any]:
+    """Преобразует диагноз в строку для сохранения."""
+    return {
+        "diagnosis_id": diagnosis.diagnosis_id,
+        "code": diagnosis.code,
+        "name": diagnosis.name,
+        "description": diagnosis.description,
+    }
+
+
+def appointment_to_row(appointment: Appointment) -> Dict[str, Any]:
+    """Преобразует запись на прием в строку для сохранения."""
+    return {
+        "appointment_id": appointment.appointment_id,
+        "patient_id": appointment.patient.patient_id,
+        "doctor_id": appointment.doctor.doctor_id,
+        "room_id": appointment.room.room_id,
+        "appointment_date": appointment.appointment_date,
+        "appointment_time": appointment.appointment_time,
+        "service_id": appointment.service.service_id,
+        "reason": appointment.reason,
+        "status": appointment.status,
+    }
+
+
+def prescription_to_row(prescription: Prescription) -> Dict[str, Any]:
+    """Преобразует назначение в строку для сохранения."""
+    return {
+        "prescription_id": prescription.prescription_id,
+        "medication": prescription.medication,
+        "dosage": prescription.dosage,
+        "frequency": prescription.frequency,
+        "duration": prescription.duration,
+    }
+
+
+def prescription_from_row(row: Row) -> Prescription:
+    """Создает назначение из сохраненной строки."""
+    return Prescription(
+        int(row["prescription_id"]),
+        row["medication"],
+        row["dosage"],
+        row["frequency"],
+        row["duration"],
+    )
+
+
+def entry_to_row(entry: RecordEntry) -> Dict[str, Any]:
+    """Преобразует запись медицинской карты в строку для сохранения."""
+    doctor = entry.doctor
+    diagnosis = entry.diagnosis
+    return {
+        "entry_id": entry.entry_id,
+        "entry_day": entry.entry_day,
+        "doctor_id": doctor.doctor_id if doctor else None,
+        "diagnosis_id": diagnosis.diagnosis_id if diagnosis else None,
+        "symptoms": entry.symptoms,
+        "treatment": entry.treatment,
+        "prescriptions": [
+            prescription_to_row(prescription) for prescription in entry.prescriptions
+        ],
+    }
+
+
+def entry_from_row(row: Row, service: PolyclinicService) -> RecordEntry:
+    """Создает запись медицинской карты из сохраненной строки.
+
+    Врач или диагноз, удаленные после сохранения, становятся None.
+    """
+    doctor_id = row.get("doctor_id")
+    diagnosis_id = row.get("diagnosis_id")
+    return RecordEntry(
+        int(row["entry_id"]),
+        int(row["entry_day"]),
+        service.get_doctor(doctor_id) if doctor_id is not None else None,
+        service.get_diagnosis(diagnosis_id) if diagnosis_id is not None else None,
+        row["symptoms"],
+        row["treatment"],
+        [prescription_from_row(prescription) for prescription in row["prescriptions"]],
+    )
+
+
+# Разделы снимка в порядке зависимостей: (раздел, тег элемента XML, описание)
+SECTIONS: List[Tuple[str, str, str]] = [
+    ("patients", "patient", "пациента"),
+    ("doctors", "doctor", "врача"),
+    ("departments", "department", "отделения"),
+    ("rooms", "room", "кабинета"),
+    ("services", "service", "услуги"),
+    ("diagnoses", "diagnosis", "диагноза"),
+    ("appointments", "appointment", "записи на прием"),
+]
+
+_HYDRATORS: Dict[str, Tuple[Callable, Callable]] = {
+    "patients": (patient_from_row, PolyclinicService.restore_patient),
+    "doctors": (doctor_from_row, PolyclinicService.restore_doctor),
+    "departments": (department_from_row, PolyclinicService.restore_department),
+    "rooms": (room_from_row, PolyclinicService.restore_room),
+    "services": (service_from_row, PolyclinicService.restore_service),
+    "diagnoses": (diagnosis_from_row, PolyclinicService.restore_diagnosis),
+    "appointments": (appointment_from_row, PolyclinicService.restore_appointment),
+}
+
+
+_SERIALIZERS: Dict[str, Callable[[Any], Dict[str, Any]]] = {
+    "patients": patient_to_row,
+    "doctors": doctor_to_row,
+    "departments": department_to_row,
+    "rooms": room_to_row,
+    "services": service_to_row,
+    "diagnoses": diagnosis_to_row,
+    "appointments": appointment_to_row,
+}
+
+
+_DELETERS: Dict[str, Callable[[PolyclinicService, int], bool]] = {
+    "patients": PolyclinicService.delete_patient,
+    "doctors": PolyclinicService.delete_doctor,
+    "departments": PolyclinicService.delete_department,
+    "rooms": PolyclinicService.delete_room,
+    "services": PolyclinicService.delete_service,
+    "appointments": PolyclinicService.delete_appointment,
+}
+
+
+def hydrate_row(service: PolyclinicService, section: str, row: Row) -> Any:
+    """Восстанавливает объект раздела в сервисе, сохраняя его ID.
+
+    Возвращает восстановленный объект.
+    """
+    factory, restore = _HYDRATORS[section]
+    entity = factory(row, service)
+    restore(service, entity)
+    return entity
+
+
+def iter_rows(service: PolyclinicService, section: str) -> Iterator[Dict[str, Any]]:
+    """Перебирает строки раздела для сохранения, не копируя коллекцию."""
+    to_row = _SERIALIZERS[section]
+    for entity in service.iter_entities(section):
+        yield to_row(entity)
+
+
+def entity_to_row(section: str, entity: Any) -> Dict[str, Any]:
+    """Преобразует объект раздела в строку для сохранения."""
+    return _SERIALIZERS[section](entity)
+
+
+def delete_row(service: PolyclinicService, section: str, entity_id: int) -> bool:
+    """Удаляет объект раздела по ID через сервис."""
+    return _DELETERS[section](service, entity_id)
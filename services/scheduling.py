@@ -0,0 +1,189 @@
+from bisect import bisect_left, bisect_right, insort
+from heapq import merge
+from typing import Callable, Dict, Iterable, Iterator, List, Optional, Tuple
+from models import Appointment, ValidationError
+from models.dates import MINUTES_PER_DAY, parse_date, parse_time
+
+# Рабочее время приема (минуты от начала суток) и шаг сетки свободных окон
+WORKDAY_START = 8 * 60
+WORKDAY_END = 21 * 60
+SLOT_STEP = 15
+
+
+def to_interval(date: str, time: str, duration: int) -> Tuple[int, int]:
+    """Возвращает интервал [начало, конец) в минутах от начала эпохи."""
+    start = parse_date(date) * MINUTES_PER_DAY + parse_time(time)
+    return start, start + max(duration, 1)
+
+
+def appointment_interval(appointment: Appointment) -> Tuple[int, int]:
+    """Возвращает интервал, который занимает запись на прием."""
+    start = appointment.start
+    return start, start + max(appointment.service.duration, 1)
+
+
+def free_starts(
+    busy: Callable[[int, int], Iterable[Tuple[int, int]]],
+    first_day: int,
+    last_day: int,
+    duration: int,
+    step: int = SLOT_STEP,
+    hints: Optional[Dict[int, int]] = None,
+) -> Iterator[int]:
+    """Перебирает по возрастанию начала свободных окон длины duration.
+
+    busy(start, end) - занятые интервалы [начало, конец), пересекающиеся с
+    [start, end), по возрастанию начала (могут пересекаться между собой).
+    Окна лежат в рабочем времени дней first_day..last_day (порядковые
+    номера) и начинаются на сетке step минут от начала рабочего дня;
+    занятый интервал пропускается целиком.
+
+    hints - день -> минута, раньше которой окон этой длины нет. Поиск
+    начинается с нее и сам дополняет словарь; пока время только
+    занимается, границы остаются верными.
+    """
+    duration = max(duration, 1)
+    for day in range(first_day, last_day + 1):
+        opening = day * MINUTES_PER_DAY + WORKDAY_START
+        closing = day * MINUTES_PER_DAY + WORKDAY_END
+        start = opening if hints is None else hints.get(day, opening)
+        intervals = iter(busy(start, closing))
+        current = next(intervals, None)
+        found = False
+        while start + duration <= closing:
+            while current is not None and current[1] <= start:
+                current = next(intervals, None)
+            if current is not None and current[0] < start + duration:
+                # Окно задевает занятый интервал: следующее окно на сетке
+                # начинается не раньше его конца
+                start = opening + -(-(current[1] - opening) // step) * step
+                continue
+            if not found and hints is not None:
+                hints[day] = start
+            found = True
+            yield start
+            start += step
+        if not found and hints is not None:
+            hints[day] = closing
+
+
+class IntervalCalendar:
+    """Календарь интервалов [начало, конец), по возрастанию начала.
+
+    Основные интервалы не пересекаются. Пересечения бывают только в ранее
+    сохраненных данных (add с overlap=True): такие интервалы хранятся
+    отдельным коротким списком и учитываются всеми выборками.
+    """
+
+    def __init__(self) -> None:
+        self._starts: List[int] = []
+        self._ends: List[int] = []
+        self._ids: List[int] = []
+        # (начало, конец, ID) интервалов, пересекающих другие, по возрастанию
+        self._overlapping: List[Tuple[int, int, int]] = []
+
+    def __len__(self) -> int:
+        return len(self._starts) + len(self._overlapping)
+
+    def __iter__(self) -> Iterator[Tuple[int, int, int]]:
+        intervals = zip(self._starts, self._ends, self._ids)
+        if not self._overlapping:
+            return iter(intervals)
+        return merge(intervals, self._overlapping)
+
+    def _overlapping_between(self, start: int, end: int) -> List[Tuple[int, int, int]]:
+        """Пересекающиеся интервалы, задевающие [start, end)."""
+        return [
+            interval
+            for interval in self._overlapping
+            if interval[0] < end and interval[1] > start
+        ]
+
+    def find_overlap(self, start: int, end: int) -> Optional[int]:
+        """Возвращает ID интервала, пересекающегося с [start, end), или None."""
+        # Основные интервалы не пересекаются, поэтому концы упорядочены так
+        # же, как начала: достаточно проверить последний интервал,
+        # начавшийся до end.
+        i = bisect_left(self._starts, end)
+        if i and self._ends[i - 1] > start:
+            return self._ids[i - 1]
+        if self._overlapping:
+            found = self._overlapping_between(start, end)
+            if found:
+                return found[0][2]
+        return None
+
+    def add(self, start: int, end: int, item_id: int, overlap: bool = False) -> None:
+        """Добавляет интервал.
+
+        Пересечение с существующими интервалами допустимо только с
+        overlap=True (загрузка сохраненных данных).
+        """
+        if self.find_overlap(start, end) is not None:
+            if not overlap:
+                raise ValidationError("Интервал пересекается с существующим")
+            insort(self._overlapping, (start, end, item_id))
+            return
+        i = bisect_right(self._starts, start)
+        self._starts.insert(i, start)
+        self._ends.insert(i, end)
+        self._ids.insert(i, item_id)
+
+    def remove(self, start: int, item_id: int) -> bool:
+        """Удаляет интервал с заданным началом и ID."""
+        i = bisect_left(self._starts, start)
+        while i < len(self._starts) and self._starts[i] == start:
+            if self._ids[i] == item_id:
+                del self._starts[i]
+                del self._ends[i]
+                del self._ids[i]
+                return True
+            i += 1
+        for i, interval in enumerate(self._overlapping):
+            if interval[0] == start and interval[2] == item_id:
+                del self._overlapping[i]
+                return True
+        return False
+
+    def between(self, start: int, end: int) -> Iterator[Tuple[int, int, int]]:
+        """Перебирает интервалы, пересекающиеся с [start, end), по возрастанию."""
+        if self._overlapping:
+            return merge(
+                self._between(start, end), self._overlapping_between(start, end)
+            )
+        return self._between(start, end)
+
+    def _between(self, start: int, end: int) -> Iterator[Tuple[int, int, int]]:
+        i = bisect_left(self._starts, start)
+        if i and self._ends[i - 1] > start:
+            i -= 1
+        while i < len(self._starts) and self._starts[i] < end:
+            yield self._starts[i], self._ends[i], self._ids[i]
+            i += 1
+
+    def spans(self, start: int, end: int) -> Iterator[Tuple[int, int]]:
+        """Перебирает (начало, конец) интервалов, пересекающихся с [start, end).
+
+        Интервалы копируются срезами растущей длины по мере чтения.
+        Календарь нельзя менять, пока поток читают.
+        """
+        if self._overlapping:
+            return merge(
+                self._spans(start, end),
+                (
+                    (first, last)
+                    for first, last, _ in self._overlapping_between(start, end)
+                ),
+            )
+        return self._spans(start, end)
+
+    def _spans(self, start: int, end: int) -> Iterator[Tuple[int, int]]:
+        i = bisect_left(self._starts, start)
+        if i and self._ends[i - 1] > start:
+            i -= 1
+        j = bisect_left(self._starts, end, i)
+        size = 32
+        while i < j:
+            k = min(i + size, j)
+            yield from zip(self._starts[i:k], self._ends[i:k])
+            i, size = k, min(size * 2, 4096)
@@ -0,0 +1,346 @@
+"""Поиск пациентов и врачей по началу фамилии, номеру документа или телефону.
+
+PersonIndex хранит отсортированные списки пар (ключ, ID): "фамилия имя",
+"имя фамилия", номера документов (страховки у пациентов, лицензии у
+врачей) и телефоны. Поиск по префиксу - два двоичных поиска, поэтому
+число совпадений известно сразу, а страница результатов вырезается из
+диапазона без перебора остальных совпадений.
+
+Для поиска с опечатками TrigramIndex хранит словарь различных фамилий
+(и имен) с их триграммами: похожие слова - те, у которых много общих
+триграмм с запросом.
+"""
+
+import re
+from bisect import bisect_left, insort
+from collections import Counter
+from typing import Callable, Dict, Iterable, Iterator, List, Optional, Set, Tuple
+
+from models import Person
+
+_NOT_DIGITS = re.compile(r"\D")
+_NUMBER_NOISE = re.compile(r"[\s\-]")
+_HAS_LETTERS = re.compile(r"[^\W\d_]")
+
+# Символ, который больше любого символа ключа: граница диапазона префикса
+_PREFIX_END = "\U0010ffff"
+
+# Наименьшее сходство (доля общих триграмм), при котором слово считается
+# похожим на запрос
+MIN_SIMILARITY = 0.3
+
+Key = Tuple[str, int]
+
+# Коллекции с поиском людей: коллекция -> (поле ID, поле номера документа)
+SEARCH_FIELDS = {
+    "patients": ("patient_id", "insurance_number"),
+    "doctors": ("doctor_id", "license_number"),
+}
+
+
+def normalize_name(name: str) -> str:
+    """Ключ имени: без регистра, ё приравнена к е, пробелы схлопнуты."""
+    return " ".join(name.casefold().replace("ё", "е").split())
+
+
+def normalize_number(number: str) -> str:
+    """Ключ номера документа: без пробелов и дефисов, без регистра."""
+    if number.isalnum():
+        # Номера обычно хранятся без разделителей
+        return number.casefold()
+    return _NUMBER_NOISE.sub("", number).casefold()
+
+
+def normalize_phone(phone: str) -> str:
+    """Ключ телефона: 10 цифр номера без кода страны (+7, 7 или 8)."""
+    if phone[:2] == "+7" and len(phone) == 12 and phone[2:].isdecimal():
+        # Частый случай: телефон сохранен как +7XXXXXXXXXX
+        return phone[2:]
+    digits = _NOT_DIGITS.sub("", phone)
+    if len(digits) == 11 and digits[0] in "78":
+        return digits[1:]
+    return digits
+
+
+def _phone_prefix(query: str) -> str:
+    """Префикс ключа телефона по началу номера, набранному пользователем."""
+    digits = _NOT_DIGITS.sub("", query)
+    if query.lstrip().startswith("+") or (digits[:1] == "8" and len(digits) > 1):
+        # +7... и 8... - код страны и префикс выхода на межгород
+        return digits[1:]
+    return normalize_phone(digits)
+
+
+def trigrams(word: str) -> Set[str]:
+    """Триграммы слова; начало слова дополняется двумя пробелами, конец - одним."""
+    padded = f"  {word} "
+    return {padded[i : i + 3] for i in range(len(padded) - 2)}
+
+
+class TrigramIndex:
+    """Словарь слов с их триграммами для поиска слов с опечатками.
+
+    Слово хранится один раз, сколько бы людей его ни носили: счетчик
+    слова убирает его из словаря, когда уходит последний носитель.
+    """
+
+    def __init__(self) -> None:
+        self._counts: Dict[str, int] = {}
+        self._sizes: Dict[str, int] = {}
+        self._words: Dict[str, Set[str]] = {}
+
+    def __len__(self) -> int:
+        return len(self._counts)
+
+    def add(self, word: str, count: int = 1) -> None:
+        """Добавляет count носителей слова."""
+        previous = self._counts.get(word, 0)
+        self._counts[word] = previous + count
+        if not previous:
+            grams = trigrams(word)
+            self._sizes[word] = len(grams)
+            for gram in grams:
+                words = self._words.get(gram)
+                if words is None:
+                    words = self._words[gram] = set()
+                words.add(word)
+
+    def remove(self, word: str) -> None:
+        """Убирает одного носителя слова."""
+        count = self._counts.get(word, 0) - 1
+        if count > 0:
+            self._counts[word] = count
+            return
+        if count < 0:
+            return
+        del self._counts[word]
+        del self._sizes[word]
+        for gram in trigrams(word):
+            words = self._words[gram]
+            words.discard(word)
+            if not words:
+                del self._words[gram]
+
+    def similar(
+        self, word: str, threshold: float = MIN_SIMILARITY
+    ) -> List[Tuple[float, str]]:
+        """Возвращает похожие слова со сходством не меньше threshold.
+
+        Сходство - доля общих триграмм (мера Жаккара); слова упорядочены
+        по убыванию сходства.
+        """
+        grams = trigrams(word)
+        shared: Counter = Counter()
+        for gram in grams:
+            words = self._words.get(gram)
+            if words:
+                shared.update(words)
+        size = len(grams)
+        sizes = self._sizes
+        found = []
+        for candidate, common in shared.items():
+            similarity = common / (size + sizes[candidate] - common)
+            if similarity >= threshold:
+                found.append((similarity, candidate))
+        found.sort(key=lambda item: (-item[0], item[1]))
+        return found
+
+
+class PersonIndex:
+    """Отсортированные ключи поиска людей одной коллекции.
+
+    number_attribute - поле номера документа (insurance_number или
+    license_number). Объекты людей индекс не хранит, только их ID.
+    """
+
+    def __init__(self, id_attribute: str, number_attribute: str) -> None:
+        self._id_attribute = id_attribute
+        self._number_attribute = number_attribute
+        self._names: List[Key] = []
+        self._first_names: List[Key] = []
+        self._numbers: List[Key] = []
+        self._phones: List[Key] = []
+        self._last_words = TrigramIndex()
+        self._first_words = TrigramIndex()
+
+    def _lists(self) -> Tuple[List[Key], ...]:
+        return self._names, self._first_names, self._numbers, self._phones
+
+    def _keys(
+        self, person: Person, name_key: Callable[[str], str] = normalize_name
+    ) -> Iterator[Tuple[List[Key], Key]]:
+        person_id = getattr(person, self._id_attribute)
+        last_name = name_key(person.last_name)
+        first_name = name_key(person.first_name)
+        yield self._names, (f"{last_name} {first_name}", person_id)
+        yield self._first_names, (f"{first_name} {last_name}", person_id)
+        number = getattr(person, self._number_attribute)
+        yield self._numbers, (normalize_number(number), person_id)
+        yield self._phones, (normalize_phone(person.phone), person_id)
+
+    def build(self, persons: Iterable[Person]) -> None:
+        """Заполняет индекс заново одной сортировкой."""
+        for keys in self._lists():
+            keys.clear()
+        # Имена повторяются, поэтому каждое нормализуется один раз
+        name_keys: Dict[str, str] = {}
+
+        def name_key(name: str) -> str:
+            key = name_keys.get(name)
+            if key is None:
+                key = name_keys[name] = normalize_name(name)
+            return key
+
+        last_names: Counter = Counter()
+        first_names: Counter = Counter()
+        for person in persons:
+            for keys, key in self._keys(person, name_key):
+                keys.append(key)
+            last_names[person.last_name] += 1
+            first_names[person.first_name] += 1
+        for keys in self._lists():
+            keys.sort()
+
+        self._last_words = TrigramIndex()
+        self._first_words = TrigramIndex()
+        for words, counts in (
+            (self._last_words, last_names),
+            (self._first_words, first_names),
+        ):
+            for name, count in counts.items():
+                words.add(name_key(name), count)
+
+    def add(self, person: Person) -> None:
+        """Добавляет ключи человека."""
+        for keys, key in self._keys(person):
+            insort(keys, key)
+        self._last_words.add(normalize_name(person.last_name))
+        self._first_words.add(normalize_name(person.first_name))
+
+    def remove(self, person: Person) -> None:
+        """Удаляет ключи человека."""
+        for keys, key in self._keys(person):
+            position = bisect_left(keys, key)
+            if position < len(keys) and keys[position] == key:
+                del keys[position]
+        self._last_words.remove(normalize_name(person.last_name))
+        self._first_words.remove(normalize_name(person.first_name))
+
+    def __len__(self) -> int:
+        return len(self._names)
+
+    @staticmethod
+    def _range(keys: List[Key], prefix: str) -> Tuple[int, int]:
+        """Границы ключей, начинающихся с prefix."""
+        return (
+            bisect_left(keys, (prefix,)),
+            bisect_left(keys, (prefix + _PREFIX_END,)),
+        )
+
+    def _ranges(self, query: str) -> List[Tuple[List[Key], int, int]]:
+        """Диапазоны совпадений запроса по спискам ключей, в порядке выдачи.
+
+        Запрос с буквами ищется среди фамилий и номеров документов,
+        запрос из цифр - среди номеров документов и телефонов.
+        """
+        if _HAS_LETTERS.search(query):
+            targets = [
+                (self._names, normalize_name(query)),
+                (self._numbers, normalize_number(query)),
+            ]
+        else:
+            targets = [(self._numbers, normalize_number(query))]
+            phone = _phone_prefix(query)
+            if phone:
+                targets.append((self._phones, phone))
+        ranges = []
+        for keys, prefix in targets:
+            if prefix:
+                low, high = self._range(keys, prefix)
+                if low < high:
+                    ranges.append((keys, low, high))
+        return ranges
+
+    def search(
+        self, query: str, offset: int = 0, limit: int = 20
+    ) -> Tuple[int, List[int]]:
+        """Возвращает число совпадений и ID людей на странице запроса.
+
+        На страницу попадают совпадения с номерами [offset, offset + limit).
+        Сначала идут совпадения по фамилии по алфавиту, затем по номеру
+        документа, затем по телефону. Если таких совпадений нет, запрос с
+        буквами ищется как фамилия и имя с опечатками (similar).
+        """
+        ranges = self._ranges(query)
+        if not ranges and _HAS_LETTERS.search(query):
+            return self.similar(query, offset, limit)
+        total = 0
+        page: List[int] = []
+        for keys, low, high in ranges:
+            size = high - low
+            start = max(offset - total, 0)
+            stop = min(offset + limit - total, size)
+            if start < stop:
+                page.extend(
+                    person_id for _, person_id in keys[low + start : low + stop]
+                )
+            total += size
+        return total, page
+
+    def complete(self, prefix: str, limit: int = 10) -> List[int]:
+        """Возвращает ID не больше limit людей для подсказок по началу имени.
+
+        Подходят люди, у которых с prefix начинается "фамилия имя" или "имя
+        фамилия". Сначала идут совпадения по фамилии, затем по имени,
+        каждые по алфавиту.
+        """
+        prefix = normalize_name(prefix)
+        if not prefix:
+            return []
+        found: List[int] = []
+        seen: Set[int] = set()
+        for keys in (self._names, self._first_names):
+            low, high = self._range(keys, prefix)
+            for _, person_id in keys[low : min(high, low + limit)]:
+                if person_id not in seen:
+                    seen.add(person_id)
+                    found.append(person_id)
+                    if len(found) == limit:
+                        return found
+        return found
+
+    def similar(
+        self, query: str, offset: int = 0, limit: int = 20
+    ) -> Tuple[int, List[int]]:
+        """Ищет людей по фамилии (и имени) с опечатками.
+
+        Первое слово запроса сравнивается с фамилиями, второе, если есть, -
+        с именами. Возвращает число найденных и ID на странице [offset,
+        offset + limit) по убыванию сходства.
+        """
+        words = normalize_name(query).split(" ")
+        if not words[0]:
+            return 0, []
+        first_names: Optional[Dict[str, float]] = None
+        if len(words) > 1:
+            first_names = {
+                word: similarity
+                for similarity, word in self._first_words.similar(words[1])
+            }
+            if not first_names:
+                return 0, []
+
+        found: List[Tuple[float, str, int]] = []
+        for similarity, last_name in self._last_words.similar(words[0]):
+            low, high = self._range(self._names, last_name + " ")
+            for key, person_id in self._names[low:high]:
+                score = similarity
+                if first_names is not None:
+                    first_similarity = first_names.get(key[len(last_name) + 1 :])
+                    if first_similarity is None:
+                        continue
+                    score += first_similarity
+                found.append((-score, key, person_id))
+        found.sort()
+        page = found[offset : offset + limit]
+        return len(found), [person_id for _, _, person_id in page]
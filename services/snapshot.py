@@ -0,0 +1,408 @@
+"""Бинарный снимок данных поликлиники с ленивой загрузкой через mmap.
+
+Формат (little-endian, версия 2):
+
+* заголовок: сигнатура, версия, число таблиц и каталог таблиц
+  (имя, смещение, число записей);
+* таблицы записей фиксированной длины, упорядоченные по ID;
+* таблица строк: смещение и длина каждой строки в общем блоке UTF-8.
+
+Строковые поля записей хранятся как номера в таблице строк, одинаковые
+строки записываются один раз. Пациенты и записи на прием декодируются
+только при обращении к ним.
+"""
+
+import mmap
+import os
+import struct
+from operator import attrgetter
+from typing import (
+    BinaryIO,
+    Callable,
+    Dict,
+    Iterable,
+    Iterator,
+    List,
+    Optional,
+    Tuple,
+)
+from models import (
+    Patient,
+    Doctor,
+    Department,
+    Room,
+    MedicalService,
+    Diagnosis,
+    Appointment,
+    MedicalRecord,
+    STATUS_CANCELLED,
+    format_date,
+    format_time,
+)
+from .lazy import LazyEntityMap, RecordTable
+from .polyclinic_service import ID_COUNTERS, AppointmentIndexRow, PolyclinicService
+from .scheduling import MINUTES_PER_DAY
+from .unique_index import NumberRow, person_numbers
+
+MAGIC = b"PCLSNAP\0"
+VERSION = 2
+
+_HEADER = struct.Struct("<8sHH")
+_TABLE_ENTRY = struct.Struct("<16sQQ")
+_STRING_ENTRY = struct.Struct("<QI")
+
+# Форматы записей таблиц; первое поле (кроме meta) - ID объекта
+_FORMATS: Dict[str, str] = {
+    # название, адрес, счетчики следующих ID
+    "meta": "<II" + "I" * len(ID_COUNTERS),
+    # ID, имя, фамилия, день рождения, телефон, страховка, ID мед. карты
+    "patients": "<IIIiIII",
+    # ID, имя, фамилия, день рождения, телефон, специализация, лицензия
+    "doctors": "<IIIiIII",
+    # ID, название, этаж, ID заведующего
+    "departments": "<IIiI",
+    # ID, номер, этаж, тип, ID отделения
+    "rooms": "<IIiII",
+    # ID, название, описание, стоимость, длительность
+    "services": "<IIIdi",
+    # ID, код, название, описание
+    "diagnoses": "<IIII",
+    # ID, пациент, врач, кабинет, услуга, день, минута начала, причина, статус
+    "appointments": "<IIIIIiHII",
+}
+_TABLES = list(_FORMATS) + ["strings", "blob"]
+_WRITE_BATCH = 4096
+
+
+class _StringTable:
+    """Накопитель уникальных строк снимка."""
+
+    def __init__(self) -> None:
+        self._ids: Dict[str, int] = {}
+        self._encoded: List[bytes] = []
+
+    def add(self, text: str) -> int:
+        """Возвращает номер строки, добавляя ее при первом появлении."""
+        string_id = self._ids.get(text)
+        if string_id is None:
+            string_id = self._ids[text] = len(self._encoded)
+            self._encoded.append((text or "").encode("utf-8"))
+        return string_id
+
+    def write(self, f: BinaryIO) -> Tuple[int, int, int]:
+        """Пишет индекс и блок строк; возвращает (смещение индекса, число
+        строк, смещение блока)."""
+        index_offset = f.tell()
+        position = 0
+        for encoded in self._encoded:
+            f.write(_STRING_ENTRY.pack(position, len(encoded)))
+            position += len(encoded)
+        blob_offset = f.tell()
+        for encoded in self._encoded:
+            f.write(encoded)
+        return index_offset, len(self._encoded), blob_offset
+
+
+def _write_records(f: BinaryIO, record_format: str, records: Iterable[Tuple]) -> int:
+    """Пишет записи таблицы пакетами и возвращает их число."""
+    record_struct = struct.Struct(record_format)
+    batch: List[bytes] = []
+    count = 0
+    for record in records:
+        batch.append(record_struct.pack(*record))
+        count += 1
+        if len(batch) >= _WRITE_BATCH:
+            f.write(b"".join(batch))
+            batch.clear()
+    f.write(b"".join(batch))
+    return count
+
+
+def _records(service: PolyclinicService, strings: _StringTable) -> Dict[str, Iterator]:
+    """Возвращает генераторы кортежей записей для каждой таблицы."""
+    s = strings.add
+
+    def by_id(collection: str, id_attr: str) -> List:
+        return sorted(service.iter_entities(collection), key=attrgetter(id_attr))
+
+    counters = service.get_id_counters()
+    return {
+        "meta": iter(
+            [(s(service.name), s(service.address), *(counters[k] for k in ID_COUNTERS))]
+        ),
+        "patients": (
+            (
+                p.patient_id,
+                s(p.first_name),
+                s(p.last_name),
+                p.birth_day,
+                s(p.phone),
+                s(p.insurance_number),
+                p.medical_record.record_id if p.medical_record else 0,
+            )
+            for p in by_id("patients", "patient_id")
+        ),
+        "doctors": (
+            (
+                d.doctor_id,
+                s(d.first_name),
+                s(d.last_name),
+                d.birth_day,
+                s(d.phone),
+                s(d.specialization),
+                s(d.license_number),
+            )
+            for d in by_id("doctors", "doctor_id")
+        ),
+        "departments": (
+            (d.department_id, s(d.name), d.floor, d.head_doctor.doctor_id)
+            for d in by_id("departments", "department_id")
+        ),
+        "rooms": (
+            (
+                r.room_id,
+                s(r.room_number),
+                r.floor,
+                s(r.room_type),
+                r.department.department_id,
+            )
+            for r in by_id("rooms", "room_id")
+        ),
+        "services": (
+            (m.service_id, s(m.name), s(m.description), m.cost, m.duration)
+            for m in by_id("services", "service_id")
+        ),
+        "diagnoses": (
+            (g.diagnosis_id, s(g.code), s(g.name), s(g.description))
+            for g in by_id("diagnoses", "diagnosis_id")
+        ),
+        "appointments": (
+            (
+                a.appointment_id,
+                a.patient.patient_id,
+                a.doctor.doctor_id,
+                a.room.room_id,
+                a.service.service_id,
+                a.day,
+                a.minute,
+                s(a.reason),
+                s(a.status),
+            )
+            for a in by_id("appointments", "appointment_id")
+        ),
+    }
+
+
+def save_snapshot(service: PolyclinicService, filename: str) -> None:
+    """Сохраняет сервис в бинарный снимок.
+
+    Файл пишется во временный и атомарно подменяет старый, поэтому уже
+    открытые через mmap снимки остаются читаемыми.
+    """
+    strings = _StringTable()
+    records = _records(service, strings)
+    directory: Dict[str, Tuple[int, int]] = {}
+    temp_name = f"{filename}.tmp"
+
+    with open(temp_name, "wb") as f:
+        f.write(b"\0" * (_HEADER.size + _TABLE_ENTRY.size * len(_TABLES)))
+        for name, record_format in _FORMATS.items():
+            offset = f.tell()
+            directory[name] = (offset, _write_records(f, record_format, records[name]))
+        index_offset, string_count, blob_offset = strings.write(f)
+        directory["strings"] = (index_offset, string_count)
+        directory["blob"] = (blob_offset, f.tell() - blob_offset)
+
+        f.seek(0)
+        f.write(_HEADER.pack(MAGIC, VERSION, len(_TABLES)))
+        for name in _TABLES:
+            f.write(_TABLE_ENTRY.pack(name.encode("ascii"), *directory[name]))
+
+    os.replace(temp_name, filename)
+
+
+class _Snapshot:
+    """Открытый через mmap снимок: доступ к таблицам и строкам."""
+
+    def __init__(self, filename: str) -> None:
+        with open(filename, "rb") as f:
+            self._mm = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+
+        magic, version, table_count = _HEADER.unpack_from(self._mm, 0)
+        if magic != MAGIC:
+            raise ValueError("Файл не является снимком поликлиники")
+        if version != VERSION:
+            raise ValueError(f"Неподдерживаемая версия снимка: {version}")
+
+        self._directory: Dict[str, Tuple[int, int]] = {}
+        for i in range(table_count):
+            name, offset, count = _TABLE_ENTRY.unpack_from(
+                self._mm, _HEADER.size + i * _TABLE_ENTRY.size
+            )
+            self._directory[name.rstrip(b"\0").decode("ascii")] = (offset, count)
+
+        self._strings = self.table("strings", _STRING_ENTRY.format)
+        self._blob_offset = self._directory["blob"][0]
+
+    def has_table(self, name: str) -> bool:
+        """Проверяет, есть ли в снимке таблица (ранние снимки без диагнозов)."""
+        return name in self._directory
+
+    def table(self, name: str, record_format: str = "") -> RecordTable:
+        """Возвращает таблицу записей по имени."""
+        offset, count = self._directory[name]
+        return RecordTable(self._mm, offset, count, record_format or _FORMATS[name])
+
+    def text(self, string_id: int) -> str:
+        """Декодирует строку по номеру в таблице строк."""
+        offset, length = self._strings.unpack(string_id)
+        start = self._blob_offset + offset
+        return self._mm[start : start + length].decode("utf-8")
+
+
+def load_snapshot(
+    filename: str, bind_record: Optional[Callable[[MedicalRecord], None]] = None
+) -> PolyclinicService:
+    """Открывает бинарный снимок.
+
+    Врачи, отделения, кабинеты, услуги и диагнозы восстанавливаются сразу,
+    пациенты и записи на прием декодируются по требованию, а индексы
+    записей строятся при первой операции, которой они нужны. bind_record
+    вызывается для медицинской карты каждого декодированного пациента.
+    """
+    snapshot = _Snapshot(filename)
+    text = snapshot.text
+
+    name_id, address_id, *counters = snapshot.table("meta").unpack(0)
+    service = PolyclinicService(text(name_id), text(address_id))
+
+    for doctor_id, first, last, birth, phone, spec, license in snapshot.table(
+        "doctors"
+    ):
+        service.restore_doctor(
+            Doctor(
+                doctor_id,
+                text(first),
+                text(last),
+                format_date(birth),
+                text(phone),
+                text(spec),
+                text(license),
+            )
+        )
+    for department_id, name, floor, head_id in snapshot.table("departments"):
+        service.restore_department(
+            Department(department_id, text(name), floor, service.get_doctor(head_id))
+        )
+    for room_id, number, floor, room_type, department_id in snapshot.table("rooms"):
+        service.restore_room(
+            Room(
+                room_id,
+                text(number),
+                floor,
+                text(room_type),
+                service.get_department(department_id),
+            )
+        )
+    durations: Dict[int, int] = {}
+    for service_id, name, description, cost, duration in snapshot.table("services"):
+        service.restore_service(
+            MedicalService(service_id, text(name), text(description), cost, duration)
+        )
+        durations[service_id] = max(duration, 1)
+    if snapshot.has_table("diagnoses"):
+        for diagnosis_id, code, name, description in snapshot.table("diagnoses"):
+            service.restore_diagnosis(
+                Diagnosis(diagnosis_id, text(code), text(name), text(description))
+            )
+
+    def decode_patient(fields: Tuple) -> Patient:
+        patient_id, first, last, birth, phone, insurance, record_id = fields
+        patient = Patient(
+            patient_id,
+            text(first),
+            text(last),
+            format_date(birth),
+            text(phone),
+            text(insurance),
+        )
+        if record_id:
+            record = MedicalRecord(
+                record_id, patient, service.repository.record_listener
+            )
+            if bind_record is not None:
+                bind_record(record)
+        return patient
+
+    def decode_appointment(fields: Tuple) -> Appointment:
+        (
+            appointment_id,
+            patient_id,
+            doctor_id,
+            room_id,
+            service_id,
+            day,
+            minute,
+            reason,
+            status,
+        ) = fields
+        appointment = Appointment(
+            appointment_id,
+            service.get_patient(patient_id),
+            service.get_doctor(doctor_id),
+            service.get_room(room_id),
+            format_date(day),
+            format_time(minute),
+            service.get_service(service_id),
+            text(reason),
+        )
+        appointment.status = text(status)
+        return appointment
+
+    appointments_table = snapshot.table("appointments")
+
+    def appointment_rows() -> Iterator[AppointmentIndexRow]:
+        # Читает поля прямо из таблицы, не создавая объектов Appointment
+        active: Dict[int, bool] = {}
+        for (
+            appointment_id,
+            patient_id,
+            doctor_id,
+            room_id,
+            service_id,
+            day,
+            minute,
+            _,
+            status,
+        ) in appointments_table:
+            if status not in active:
+                active[status] = text(status) != STATUS_CANCELLED
+            start = day * MINUTES_PER_DAY + minute
+            yield (
+                appointment_id,
+                patient_id,
+                doctor_id,
+                room_id,
+                service_id,
+                start,
+                start + durations[service_id],
+                active[status],
+            )
+
+    patients = LazyEntityMap(snapshot.table("patients"), decode_patient)
+
+    def patient_numbers() -> Iterator[NumberRow]:
+        # Номера сохраненных пациентов читаются прямо из таблицы
+        for patient_id, _, _, _, phone, insurance, _ in patients.stored_rows():
+            yield patient_id, text(insurance), text(phone)
+        for patient in patients.added():
+            yield person_numbers("patients", patient)
+
+    service.attach_lazy_collections(
+        patients,
+        LazyEntityMap(appointments_table, decode_appointment),
+        appointment_rows,
+        patient_numbers,
+    )
+    service.restore_id_counters(dict(zip(ID_COUNTERS, counters)))
+    return service
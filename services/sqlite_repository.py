@@ -0,0 +1,767 @@
+import os
+import sqlite3
+from contextlib import contextmanager
+from typing import Any, Callable, Dict, Iterator, List, Mapping, Optional, Set, Tuple
+from models import (
+    Patient,
+    Doctor,
+    Department,
+    Room,
+    MedicalService,
+    Diagnosis,
+    Appointment,
+    MedicalRecord,
+    STATUS_CANCELLED,
+    format_date,
+    format_time,
+)
+from .repository import APPOINTMENT_OWNERS, Repository, entity_id
+from .scheduling import MINUTES_PER_DAY, appointment_interval
+from .unique_index import UNIQUE_FIELDS, UniqueIndex
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS meta (
+    key TEXT PRIMARY KEY,
+    value TEXT NOT NULL
+);
+CREATE TABLE IF NOT EXISTS patients (
+    id INTEGER PRIMARY KEY,
+    first_name TEXT NOT NULL,
+    last_name TEXT NOT NULL,
+    birth_day INTEGER NOT NULL,
+    phone TEXT NOT NULL,
+    insurance_number TEXT NOT NULL,
+    record_id INTEGER,
+    insurance_number_key TEXT NOT NULL DEFAULT '',
+    phone_key TEXT NOT NULL DEFAULT ''
+);
+CREATE INDEX IF NOT EXISTS patients_insurance ON patients (insurance_number);
+CREATE TABLE IF NOT EXISTS doctors (
+    id INTEGER PRIMARY KEY,
+    first_name TEXT NOT NULL,
+    last_name TEXT NOT NULL,
+    birth_day INTEGER NOT NULL,
+    phone TEXT NOT NULL,
+    specialization TEXT NOT NULL,
+    license_number TEXT NOT NULL,
+    license_number_key TEXT NOT NULL DEFAULT '',
+    phone_key TEXT NOT NULL DEFAULT ''
+);
+CREATE TABLE IF NOT EXISTS departments (
+    id INTEGER PRIMARY KEY,
+    name TEXT NOT NULL,
+    floor INTEGER NOT NULL,
+    head_doctor_id INTEGER NOT NULL
+);
+CREATE INDEX IF NOT EXISTS departments_head ON departments (head_doctor_id);
+CREATE TABLE IF NOT EXISTS rooms (
+    id INTEGER PRIMARY KEY,
+    room_number TEXT NOT NULL,
+    floor INTEGER NOT NULL,
+    room_type TEXT NOT NULL,
+    department_id INTEGER NOT NULL
+);
+CREATE INDEX IF NOT EXISTS rooms_department ON rooms (department_id);
+CREATE TABLE IF NOT EXISTS services (
+    id INTEGER PRIMARY KEY,
+    name TEXT NOT NULL,
+    description TEXT NOT NULL,
+    cost REAL NOT NULL,
+    duration INTEGER NOT NULL
+);
+CREATE TABLE IF NOT EXISTS diagnoses (
+    id INTEGER PRIMARY KEY,
+    code TEXT NOT NULL,
+    name TEXT NOT NULL,
+    description TEXT NOT NULL
+);
+CREATE TABLE IF NOT EXISTS appointments (
+    id INTEGER PRIMARY KEY,
+    patient_id INTEGER NOT NULL,
+    doctor_id INTEGER NOT NULL,
+    room_id INTEGER NOT NULL,
+    service_id INTEGER NOT NULL,
+    date INTEGER NOT NULL,
+    time INTEGER NOT NULL,
+    end_minute INTEGER NOT NULL,
+    reason TEXT NOT NULL,
+    status TEXT NOT NULL,
+    active INTEGER NOT NULL
+);
+CREATE INDEX IF NOT EXISTS appointments_doctor_slot
+    ON appointments (doctor_id, date, time);
+CREATE INDEX IF NOT EXISTS appointments_room_slot
+    ON appointments (room_id, date, time);
+CREATE INDEX IF NOT EXISTS appointments_patient ON appointments (patient_id);
+CREATE INDEX IF NOT EXISTS appointments_service ON appointments (service_id);
+"""
+
+# Столбцы таблиц в порядке полей строк. Даты хранятся как порядковые номера
+# дней, время приема (time) - как минута от начала суток, end_minute - конец
+# приема в минутах от начала эпохи
+COLUMNS: Dict[str, Tuple[str, ...]] = {
+    "patients": (
+        "id",
+        "first_name",
+        "last_name",
+        "birth_day",
+        "phone",
+        "insurance_number",
+        "record_id",
+    ),
+    "doctors": (
+        "id",
+        "first_name",
+        "last_name",
+        "birth_day",
+        "phone",
+        "specialization",
+        "license_number",
+    ),
+    "departments": ("id", "name", "floor", "head_doctor_id"),
+    "rooms": ("id", "room_number", "floor", "room_type", "department_id"),
+    "services": ("id", "name", "description", "cost", "duration"),
+    "diagnoses": ("id", "code", "name", "description"),
+    "appointments": (
+        "id",
+        "patient_id",
+        "doctor_id",
+        "room_id",
+        "service_id",
+        "date",
+        "time",
+        "end_minute",
+        "reason",
+        "status",
+        "active",
+    ),
+}
+
+# Столбцы нормализованных уникальных номеров людей (поле_key), по которым
+# проверяется занятость номера: таблица -> ((столбец, поле, нормализация), ...).
+# В строки объектов они не входят и дописываются при вставке.
+_NUMBER_COLUMNS: Dict[str, Tuple[Tuple[str, str, Callable[[str], str]], ...]] = {
+    table: tuple((f"{field}_key", field, normalize) for field, normalize, _ in fields)
+    for table, (_, fields) in UNIQUE_FIELDS.items()
+}
+
+# Счетчики следующих ID: (тип объекта, таблица, столбец)
+_ID_SOURCES = (
+    ("patient", "patients", "id"),
+    ("doctor", "doctors", "id"),
+    ("department", "departments", "id"),
+    ("room", "rooms", "id"),
+    ("service", "services", "id"),
+    ("diagnosis", "diagnoses", "id"),
+    ("appointment", "appointments", "id"),
+    ("record", "patients", "record_id"),
+)
+# Столбцы ID в строках таблиц: таблица -> ((тип объекта, номер столбца), ...)
+_ID_COLUMNS: Dict[str, Tuple[Tuple[str, int], ...]] = {
+    table: tuple(
+        (kind, COLUMNS[table].index(column))
+        for kind, source, column in _ID_SOURCES
+        if source == table
+    )
+    for table in COLUMNS
+}
+# Ключи счетчиков следующих ID в таблице meta: next_<тип объекта>
+_COUNTER_PREFIX = "next_"
+
+# Размер пакета вставок, отправляемого одним executemany
+WRITE_BATCH = 1000
+
+Row = Tuple[Any, ...]
+
+
+class SqliteCollection(Mapping):
+    """Карта ID -> объект поверх таблицы SQLite.
+
+    Прочитанные и добавленные объекты хранятся в карте идентичности, поэтому
+    повторное обращение возвращает тот же объект без запроса к базе.
+    """
+
+    def __init__(
+        self, repository: "SqliteRepository", table: str, decode: Callable[[Row], Any]
+    ) -> None:
+        self._repository = repository
+        self._table = table
+        self._decode = decode
+        self._select = f"SELECT {', '.join(COLUMNS[table])} FROM {table}"
+        self.cache: Dict[int, Any] = {}
+
+    def _load(self, row: Row) -> Any:
+        entity = self.cache.get(row[0])
+        if entity is None:
+            entity = self.cache[row[0]] = self._decode(row)
+        return entity
+
+    def __getitem__(self, entity_id: int) -> Any:
+        entity = self.cache.get(entity_id)
+        if entity is not None:
+            return entity
+        # Все еще не записанные объекты лежат в карте идентичности, поэтому
+        # выборка по ID не требует сброса пакета вставок
+        row = self._repository.connection.execute(
+            f"{self._select} WHERE id = ?", (entity_id,)
+        ).fetchone()
+        if row is None:
+            raise KeyError(entity_id)
+        return self._load(row)
+
+    def __contains__(self, entity_id: object) -> bool:
+        if entity_id in self.cache:
+            return True
+        return (
+            self._repository.connection.execute(
+                f"SELECT 1 FROM {self._table} WHERE id = ?", (entity_id,)
+            ).fetchone()
+            is not None
+        )
+
+    def __len__(self) -> int:
+        return self._repository.query(
+            self._table, f"SELECT COUNT(*) FROM {self._table}"
+        ).fetchone()[0]
+
+    def __iter__(self) -> Iterator[int]:
+        cursor = self._repository.query(
+            self._table, f"SELECT id FROM {self._table} ORDER BY id"
+        )
+        return iter([entity_id for entity_id, in cursor])
+
+    def values(self) -> Iterator[Any]:  # type: ignore[override]
+        """Перебирает объекты по возрастанию ID одним запросом."""
+        cursor = self._repository.query(self._table, f"{self._select} ORDER BY id")
+        for row in cursor:
+            yield self._load(row)
+
+    def page(self, offset: int, limit: int) -> List[Any]:
+        """Возвращает объекты с номерами [offset, offset + limit) по возрастанию ID."""
+        cursor = self._repository.query(
+            self._table, f"{self._select} ORDER BY id LIMIT ? OFFSET ?", (limit, offset)
+        )
+        return [self._load(row) for row in cursor]
+
+
+class SqliteRepository(Repository):
+    """Хранилище в базе SQLite.
+
+    Соединение открывается один раз и используется всеми запросами.
+    Вставки копятся пакетами и отправляются через executemany; вне
+    transaction() каждое изменение фиксируется сразу, внутри - при выходе
+    из внешнего блока.
+    """
+
+    def __init__(self, path: str) -> None:
+        self.path = os.path.abspath(path)
+        self.connection = sqlite3.connect(self.path)
+        self.connection.execute("PRAGMA journal_mode = WAL")
+        self.connection.execute("PRAGMA synchronous = NORMAL")
+        self.connection.executescript(SCHEMA)
+        self._add_number_columns()
+
+        self._depth = 0
+        self._pending: Dict[str, List[Row]] = {table: [] for table in COLUMNS}
+        # Врачи и кабинеты, у которых есть еще не записанные записи на прием
+        self._pending_owners: Set[Tuple[str, int]] = set()
+        # Длительность самой долгой записи на прием (минуты): пересекать
+        # интервал могут только записи, начавшиеся не раньше чем за столько
+        # минут до него. Считается при первой проверке занятости.
+        self._longest: Optional[int] = None
+        self._inserts = {}
+        for table, columns in COLUMNS.items():
+            columns += tuple(column for column, _, _ in _NUMBER_COLUMNS.get(table, ()))
+            self._inserts[table] = (
+                f"INSERT INTO {table} ({', '.join(columns)}) "
+                f"VALUES ({', '.join('?' * len(columns))})"
+            )
+        # Индексы уникальных номеров (коллекция -> индекс); помнят только
+        # номера еще не записанных людей
+        self._unique_indexes: Dict[str, SqliteUniqueIndex] = {}
+
+        # Следующие ID по типам объектов. Хранятся в meta и только растут,
+        # поэтому ID удаленных объектов не выдаются повторно и в следующих
+        # сеансах; измененные счетчики записываются вместе со вставками.
+        self._next_ids = self._stored_counters()
+        self._changed_counters: Set[str] = set()
+        # ID пациентов, удаленных в еще не зафиксированной транзакции
+        self._removed_patients: List[int] = []
+
+        # Вызывается для медицинской карты каждого прочитанного пациента
+        # (подключение хранилища карт, см. services.record_store)
+        self.bind_record: Optional[Callable[[MedicalRecord], None]] = None
+        # Вызывается после фиксации удаления пациентов с их ID (стирание
+        # их карт в хранилище карт, см. services.record_store)
+        self.drop_records: Optional[Callable[[List[int]], None]] = None
+
+        self.patients = SqliteCollection(self, "patients", self._decode_patient)
+        self.doctors = SqliteCollection(self, "doctors", self._decode_doctor)
+        self.departments = SqliteCollection(
+            self, "departments", self._decode_department
+        )
+        self.rooms = SqliteCollection(self, "rooms", self._decode_room)
+        self.services = SqliteCollection(self, "services", self._decode_service)
+        self.diagnoses = SqliteCollection(self, "diagnoses", self._decode_diagnosis)
+        self.appointments = SqliteCollection(
+            self, "appointments", self._decode_appointment
+        )
+
+    def _add_number_columns(self) -> None:
+        """Заполняет и индексирует столбцы нормализованных номеров.
+
+        В базах, созданных до появления этих столбцов, они добавляются и
+        заполняются по уже сохраненным номерам.
+        """
+        for table, numbers in _NUMBER_COLUMNS.items():
+            existing = {
+                row[1] for row in self.connection.execute(f"PRAGMA table_info({table})")
+            }
+            missing = [number for number in numbers if number[0] not in existing]
+            for column, _, _ in missing:
+                self.connection.execute(
+                    f"ALTER TABLE {table} ADD COLUMN {column} TEXT NOT NULL DEFAULT ''"
+                )
+            if missing:
+                fields = ", ".join(field for _, field, _ in missing)
+                rows = self.connection.execute(f"SELECT id, {fields} FROM {table}")
+                self.connection.executemany(
+                    f"UPDATE {table} SET "
+                    f"{', '.join(f'{column} = ?' for column, _, _ in missing)} "
+                    f"WHERE id = ?",
+                    [
+                        (
+                            *(
+                                normalize(value)
+                                for (_, _, normalize), value in zip(missing, values)
+                            ),
+                            row_id,
+                        )
+                        for row_id, *values in rows.fetchall()
+                    ],
+                )
+            for column, _, _ in numbers:
+                self.connection.execute(
+                    f"CREATE INDEX IF NOT EXISTS {table}_{column} ON {table} ({column})"
+                )
+        self.connection.commit()
+
+    # --- Декодирование строк ---
+
+    def _decode_patient(self, row: Row) -> Patient:
+        patient_id, first, last, birth_day, phone, insurance, record_id = row
+        patient = Patient(
+            patient_id, first, last, format_date(birth_day), phone, insurance
+        )
+        if record_id is not None:
+            record = MedicalRecord(record_id, patient, self.record_listener)
+            if self.bind_record is not None:
+                self.bind_record(record)
+        return patient
+
+    def _decode_doctor(self, row: Row) -> Doctor:
+        doctor_id, first, last, birth_day, phone, specialization, license = row
+        return Doctor(
+            doctor_id,
+            first,
+            last,
+            format_date(birth_day),
+            phone,
+            specialization,
+            license,
+        )
+
+    def _decode_department(self, row: Row) -> Department:
+        department_id, name, floor, head_doctor_id = row
+        return Department(department_id, name, floor, self.doctors[head_doctor_id])
+
+    def _decode_room(self, row: Row) -> Room:
+        room_id, number, floor, room_type, department_id = row
+        return Room(room_id, number, floor, room_type, self.departments[department_id])
+
+    def _decode_service(self, row: Row) -> MedicalService:
+        return MedicalService(*row)
+
+    def _decode_diagnosis(self, row: Row) -> Diagnosis:
+        return Diagnosis(*row)
+
+    def _decode_appointment(self, row: Row) -> Appointment:
+        appointment = Appointment(
+            row[0],
+            self.patients[row[1]],
+            self.doctors[row[2]],
+            self.rooms[row[3]],
+            format_date(row[5]),
+            format_time(row[6]),
+            self.services[row[4]],
+            row[8],
+        )
+        appointment.status = row[9]
+        return appointment
+
+    # --- Кодирование объектов ---
+
+    @staticmethod
+    def _encode(collection: str, entity: Any) -> Row:
+        if collection == "patients":
+            record = entity.medical_record
+            return (
+                entity.patient_id,
+                entity.first_name,
+                entity.last_name,
+                entity.birth_day,
+                entity.phone,
+                entity.insurance_number,
+                record.record_id if record else None,
+            )
+        if collection == "doctors":
+            return (
+                entity.doctor_id,
+                entity.first_name,
+                entity.last_name,
+                entity.birth_day,
+                entity.phone,
+                entity.specialization,
+                entity.license_number,
+            )
+        if collection == "departments":
+            return (
+                entity.department_id,
+                entity.name,
+                entity.floor,
+                entity.head_doctor.doctor_id,
+            )
+        if collection == "rooms":
+            return (
+                entity.room_id,
+                entity.room_number,
+                entity.floor,
+                entity.room_type,
+                entity.department.department_id,
+            )
+        if collection == "services":
+            return (
+                entity.service_id,
+                entity.name,
+                entity.description,
+                entity.cost,
+                entity.duration,
+            )
+        if collection == "diagnoses":
+            return (entity.diagnosis_id, entity.code, entity.name, entity.description)
+
+        _, end = appointment_interval(entity)
+        return (
+            entity.appointment_id,
+            entity.patient.patient_id,
+            entity.doctor.doctor_id,
+            entity.room.room_id,
+            entity.service.service_id,
+            entity.day,
+            entity.minute,
+            end,
+            entity.reason,
+            entity.status,
+            entity.status != STATUS_CANCELLED,
+        )
+
+    # --- Запись и транзакции ---
+
+    def _flush(self) -> None:
+        """Отправляет накопленные вставки и изменившиеся счетчики ID в базу."""
+        for table, rows in self._pending.items():
+            if rows:
+                self.connection.executemany(self._inserts[table], rows)
+                rows.clear()
+        self._pending_owners.clear()
+        # Номера записанных людей теперь находятся запросами
+        for index in self._unique_indexes.values():
+            index.clear()
+        if self._changed_counters:
+            self.connection.executemany(
+                "INSERT OR REPLACE INTO meta (key, value) VALUES (?, ?)",
+                [
+                    (_COUNTER_PREFIX + kind, self._next_ids[kind])
+                    for kind in self._changed_counters
+                ],
+            )
+            self._changed_counters.clear()
+
+    def _stored_counters(self) -> Dict[str, int]:
+        """Читает сохраненные счетчики следующих ID из meta."""
+        rows = self.connection.execute(
+            "SELECT key, value FROM meta WHERE substr(key, 1, ?) = ?",
+            (len(_COUNTER_PREFIX), _COUNTER_PREFIX),
+        )
+        return {key[len(_COUNTER_PREFIX) :]: int(value) for key, value in rows}
+
+    def _advance_counter(self, kind: str, used_id: Optional[int]) -> None:
+        """Сдвигает счетчик следующего ID за выданный ID used_id."""
+        if used_id is not None and used_id >= self._next_ids.get(kind, 1):
+            self._next_ids[kind] = used_id + 1
+            self._changed_counters.add(kind)
+
+    def _written(self) -> None:
+        """Фиксирует изменение, если оно сделано вне транзакции."""
+        if not self._depth:
+            self.commit()
+
+    def commit(self) -> None:
+        """Записывает накопленные вставки и фиксирует транзакцию."""
+        self._flush()
+        self.connection.commit()
+        if self._removed_patients:
+            removed, self._removed_patients = self._removed_patients, []
+            if self.drop_records is not None:
+                self.drop_records(removed)
+
+    @contextmanager
+    def transaction(self) -> Iterator[None]:
+        self._depth += 1
+        try:
+            yield
+        except BaseException:
+            self._depth -= 1
+            if not self._depth:
+                self._rollback()
+            raise
+        self._depth -= 1
+        if not self._depth:
+            self.commit()
+
+    def _rollback(self) -> None:
+        """Откатывает транзакцию и сбрасывает карты идентичности."""
+        for rows in self._pending.values():
+            rows.clear()
+        self._pending_owners.clear()
+        self._longest = None
+        self._removed_patients.clear()
+        for index in self._unique_indexes.values():
+            index.clear()
+        self.connection.rollback()
+        self._next_ids = self._stored_counters()
+        self._changed_counters.clear()
+        for collection in COLUMNS:
+            getattr(self, collection).cache.clear()
+
+    def query(self, table: str, sql: str, parameters: Tuple = ()) -> sqlite3.Cursor:
+        """Выполняет запрос, предварительно записав вставки в таблицу table."""
+        if self._pending[table]:
+            self._flush()
+        return self.connection.execute(sql, parameters)
+
+    def add(self, collection: str, entity: Any) -> None:
+        rows = self._pending[collection]
+        row = self._encode(collection, entity)
+        rows.append(
+            row
+            + tuple(
+                normalize(getattr(entity, field))
+                for _, field, normalize in _NUMBER_COLUMNS.get(collection, ())
+            )
+        )
+        getattr(self, collection).cache[entity_id(collection, entity)] = entity
+        for kind, column in _ID_COLUMNS[collection]:
+            self._advance_counter(kind, row[column])
+        if collection == "appointments":
+            self._pending_owners.add(("doctor_id", entity.doctor.doctor_id))
+            self._pending_owners.add(("room_id", entity.room.room_id))
+            if self._longest is not None:
+                start, end = appointment_interval(entity)
+                self._longest = max(self._longest, end - start)
+        if len(rows) >= WRITE_BATCH:
+            self._flush()
+        self._written()
+
+    def remove(self, collection: str, entity: Any) -> None:
+        self._flush()
+        key = entity_id(collection, entity)
+        self.connection.execute(f"DELETE FROM {collection} WHERE id = ?", (key,))
+        getattr(self, collection).cache.pop(key, None)
+        if collection == "patients":
+            self._removed_patients.append(key)
+        self._written()
+
+    def update_appointment_status(self, appointment: Appointment, status: str) -> None:
+        self._flush()
+        self.connection.execute(
+            "UPDATE appointments SET status = ?, active = ? WHERE id = ?",
+            (status, status != STATUS_CANCELLED, appointment.appointment_id),
+        )
+        appointment.status = status
+        self._written()
+
+    # --- Выборки ---
+
+    def appointment_ids(self, owner: str, owner_id: int) -> List[int]:
+        if owner not in APPOINTMENT_OWNERS:
+            raise ValueError(f"Неизвестное поле записи: {owner}")
+        cursor = self.query(
+            "appointments", f"SELECT id FROM appointments WHERE {owner} = ?", (owner_id,)
+        )
+        return [appointment_id for appointment_id, in cursor]
+
+    def has_appointments(self, owner: str, owner_id: int) -> bool:
+        if owner not in APPOINTMENT_OWNERS:
+            raise ValueError(f"Неизвестное поле записи: {owner}")
+        return (
+            self.query(
+                "appointments",
+                f"SELECT 1 FROM appointments WHERE {owner} = ? LIMIT 1",
+                (owner_id,),
+            ).fetchone()
+            is not None
+        )
+
+    def has_rooms(self, department_id: int) -> bool:
+        return (
+            self.query(
+                "rooms",
+                "SELECT 1 FROM rooms WHERE department_id = ? LIMIT 1",
+                (department_id,),
+            ).fetchone()
+            is not None
+        )
+
+    def heads_department(self, doctor_id: int) -> bool:
+        return (
+            self.query(
+                "departments",
+                "SELECT 1 FROM departments WHERE head_doctor_id = ? LIMIT 1",
+                (doctor_id,),
+            ).fetchone()
+            is not None
+        )
+
+    def _lookback(self, start: int) -> int:
+        """Самое раннее начало записи, которая может идти в момент start."""
+        if self._longest is None:
+            row = self.query(
+                "appointments",
+                f"SELECT MAX(end_minute - (date * {MINUTES_PER_DAY} + time)) "
+                f"FROM appointments",
+            ).fetchone()
+            self._longest = row[0] or 0
+        return start - self._longest
+
+    def find_overlap(
+        self, owner: str, owner_id: int, start: int, end: int
+    ) -> Optional[int]:
+        if owner not in ("doctor_id", "room_id"):
+            raise ValueError(f"Неизвестный владелец календаря: {owner}")
+        if (owner, owner_id) in self._pending_owners:
+            self._flush()
+        # Записи, задевающие [start, end), начинаются не раньше _lookback:
+        # просматривается только этот участок индекса (owner, date, time).
+        # Так находятся и пересечения в ранее сохраненных данных.
+        row = self.connection.execute(
+            f"SELECT id FROM appointments "
+            f"WHERE {owner} = ? AND active AND (date, time) >= (?, ?) "
+            f"AND (date, time) <= (?, ?) AND end_minute > ? "
+            f"ORDER BY date, time LIMIT 1",
+            (
+                owner_id,
+                *divmod(self._lookback(start), MINUTES_PER_DAY),
+                *divmod(end - 1, MINUTES_PER_DAY),
+                start,
+            ),
+        ).fetchone()
+        return None if row is None else row[0]
+
+    def busy_intervals(
+        self, owner: str, owner_id: int, start: int, end: int
+    ) -> Iterator[Tuple[int, int]]:
+        if owner not in ("doctor_id", "room_id"):
+            raise ValueError(f"Неизвестный владелец календаря: {owner}")
+        if (owner, owner_id) in self._pending_owners:
+            self._flush()
+        rows = self.connection.execute(
+            f"SELECT date * {MINUTES_PER_DAY} + time, end_minute FROM appointments "
+            f"WHERE {owner} = ? AND active AND (date, time) >= (?, ?) "
+            f"AND (date, time) <= (?, ?) AND end_minute > ? ORDER BY date, time",
+            (
+                owner_id,
+                *divmod(self._lookback(start), MINUTES_PER_DAY),
+                *divmod(end - 1, MINUTES_PER_DAY),
+                start,
+            ),
+        ).fetchall()
+        for busy_start, busy_end in rows:
+            yield busy_start, busy_end
+
+    def page(self, collection: str, offset: int, limit: int) -> List[Any]:
+        return getattr(self, collection).page(offset, limit)
+
+    def id_counters(self) -> Dict[str, int]:
+        self._flush()
+        counters = dict(self._next_ids)
+        # Базы, сохраненные до появления счетчиков в meta, берут их из таблиц
+        for kind, table, column in _ID_SOURCES:
+            (largest,) = self.connection.execute(
+                f"SELECT MAX({column}) FROM {table}"
+            ).fetchone()
+            counters[kind] = max(counters.get(kind, 1), (largest or 0) + 1)
+        return counters
+
+    def unique_index(self, collection: str) -> UniqueIndex:
+        index = self._unique_indexes.get(collection)
+        if index is None:
+            index = self._unique_indexes[collection] = SqliteUniqueIndex(
+                self, collection
+            )
+        return index
+
+    def save_id_counters(self, counters: Mapping[str, int]) -> None:
+        """Сохраняет счетчики следующих ID сервиса, не уменьшая сохраненные."""
+        for kind, next_id in counters.items():
+            self._advance_counter(kind, next_id - 1)
+        self._written()
+
+    # --- Сведения о поликлинике ---
+
+    def save_meta(self, name: str, address: str) -> None:
+        """Сохраняет название и адрес поликлиники."""
+        self.connection.executemany(
+            "INSERT OR REPLACE INTO meta (key, value) VALUES (?, ?)",
+            (("name", name), ("address", address)),
+        )
+        self._written()
+
+    def load_meta(self) -> Optional[Tuple[str, str]]:
+        """Возвращает (название, адрес) или None для пустой базы."""
+        meta = dict(self.connection.execute("SELECT key, value FROM meta"))
+        if "name" not in meta:
+            return None
+        return meta["name"], meta.get("address", "")
+
+    def close(self) -> None:
+        self.commit()
+        self.connection.close()
+
+
+class SqliteUniqueIndex(UniqueIndex):
+    """Уникальные номера людей одной таблицы SQLite.
+
+    Владелец номера ищется запросом по индексированному столбцу
+    нормализованного номера, поэтому коллекция в память не читается. В
+    словарях индекса лежат только номера людей, еще не записанных в базу:
+    хранилище очищает их при записи пакета вставок.
+    """
+
+    def __init__(self, repository: SqliteRepository, collection: str) -> None:
+        super().__init__(collection)
+        self._repository = repository
+        self._selects = {
+            field: f"SELECT id FROM {collection} WHERE {column} = ? "
+            f"ORDER BY id LIMIT 1"
+            for column, field, _ in _NUMBER_COLUMNS[collection]
+        }
+
+    def _owner(self, field: str, key: str) -> Optional[int]:
+        owner = self._ids[field].get(key)
+        if owner is None:
+            row = self._repository.connection.execute(
+                self._selects[field], (key,)
+            ).fetchone()
+            owner = None if row is None else row[0]
+        return owner
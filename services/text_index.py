@@ -0,0 +1,457 @@
+"""Полнотекстовый индекс записей медицинских карт и диагнозов.
+
+Текст разбивается на слова (буквы и цифры), слова приводятся к нижнему
+регистру, ё приравнивается к е, у русских слов отрезается окончание
+(light_stem), служебные слова отбрасываются. Индекс обратный: для каждого
+слова хранится отсортированный массив номеров документов и частоты слова
+в тех документах, где оно встречается больше одного раза. Документ снаружи
+задается ключом - целым числом (для записи карты это entry_key(ID
+пациента, номер записи)).
+
+Поиск находит документы со всеми словами запроса, начиная с самого
+редкого слова, и упорядочивает их по BM25.
+
+Формат файла индекса (little-endian, версия 2):
+
+* заголовок: сигнатура, версия, число документов, число слов, длина
+  блока слов, суммарная длина документов, размер и время изменения (нс)
+  файла карт, с которым индекс согласован;
+* ключи документов (Q) и длины документов (H);
+* таблица слов: смещение списка слова, число документов и число повторов
+  (QII);
+* слова в UTF-8 через перевод строки, по возрастанию;
+* списки слов: номера документов (I), затем повторы - пары (номер
+  документа, частота слова) (IH) для документов, где слово встречается
+  больше одного раза.
+
+При открытии читаются ключи, длины и слова, списки документов слова -
+при первом обращении к слову.
+"""
+
+import heapq
+import math
+import mmap
+import os
+import re
+import struct
+from array import array
+from bisect import bisect_left
+from functools import lru_cache
+from operator import itemgetter
+from typing import Dict, Iterable, List, Optional, Set, Tuple
+from models import Diagnosis, RecordEntry
+
+MAGIC = b"PCLTEXT\0"
+VERSION = 2
+
+_SIGNATURE = struct.Struct("<8sH")
+_HEADER = struct.Struct("<8sHIIIQQQ")
+_TERM_FORMAT = "<QII"
+_TERM = struct.Struct(_TERM_FORMAT)
+_REPEAT = struct.Struct("<IH")
+
+_WORD = re.compile(r"[^\W_]+")
+_CYRILLIC = re.compile(r"[а-я]+")
+
+# Окончания русских слов от длинных к коротким
+_ENDINGS = sorted(
+    (
+        "иями ями ами ией ого его ому ему ыми ими ая яя ое ее ые ие ый ий ой "
+        "ей ом ем ам ям ах ях ов ев ью ия ию ии а я о е ы и у ю ь й"
+    ).split(),
+    key=len,
+    reverse=True,
+)
+_MIN_STEM = 3
+# Гласные, а также й и ь: рядом с ними гласная основы не считается беглой
+_VOWELS = "аеиоуыэюяйь"
+
+STOP_WORDS = frozenset(
+    "а и в во на с со по к ко от до не ни за из у о об при для без под над или "
+    "но же ли бы то как так что это".split()
+)
+
+# Параметры BM25
+_K1 = 1.2
+_B = 0.75
+
+# Во сколько раз список слова должен быть длиннее списка кандидатов, чтобы
+# кандидаты проверялись двоичным поиском, а не пересечением множеств
+_BISECT_RATIO = 32
+
+# Основы частых слов запоминаются: словарь записей карт невелик
+_STEM_CACHE = 1 << 17
+
+_MAX_FREQUENCY = 65535
+_MAX_LENGTH = 65535
+
+
+@lru_cache(maxsize=_STEM_CACHE)
+def light_stem(word: str) -> str:
+    """Отрезает у русского слова окончание, оставляя не меньше _MIN_STEM букв.
+
+    Беглая гласная перед последней согласной основы тоже убирается, чтобы
+    "кашель" и "кашля", "желудок" и "желудке" давали одну основу.
+    """
+    if not _CYRILLIC.fullmatch(word):
+        return word
+    for ending in _ENDINGS:
+        if word.endswith(ending) and len(word) - len(ending) >= _MIN_STEM:
+            word = word[: -len(ending)]
+            break
+    if (
+        len(word) >= _MIN_STEM + 2
+        and word[-2] in "ое"
+        and word[-1] not in _VOWELS
+        and word[-3] not in _VOWELS
+    ):
+        word = word[:-2] + word[-1]
+    return word
+
+
+def tokenize(text: str) -> List[str]:
+    """Разбивает текст на ключи индекса в порядке следования слов."""
+    words = _WORD.findall(text.casefold().replace("ё", "е"))
+    return [
+        light_stem(word)
+        for word in words
+        if word not in STOP_WORDS and (len(word) > 1 or word.isdigit())
+    ]
+
+
+def entry_text(entry: RecordEntry) -> str:
+    """Текст документа записи карты: жалобы, лечение, диагноз и лекарства."""
+    parts = [entry.symptoms, entry.treatment]
+    if entry.diagnosis is not None:
+        parts.append(entry.diagnosis.code)
+        parts.append(entry.diagnosis.name)
+    parts.extend(prescription.medication for prescription in entry.prescriptions)
+    return " ".join(parts)
+
+
+def diagnosis_text(diagnosis: Diagnosis) -> str:
+    """Текст документа диагноза: код, название и описание."""
+    return f"{diagnosis.code} {diagnosis.name} {diagnosis.description}"
+
+
+def entry_key(patient_id: int, entry_id: int) -> int:
+    """Ключ документа записи медицинской карты."""
+    return patient_id << 32 | entry_id
+
+
+def split_entry_key(key: int) -> Tuple[int, int]:
+    """Ключ документа записи -> (ID пациента, номер записи в карте)."""
+    return key >> 32, key & 0xFFFFFFFF
+
+
+def _position(docs: array, doc: int) -> Optional[int]:
+    """Позиция документа в отсортированном списке или None."""
+    position = bisect_left(docs, doc)
+    if position < len(docs) and docs[position] == doc:
+        return position
+    return None
+
+
+class _Postings:
+    """Документы одного слова: номера по возрастанию и повторы слова.
+
+    Частота слова почти всегда 1, поэтому хранятся только частоты больше
+    единицы (номер документа -> частота).
+    """
+
+    __slots__ = ("docs", "repeats")
+
+    def __init__(self) -> None:
+        self.docs = array("I")
+        self.repeats: Dict[int, int] = {}
+
+
+class TextIndex:
+    """Обратный индекс документов с целочисленными ключами.
+
+    Документы только добавляются. Удаленные ключи (discard) запоминаются
+    и пропускаются при поиске, а из файла исчезают при следующем
+    сохранении.
+    """
+
+    def __init__(self) -> None:
+        self._keys = array("Q")
+        self._lengths = array("H")
+        self._total_length = 0
+        self._postings: Dict[str, _Postings] = {}
+        self._removed: Set[int] = set()
+
+        # Открытый файл индекса: слово -> номер строки таблицы слов; списки
+        # документов слова переносятся в _postings при первом обращении
+        self._mm: Optional[mmap.mmap] = None
+        self._stored: Dict[str, int] = {}
+        self._terms_offset = 0
+        self._records_stamp: Tuple[int, int] = (0, 0)
+        self._changed = True
+
+    def __len__(self) -> int:
+        return len(self._keys) - len(self._removed)
+
+    @property
+    def records_stamp(self) -> Tuple[int, int]:
+        """Размер и время изменения (нс) файла карт, с которыми согласован индекс."""
+        return self._records_stamp
+
+    def add(self, key: int, text: str) -> None:
+        """Добавляет документ с ключом key."""
+        counts: Dict[str, int] = {}
+        for term in tokenize(text):
+            counts[term] = counts.get(term, 0) + 1
+        doc = len(self._keys)
+        self._keys.append(key)
+        length = sum(counts.values())
+        self._lengths.append(min(length, _MAX_LENGTH))
+        self._total_length += length
+        for term, count in counts.items():
+            postings = self._term(term, create=True)
+            postings.docs.append(doc)
+            if count > 1:
+                postings.repeats[doc] = min(count, _MAX_FREQUENCY)
+        self._changed = True
+        self._records_stamp = (0, 0)
+
+    def build(self, documents: Iterable[Tuple[int, str]]) -> None:
+        """Добавляет документы (ключ, текст)."""
+        for key, text in documents:
+            self.add(key, text)
+
+    def discard(self, keys: Iterable[int]) -> None:
+        """Исключает документы с ключами keys из результатов поиска."""
+        self._removed.update(keys)
+        self._changed = True
+        self._records_stamp = (0, 0)
+
+    def _term(self, term: str, create: bool = False) -> Optional[_Postings]:
+        """Документы слова; из открытого файла они читаются один раз."""
+        postings = self._postings.get(term)
+        if postings is None:
+            row = self._stored.pop(term, None)
+            if row is not None:
+                postings = self._read_postings(row)
+            elif create:
+                postings = _Postings()
+            else:
+                return None
+            self._postings[term] = postings
+        return postings
+
+    def _read_postings(self, row: int) -> _Postings:
+        position = self._terms_offset + row * _TERM.size
+        offset, count, repeats = _TERM.unpack_from(self._mm, position)
+        postings = _Postings()
+        postings.docs.frombytes(self._mm[offset : offset + 4 * count])
+        offset += 4 * count
+        if repeats:
+            block = self._mm[offset : offset + _REPEAT.size * repeats]
+            postings.repeats = dict(_REPEAT.iter_unpack(block))
+        return postings
+
+    def search(
+        self, query: str, offset: int = 0, limit: int = 20
+    ) -> Tuple[int, List[int]]:
+        """Возвращает число документов со всеми словами запроса и ключи страницы.
+
+        Документы упорядочены по убыванию релевантности (BM25), на
+        страницу попадают документы с номерами [offset, offset + limit).
+        """
+        terms = set(tokenize(query))
+        lists = []
+        for term in terms:
+            postings = self._term(term)
+            if postings is None:
+                return 0, []
+            lists.append(postings)
+        if not lists:
+            return 0, []
+        lists.sort(key=lambda postings: len(postings.docs))
+
+        # Совпадения - документы самого редкого слова, в которых есть и
+        # остальные слова. Короткий список кандидатов проверяется двоичным
+        # поиском по длинному списку слова, иначе списки пересекаются как
+        # множества.
+        matches = set(lists[0].docs)
+        for postings in lists[1:]:
+            docs = postings.docs
+            if len(docs) > _BISECT_RATIO * len(matches):
+                matches = {doc for doc in matches if _position(docs, doc) is not None}
+            else:
+                matches.intersection_update(docs)
+            if not matches:
+                return 0, []
+        keys = self._keys
+        if self._removed:
+            removed = self._removed
+            matches = {doc for doc in matches if keys[doc] not in removed}
+
+        # BM25: вклад слова с частотой f в документ с нормой длины n равен
+        # idf * (K1 + 1) * f / (f + n). Сначала все слова считаются
+        # встреченными по одному разу, затем поправляются повторы.
+        documents = len(keys)
+        lengths = self._lengths
+        norm_base = _K1 * (1 - _B)
+        norm_length = _K1 * _B * documents / self._total_length
+        weights = []
+        for postings in lists:
+            count = len(postings.docs)
+            idf = math.log(1 + (documents - count + 0.5) / (count + 0.5))
+            weights.append(idf * (_K1 + 1))
+        total = sum(weights)
+        norms = {doc: norm_base + norm_length * lengths[doc] for doc in matches}
+        scores = {doc: total / (1 + norm) for doc, norm in norms.items()}
+        for postings, weight in zip(lists, weights):
+            for doc, frequency in postings.repeats.items():
+                norm = norms.get(doc)
+                if norm is not None:
+                    scores[doc] += weight * (
+                        frequency / (frequency + norm) - 1 / (1 + norm)
+                    )
+
+        best = heapq.nlargest(offset + limit, scores.items(), key=itemgetter(1))
+        return len(scores), [keys[doc] for doc, _ in best[offset:]]
+
+    def save(self, filename: str, records_stamp: Tuple[int, int] = (0, 0)) -> None:
+        """Записывает индекс в файл (через временный файл).
+
+        records_stamp - отпечаток файла карт (размер, время изменения в нс),
+        с которым согласован индекс; индекс запоминает его до следующего
+        изменения. Неизмененный индекс, открытый из файла, копируется
+        байтами с новым отпечатком в заголовке.
+        """
+        temp_name = f"{filename}.tmp"
+        if not self._changed and self._mm is not None:
+            header = list(_HEADER.unpack_from(self._mm, 0))
+            header[-2:] = records_stamp
+            with open(temp_name, "wb") as f:
+                f.write(_HEADER.pack(*header))
+                f.write(self._mm[_HEADER.size :])
+            os.replace(temp_name, filename)
+            self._records_stamp = records_stamp
+            return
+
+        # Номера документов без удаленных; -1 - удаленный документ
+        keys = self._keys
+        renumber = None
+        if self._removed:
+            renumber = array("i")
+            alive = 0
+            for key in keys:
+                if key in self._removed:
+                    renumber.append(-1)
+                else:
+                    renumber.append(alive)
+                    alive += 1
+            kept = [doc for doc in range(len(keys)) if renumber[doc] >= 0]
+            keys = array("Q", [keys[doc] for doc in kept])
+            lengths = array("H", [self._lengths[doc] for doc in kept])
+        else:
+            lengths = self._lengths
+        total_length = sum(lengths)
+
+        lists: List[Tuple[str, _Postings]] = []
+        for term in sorted({*self._postings, *self._stored}):
+            postings = self._postings.get(term)
+            if postings is None:
+                postings = self._read_postings(self._stored[term])
+            if renumber is not None:
+                postings = _renumbered(postings, renumber)
+            if postings.docs:
+                lists.append((term, postings))
+
+        terms_blob = "\n".join(term for term, _ in lists).encode("utf-8")
+        table_offset = _HEADER.size + len(keys) * 10
+        offset = table_offset + len(lists) * _TERM.size + len(terms_blob)
+        table = []
+        for _, postings in lists:
+            count = len(postings.docs)
+            repeats = len(postings.repeats)
+            table.append(_TERM.pack(offset, count, repeats))
+            offset += 4 * count + _REPEAT.size * repeats
+
+        with open(temp_name, "wb") as f:
+            f.write(
+                _HEADER.pack(
+                    MAGIC,
+                    VERSION,
+                    len(keys),
+                    len(lists),
+                    len(terms_blob),
+                    total_length,
+                    *records_stamp,
+                )
+            )
+            f.write(keys.tobytes())
+            f.write(lengths.tobytes())
+            f.write(b"".join(table))
+            f.write(terms_blob)
+            for _, postings in lists:
+                f.write(postings.docs.tobytes())
+                f.write(
+                    b"".join(
+                        _REPEAT.pack(doc, frequency)
+                        for doc, frequency in sorted(postings.repeats.items())
+                    )
+                )
+        os.replace(temp_name, filename)
+        self._records_stamp = records_stamp
+
+    @classmethod
+    def open(cls, filename: str) -> "TextIndex":
+        """Открывает файл индекса; списки слов читаются по мере обращения."""
+        index = cls()
+        with open(filename, "rb") as f:
+            mm = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        # Сигнатура проверяется до разбора заголовка: у прежних версий он
+        # короче
+        magic, version = (
+            _SIGNATURE.unpack_from(mm, 0) if len(mm) >= _SIGNATURE.size else (b"", 0)
+        )
+        if magic != MAGIC:
+            mm.close()
+            raise ValueError("Файл не является полнотекстовым индексом")
+        if version != VERSION or len(mm) < _HEADER.size:
+            mm.close()
+            raise ValueError(f"Неподдерживаемая версия индекса: {version}")
+        (
+            _,
+            _,
+            documents,
+            terms,
+            terms_size,
+            total_length,
+            records_size,
+            records_mtime,
+        ) = _HEADER.unpack_from(mm, 0)
+
+        offset = _HEADER.size
+        index._keys.frombytes(mm[offset : offset + 8 * documents])
+        offset += 8 * documents
+        index._lengths.frombytes(mm[offset : offset + 2 * documents])
+        offset += 2 * documents
+        index._terms_offset = offset
+        offset += terms * _TERM.size
+        words = mm[offset : offset + terms_size].decode("utf-8").split("\n")
+        index._stored = dict(zip(words, range(terms))) if terms else {}
+        index._total_length = total_length
+        index._records_stamp = (records_size, records_mtime)
+        index._mm = mm
+        index._changed = False
+        return index
+
+
+def _renumbered(postings: _Postings, renumber: array) -> _Postings:
+    """Документы слова в новой нумерации, без удаленных."""
+    result = _Postings()
+    result.docs = array(
+        "I", [renumber[doc] for doc in postings.docs if renumber[doc] >= 0]
+    )
+    result.repeats = {
+        renumber[doc]: frequency
+        for doc, frequency in postings.repeats.items()
+        if renumber[doc] >= 0
+    }
+    return result
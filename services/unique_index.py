@@ -0,0 +1,172 @@
+"""Уникальные номера людей: страховки, лицензии и телефоны.
+
+UniqueIndex хранит словари "нормализованный номер -> ID" для полей одной
+коллекции, поэтому проверка занятости номера при добавлении человека и
+поиск человека по номеру не перебирают коллекцию. Пустые номера не
+индексируются и уникальными не считаются.
+
+Хранилище может подставить свой индекс (Repository.unique_index): SQLite
+ищет номера запросами к базе, а номера лениво загруженного снимка читаются
+из его таблицы при первой проверке.
+"""
+
+from typing import Any, Callable, Dict, Iterable, List, Optional, Tuple
+
+from models import Person, ValidationError
+
+from .search import normalize_number, normalize_phone
+
+# Уникальное поле: (поле, нормализация номера, название для сообщений)
+UniqueField = Tuple[str, Callable[[str], str], str]
+
+# Уникальные поля коллекций: коллекция -> (поле ID, уникальные поля)
+UNIQUE_FIELDS: Dict[str, Tuple[str, Tuple[UniqueField, ...]]] = {
+    "patients": (
+        "patient_id",
+        (
+            ("insurance_number", normalize_number, "Номер страховки"),
+            ("phone", normalize_phone, "Телефон"),
+        ),
+    ),
+    "doctors": (
+        "doctor_id",
+        (
+            ("license_number", normalize_number, "Номер лицензии"),
+            ("phone", normalize_phone, "Телефон"),
+        ),
+    ),
+}
+
+# Номера человека: (ID, номера уникальных полей в порядке UNIQUE_FIELDS)
+NumberRow = Tuple[Any, ...]
+
+
+def person_numbers(collection: str, person: Person) -> NumberRow:
+    """Возвращает номера человека коллекции в виде NumberRow."""
+    id_attribute, fields = UNIQUE_FIELDS[collection]
+    return (
+        getattr(person, id_attribute),
+        *(getattr(person, field) for field, _, _ in fields),
+    )
+
+
+class UniqueIndex:
+    """Словари уникальных номеров людей одной коллекции.
+
+    Объекты людей индекс не хранит, только их ID. stored - источник
+    номеров уже сохраненных людей, который читается при первой проверке,
+    поиске или удалении; до этого register не разбирает номера
+    загружаемых людей, так как они попадут в stored.
+    """
+
+    def __init__(
+        self,
+        collection: str,
+        stored: Optional[Callable[[], Iterable[NumberRow]]] = None,
+    ) -> None:
+        self._collection = collection
+        self._id_attribute, self._fields = UNIQUE_FIELDS[collection]
+        self._normalizers = {field: normalize for field, normalize, _ in self._fields}
+        self._ids: Dict[str, Dict[str, int]] = {
+            field: {} for field in self._normalizers
+        }
+        self._stored = stored
+
+    def build(self, persons: Iterable[Person]) -> None:
+        """Заполняет индекс людьми, уже сохраненными в коллекции."""
+        collection = self._collection
+        self.build_rows(person_numbers(collection, person) for person in persons)
+
+    def build_rows(self, rows: Iterable[NumberRow]) -> None:
+        """Заполняет индекс номерами людей, уже сохраненных в коллекции.
+
+        Повторы в ранее сохраненных данных не считаются ошибкой: номер
+        остается за первым человеком, чтобы данные можно было загрузить.
+        """
+        self._stored = None
+        self.clear()
+        columns = [
+            (self._ids[field], normalize) for field, normalize, _ in self._fields
+        ]
+        for person_id, *numbers in rows:
+            for (ids, normalize), number in zip(columns, numbers):
+                key = normalize(number)
+                if key:
+                    ids.setdefault(key, person_id)
+
+    def clear(self) -> None:
+        """Забывает все номера."""
+        for ids in self._ids.values():
+            ids.clear()
+
+    def _load(self) -> None:
+        """Читает номера сохраненных людей, если они еще не прочитаны."""
+        if self._stored is not None:
+            self.build_rows(self._stored())
+
+    def _owner(self, field: str, key: str) -> Optional[int]:
+        """Возвращает ID владельца нормализованного номера key или None."""
+        return self._ids[field].get(key)
+
+    def _keys(self, person: Person) -> List[Tuple[str, str, str]]:
+        """(поле, нормализованный номер, название) непустых номеров человека."""
+        keys = []
+        for field, normalize, label in self._fields:
+            key = normalize(getattr(person, field))
+            if key:
+                keys.append((field, key, label))
+        return keys
+
+    def claim(self, person: Person) -> None:
+        """Занимает номера нового человека.
+
+        Если номер уже занят другим человеком, выбрасывается
+        ValidationError и ни один номер не занимается.
+        """
+        self._load()
+        person_id = getattr(person, self._id_attribute)
+        keys = self._keys(person)
+        for field, key, label in keys:
+            owner = self._owner(field, key)
+            if owner is not None and owner != person_id:
+                value = getattr(person, field)
+                raise ValidationError(f"{label} {value} уже занят (ID {owner})")
+        for field, key, _ in keys:
+            self._ids[field][key] = person_id
+
+    def register(self, person: Person) -> List[str]:
+        """Добавляет номера загруженного человека, не отклоняя повторов.
+
+        Как и в build, занятый номер остается за первым человеком.
+        Возвращает сообщения о повторах, чтобы загрузка могла о них
+        предупредить.
+        """
+        if self._stored is not None:
+            return []
+        person_id = getattr(person, self._id_attribute)
+        duplicates = []
+        for field, key, label in self._keys(person):
+            owner = self._owner(field, key)
+            if owner is None:
+                self._ids[field][key] = person_id
+            elif owner != person_id:
+                value = getattr(person, field)
+                duplicates.append(
+                    f"{label} {value} у ID {person_id} уже занят (ID {owner})"
+                )
+        return duplicates
+
+    def remove(self, person: Person) -> None:
+        """Освобождает номера удаленного человека."""
+        self._load()
+        person_id = getattr(person, self._id_attribute)
+        for field, key, _ in self._keys(person):
+            ids = self._ids[field]
+            if ids.get(key) == person_id:
+                del ids[key]
+
+    def get(self, field: str, value: str) -> Optional[int]:
+        """Возвращает ID человека с номером value в поле field или None."""
+        self._load()
+        key = self._normalizers[field](value)
+        return self._owner(field, key) if key else None
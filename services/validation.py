@@ -0,0 +1,344 @@
+"""Проверка данных поликлиники пачками.
+
+Правила полей - функции, которые возвращают текст ошибки или None и
+ничего не печатают. Регулярные выражения компилируются один раз при
+импорте модуля, даты разбираются кэшируемыми parse_date/parse_time.
+RecordValidator применяет правила раздела к строкам или к столбцам и
+возвращает список FieldError; его используют загрузчики
+PolyclinicFileManager и диалоги main.Validator.
+"""
+
+import re
+from typing import Any, Callable, Dict, Iterable, List, Mapping, Optional, Sequence
+from models import (
+    ValidationError,
+    STATUS_SCHEDULED,
+    STATUS_COMPLETED,
+    STATUS_CANCELLED,
+    parse_date,
+    parse_time,
+)
+from .rows import Row
+
+Rule = Callable[[Any], Optional[str]]
+
+_NAME = re.compile(r"[a-zA-Zа-яА-ЯёЁ\s\-]+")
+_LICENSE = re.compile(r"[a-zA-Zа-яА-ЯёЁ0-9\-]+")
+_ROOM_NUMBER = re.compile(r"[a-zA-Zа-яА-ЯёЁ0-9\-\s]+")
+_PHONE_NOISE = re.compile(r"[^\d+]")
+_INSURANCE_NOISE = re.compile(r"[\s\-]")
+
+_STATUSES = frozenset((STATUS_SCHEDULED, STATUS_COMPLETED, STATUS_CANCELLED))
+
+
+class FieldError:
+    """Ошибка поля в строке пачки."""
+
+    __slots__ = ("row", "field", "value", "message")
+
+    def __init__(self, row: int, field: str, value: Any, message: str) -> None:
+        self.row = row
+        self.field = field
+        self.value = value
+        self.message = message
+
+    def __str__(self) -> str:
+        return f"строка {self.row}, поле {self.field}: {self.message}"
+
+    def __repr__(self) -> str:
+        return (
+            f"FieldError(row={self.row}, field={self.field!r}, "
+            f"value={self.value!r}, message={self.message!r})"
+        )
+
+
+def _text(value: Any) -> str:
+    return "" if value is None else str(value)
+
+
+def check_name(value: Any, field_name: str = "Имя") -> Optional[str]:
+    """Проверяет имя, фамилию или название."""
+    text = _text(value)
+    if len(text.strip()) < 2:
+        return f"{field_name} должно содержать минимум 2 символа"
+    if not _NAME.fullmatch(text):
+        return f"{field_name} может содержать только буквы, пробелы и дефисы"
+    return None
+
+
+def check_phone(value: Any) -> Optional[str]:
+    """Проверяет номер телефона."""
+    phone = _PHONE_NOISE.sub("", _text(value))
+    if (
+        (phone.startswith("+7") and len(phone) == 12)
+        or (phone.startswith("8") and len(phone) == 11)
+        or (phone.startswith("7") and len(phone) == 11)
+    ):
+        return None
+    return (
+        "Неверный формат телефона. Используйте: +7XXX..., 8XXX... или 7XXX... "
+        "(10 цифр после кода)"
+    )
+
+
+def check_date(value: Any) -> Optional[str]:
+    """Проверяет дату в формате ГГГГ-ММ-ДД."""
+    try:
+        parse_date(value)
+    except ValidationError:
+        return "Неверный формат даты. Используйте: ГГГГ-ММ-ДД"
+    return None
+
+
+def check_time(value: Any) -> Optional[str]:
+    """Проверяет время в формате ЧЧ:ММ."""
+    try:
+        parse_time(value)
+    except ValidationError:
+        return "Неверный формат времени. Используйте: ЧЧ:ММ"
+    return None
+
+
+def check_insurance_number(value: Any) -> Optional[str]:
+    """Проверяет номер страховки - только 16 цифр."""
+    number = _INSURANCE_NOISE.sub("", _text(value))
+    if not number:
+        return "Номер страховки не может быть пустым"
+    if len(number) != 16:
+        return "Номер страховки должен содержать ровно 16 цифр"
+    if not number.isdigit():
+        return "Номер страховки должен содержать только цифры"
+    return None
+
+
+def check_license_number(value: Any) -> Optional[str]:
+    """Проверяет номер лицензии врача."""
+    text = _text(value)
+    if len(text.strip()) < 5:
+        return "Номер лицензии должен содержать минимум 5 символов"
+    if not _LICENSE.fullmatch(text):
+        return "Номер лицензии может содержать только буквы, цифры и дефисы"
+    return None
+
+
+def check_specialization(value: Any) -> Optional[str]:
+    """Проверяет специализацию врача."""
+    text = _text(value)
+    if len(text.strip()) < 3:
+        return "Специализация должна содержать минимум 3 символа"
+    if not _NAME.fullmatch(text):
+        return "Специализация может содержать только буквы, пробелы и дефисы"
+    return None
+
+
+def check_floor(value: Any) -> Optional[str]:
+    """Проверяет номер этажа."""
+    try:
+        floor = int(value)
+    except (TypeError, ValueError):
+        return "Этаж должен быть числом"
+    if not 1 <= floor <= 50:
+        return "Этаж должен быть от 1 до 50"
+    return None
+
+
+def check_room_number(value: Any) -> Optional[str]:
+    """Проверяет номер кабинета."""
+    text = _text(value)
+    if not text.strip():
+        return "Номер кабинета не может быть пустым"
+    if not _ROOM_NUMBER.fullmatch(text):
+        return "Номер кабинета может содержать только буквы, цифры, пробелы и дефисы"
+    return None
+
+
+def check_cost(value: Any) -> Optional[str]:
+    """Проверяет стоимость."""
+    try:
+        cost = float(value)
+    except (TypeError, ValueError):
+        return "Стоимость должна быть числом"
+    if cost < 0:
+        return "Стоимость не может быть отрицательной"
+    return None
+
+
+def check_duration(value: Any) -> Optional[str]:
+    """Проверяет длительность в минутах."""
+    try:
+        duration = int(value)
+    except (TypeError, ValueError):
+        return "Длительность должна быть целым числом"
+    if not 1 <= duration <= 480:
+        return "Длительность должна быть от 1 до 480 минут"
+    return None
+
+
+def check_diagnosis_code(value: Any) -> Optional[str]:
+    """Проверяет код диагноза."""
+    if len(_text(value).strip()) < 2:
+        return "Код диагноза должен содержать минимум 2 символа"
+    return None
+
+
+def check_diagnosis_name(value: Any) -> Optional[str]:
+    """Проверяет название диагноза."""
+    if not _text(value).strip():
+        return "Название диагноза не может быть пустым"
+    return None
+
+
+def check_id(value: Any) -> Optional[str]:
+    """Проверяет идентификатор - положительное целое число."""
+    try:
+        if int(value) > 0:
+            return None
+    except (TypeError, ValueError):
+        pass
+    return "ID должен быть положительным целым числом"
+
+
+def check_status(value: Any) -> Optional[str]:
+    """Проверяет статус записи на прием (пустой - запланирован)."""
+    if value and value not in _STATUSES:
+        return f"Неизвестный статус записи: {value}"
+    return None
+
+
+def _named(field_name: str) -> Rule:
+    return lambda value: check_name(value, field_name)
+
+
+# Правила полей сохраняемых строк по разделам
+SECTION_RULES: Dict[str, Dict[str, Rule]] = {
+    "patients": {
+        "patient_id": check_id,
+        "first_name": _named("Имя"),
+        "last_name": _named("Фамилия"),
+        "birth_date": check_date,
+        "phone": check_phone,
+        "insurance_number": check_insurance_number,
+    },
+    "doctors": {
+        "doctor_id": check_id,
+        "first_name": _named("Имя"),
+        "last_name": _named("Фамилия"),
+        "birth_date": check_date,
+        "phone": check_phone,
+        "specialization": check_specialization,
+        "license_number": check_license_number,
+    },
+    "departments": {
+        "department_id": check_id,
+        "name": _named("Название"),
+        "floor": check_floor,
+        "head_doctor_id": check_id,
+    },
+    "rooms": {
+        "room_id": check_id,
+        "room_number": check_room_number,
+        "floor": check_floor,
+        "department_id": check_id,
+    },
+    "services": {
+        "service_id": check_id,
+        "cost": check_cost,
+        "duration": check_duration,
+    },
+    "diagnoses": {
+        "diagnosis_id": check_id,
+        "code": check_diagnosis_code,
+        "name": check_diagnosis_name,
+    },
+    "appointments": {
+        "appointment_id": check_id,
+        "patient_id": check_id,
+        "doctor_id": check_id,
+        "room_id": check_id,
+        "service_id": check_id,
+        "appointment_date": check_date,
+        "appointment_time": check_time,
+        "status": check_status,
+    },
+}
+
+# Поля, которые могут отсутствовать в строке
+_OPTIONAL_FIELDS = frozenset(("status",))
+
+
+class RecordValidator:
+    """Проверка строк одного раздела по правилам SECTION_RULES."""
+
+    def __init__(self, section: str) -> None:
+        self.section = section
+        self._rules = list(SECTION_RULES[section].items())
+
+    def check(self, row: Row, index: int = 0) -> List[FieldError]:
+        """Проверяет одну строку; index попадает в FieldError.row."""
+        errors = []
+        for field, rule in self._rules:
+            value = row.get(field)
+            if value is None and field not in _OPTIONAL_FIELDS:
+                errors.append(FieldError(index, field, None, "Поле отсутствует"))
+                continue
+            message = rule(value)
+            if message is not None:
+                errors.append(FieldError(index, field, value, message))
+        return errors
+
+    def validate(self, rows: Iterable[Row], start: int = 0) -> List[FieldError]:
+        """Проверяет строки; номера строк отсчитываются от start."""
+        errors: List[FieldError] = []
+        check = self.check
+        for index, row in enumerate(rows, start):
+            found = check(row, index)
+            if found:
+                errors.extend(found)
+        return errors
+
+    def validate_columns(
+        self, columns: Mapping[str, Sequence[Any]]
+    ) -> List[FieldError]:
+        """Проверяет пачку, заданную столбцами: поле -> значения по строкам.
+
+        Каждое правило применяется ко всему столбцу сразу. Ошибки
+        упорядочены по номеру строки, затем по порядку полей раздела.
+        """
+        size = max((len(values) for values in columns.values()), default=0)
+        errors: List[FieldError] = []
+        for position, (field, rule) in enumerate(self._rules):
+            values = columns.get(field)
+            if values is None:
+                if field not in _OPTIONAL_FIELDS:
+                    errors.extend(
+                        FieldError(index, field, None, "Поле отсутствует")
+                        for index in range(size)
+                    )
+                continue
+            optional = field in _OPTIONAL_FIELDS
+            for index, (value, message) in enumerate(zip(values, map(rule, values))):
+                if value is None and not optional:
+                    errors.append(FieldError(index, field, None, "Поле отсутствует"))
+                elif message is not None:
+                    errors.append(FieldError(index, field, value, message))
+        order = {field: position for position, (field, _) in enumerate(self._rules)}
+        errors.sort(key=lambda error: (error.row, order[error.field]))
+        return errors
+
+
+_VALIDATORS: Dict[str, RecordValidator] = {}
+
+
+def validator_for(section: str) -> RecordValidator:
+    """Возвращает общий проверяющий объект раздела."""
+    validator = _VALIDATORS.get(section)
+    if validator is None:
+        validator = _VALIDATORS[section] = RecordValidator(section)
+    return validator
+
+
+def validate_rows(
+    section: str, rows: Iterable[Row], start: int = 0
+) -> List[FieldError]:
+    """Проверяет строки раздела и возвращает ошибки полей."""
+    return validator_for(section).validate(rows, start)
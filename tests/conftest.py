@@ -0,0 +1,60 @@
+"""Общие данные тестов: небольшая поликлиника со случайными записями."""
+
+import random
+
+import pytest
+
+from models import ValidationError
+from services import PolyclinicService
+
+DAYS = ["2026-03-02", "2026-03-03", "2026-03-04"]
+
+
+def fill_service(service: PolyclinicService, seed: int = 1) -> PolyclinicService:
+    """Заполняет сервис врачами, кабинетами и случайными записями на прием.
+
+    Записи начинаются не на сетке окон и имеют разную длительность; часть
+    записей отменена. Попытки, пересекающиеся с уже созданными записями,
+    отклоняются сервисом и пропускаются.
+    """
+    rng = random.Random(seed)
+    for i in range(6):
+        service.create_patient(
+            "Иван", f"Иванов{i}", "1990-01-01", f"+7999000{i:04d}", f"{i:016d}"
+        )
+    for i, specialization in enumerate(["Терапевт", "Терапевт", "Терапевт", "Хирург"]):
+        service.create_doctor(
+            "Петр",
+            f"Петров{i}",
+            "1980-01-01",
+            f"+7998000{i:04d}",
+            specialization,
+            f"LIC{i}",
+        )
+    department = service.create_department("Терапевтическое", 1, 1)
+    for i in range(2):
+        service.create_room(str(100 + i), 1, "Кабинет", department.department_id)
+    for duration in (15, 30, 45, 70):
+        service.create_service(f"Прием {duration}", "", 1000.0, duration)
+
+    for _ in range(150):
+        minute = rng.randrange(8 * 60, 20 * 60, 5)
+        try:
+            appointment = service.create_appointment(
+                rng.randint(1, 6),
+                rng.randint(1, 4),
+                rng.randint(1, 2),
+                rng.choice(DAYS),
+                f"{minute // 60:02d}:{minute % 60:02d}",
+                rng.randint(1, 4),
+            )
+        except ValidationError:
+            continue
+        if rng.random() < 0.2:
+            service.cancel_appointment(appointment.appointment_id)
+    return service
+
+
+@pytest.fixture
+def service() -> PolyclinicService:
+    return fill_service(PolyclinicService("Поликлиника", "ул. Ленина, 10"))
@@ -0,0 +1,71 @@
+"""Отчеты по выручке и загрузке: сравнение с подсчетом по объектам."""
+
+from datetime import date, timedelta
+
+import pytest
+
+from models import STATUS_CANCELLED, ValidationError, parse_date
+from services.analytics import BILLABLE_STATUSES, aggregate, summarize
+
+
+def brute_force(service, key_of, statuses=BILLABLE_STATUSES, days=None):
+    """Группа -> (число записей, минуты, выручка) по объектам записей."""
+    totals = {}
+    for appointment in service.appointments:
+        if appointment.status not in statuses:
+            continue
+        if days is not None and not days[0] <= appointment.day <= days[1]:
+            continue
+        count, minutes, revenue = totals.get(key_of(appointment), (0, 0, 0.0))
+        totals[key_of(appointment)] = (
+            count + 1,
+            minutes + appointment.service.duration,
+            revenue + appointment.service.cost,
+        )
+    return totals
+
+
+def report(groups):
+    return {g.key: (g.count, g.minutes, g.revenue) for g in groups}
+
+
+def week(appointment):
+    day = date.fromordinal(appointment.day)
+    return (day - timedelta(days=day.weekday())).toordinal()
+
+
+@pytest.mark.parametrize(
+    "group_by, key_of",
+    [
+        ("doctor", lambda a: a.doctor.doctor_id),
+        ("department", lambda a: a.room.department.department_id),
+        ("service", lambda a: a.service.service_id),
+        ("day", lambda a: a.day),
+        ("week", week),
+        ("month", lambda a: tuple(map(int, a.appointment_date.split("-")[:2]))),
+    ],
+)
+def test_aggregate_matches_brute_force(service, group_by, key_of):
+    groups = aggregate(service, group_by)
+    assert report(groups) == pytest.approx(brute_force(service, key_of))
+    assert [g.key for g in groups] == sorted(g.key for g in groups)
+
+
+def test_report_filters_statuses_and_days(service):
+    days = (parse_date("2026-03-03"),) * 2
+    cancelled = (STATUS_CANCELLED,)
+    groups = aggregate(service, "doctor", cancelled, *days)
+    expected = brute_force(service, lambda a: a.doctor.doctor_id, cancelled, days)
+    assert expected
+    assert report(groups) == pytest.approx(expected)
+
+    total = summarize(service)
+    all_groups = brute_force(service, lambda a: None)
+    assert (total.count, total.minutes, total.revenue) == pytest.approx(
+        all_groups[None]
+    )
+
+
+def test_unknown_grouping_is_rejected(service):
+    with pytest.raises(ValidationError):
+        aggregate(service, "patient")
@@ -0,0 +1,56 @@
+"""Пакетная запись: заявки без пересечений и отчет о неразмещенных."""
+
+from itertools import combinations
+
+from models import STATUS_CANCELLED
+from services.batch_scheduling import BookingRequest, schedule_batch
+from services.scheduling import WORKDAY_END, WORKDAY_START, appointment_interval
+
+DAY = "2026-03-05"
+
+
+def overlaps(service):
+    """Пары неотмененных записей одного врача или кабинета, идущие одновременно."""
+    active = [a for a in service.appointments if a.status != STATUS_CANCELLED]
+    found = []
+    for first, second in combinations(active, 2):
+        if first.doctor is not second.doctor and first.room is not second.room:
+            continue
+        (start1, end1), (start2, end2) = map(appointment_interval, (first, second))
+        if start1 < end2 and start2 < end1:
+            found.append((first.appointment_id, second.appointment_id))
+    return found
+
+
+def test_batch_fills_day_without_overlaps(service):
+    before = overlaps(service)
+    surgeries = [
+        BookingRequest(i % 6 + 1, 4, DAY, DAY, specialization="Хирург")
+        for i in range(15)
+    ]
+    checkups = [BookingRequest(i + 1, 3, DAY, DAY, doctor_id=1) for i in range(5)]
+    missing = BookingRequest(99, 1, DAY, DAY, doctor_id=2)
+    result = schedule_batch(service, [*surgeries, missing, *checkups])
+
+    assert overlaps(service) == before
+    # Приемы по 70 минут начинаются на сетке 15 минут, то есть каждые 75
+    # минут: рабочий день единственного хирурга вмещает 10 из них
+    assert len(result.placed) == 10 + len(checkups)
+    for request, appointment in result.placed:
+        assert appointment.patient.patient_id == request.patient_id
+        assert appointment.appointment_date == DAY
+        start, end = appointment_interval(appointment)
+        assert WORKDAY_START <= start % (24 * 60) and end % (24 * 60) <= WORKDAY_END
+        if request.doctor_id is not None:
+            assert appointment.doctor.doctor_id == request.doctor_id
+        else:
+            assert appointment.doctor.specialization == "Хирург"
+
+    # Неразмещенные заявки идут в исходном порядке, с причиной отказа
+    placed = {id(request) for request, _ in result.placed}
+    assert [request for request, _ in result.unplaced] == [
+        request for request in [*surgeries, missing] if id(request) not in placed
+    ]
+    reasons = [reason for _, reason in result.unplaced]
+    assert reasons[:-1] == ["Нет свободного времени в заданном окне"] * 5
+    assert "99" in reasons[-1]
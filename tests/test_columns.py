@@ -0,0 +1,54 @@
+"""Столбцовая копия записей на прием: совпадение с объектами после изменений."""
+
+from collections import Counter
+
+from models import STATUS_CANCELLED, STATUS_COMPLETED, STATUS_SCHEDULED
+
+
+def object_rows(service):
+    return sorted(
+        (
+            a.appointment_id,
+            a.patient.patient_id,
+            a.doctor.doctor_id,
+            a.room.room_id,
+            a.service.service_id,
+            a.day,
+            a.minute,
+            a.status,
+        )
+        for a in service.appointments
+    )
+
+
+def column_rows(columns):
+    names = ("appointment_id", "patient_id", "doctor_id", "room_id")
+    names += ("service_id", "day", "minute")
+    return sorted(
+        (*row, columns.status_name(code))
+        for *row, code in zip(*(columns.column(name) for name in names), columns.status)
+    )
+
+
+def test_columns_follow_service_changes(service):
+    columns = service.appointment_columns()
+    assert column_rows(columns) == object_rows(service)
+
+    appointments = sorted(service.appointments, key=lambda a: a.appointment_id)
+    service.complete_appointment(appointments[0].appointment_id)
+    service.cancel_appointment(appointments[1].appointment_id)
+    service.delete_appointment(appointments[2].appointment_id)
+    service.delete_patient(3)
+    service.create_appointment(1, 1, 1, "2026-03-10", "10:00", 2)
+    assert service.appointment_columns() is columns
+    assert len(columns) == len(service.appointments)
+    assert column_rows(columns) == object_rows(service)
+
+
+def test_count_by_with_status_mask(service):
+    columns = service.appointment_columns()
+    mask = columns.status_mask(STATUS_SCHEDULED, STATUS_COMPLETED)
+    assert columns.count_by("doctor_id", mask) == Counter(
+        a.doctor.doctor_id for a in service.appointments if a.status != STATUS_CANCELLED
+    )
+    assert columns.count_by("day") == Counter(a.day for a in service.appointments)
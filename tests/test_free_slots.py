@@ -0,0 +1,137 @@
+"""Поиск свободных окон против полного перебора сетки."""
+
+import warnings
+
+import pytest
+
+from models import (
+    MINUTES_PER_DAY,
+    STATUS_CANCELLED,
+    Appointment,
+    format_date,
+    format_time,
+    parse_date,
+)
+from services import InMemoryRepository, PolyclinicService, SqliteRepository
+from services.scheduling import WORKDAY_END, WORKDAY_START, appointment_interval
+
+from .conftest import DAYS, fill_service
+
+
+def busy(service: PolyclinicService, owner: str, owner_id: int, start: int, end: int):
+    """Занят ли врач или кабинет в [start, end) - перебором всех записей."""
+    for appointment in service.get_all_appointments():
+        if appointment.status == STATUS_CANCELLED:
+            continue
+        if owner == "doctor_id":
+            appointment_owner = appointment.doctor.doctor_id
+        else:
+            appointment_owner = appointment.room.room_id
+        first, last = appointment_interval(appointment)
+        if appointment_owner == owner_id and first < end and last > start:
+            return True
+    return False
+
+
+def brute_force_slots(service, specialization, date_range, duration, limit, step):
+    """Ранние окна перебором: каждое начало сетки, каждый врач и кабинет."""
+    doctors = sorted(
+        (d for d in service.get_all_doctors() if d.specialization == specialization),
+        key=lambda d: d.doctor_id,
+    )
+    rooms = service.rooms
+    slots = []
+    for day in range(parse_date(date_range[0]), parse_date(date_range[1]) + 1):
+        minute = WORKDAY_START
+        while minute + duration <= WORKDAY_END:
+            start = day * MINUTES_PER_DAY + minute
+            end = start + duration
+            for doctor in doctors:
+                if busy(service, "doctor_id", doctor.doctor_id, start, end):
+                    continue
+                if all(busy(service, "room_id", r.room_id, start, end) for r in rooms):
+                    continue
+                slots.append((format_date(day), format_time(minute), doctor.doctor_id))
+                if len(slots) >= limit:
+                    return slots
+            minute += step
+    return slots
+
+
+def check_slots(service, duration, limit=200, step=15, specialization="Терапевт"):
+    # Последний день поиска свободен от записей
+    date_range = (DAYS[0], "2026-03-05")
+    found = service.find_free_slots(specialization, date_range, duration, limit, step)
+    expected = brute_force_slots(
+        service, specialization, date_range, duration, limit, step
+    )
+    assert [(d, t, doctor.doctor_id) for d, t, doctor, _ in found] == expected
+    for date, time, doctor, room in found:
+        start = parse_date(date) * MINUTES_PER_DAY + int(time[:2]) * 60 + int(time[3:])
+        assert not busy(service, "room_id", room.room_id, start, start + duration)
+
+
+@pytest.fixture(params=["memory", "sqlite"])
+def any_service(request, tmp_path):
+    if request.param == "memory":
+        repository = InMemoryRepository()
+    else:
+        repository = SqliteRepository(str(tmp_path / "data.db"))
+    service = PolyclinicService("Поликлиника", "ул. Ленина, 10", repository=repository)
+    yield fill_service(service)
+    repository.close()
+
+
+@pytest.mark.parametrize("duration", [10, 15, 30, 45, 90, 200])
+def test_free_slots_match_brute_force(any_service, duration):
+    check_slots(any_service, duration)
+
+
+def test_free_slots_other_step_and_limit(any_service):
+    check_slots(any_service, 25, limit=100, step=10)
+    check_slots(any_service, 60, limit=3, step=20)
+    check_slots(any_service, 30, specialization="Хирург")
+
+
+def test_free_slots_follow_bookings_and_cancellations(service):
+    # Повторные поиски опираются на запомненные границы окон: они должны
+    # сдвигаться при создании записей и откатываться при отмене
+    for duration in (30, 45):
+        check_slots(service, duration)
+    date, time, doctor, room = service.find_free_slots(
+        "Терапевт", (DAYS[0], DAYS[-1]), 45, 1
+    )[0]
+    appointment = service.create_appointment(
+        1, doctor.doctor_id, room.room_id, date, time, 3
+    )
+    for duration in (30, 45):
+        check_slots(service, duration)
+    service.cancel_appointment(appointment.appointment_id)
+    for duration in (30, 45):
+        check_slots(service, duration)
+    for appointment in list(service.get_all_appointments())[:20]:
+        service.delete_appointment(appointment.appointment_id)
+    for duration in (30, 45):
+        check_slots(service, duration)
+
+
+def test_free_slots_with_restored_overlap(service):
+    # Пересечение из сохраненных данных: длинная запись накрывает короткие
+    doctor = service.get_doctor(1)
+    long_service = service.create_service("Долгий прием", "", 1000.0, 300)
+    appointment = Appointment(
+        1000,
+        service.get_patient(1),
+        doctor,
+        service.get_room(1),
+        DAYS[0],
+        "08:05",
+        long_service,
+        "",
+    )
+    with warnings.catch_warnings(record=True) as caught:
+        warnings.simplefilter("always")
+        service.restore_appointment(appointment)
+    assert caught
+    for duration in (15, 30, 45):
+        check_slots(service, duration)
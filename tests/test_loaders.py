@@ -0,0 +1,96 @@
+"""Загрузка JSON и XML: восстановление объектов с исходными ID."""
+
+import io
+import json
+import os
+
+import pytest
+
+from models import STATUS_COMPLETED
+from services import PolyclinicFileManager
+from services.json_stream import iter_json_object
+
+from .test_snapshot import add_entries, state
+
+
+@pytest.fixture
+def clinic(service):
+    add_entries(service)
+    service.delete_patient(2)
+    appointment = min(service.appointments, key=lambda a: a.appointment_id)
+    service.set_appointment_status(appointment.appointment_id, STATUS_COMPLETED)
+    return service
+
+
+def saved_state(service):
+    """state без номера следующей карты: JSON и XML не хранят ID карт."""
+    result = state(service)
+    del result["counters"]["record"]
+    return result
+
+
+def test_bulk_load_keeps_ids_and_statuses(clinic, tmp_path):
+    filename = str(tmp_path / "data.json")
+    PolyclinicFileManager.save_to_json(clinic, filename)
+    loaded = PolyclinicFileManager.load_from_json(filename, streaming=False)
+    assert saved_state(loaded) == saved_state(clinic)
+    assert loaded.get_patient(2) is None
+
+    # Новые объекты продолжают сохраненную нумерацию
+    patient = loaded.create_patient(
+        "Анна", "Новая", "1995-05-05", "+79170000001", "5" * 16
+    )
+    assert patient.patient_id == 7
+
+
+def test_streaming_json_matches_full_parse(clinic, tmp_path):
+    filename = str(tmp_path / "data.json")
+    PolyclinicFileManager.save_to_json(clinic, filename)
+    streamed = PolyclinicFileManager.load_from_json(filename)
+    parsed = PolyclinicFileManager.load_from_json(filename, streaming=False)
+    assert (streamed.name, streamed.address) == (clinic.name, clinic.address)
+    assert saved_state(streamed) == saved_state(parsed) == saved_state(clinic)
+
+
+@pytest.mark.parametrize("chunk_size", [1, 3, 7, 4096])
+def test_json_stream_splits_arrays(chunk_size):
+    document = {
+        "name": "Поликлиника \"№1\"\n",
+        "empty": [],
+        "rows": [{"id": 1, "cost": 1250.5}, {"id": 12345678901234567890}, "\u0436"],
+        "nested": {"list": [1, [2, 3]]},
+        "last": -0.125e3,
+    }
+    text = json.dumps(document, ensure_ascii=False, indent=2)
+    pairs = list(iter_json_object(io.StringIO(text), chunk_size))
+    assert pairs == [
+        ("name", document["name"]),
+        ("rows", document["rows"][0]),
+        ("rows", document["rows"][1]),
+        ("rows", document["rows"][2]),
+        ("nested", document["nested"]),
+        ("last", document["last"]),
+    ]
+
+
+def test_streaming_xml_matches_full_parse(clinic, tmp_path):
+    # Текст со служебными символами XML и пустые поля
+    clinic.create_service("Прием <срочный> & повторный", "", 700.0, 25)
+    clinic.name = "Поликлиника «A&B»"
+    filename = str(tmp_path / "data.xml")
+    PolyclinicFileManager.save_to_xml(clinic, filename)
+    streamed = PolyclinicFileManager.load_from_xml(filename)
+    parsed = PolyclinicFileManager.load_from_xml(filename, streaming=False)
+    assert streamed.name == parsed.name == clinic.name
+    assert saved_state(streamed) == saved_state(parsed) == saved_state(clinic)
+    assert streamed.get_service(5).description == ""
+
+
+def test_broken_xml_loads_empty_clinic(clinic, tmp_path):
+    filename = str(tmp_path / "data.xml")
+    PolyclinicFileManager.save_to_xml(clinic, filename)
+    with open(filename, "r+b") as f:
+        f.truncate(os.path.getsize(filename) // 2)
+    loaded = PolyclinicFileManager.load_from_xml(filename)
+    assert loaded.name == "Восстановленная поликлиника"
+    assert loaded.count("patients") == 0
@@ -0,0 +1,61 @@
+"""Подсказки по началу имени и поиск фамилий с опечатками."""
+
+import pytest
+
+from services import PolyclinicService
+
+NAMES = [
+    ("Анна", "Смирнова"),
+    ("Олег", "Смирнов"),
+    ("Мария", "Смолина"),
+    ("Иван", "Кузнецов"),
+    ("Петр", "Кузьмин"),
+    ("Анна", "Петрова"),
+]
+
+
+@pytest.fixture
+def clinic():
+    service = PolyclinicService("Поликлиника", "ул. Ленина, 10")
+    for i, (first_name, last_name) in enumerate(NAMES, 1):
+        service.create_patient(
+            first_name, last_name, "1990-01-01", f"+7916000{i:04d}", f"{i:016d}"
+        )
+    return service
+
+
+def names(patients):
+    return [f"{p.last_name} {p.first_name}" for p in patients]
+
+
+def test_autocomplete_by_last_or_first_name(clinic):
+    assert sorted(names(clinic.autocomplete("patients", "смир"))) == [
+        "Смирнов Олег",
+        "Смирнова Анна",
+    ]
+    assert len(clinic.autocomplete("patients", "см", limit=2)) == 2
+    assert names(clinic.autocomplete("patients", "Анна Пет")) == ["Петрова Анна"]
+    assert names(clinic.autocomplete("patients", "кузь")) == ["Кузьмин Петр"]
+    assert clinic.autocomplete("patients", "ю") == []
+
+
+def test_autocomplete_follows_changes(clinic):
+    clinic.autocomplete("patients", "к")
+    clinic.delete_patient(4)
+    clinic.create_patient("Юрий", "Кузин", "1990-01-01", "+79160009999", "9" * 16)
+    assert sorted(names(clinic.autocomplete("patients", "куз"))) == [
+        "Кузин Юрий",
+        "Кузьмин Петр",
+    ]
+
+
+def test_similar_names_with_typos(clinic):
+    total, found = clinic.search_similar("patients", "Смирнав Анна")
+    assert total >= 1 and names(found)[0] == "Смирнова Анна"
+    _, found = clinic.search_similar("patients", "Кузнецоф")
+    assert names(found)[0] == "Кузнецов Иван"
+
+    # Обычный поиск без совпадений по началу переходит к поиску с опечатками
+    total, found = clinic.search_patients("Кузнецоф")
+    assert total >= 1 and names(found)[0] == "Кузнецов Иван"
+    assert clinic.search_similar("patients", "Щукина") == (0, [])
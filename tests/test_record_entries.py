@@ -0,0 +1,77 @@
+"""Записи медицинских карт и их индексы по дням приема и кодам диагнозов."""
+
+import random
+
+import pytest
+
+from models import RecordEntry, parse_date
+
+CODES = ["J06", "I10", "K29"]
+DATES = ["2026-02-27", "2026-03-01", "2026-03-02", "2026-03-09", "2026-04-15"]
+
+
+def add_random_entries(service, rng, count):
+    diagnoses = [service.create_diagnosis(code, code, "") for code in CODES]
+    for _ in range(count):
+        service.add_record_entry(
+            rng.randint(1, 6),
+            rng.choice(DATES),
+            service.get_doctor(rng.randint(1, 4)),
+            rng.choice([*diagnoses, None]),
+            "жалобы",
+            "",
+        )
+
+
+def brute_force(service, code, date_range):
+    first, last = (parse_date(day) for day in date_range)
+    return [
+        (patient.patient_id, entry.entry_id)
+        for patient in service.patients
+        for entry in patient.medical_record.entries
+        if first <= entry.entry_day <= last
+        and (code is None or (entry.diagnosis and entry.diagnosis.code == code))
+    ]
+
+
+@pytest.mark.parametrize("code", [None, *CODES, "Z99"])
+@pytest.mark.parametrize(
+    "date_range", [(DATES[0], DATES[-1]), ("2026-03-01", "2026-03-08"), DATES[3:4] * 2]
+)
+def test_index_matches_brute_force(service, code, date_range):
+    rng = random.Random(7)
+    add_random_entries(service, rng, 40)
+    service.find_record_entries()
+    # Записи, добавленные после построения индекса, и удаление пациента
+    add_random_entries(service, rng, 20)
+    service.delete_patient(2)
+
+    found = service.find_record_entries(code, date_range)
+    days = [entry.entry_day for _, entry in found]
+    assert days == sorted(days)
+    pairs = [(patient.patient_id, entry.entry_id) for patient, entry in found]
+    assert sorted(pairs) == sorted(brute_force(service, code, date_range))
+
+    if code is not None:
+        expected = sorted({patient_id for patient_id, _ in pairs})
+        patients = service.patients_with_code(code, date_range)
+        assert [patient.patient_id for patient in patients] == expected
+
+
+def test_patient_entries_between(service):
+    add_random_entries(service, random.Random(3), 30)
+    for patient in service.patients:
+        entries = service.patient_entries_between(patient.patient_id, DATES[1:3])
+        assert [entry.entry_day for entry in entries] == sorted(
+            entry.entry_day
+            for entry in patient.medical_record.entries
+            if DATES[1] <= entry.entry_date <= DATES[2]
+        )
+    assert service.patient_entries_between(99, DATES[1:3]) == []
+
+
+def test_entry_is_compact():
+    entry = RecordEntry(1, parse_date("2026-03-02"), None, None, "кашель", "")
+    assert entry.entry_date == "2026-03-02"
+    assert not hasattr(entry, "__dict__")
+    assert entry.prescriptions == ()
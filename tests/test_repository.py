@@ -0,0 +1,61 @@
+"""Занятость врачей и кабинетов в хранилище записей на прием."""
+
+import pytest
+
+from models import STATUS_CANCELLED, STATUS_SCHEDULED, Appointment, ValidationError
+from services import PolyclinicService
+
+
+@pytest.fixture
+def clinic():
+    service = PolyclinicService("Поликлиника", "ул. Ленина, 10")
+    service.create_patient("Иван", "Иванов", "1990-01-01", "+79160000001", "1" * 16)
+    for i in range(2):
+        service.create_doctor(
+            "Анна", f"Смирнова{i}", "1980-01-01", f"+7916100000{i}", "Терапевт", f"M{i}"
+        )
+    department = service.create_department("Терапевтическое", 1, 1)
+    for number in ("101", "102"):
+        service.create_room(number, 1, "Кабинет", department.department_id)
+    service.create_service("Прием", "", 1000.0, 30)
+    service.create_appointment(1, 1, 1, "2026-03-02", "10:00", 1)
+    return service
+
+
+def test_overlap_accounts_for_duration(clinic):
+    # Прием 10:00-10:30 занимает врача и кабинет на всю длительность
+    with pytest.raises(ValidationError, match="Время уже занято"):
+        clinic.create_appointment(1, 1, 2, "2026-03-02", "10:20", 1)
+    with pytest.raises(ValidationError, match="Кабинет"):
+        clinic.create_appointment(1, 2, 1, "2026-03-02", "09:45", 1)
+    clinic.create_appointment(1, 1, 2, "2026-03-02", "10:30", 1)
+    clinic.create_appointment(1, 2, 1, "2026-03-02", "09:30", 1)
+    assert clinic.count("appointments") == 3
+
+
+def test_cancelled_appointment_frees_time(clinic):
+    clinic.cancel_appointment(1)
+    clinic.create_appointment(1, 2, 1, "2026-03-02", "10:10", 1)
+    # Возврат отмененной записи в расписание упирается в новую запись
+    with pytest.raises(ValidationError):
+        clinic.set_appointment_status(1, STATUS_SCHEDULED)
+    assert clinic.get_all_appointments()[0].status == STATUS_CANCELLED
+
+
+def test_failed_booking_leaves_repository_unchanged(clinic):
+    # Врач свободен, кабинет занят: хранилище не должно занять время врача
+    appointment = Appointment(
+        2,
+        clinic.get_patient(1),
+        clinic.get_doctor(2),
+        clinic.get_room(1),
+        "2026-03-02",
+        "10:15",
+        clinic.get_service(1),
+        "",
+    )
+    with pytest.raises(ValidationError):
+        clinic.repository.add("appointments", appointment)
+    assert clinic.count("appointments") == 1
+    assert clinic.repository.find_overlap("doctor_id", 2, 0, 10**9) is None
+    clinic.create_appointment(1, 2, 2, "2026-03-02", "10:15", 1)
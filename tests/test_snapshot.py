@@ -0,0 +1,207 @@
+"""Бинарный снимок и его журнал изменений: сохранение и загрузка."""
+
+import os
+
+import pytest
+
+from services import PolyclinicFileManager
+from services import journal
+from services.journal import journal_path
+from services.record_store import records_path, text_index_path
+
+
+def state(service):
+    """Содержимое сервиса в виде, удобном для сравнения."""
+    people = ("first_name", "last_name", "birth_date", "phone")
+    return {
+        "patients": [
+            (p.patient_id, p.insurance_number, *(getattr(p, f) for f in people))
+            for p in sorted(service.patients, key=lambda p: p.patient_id)
+        ],
+        "doctors": [
+            (d.doctor_id, d.specialization, d.license_number, d.phone)
+            for d in sorted(service.doctors, key=lambda d: d.doctor_id)
+        ],
+        "rooms": sorted(
+            (r.room_id, r.room_number, r.department.department_id)
+            for r in service.rooms
+        ),
+        "services": sorted(
+            (s.service_id, s.name, s.duration) for s in service.services
+        ),
+        "appointments": sorted(
+            (
+                a.appointment_id,
+                a.patient.patient_id,
+                a.doctor.doctor_id,
+                a.room.room_id,
+                a.appointment_date,
+                a.appointment_time,
+                a.service.service_id,
+                a.status,
+            )
+            for a in service.appointments
+        ),
+        "records": {
+            p.patient_id: [
+                (
+                    e.entry_id,
+                    e.entry_day,
+                    e.doctor.doctor_id,
+                    e.diagnosis.code if e.diagnosis else None,
+                    e.symptoms,
+                    [x.prescription_id for x in e.prescriptions],
+                )
+                for e in p.medical_record.entries
+            ]
+            for p in service.patients
+        },
+        "counters": service.get_id_counters(),
+    }
+
+
+def add_entries(service):
+    diagnosis = service.create_diagnosis("J06", "ОРВИ", "")
+    for patient_id in (1, 3):
+        prescription = service.create_prescription("Парацетамол", "500 мг", "", "")
+        service.add_record_entry(
+            patient_id,
+            "2026-03-02",
+            service.get_doctor(1),
+            diagnosis,
+            f"кашель {patient_id}",
+            "покой",
+            [prescription],
+        )
+
+
+@pytest.fixture
+def snapshot(service, tmp_path):
+    add_entries(service)
+    filename = str(tmp_path / "data.snapshot")
+    PolyclinicFileManager.save_to_snapshot(service, filename)
+    return filename
+
+
+def test_snapshot_round_trip(service, snapshot):
+    loaded = PolyclinicFileManager.load_from_snapshot(snapshot)
+    assert state(loaded) == state(service)
+    assert not os.path.exists(journal_path(snapshot))
+
+
+def test_snapshot_decodes_on_access(snapshot):
+    loaded = PolyclinicFileManager.load_from_snapshot(snapshot)
+    patients = loaded.repository.patients
+    assert not patients._cache
+    assert loaded.get_patient(3).last_name == "Иванов2"
+    assert list(patients._cache) == [3]
+    assert loaded.count("patients") == 6
+
+
+def test_journal_round_trip(snapshot):
+    service = PolyclinicFileManager.load_from_snapshot(snapshot)
+    service.create_patient("Анна", "Новая", "1995-05-05", "+79170000001", "5" * 16)
+    appointments = sorted(service.appointments, key=lambda a: a.appointment_id)
+    service.cancel_appointment(appointments[0].appointment_id)
+    service.delete_appointment(appointments[1].appointment_id)
+    service.delete_patient(2)
+    PolyclinicFileManager.save_to_snapshot(service, snapshot)
+    assert os.path.exists(journal_path(snapshot))
+
+    loaded = PolyclinicFileManager.load_from_snapshot(snapshot)
+    assert state(loaded) == state(service)
+
+    # Второе сохранение дописывает журнал, а не переписывает снимок
+    loaded.create_service("Осмотр", "", 500.0, 20)
+    PolyclinicFileManager.save_to_snapshot(loaded, snapshot)
+    assert state(PolyclinicFileManager.load_from_snapshot(snapshot)) == state(loaded)
+
+
+def test_journal_compaction(snapshot, monkeypatch):
+    monkeypatch.setattr(journal, "COMPACT_MIN_BYTES", 0)
+    monkeypatch.setattr(journal, "COMPACT_RATIO", 0)
+    service = PolyclinicFileManager.load_from_snapshot(snapshot)
+    service.create_patient("Анна", "Новая", "1995-05-05", "+79170000001", "5" * 16)
+    PolyclinicFileManager.save_to_snapshot(service, snapshot)
+    assert not os.path.exists(journal_path(snapshot))
+    assert state(PolyclinicFileManager.load_from_snapshot(snapshot)) == state(service)
+
+
+def test_stale_journal_is_ignored(service, snapshot):
+    loaded = PolyclinicFileManager.load_from_snapshot(snapshot)
+    loaded.create_patient("Анна", "Новая", "1995-05-05", "+79170000001", "5" * 16)
+    PolyclinicFileManager.save_to_snapshot(loaded, snapshot)
+
+    # Снимок переписан заново, а журнал остался от прежнего
+    journal_file = journal_path(snapshot)
+    with open(journal_file, "rb") as f:
+        leftover = f.read()
+    service.checkpoint()
+    PolyclinicFileManager.save_to_snapshot(service, snapshot)
+    with open(journal_file, "wb") as f:
+        f.write(leftover)
+    assert state(PolyclinicFileManager.load_from_snapshot(snapshot)) == state(service)
+
+
+def test_journal_save_keeps_unchanged_charts(snapshot):
+    service = PolyclinicFileManager.load_from_snapshot(snapshot)
+    service.search_records("кашель")
+    PolyclinicFileManager.save_to_snapshot(service, snapshot)
+    stamps = {
+        path: os.stat(path).st_mtime_ns
+        for path in (records_path(snapshot), text_index_path(snapshot))
+    }
+
+    service.create_patient("Анна", "Новая", "1995-05-05", "+79170000001", "5" * 16)
+    PolyclinicFileManager.save_to_snapshot(service, snapshot)
+    assert {path: os.stat(path).st_mtime_ns for path in stamps} == stamps
+
+    add_entries(service)
+    PolyclinicFileManager.save_to_snapshot(service, snapshot)
+    assert os.stat(records_path(snapshot)).st_mtime_ns != stamps[records_path(snapshot)]
+    loaded = PolyclinicFileManager.load_from_snapshot(snapshot)
+    assert state(loaded) == state(service)
+    total, _ = loaded.search_records("кашель")
+    assert total == service.search_records("кашель")[0] == 4
+
+
+def test_journal_patient_keeps_chart(snapshot, tmp_path):
+    service = PolyclinicFileManager.load_from_snapshot(snapshot)
+    patient = service.create_patient(
+        "Анна", "Новая", "1995-05-05", "+79170000001", "5" * 16
+    )
+    service.add_record_entry(
+        patient.patient_id, "2026-03-03", service.get_doctor(2), None, "озноб", ""
+    )
+    PolyclinicFileManager.save_to_snapshot(service, snapshot)
+    assert os.path.exists(journal_path(snapshot))
+
+    loaded = PolyclinicFileManager.load_from_snapshot(snapshot)
+    assert state(loaded) == state(service)
+    assert loaded.count_record_entries(patient.patient_id) == 1
+    assert loaded.search_records("озноб")[0] == 1
+
+    # Карта не теряется и при пересохранении в другой формат
+    json_file = str(tmp_path / "data.json")
+    PolyclinicFileManager.save_to_json(loaded, json_file)
+    reloaded = PolyclinicFileManager.load_from_json(json_file)
+    entries = reloaded.get_medical_record(patient.patient_id).entries
+    assert [entry.symptoms for entry in entries] == ["озноб"]
+
+
+def test_entry_added_through_chart_is_saved(snapshot):
+    service = PolyclinicFileManager.load_from_snapshot(snapshot)
+    service.find_record_entries("J06")
+    service.search_records("кашель")
+    record = service.get_medical_record(2)
+    record.add_entry("2026-03-04", service.get_doctor(3), None, "хрипы", "", [])
+    assert service.charts_changed
+    assert service.search_records("хрипы")[0] == 1
+    day = ("2026-03-04", "2026-03-04")
+    found = service.find_record_entries(date_range=day)
+    assert [(p.patient_id, e.symptoms) for p, e in found] == [(2, "хрипы")]
+
+    PolyclinicFileManager.save_to_snapshot(service, snapshot)
+    loaded = PolyclinicFileManager.load_from_snapshot(snapshot)
+    assert state(loaded) == state(service)
+    assert loaded.search_records("хрипы")[0] == 1
@@ -0,0 +1,97 @@
+"""Сервис поверх базы SQLite: сохранение, счетчики ID и карты."""
+
+import os
+
+import pytest
+
+from services import PolyclinicFileManager, PolyclinicService
+from services.record_store import records_path, text_index_path
+
+from .test_snapshot import state
+
+
+@pytest.fixture
+def database(service, tmp_path):
+    diagnosis = service.create_diagnosis("B20", "Болезнь, вызванная ВИЧ", "")
+    service.add_record_entry(
+        1, "2026-03-02", service.get_doctor(1), diagnosis, "слабость", "терапия"
+    )
+    service.search_records("слабость")
+    filename = str(tmp_path / "data.db")
+    PolyclinicFileManager.save_to_sqlite(service, filename)
+    return filename
+
+
+def reopen(filename):
+    return PolyclinicFileManager.load_from_sqlite(filename)
+
+
+def test_sqlite_round_trip(service, database):
+    loaded = reopen(database)
+    assert state(loaded) == state(service)
+    loaded.repository.close()
+
+
+def test_deleted_ids_are_not_reused(database):
+    service = reopen(database)
+    last_patient = max(service.repository.patients)
+    service.delete_patient(last_patient)
+    appointment_id = max(service.repository.appointments)
+    service.delete_appointment(appointment_id)
+    service.repository.close()
+
+    service = reopen(database)
+    patient = service.create_patient(
+        "Анна", "Новая", "1995-05-05", "+79170000001", "5" * 16
+    )
+    assert patient.patient_id == last_patient + 1
+    assert service.create_appointment(
+        patient.patient_id, 4, 1, "2026-04-01", "09:00", 1
+    ).appointment_id == appointment_id + 1
+    service.repository.close()
+
+
+def test_deleted_patient_chart_is_erased(database):
+    service = reopen(database)
+    assert service.count_record_entries(1) == 1
+    service.delete_patient(1)
+    service.repository.close()
+
+    # Удаление зафиксировано: карты нет ни в файле карт, ни в индексе поиска
+    with open(records_path(database), "rb") as f:
+        assert "слабость".encode("utf-8") not in f.read()
+    assert not os.path.exists(text_index_path(database))
+
+    service = reopen(database)
+    patient = service.create_patient(
+        "Анна", "Новая", "1995-05-05", "+79170000001", "5" * 16
+    )
+    service.repository.close()
+    service = reopen(database)
+    assert service.count_record_entries(patient.patient_id) == 0
+    assert service.search_records("слабость")[0] == 0
+    service.repository.close()
+
+
+def test_rolled_back_delete_keeps_chart(database):
+    service = reopen(database)
+    with pytest.raises(RuntimeError):
+        with service.transaction():
+            service.delete_patient(1)
+            raise RuntimeError("отмена")
+    service.repository.close()
+    assert reopen(database).count_record_entries(1) == 1
+
+
+def test_counters_survive_save_to_new_file(tmp_path):
+    service = PolyclinicService("Поликлиника", "ул. Ленина, 10")
+    for i in range(3):
+        service.create_patient(
+            "Иван", f"Иванов{i}", "1990-01-01", f"+7916000000{i}", f"{i:016d}"
+        )
+    service.delete_patient(3)
+    filename = str(tmp_path / "data.db")
+    PolyclinicFileManager.save_to_sqlite(service, filename)
+    loaded = reopen(filename)
+    assert loaded.get_id_counters()["patient"] == 4
+    loaded.repository.close()
@@ -0,0 +1,116 @@
+"""Полнотекстовый индекс карт: сохранение рядом с файлом карт и устаревание."""
+
+import os
+import struct
+
+import pytest
+
+from services import PolyclinicFileManager, PolyclinicService
+from services.record_store import open_text_index, records_path, text_index_path
+
+
+def found(service, query):
+    """(ID пациента, номер записи) найденных записей карт."""
+    _, page = service.search_records(query)
+    return sorted((patient.patient_id, entry.entry_id) for patient, entry in page)
+
+
+@pytest.fixture
+def saved(tmp_path):
+    service = PolyclinicService("Поликлиника", "ул. Ленина, 10")
+    doctor = service.create_doctor(
+        "Анна", "Смирнова", "1980-01-01", "+79160000001", "Терапевт", "MED12345"
+    )
+    for i in range(4):
+        patient = service.create_patient(
+            "Иван", f"Иванов{i}", "1990-01-01", f"+7916000001{i}", f"{i:016d}"
+        )
+        symptoms = "кашель и насморк" if i % 2 else "головная боль"
+        service.add_record_entry(
+            patient.patient_id, "2026-01-05", doctor, None, symptoms, "покой"
+        )
+    service.search_records("кашель")
+    filename = str(tmp_path / "data.json")
+    PolyclinicFileManager.save_to_json(service, filename)
+    return filename
+
+
+def test_saved_index_is_attached(saved):
+    assert open_text_index(saved) is not None
+    service = PolyclinicFileManager.load_from_json(saved)
+    assert service.text_index(build=False) is not None
+    assert found(service, "кашель") == [(2, 1), (4, 1)]
+
+
+def test_resave_keeps_index_fresh(saved):
+    service = PolyclinicFileManager.load_from_json(saved)
+    PolyclinicFileManager.save_to_json(service, saved)
+    assert open_text_index(saved) is not None
+    assert found(PolyclinicFileManager.load_from_json(saved), "насморк") == [
+        (2, 1),
+        (4, 1),
+    ]
+
+
+def test_touched_records_make_index_stale(saved):
+    path = records_path(saved)
+    stat = os.stat(path)
+    os.utime(path, ns=(stat.st_atime_ns, stat.st_mtime_ns + 10**9))
+    assert open_text_index(saved) is None
+
+    service = PolyclinicFileManager.load_from_json(saved)
+    assert service.text_index(build=False) is None
+    assert found(service, "кашель") == [(2, 1), (4, 1)]
+
+
+def test_index_of_other_records_is_stale(saved, tmp_path):
+    # Индекс от одного файла карт, подложенный к другому
+    other = str(tmp_path / "other.json")
+    service = PolyclinicFileManager.load_from_json(saved)
+    service.add_record_entry(1, "2026-01-06", service.get_doctor(1), None, "кашель", "")
+    PolyclinicFileManager.save_to_json(service, other)
+    os.replace(text_index_path(saved), text_index_path(other))
+    assert open_text_index(other) is None
+    assert found(PolyclinicFileManager.load_from_json(other), "кашель") == [
+        (1, 2),
+        (2, 1),
+        (4, 1),
+    ]
+
+
+@pytest.mark.parametrize("damage", ["old_version", "truncated", "tiny"])
+def test_damaged_index_is_rebuilt(saved, damage):
+    path = text_index_path(saved)
+    with open(path, "rb") as f:
+        data = bytearray(f.read())
+    if damage == "old_version":
+        data[8:10] = struct.pack("<H", 1)
+    elif damage == "truncated":
+        data = data[:40]
+    else:
+        data = b"x"
+    with open(path, "wb") as f:
+        f.write(data)
+    service = PolyclinicFileManager.load_from_json(saved)
+    assert found(service, "кашель") == [(2, 1), (4, 1)]
+
+
+def test_search_skips_missing_patients(saved):
+    index = open_text_index(saved)
+    service = PolyclinicFileManager.load_from_json(saved)
+    service.delete_patient(2)
+    # Индекс, не знающий об удалении, указывает на пропавшего пациента
+    service.attach_text_index(index)
+    assert found(service, "кашель") == [(4, 1)]
+    assert service.search_records("кашель")[0] == 1
+
+
+def test_search_total_counts_only_found_entries(saved):
+    index = open_text_index(saved)
+    service = PolyclinicFileManager.load_from_json(saved)
+    service.delete_patient(1)
+    service.delete_patient(3)
+    service.attach_text_index(index)
+    # Все совпадения указывают на удаленных пациентов: пустая страница из 0
+    assert service.search_records("головная боль") == (0, [])
+    assert service.search_records("боль", limit=1) == (0, [])
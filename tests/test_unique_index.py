@@ -0,0 +1,128 @@
+"""Уникальные номера страховок, лицензий и телефонов."""
+
+import os
+import warnings
+
+import pytest
+
+from models import Doctor, Patient, ValidationError
+from services import PolyclinicFileManager, PolyclinicService
+from services.journal import journal_path
+from services.unique_index import UniqueIndex
+
+
+def patient(patient_id, phone, insurance_number):
+    return Patient(patient_id, "Иван", "Иванов", "1990-01-01", phone, insurance_number)
+
+
+def test_claim_rolls_back_on_conflict():
+    index = UniqueIndex("patients")
+    index.claim(patient(1, "+79160000001", "1111222233334444"))
+    # Страховка свободна, а телефон занят: страховка не должна остаться занятой
+    with pytest.raises(ValidationError, match="Телефон"):
+        index.claim(patient(2, "8 (916) 000-00-01", "5555666677778888"))
+    assert index.get("insurance_number", "5555666677778888") is None
+    assert index.get("phone", "+7 916 000 00 01") == 1
+    index.claim(patient(3, "+79160000003", "5555 6666 7777 8888"))
+    assert index.get("insurance_number", "5555666677778888") == 3
+
+
+def test_register_keeps_first_owner():
+    index = UniqueIndex("patients")
+    assert index.register(patient(1, "+79160000001", "1111222233334444")) == []
+    duplicates = index.register(patient(2, "+79160000001", "5555666677778888"))
+    assert len(duplicates) == 1 and "ID 1" in duplicates[0]
+    assert index.get("phone", "+79160000001") == 1
+    assert index.get("insurance_number", "5555666677778888") == 2
+
+
+def test_remove_frees_only_own_numbers():
+    index = UniqueIndex("doctors")
+    phone = "+79160000001"
+    first = Doctor(1, "Анна", "Смирнова", "1980-01-01", phone, "Терапевт", "MED1")
+    second = Doctor(2, "Олег", "Ковалев", "1975-01-01", phone, "Хирург", "MED2")
+    index.build([first, second])
+    index.remove(second)
+    assert index.get("phone", "+79160000001") == 1
+    assert index.get("license_number", "MED2") is None
+
+
+def test_create_patient_rejects_duplicates():
+    service = PolyclinicService("Поликлиника", "ул. Ленина, 10")
+    service.create_patient("Иван", "Иванов", "1990-01-01", "+79160000001", "1" * 16)
+    with pytest.raises(ValidationError):
+        service.create_patient(
+            "Петр", "Петров", "1990-01-01", "+79160000002", "1111 1111 1111 1111"
+        )
+    assert service.count("patients") == 1
+    assert service.get_patient_by_phone("+79160000002") is None
+    service.create_patient("Петр", "Петров", "1990-01-01", "+79160000002", "2" * 16)
+
+
+def test_stored_duplicates_load_with_warning(tmp_path):
+    service = PolyclinicService("Поликлиника", "ул. Ленина, 10")
+    service.restore_patient(patient(1, "+79160000001", "1" * 16))
+    with pytest.warns(UserWarning, match="Повтор номера"):
+        service.restore_patient(patient(2, "+79160000001", "2" * 16))
+    assert service.get_patient_by_phone("+79160000001").patient_id == 1
+
+    filename = str(tmp_path / "data.json")
+    PolyclinicFileManager.save_to_json(service, filename)
+    with warnings.catch_warnings(record=True) as caught:
+        warnings.simplefilter("always")
+        loaded = PolyclinicFileManager.load_from_json(filename)
+    assert loaded.count("patients") == 2
+    assert any("Повтор номера" in str(warning.message) for warning in caught)
+
+
+def clinic(count):
+    service = PolyclinicService("Поликлиника", "ул. Ленина, 10")
+    for i in range(1, count + 1):
+        service.create_patient(
+            "Иван", f"Иванов{i}", "1990-01-01", f"+7916000{i:04d}", f"{i:016d}"
+        )
+    return service
+
+
+def test_snapshot_numbers_read_without_decoding(tmp_path):
+    filename = str(tmp_path / "data.snapshot")
+    PolyclinicFileManager.save_to_snapshot(clinic(5), filename)
+    service = PolyclinicFileManager.load_from_snapshot(filename)
+    service.create_patient("Анна", "Новая", "1995-05-05", "+79170000001", "9" * 16)
+    service.delete_patient(2)
+    PolyclinicFileManager.save_to_snapshot(service, filename)
+    assert os.path.exists(journal_path(filename))
+
+    # Пациенты из журнала восстанавливаются, не декодируя снимок
+    loaded = PolyclinicFileManager.load_from_snapshot(filename)
+    assert not loaded.repository.patients._cache
+    for phone in ("+79160000001", "+79170000001"):
+        with pytest.raises(ValidationError, match="Телефон"):
+            loaded.create_patient("Петр", "Петров", "1990-01-01", phone, "8" * 16)
+    assert not loaded.repository.patients._cache
+    # Номер удаленного пациента свободен
+    assert loaded.get_patient_by_phone("+79160000002") is None
+    loaded.create_patient("Петр", "Петров", "1990-01-01", "+79160000002", "8" * 16)
+
+
+def test_sqlite_numbers_checked_by_queries(tmp_path):
+    filename = str(tmp_path / "data.db")
+    PolyclinicFileManager.save_to_sqlite(clinic(5), filename)
+    service = PolyclinicFileManager.load_from_sqlite(filename)
+    with pytest.raises(ValidationError, match="Номер страховки"):
+        service.create_patient(
+            "Петр", "Петров", "1990-01-01", "+79170000001", "0000 0000 0000 0003"
+        )
+    assert service.get_patient_by_phone("8 (916) 000-00-04").patient_id == 4
+    assert list(service.repository.patients.cache) == [4]
+
+    with service.transaction():
+        # Еще не записанный пациент тоже занимает свои номера
+        service.create_patient("Анна", "Новая", "1995-05-05", "+79170000001", "9" * 16)
+        with pytest.raises(ValidationError, match="Телефон"):
+            service.create_patient(
+                "Петр", "Петров", "1990-01-01", "+79170000001", "8" * 16
+            )
+    service.delete_patient(1)
+    service.create_patient("Петр", "Петров", "1990-01-01", "+79160000001", "8" * 16)
+    service.repository.close()
@@ -0,0 +1,62 @@
+"""Проверка строк пачками и пропуск ошибочных строк при загрузке."""
+
+import json
+
+import pytest
+
+from services import PolyclinicFileManager
+from services.rows import iter_rows
+from services.validation import validate_rows, validator_for
+
+
+def errors(found):
+    return [(e.row, e.field, e.value, e.message) for e in found]
+
+
+@pytest.fixture
+def broken_rows(service):
+    # Фамилии тестовых пациентов содержат цифры; здесь они исправлены
+    rows = [dict(row, last_name="Иванов") for row in iter_rows(service, "patients")]
+    rows[0]["phone"] = "12-34"
+    rows[1]["birth_date"] = "2026-13-45"
+    rows[1]["first_name"] = "Иван3"
+    del rows[3]["insurance_number"]
+    rows[4]["patient_id"] = -5
+    return rows
+
+
+def test_rows_and_columns_give_same_errors(broken_rows):
+    validator = validator_for("patients")
+    by_rows = errors(validator.validate(broken_rows))
+    columns = {
+        field: [row.get(field) for row in broken_rows]
+        for field in ("patient_id", "first_name", "last_name", "birth_date")
+        + ("phone", "insurance_number")
+    }
+    assert errors(validator.validate_columns(columns)) == by_rows
+    assert [(row, field) for row, field, _, _ in by_rows] == [
+        (0, "phone"),
+        (1, "first_name"),
+        (1, "birth_date"),
+        (3, "insurance_number"),
+        (4, "patient_id"),
+    ]
+    assert errors(validate_rows("patients", broken_rows[5:], start=5)) == []
+
+
+def test_validated_load_skips_broken_rows(service, broken_rows, tmp_path):
+    filename = str(tmp_path / "data.json")
+    PolyclinicFileManager.save_to_json(service, filename)
+    with open(filename, encoding="utf-8") as f:
+        data = json.load(f)
+    data["patients"] = broken_rows
+    with open(filename, "w", encoding="utf-8") as f:
+        json.dump(data, f, ensure_ascii=False)
+
+    for streaming in (True, False):
+        loaded = PolyclinicFileManager.load_from_json(
+            filename, streaming=streaming, validate=True
+        )
+        assert sorted(p.patient_id for p in loaded.patients) == [3, 6]
+        # Записи на прием пропущенных пациентов не загружаются
+        assert {a.patient.patient_id for a in loaded.appointments} <= {3, 6}
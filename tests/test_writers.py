@@ -0,0 +1,61 @@
+"""Потоковая запись JSON и XML: тот же текст, что у json.dump и ElementTree."""
+
+import json
+import xml.etree.ElementTree as ET
+
+import pytest
+
+from services import PolyclinicFileManager, PolyclinicService
+from services.rows import SECTIONS, iter_rows
+
+from .test_snapshot import add_entries
+
+
+@pytest.fixture(params=["filled", "empty"])
+def clinic(request):
+    if request.param == "empty":
+        # Пустые разделы: [] в JSON и <patients /> в XML
+        return PolyclinicService("Поликлиника", "")
+    service = request.getfixturevalue("service")
+    add_entries(service)
+    service.create_service('Прием "срочный" <1> & \\ повторный', "", 700.5, 25)
+    service.create_diagnosis("Z00", "Осмотр\nплановый", "")
+    service.name = "Поликлиника «A&B»"
+    return service
+
+
+def read(filename):
+    with open(filename, "rb") as f:
+        return f.read()
+
+
+def test_json_matches_json_dump(clinic, tmp_path):
+    document = {"name": clinic.name, "address": clinic.address}
+    for section, _, _ in SECTIONS:
+        document[section] = list(iter_rows(clinic, section))
+    filename = str(tmp_path / "data.json")
+    PolyclinicFileManager.save_to_json(clinic, filename)
+    expected = json.dumps(document, ensure_ascii=False, indent=2)
+    assert read(filename) == expected.encode("utf-8")
+
+
+def test_xml_matches_element_tree(clinic, tmp_path):
+    root = ET.Element("polyclinic")
+    ET.SubElement(root, "name").text = clinic.name
+    ET.SubElement(root, "address").text = clinic.address
+    for section, tag, _ in SECTIONS:
+        section_elem = ET.SubElement(root, section)
+        for row in iter_rows(clinic, section):
+            elem = ET.SubElement(section_elem, tag)
+            ET.SubElement(elem, "id").text = str(row[f"{tag}_id"])
+            for key, value in row.items():
+                if key != f"{tag}_id":
+                    field = ET.SubElement(elem, key)
+                    if value is not None:
+                        field.text = str(value)
+    expected = str(tmp_path / "expected.xml")
+    ET.ElementTree(root).write(expected, encoding="utf-8", xml_declaration=True)
+
+    filename = str(tmp_path / "data.xml")
+    PolyclinicFileManager.save_to_xml(clinic, filename)
+    assert read(filename) == read(expected)